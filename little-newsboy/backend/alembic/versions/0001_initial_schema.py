@@ -0,0 +1,194 @@
+"""initial schema
+
+引入迁移之前由 Base.metadata.create_all 创建的表结构。
+已有数据库中存在的表和索引会被跳过，因此旧数据库无需手动stamp即可直接升级。
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+source_type = sa.Enum("GITHUB", "ARXIV", "BLOG", "COMMUNITY", "NEWS", name="sourcetype")
+update_frequency = sa.Enum("REALTIME", "DAILY", "WEEKLY", name="updatefrequency")
+priority = sa.Enum("HIGH", "MEDIUM", "LOW", name="priority")
+status = sa.Enum("ACTIVE", "PAUSED", name="status")
+job_status = sa.Enum("PENDING", "RUNNING", "SUCCEEDED", "FAILED", name="jobstatus")
+
+
+def _create_table(name: str, *columns) -> bool:
+    """表不存在时创建，返回是否新建"""
+    if sa.inspect(op.get_bind()).has_table(name):
+        return False
+    op.create_table(name, *columns)
+    return True
+
+
+def _create_index(name: str, table: str, columns: list, unique: bool = False) -> None:
+    existing = {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+    if name not in existing:
+        op.create_index(name, table, columns, unique=unique)
+
+
+def upgrade() -> None:
+    _create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("username", sa.String(), nullable=True),
+        sa.Column("email", sa.String(), nullable=True),
+        sa.Column("hashed_password", sa.String(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    _create_index("ix_users_id", "users", ["id"])
+    _create_index("ix_users_email", "users", ["email"], unique=True)
+    _create_index("ix_users_username", "users", ["username"], unique=True)
+
+    _create_table(
+        "sources",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=True),
+        sa.Column("type", source_type, nullable=True),
+        sa.Column("url", sa.String(), nullable=True),
+        sa.Column("update_frequency", update_frequency, nullable=True),
+        sa.Column("priority", priority, nullable=True),
+        sa.Column("status", status, nullable=True),
+        sa.Column("filters", sa.JSON(), nullable=True),
+        sa.Column("credentials", sa.JSON(), nullable=True),
+        sa.Column("user_id", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    _create_index("ix_sources_id", "sources", ["id"])
+    _create_index("ix_sources_name", "sources", ["name"])
+    _create_index("ix_sources_type", "sources", ["type"])
+
+    _create_table(
+        "summaries",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("title", sa.String(), nullable=True),
+        sa.Column("content", sa.String(), nullable=True),
+        sa.Column("key_points", sa.JSON(), nullable=True),
+        sa.Column("tags", sa.JSON(), nullable=True),
+        sa.Column("is_archived", sa.Boolean(), nullable=True),
+        sa.Column("is_important", sa.Boolean(), nullable=True),
+        sa.Column("user_id", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    _create_index("ix_summaries_id", "summaries", ["id"])
+    _create_index("ix_summaries_title", "summaries", ["title"])
+
+    _create_table(
+        "summary_templates",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=True),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("parameters", sa.JSON(), nullable=True),
+        sa.Column("user_id", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    _create_index("ix_summary_templates_id", "summary_templates", ["id"])
+    _create_index("ix_summary_templates_name", "summary_templates", ["name"])
+
+    _create_table(
+        "source_fetches",
+        sa.Column("source_id", sa.String(), nullable=False),
+        sa.Column("url", sa.String(), nullable=True),
+        sa.Column("etag", sa.String(), nullable=True),
+        sa.Column("last_modified", sa.String(), nullable=True),
+        sa.Column("status_code", sa.Integer(), nullable=True),
+        sa.Column("content_type", sa.String(), nullable=True),
+        sa.Column("content_hash", sa.String(), nullable=True),
+        sa.Column("bytes", sa.Integer(), nullable=True),
+        sa.Column("truncated", sa.Boolean(), nullable=True),
+        sa.Column("duration_ms", sa.Integer(), nullable=True),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("items", sa.JSON(), nullable=True),
+        sa.Column("content", sa.Text(), nullable=True),
+        sa.Column("fetched_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("changed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["source_id"], ["sources.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("source_id"),
+    )
+
+    _create_table(
+        "source_schedules",
+        sa.Column("source_id", sa.String(), nullable=False),
+        sa.Column("next_run_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_run_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["source_id"], ["sources.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("source_id"),
+    )
+    _create_index("ix_source_schedules_next_run_at", "source_schedules", ["next_run_at"])
+
+    _create_table(
+        "summary_source_association",
+        sa.Column("summary_id", sa.String(), nullable=True),
+        sa.Column("source_id", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["source_id"], ["sources.id"]),
+        sa.ForeignKeyConstraint(["summary_id"], ["summaries.id"]),
+    )
+
+    _create_table(
+        "summary_tags",
+        sa.Column("summary_id", sa.String(), nullable=False),
+        sa.Column("tag", sa.String(), nullable=False),
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["summary_id"], ["summaries.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("summary_id", "tag"),
+    )
+    _create_index("ix_summary_tags_user_tag_created", "summary_tags", ["user_id", "tag", "created_at"])
+
+    _create_table(
+        "summary_jobs",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("status", job_status, nullable=True),
+        sa.Column("source_ids", sa.JSON(), nullable=True),
+        sa.Column("template_id", sa.String(), nullable=True),
+        sa.Column("parameters", sa.JSON(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=True),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("summary_id", sa.String(), nullable=True),
+        sa.Column("user_id", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["summary_id"], ["summaries.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    _create_index("ix_summary_jobs_id", "summary_jobs", ["id"])
+    _create_index("ix_summary_jobs_status", "summary_jobs", ["status"])
+    _create_index("ix_summary_jobs_user_id", "summary_jobs", ["user_id"])
+
+
+def downgrade() -> None:
+    for table in (
+        "summary_jobs", "summary_tags", "summary_source_association", "source_schedules",
+        "source_fetches", "summary_templates", "summaries", "sources", "users",
+    ):
+        op.drop_table(table)
@@ -0,0 +1,82 @@
+"""integer user ids and composite indexes
+
+users.id 是整数，而各表的 user_id 外键此前是字符串，每次按用户过滤都伴随隐式类型转换，
+且外键上没有索引。本迁移把外键统一为整数，并为热点查询添加复合索引。
+
+SQLite通过重建表修改列类型，summaries 和 summary_templates 的rowid可能随之变化，
+因此删除依赖rowid的FTS5索引表，由应用启动时的 init_fts 重新创建并回填。
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:01.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# 表 -> user_id 是否可为空
+USER_ID_TABLES = {
+    "sources": True,
+    "summaries": True,
+    "summary_templates": True,
+    "summary_jobs": True,
+    "summary_tags": False,
+}
+
+# (索引名, 表, 列)
+INDEXES = [
+    ("ix_summaries_user_created", "summaries", ["user_id", "created_at"]),
+    ("ix_summaries_user_flags_created", "summaries", ["user_id", "is_archived", "is_important", "created_at"]),
+    ("ix_sources_user_created", "sources", ["user_id", "created_at"]),
+    ("ix_sources_user_type_status", "sources", ["user_id", "type", "status"]),
+    ("ix_summary_templates_user_id", "summary_templates", ["user_id"]),
+    ("ix_summary_source_association_summary_source", "summary_source_association", ["summary_id", "source_id"]),
+    ("ix_summary_source_association_source_id", "summary_source_association", ["source_id"]),
+]
+
+FTS_TABLES = ["summaries_fts", "summary_templates_fts"]
+
+
+def _drop_fts_tables() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        for table in FTS_TABLES:
+            op.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+def upgrade() -> None:
+    _drop_fts_tables()
+    for table, nullable in USER_ID_TABLES.items():
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                "user_id",
+                existing_type=sa.String(),
+                type_=sa.Integer(),
+                existing_nullable=nullable,
+                postgresql_using="user_id::integer",
+            )
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    _drop_fts_tables()
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table)
+    for table, nullable in USER_ID_TABLES.items():
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                "user_id",
+                existing_type=sa.Integer(),
+                type_=sa.String(),
+                existing_nullable=nullable,
+            )
@@ -0,0 +1,106 @@
+"""github analytics rollup tables
+
+GitHub分析数据改为由事件导入任务维护的汇总表：仓库概况、按月/按日活动数、
+按月贡献者活动数、按月issue标签数，以及GH Archive文件的导入进度。
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:02.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _repo_id() -> sa.Column:
+    return sa.Column(
+        "repo_id", sa.Integer(), sa.ForeignKey("github_repos.id", ondelete="CASCADE"), primary_key=True
+    )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "github_repos",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("full_name", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("stars", sa.Integer(), nullable=True),
+        sa.Column("forks", sa.Integer(), nullable=True),
+        sa.Column("open_issues", sa.Integer(), nullable=True),
+        sa.Column("watchers", sa.Integer(), nullable=True),
+        sa.Column("metadata_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_event_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_event_id", sa.BigInteger(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    )
+    op.create_index("ix_github_repos_id", "github_repos", ["id"])
+    op.create_index("ix_github_repos_full_name", "github_repos", ["full_name"], unique=True)
+    op.create_index("ix_github_repos_name", "github_repos", ["name"])
+
+    op.create_table(
+        "github_monthly_stats",
+        _repo_id(),
+        sa.Column("month", sa.Date(), primary_key=True),
+        sa.Column("commits", sa.Integer(), nullable=True),
+        sa.Column("pull_requests", sa.Integer(), nullable=True),
+        sa.Column("issues", sa.Integer(), nullable=True),
+        sa.Column("stars", sa.Integer(), nullable=True),
+        sa.Column("forks", sa.Integer(), nullable=True),
+        sa.Column("contributors", sa.Integer(), nullable=True),
+    )
+    op.create_table(
+        "github_daily_stats",
+        _repo_id(),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("commits", sa.Integer(), nullable=True),
+        sa.Column("pull_requests", sa.Integer(), nullable=True),
+        sa.Column("issues", sa.Integer(), nullable=True),
+        sa.Column("stars", sa.Integer(), nullable=True),
+    )
+    op.create_table(
+        "github_contributor_stats",
+        _repo_id(),
+        sa.Column("month", sa.Date(), primary_key=True),
+        sa.Column("login", sa.String(), primary_key=True),
+        sa.Column("avatar_url", sa.String(), nullable=True),
+        sa.Column("commits", sa.Integer(), nullable=True),
+        sa.Column("pull_requests", sa.Integer(), nullable=True),
+        sa.Column("issues", sa.Integer(), nullable=True),
+    )
+    op.create_table(
+        "github_issue_label_stats",
+        _repo_id(),
+        sa.Column("month", sa.Date(), primary_key=True),
+        sa.Column("label", sa.String(), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=True),
+    )
+    op.create_table(
+        "github_archive_files",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("lines", sa.Integer(), nullable=True),
+        sa.Column("events", sa.Integer(), nullable=True),
+        sa.Column("completed", sa.Boolean(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("github_archive_files")
+    op.drop_table("github_issue_label_stats")
+    op.drop_table("github_contributor_stats")
+    op.drop_table("github_daily_stats")
+    op.drop_table("github_monthly_stats")
+    op.drop_index("ix_github_repos_name", table_name="github_repos")
+    op.drop_index("ix_github_repos_full_name", table_name="github_repos")
+    op.drop_index("ix_github_repos_id", table_name="github_repos")
+    op.drop_table("github_repos")
@@ -0,0 +1,55 @@
+"""summary excerpts
+
+摘要列表只展示标题、标签和正文预览，此前每一行都要读取并返回完整正文。
+新增excerpt列保存写入时生成的正文摘录，列表接口只加载摘录；
+已有摘要的摘录在升级时一并生成（离线生成SQL脚本时跳过）。
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:03.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from app.db.repositories.summary import build_excerpt
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# 每批回填的行数
+BATCH_SIZE = 500
+
+
+def upgrade() -> None:
+    op.add_column("summaries", sa.Column("excerpt", sa.String(), nullable=True))
+    if context.is_offline_mode():
+        return
+
+    # 只声明用到的列；不设置updated_at，回填不算作修改
+    summaries = sa.table("summaries", sa.column("id", sa.String), sa.column("content", sa.String),
+                         sa.column("excerpt", sa.String))
+    connection = op.get_bind()
+    ids = list(connection.scalars(sa.select(summaries.c.id).where(summaries.c.content.isnot(None))))
+    statement = (
+        summaries.update()
+        .where(summaries.c.id == sa.bindparam("b_id"))
+        .values(excerpt=sa.bindparam("b_excerpt"))
+    )
+    for start in range(0, len(ids), BATCH_SIZE):
+        rows = connection.execute(
+            sa.select(summaries.c.id, summaries.c.content).where(summaries.c.id.in_(ids[start:start + BATCH_SIZE]))
+        ).all()
+        connection.execute(statement, [{"b_id": id, "b_excerpt": build_excerpt(content)} for id, content in rows])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("summaries") as batch_op:
+        batch_op.drop_column("excerpt")
@@ -0,0 +1,56 @@
+"""item fingerprints
+
+新闻和社区类信息源经常转载同一篇内容，每一份都会送去生成摘要。
+新增 item_fingerprints 表保存抓取条目的MinHash签名（按用户、信息源），
+item_fingerprint_bands 表保存签名的LSH分段键，查找近似重复时只比较分段键相同的候选。
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:04.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "item_fingerprints",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("source_id", sa.String(), sa.ForeignKey("sources.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("item_key", sa.String(), nullable=False),
+        sa.Column("title", sa.String(), nullable=True),
+        sa.Column("link", sa.String(), nullable=True),
+        sa.Column("signature", sa.LargeBinary(), nullable=False),
+        sa.Column("seen_at", sa.DateTime(timezone=True), nullable=False),
+        sa.UniqueConstraint("source_id", "item_key", name="uq_item_fingerprints_source_item"),
+    )
+    op.create_index("ix_item_fingerprints_user_seen", "item_fingerprints", ["user_id", "seen_at"])
+    op.create_table(
+        "item_fingerprint_bands",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("band_key", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "fingerprint_id", sa.Integer(),
+            sa.ForeignKey("item_fingerprints.id", ondelete="CASCADE"), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("user_id", "band_key", "fingerprint_id"),
+    )
+    op.create_index("ix_item_fingerprint_bands_fingerprint", "item_fingerprint_bands", ["fingerprint_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_item_fingerprint_bands_fingerprint", table_name="item_fingerprint_bands")
+    op.drop_table("item_fingerprint_bands")
+    op.drop_index("ix_item_fingerprints_user_seen", table_name="item_fingerprints")
+    op.drop_table("item_fingerprints")
@@ -0,0 +1,42 @@
+"""summary vectors
+
+发现摘要只能通过列表接口的关键词搜索。
+新增 summary_vectors 表保存每条摘要的本地哈希n-gram向量（float32），用于查找相关摘要，
+自增ID不复用，内存中的索引按ID增量同步（删除的摘要写入向量为空的墓碑行）；
+已有摘要的向量不在迁移中计算（迁移不依赖应用当前的向量算法和维度），
+由启动时的 prepare_database 调用 backfill_vectors 补齐。
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:05.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "summary_vectors",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("summary_id", sa.String(), nullable=False, unique=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        # 为空表示摘要已删除（墓碑行）
+        sa.Column("vector", sa.LargeBinary(), nullable=True),
+        sqlite_autoincrement=True,
+    )
+    op.create_index("ix_summary_vectors_user_id", "summary_vectors", ["user_id", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_summary_vectors_user_id", table_name="summary_vectors")
+    op.drop_table("summary_vectors")
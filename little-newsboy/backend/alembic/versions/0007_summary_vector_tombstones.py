@@ -0,0 +1,46 @@
+"""summary vector tombstones
+
+删除摘要时写入的墓碑行此前在应用启动时按“摘要已不存在”一次性清理，
+其他进程中尚未同步到这些墓碑行的内存索引会因此保留已删除的摘要。
+新增 deleted_at 列记录墓碑行的写入时间，只清理超过 RELATED_TOMBSTONE_TTL_SECONDS 的墓碑行；
+已有的墓碑行以升级时间为准。
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:06.000000
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("summary_vectors", sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index("ix_summary_vectors_deleted_at", "summary_vectors", ["deleted_at"])
+
+    summaries = sa.table("summaries", sa.column("id", sa.String))
+    summary_vectors = sa.table(
+        "summary_vectors", sa.column("summary_id", sa.String), sa.column("vector", sa.LargeBinary),
+        sa.column("deleted_at", sa.DateTime(timezone=True)),
+    )
+    op.execute(
+        summary_vectors.update()
+        .where(summary_vectors.c.vector.is_(None), summary_vectors.c.summary_id.not_in(sa.select(summaries.c.id)))
+        .values(deleted_at=datetime.now(timezone.utc))
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_summary_vectors_deleted_at", table_name="summary_vectors")
+    with op.batch_alter_table("summary_vectors") as batch_op:
+        batch_op.drop_column("deleted_at")
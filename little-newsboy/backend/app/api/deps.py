@@ -1,17 +1,101 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db, get_read_db
 from app.config import settings
 from app.db.models.user import User
 from app.schemas.token import TokenPayload
+from app.services.cache import TTLCache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
+# 缓存过期时间上限：用户变更只在当前进程内清除缓存，其他进程最长在过期时间内使用旧信息（如已禁用的用户仍可访问）
+AUTH_CACHE_MAX_TTL_SECONDS = 30
+AUTH_CACHE_TTL_SECONDS = min(settings.AUTH_CACHE_TTL_SECONDS, AUTH_CACHE_MAX_TTL_SECONDS)
+
+# 已验证的令牌 -> 用户ID，条目不晚于令牌过期时间失效
+token_cache = TTLCache(
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl_seconds=AUTH_CACHE_TTL_SECONDS,
+)
+# 用户ID -> 用户字段快照，用户更新或删除时失效
+user_cache = TTLCache(
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl_seconds=AUTH_CACHE_TTL_SECONDS,
+)
+
+
+def _decode_token(token: str) -> Optional[int]:
+    """校验令牌并返回用户ID（优先读取缓存），令牌无效时返回None"""
+    if settings.AUTH_CACHE_ENABLED:
+        cached = token_cache.get(token)
+        if cached is not None:
+            return cached
+
+    try:
+        payload = jwt.decode(
+            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+        )
+        token_data = TokenPayload(**payload)
+        if token_data.sub is None:
+            return None
+        user_id = int(token_data.sub)
+    except (JWTError, ValueError):
+        return None
+
+    if settings.AUTH_CACHE_ENABLED:
+        ttl = None
+        if isinstance(payload.get("exp"), (int, float)):
+            ttl = payload["exp"] - datetime.now(timezone.utc).timestamp()
+        token_cache.set(token, user_id, ttl)
+    return user_id
+
+
+async def _load_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    """获取用户（优先读取缓存快照）。返回的User对象不属于任何会话"""
+    if settings.AUTH_CACHE_ENABLED:
+        snapshot = user_cache.get(user_id)
+        if snapshot is not None:
+            return User(**snapshot)
+
+    user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
+    if user is not None:
+        # 异步会话不能在事件循环外懒加载，路由中只读取已加载的列
+        db.expunge(user)
+    if user is not None and settings.AUTH_CACHE_ENABLED:
+        user_cache.set(user_id, {
+            attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs
+        })
+    return user
+
+
+def invalidate_user(user_id: Any) -> None:
+    """用户信息变化后清除缓存的快照（仅当前进程，其他进程在AUTH_CACHE_TTL_SECONDS内失效）"""
+    user_cache.delete(int(user_id))
+
+
+def auth_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """令牌和用户缓存的命中统计"""
+    return {"token": token_cache.stats(), "user": user_cache.stats()}
+
+
+def _on_user_changed(mapper, connection, target: User) -> None:
+    invalidate_user(target.id)
+
+
+# 通过ORM更新或删除用户时清除缓存（批量query.update()不会触发）
+event.listen(User, "after_update", _on_user_changed)
+event.listen(User, "after_delete", _on_user_changed)
+
+
 async def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)
 ) -> User:
     """获取当前用户"""
     credentials_exception = HTTPException(
@@ -19,19 +103,15 @@ async def get_current_user(
         detail="无法验证凭据",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
-    except JWTError:
+    user_id = _decode_token(token)
+    if user_id is None:
         raise credentials_exception
-    
-    user = db.query(User).filter(User.id == token_data.sub).first()
+
+    user = await _load_user(db, user_id)
     if user is None:
         raise credentials_exception
-    
+
     if not user.is_active:
         raise HTTPException(status_code=400, detail="用户未激活")
-    
-    return user 
\ No newline at end of file
+
+    return user
@@ -0,0 +1,49 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.metrics import (
+    http_request_duration_seconds, http_requests_in_progress, http_requests_total
+)
+
+# 未匹配任何路由的请求（如404）统一记为该值，避免按原始路径产生无限多的标签
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """记录HTTP请求数、耗时和正在处理的请求数
+
+    使用纯ASGI中间件而不是BaseHTTPMiddleware：不额外包装请求和响应，流式响应的耗时计到最后一个字节发出。
+    路由标签取路由模板（如/api/v1/summaries/{summary_id}），路由匹配后才可知，因此正在处理的请求数只按方法区分。
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        in_progress = http_requests_in_progress.labels(method)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_progress.dec()
+            # 路由匹配后Starlette会把路由对象写入scope
+            route = scope.get("route")
+            path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            http_request_duration_seconds.labels(method, path).observe(elapsed)
+            http_requests_total.labels(method, path, str(status)).inc()
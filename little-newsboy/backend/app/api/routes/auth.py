@@ -2,22 +2,23 @@ from datetime import timedelta
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
-from app.core.security import create_access_token, get_current_active_user
+from app.core.security import create_access_token, get_current_active_user, get_password_hash_async
 from app.config import settings
-from app.db.repositories.user import authenticate_user, create_user, get_user_by_email, get_user_by_username
+from app.db.repositories.user import authenticate_user_async, create_user, get_user_by_email, get_user_by_username
 from app.db.session import get_db
 from app.schemas.user import Token, User, UserCreate, UserLogin
 
 router = APIRouter()
 
 @router.post("/register", response_model=User, status_code=status.HTTP_201_CREATED)
-def register(*, db: Session = Depends(get_db), user_in: UserCreate) -> Any:
+async def register(*, db: Session = Depends(get_db), user_in: UserCreate) -> Any:
     """用户注册"""
     # 检查邮箱是否已被注册
-    user = get_user_by_email(db, email=user_in.email)
+    user = await run_in_threadpool(get_user_by_email, db, email=user_in.email)
     if user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -25,22 +26,23 @@ def register(*, db: Session = Depends(get_db), user_in: UserCreate) -> Any:
         )
     
     # 检查用户名是否已被使用
-    user = get_user_by_username(db, username=user_in.username)
+    user = await run_in_threadpool(get_user_by_username, db, username=user_in.username)
     if user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="该用户名已被使用",
         )
     
-    # 创建新用户
-    user = create_user(db, user_in)
+    # 创建新用户（密码哈希在专用线程池中计算）
+    hashed_password = await get_password_hash_async(user_in.password)
+    user = await run_in_threadpool(create_user, db, user_in, hashed_password)
     
     return user
 
 @router.post("/login", response_model=Token)
-def login(*, db: Session = Depends(get_db), form_data: UserLogin) -> Any:
+async def login(*, db: Session = Depends(get_db), form_data: UserLogin) -> Any:
     """用户登录"""
-    user = authenticate_user(db, form_data.username_or_email, form_data.password)
+    user = await authenticate_user_async(db, form_data.username_or_email, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -64,11 +66,11 @@ def login(*, db: Session = Depends(get_db), form_data: UserLogin) -> Any:
 
 # 用于支持OAuth2标准登录表单
 @router.post("/token", response_model=Token)
-def login_for_access_token(
+async def login_for_access_token(
     db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """OAuth2兼容的令牌登录，主要用于Swagger文档"""
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user_async(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -15,6 +15,7 @@ from app.db.repositories.source import (
     update_source,
 )
 from app.schemas.source import Source, SourceCreate, SourcesPage, SourceUpdate
+from app.tasks.source import enqueue_source_refresh
 
 router = APIRouter(
     prefix="/sources",
@@ -35,7 +36,7 @@ def get_source(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="信息源不存在"
         )
-    if str(source.user_id) != str(current_user.id):
+    if source.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="没有权限访问此信息源"
@@ -56,7 +57,7 @@ def list_sources(
     """获取信息源列表（分页）"""
     sources = get_sources(
         db, 
-        str(current_user.id),
+        current_user.id,
         skip=skip,
         limit=limit,
         search=search,
@@ -65,7 +66,7 @@ def list_sources(
     )
     total = count_sources(
         db, 
-        str(current_user.id),
+        current_user.id,
         search=search,
         source_type=source_type,
         status=status
@@ -87,7 +88,7 @@ def create_new_source(
     current_user: User = Depends(get_current_user)
 ):
     """创建新的信息源"""
-    return create_source(db, source_data, str(current_user.id))
+    return create_source(db, source_data, current_user.id)
 
 
 @router.post("", response_model=Source, status_code=status.HTTP_201_CREATED)
@@ -108,7 +109,7 @@ def update_existing_source(
     current_user: User = Depends(get_current_user)
 ):
     """更新信息源"""
-    source = update_source(db, source_id, source_data, str(current_user.id))
+    source = update_source(db, source_id, source_data, current_user.id)
     if not source:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -124,7 +125,7 @@ def delete_existing_source(
     current_user: User = Depends(get_current_user)
 ):
     """删除信息源"""
-    result = delete_source(db, source_id, str(current_user.id))
+    result = delete_source(db, source_id, current_user.id)
     if not result:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -146,15 +147,20 @@ def refresh_source(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="信息源不存在"
         )
-    if str(source.user_id) != str(current_user.id):
+    if source.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="没有权限访问此信息源"
         )
     
-    # 这里可以添加实际的刷新逻辑，如发送到队列或后台任务
-    # 例如：
-    # background_tasks.add_task(refresh_source_data, source_id)
+    try:
+        enqueue_source_refresh([source.id])
+    except Exception as e:
+        print(f"信息源刷新任务入队失败：{str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="任务队列不可用，请稍后重试"
+        )
     
     return {"message": "刷新请求已接收，将在后台处理"}
 
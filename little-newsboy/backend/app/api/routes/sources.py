@@ -1,88 +1,150 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from uuid import UUID
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_async_db, get_current_user, get_db
+from app.config import settings
 from app.db.models.source import SourceType, Status
 from app.db.models.user import User
+from app.db.pagination import InvalidCursor
 from app.db.repositories.source import (
+    SourceRepository,
     get_source_by_id,
-    get_sources,
-    count_sources,
     create_source,
     update_source,
     delete_source
 )
-from app.schemas.source import Source, SourceCreate, SourceUpdate, SourcesPage
+from app.schemas.source import Source, SourceCreate, SourceExport, SourceImport, SourceUpdate, SourcesPage
+from app.schemas.transfer import ImportResult
+from app.services.fetcher import source_fetcher
+from app.services.source import refresh_source_from_thread
+from app.services.transfer import NDJSON_MEDIA_TYPE, export_ndjson, import_ndjson
 
 router = APIRouter(prefix="/sources", tags=["sources"])
+source_repository = SourceRepository()
 
 
 @router.get("", response_model=SourcesPage)
-def read_sources(
+async def read_sources(
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
     search: Optional[str] = None,
     source_type: Optional[SourceType] = None,
     status: Optional[Status] = None,
+    cursor: Optional[str] = Query(None, description="上一页返回的next_cursor，传入后按游标分页"),
+    include_total: bool = Query(True, description="是否统计总数"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """获取当前用户的信息源列表"""
     skip = (page - 1) * page_size
-    sources = get_sources(
-        db, current_user.id, skip, page_size, search, source_type, status
+    sources, next_cursor = await _get_page(
+        db, current_user.id, page_size, cursor, skip, search, source_type, status
+    )
+    total = (
+        await source_repository.count_async(db, current_user.id, search, source_type, status)
+        if include_total else None
     )
-    total = count_sources(db, current_user.id, search, source_type, status)
     return {
         "items": sources,
         "total": total,
-        "page": page,
+        "page": page if not cursor else None,
+        "size": page_size,
         "page_size": page_size,
-        "pages": (total + page_size - 1) // page_size
+        "pages": (total + page_size - 1) // page_size if total is not None else None,
+        "next_cursor": next_cursor
     }
 
 
 @router.get("/list", response_model=SourcesPage)
-def list_sources_with_skip_limit(
+async def list_sources_with_skip_limit(
     skip: int = 0,
     limit: int = 10,
     search: Optional[str] = None,
     source_type: Optional[SourceType] = None,
     status: Optional[Status] = None,
+    cursor: Optional[str] = Query(None, description="上一页返回的next_cursor，传入后按游标分页"),
+    include_total: bool = Query(True, description="是否统计总数"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """使用skip和limit参数获取信息源列表"""
-    sources = get_sources(
-        db, current_user.id, skip, limit, search, source_type, status
+    sources, next_cursor = await _get_page(
+        db, current_user.id, limit, cursor, skip, search, source_type, status
+    )
+    total = (
+        await source_repository.count_async(db, current_user.id, search, source_type, status)
+        if include_total else None
     )
-    total = count_sources(db, current_user.id, search, source_type, status)
     return {
         "items": sources,
         "total": total,
-        "page": skip // limit + 1 if limit > 0 else 1,
+        "page": (skip // limit + 1 if limit > 0 else 1) if not cursor else None,
         "size": limit,
         "page_size": limit,
-        "pages": (total + limit - 1) // limit if limit > 0 else 1
+        "pages": ((total + limit - 1) // limit if limit > 0 else 1) if total is not None else None,
+        "next_cursor": next_cursor
     }
 
 
+async def _get_page(db: AsyncSession, user_id, limit, cursor, skip, search, source_type, source_status):
+    """获取一页信息源，游标无效时返回400"""
+    try:
+        return await source_repository.get_page_async(
+            db, user_id, limit, cursor, skip, search, source_type, source_status
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/export")
+def export_sources(
+    current_user: User = Depends(get_current_user),
+):
+    """以NDJSON流式导出当前用户的全部信息源（每行一条，格式与导入一致）"""
+    user_id = current_user.id
+    return StreamingResponse(
+        export_ndjson(
+            lambda db: source_repository.iter_by_user_id(db, user_id, batch_size=settings.EXPORT_BATCH_SIZE),
+            SourceExport,
+        ),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": 'attachment; filename="sources.ndjson"'},
+    )
+
+
+@router.post("/import", response_model=ImportResult)
+async def import_sources(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """从NDJSON请求体批量导入信息源，每IMPORT_CHUNK_SIZE行一个事务；ID已存在的跳过"""
+    user_id = current_user.id
+    return await import_ndjson(
+        request,
+        SourceImport,
+        lambda items: source_repository.bulk_import(db, items, user_id),
+    )
+
+
 @router.get("/{source_id}", response_model=Source)
-def read_source(
+async def read_source(
     source_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """获取单个信息源详情"""
-    source = get_source_by_id(db, str(source_id))
+    source = await source_repository.get_async(db, str(source_id))
     if not source:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="信息源不存在"
         )
-    if str(source.user_id) != str(current_user.id):
+    if source.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="没有权限访问该信息源"
@@ -139,19 +201,24 @@ def refresh_source(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """刷新信息源（实际功能待实现）"""
+    """立即抓取信息源的最新内容"""
     source = get_source_by_id(db, str(source_id))
     if not source:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="信息源不存在"
         )
-    if str(source.user_id) != str(current_user.id):
+    if source.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="没有权限刷新该信息源"
         )
     
-    # 这里应该实现实际的刷新逻辑，例如重新抓取数据等
-    # 目前只是返回现有信息源
-    return source 
\ No newline at end of file
+    fetch = refresh_source_from_thread(db, source, source_fetcher)
+    if fetch.error:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"信息源抓取失败：{fetch.error}"
+        )
+    db.refresh(source)
+    return source
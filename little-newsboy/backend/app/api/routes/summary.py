@@ -1,67 +1,156 @@
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from starlette.status import HTTP_404_NOT_FOUND, HTTP_201_CREATED, HTTP_200_OK, HTTP_204_NO_CONTENT, HTTP_202_ACCEPTED
+from starlette.status import (
+    HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND, HTTP_201_CREATED, HTTP_200_OK, HTTP_204_NO_CONTENT,
+    HTTP_202_ACCEPTED, HTTP_409_CONFLICT, HTTP_503_SERVICE_UNAVAILABLE
+)
 import asyncio
+import json
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_async_db, get_db, get_read_db, get_current_user
+from app.config import settings
 from app.db.models.user import User
+from app.db.pagination import InvalidCursor
+from app.db.repositories.base import get_owned_ids
 from app.db.repositories.summary import SummaryRepository, SummaryTemplateRepository
 from app.db.repositories.source import SourceRepository
+from app.db.repositories.job import SummaryJobRepository
+from app.db.session import SessionLocal
 from app.schemas.summary import (
-    Summary, SummaryCreate, SummaryUpdate, SummariesPage,
+    Summary, SummaryCreate, SummaryUpdate, SummariesPage, SummaryListItem, SUMMARY_LIST_FIELDS,
+    RelatedSummary, RELATED_SUMMARY_FIELDS,
+    TagCount, SummaryExport, SummaryImport,
     SummaryTemplate, SummaryTemplateCreate, SummaryTemplateUpdate,
-    SummaryGenerateRequest
+    SummaryGenerateRequest, SummaryBatchGenerateRequest, SummaryBatchGenerateResponse,
+    SummaryBatchItemResult
 )
-from app.services.ai import ai_service, SummaryRequest, SummaryResult
+from app.schemas.job import SummaryJob, SummaryJobAccepted
+from app.schemas.transfer import ImportResult
+from app.services.ai import ai_service
+from app.services.related import related_index
+from app.services.summary import SourceContentMissing, build_summary_request, save_generated_summary
+from app.services.transfer import NDJSON_MEDIA_TYPE, export_ndjson, import_ndjson
+from app.tasks.summary import enqueue_summary_job
 
 
 router = APIRouter()
 summary_repository = SummaryRepository()
 template_repository = SummaryTemplateRepository()
 source_repository = SourceRepository()
+job_repository = SummaryJobRepository()
 
 
-@router.get("/", response_model=SummariesPage)
-@router.get("", response_model=SummariesPage)
-def get_summaries(
-    db: Session = Depends(get_db),
+def _list_fields(fields: Optional[str]) -> List[str]:
+    """解析逗号分隔的fields参数，id总是返回"""
+    if not fields:
+        return list(SUMMARY_LIST_FIELDS)
+    selected = list(dict.fromkeys(["id", *(field.strip() for field in fields.split(",") if field.strip())]))
+    unknown = [field for field in selected if field not in SummaryListItem.model_fields]
+    if unknown:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=f"未知字段: {', '.join(unknown)}")
+    return selected
+
+
+# 响应只包含选择的字段
+@router.get("/", response_model=SummariesPage, response_model_exclude_unset=True)
+@router.get("", response_model=SummariesPage, response_model_exclude_unset=True)
+async def get_summaries(
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    sort_field: str = Query("created_at"),
+    sort_field: Optional[str] = Query(None, description="排序字段，默认按创建时间；搜索时默认按相关度"),
     sort_order: str = Query("desc"),
     tag: Optional[str] = None,
     search: Optional[str] = None,
     is_archived: Optional[bool] = None,
     is_important: Optional[bool] = None,
-    source_id: Optional[str] = None
+    source_id: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="上一页返回的next_cursor，传入后按游标分页"),
+    include_total: bool = Query(True, description="是否统计总数"),
+    fields: Optional[str] = Query(
+        None, description="逗号分隔的返回字段，如 id,title,tags；默认返回除content、key_points外的字段"
+    )
 ) -> Any:
-    """获取摘要列表（分页）"""
+    """获取摘要列表（分页），正文以摘录（excerpt）代替，完整正文通过详情接口获取"""
     skip = (page - 1) * page_size
-    return summary_repository.get_multi_paginated(
-        db,
-        user_id=current_user.id,
-        skip=skip,
-        limit=page_size,
-        sort_field=sort_field,
-        sort_order=sort_order,
-        tag=tag,
-        search=search,
-        is_archived=is_archived,
-        is_important=is_important,
-        source_id=source_id
+    selected_fields = _list_fields(fields)
+    try:
+        return await summary_repository.get_multi_paginated_async(
+            db,
+            user_id=current_user.id,
+            skip=skip,
+            limit=page_size,
+            sort_field=sort_field,
+            sort_order=sort_order,
+            tag=tag,
+            search=search,
+            is_archived=is_archived,
+            is_important=is_important,
+            source_id=source_id,
+            cursor=cursor,
+            include_total=include_total,
+            fields=selected_fields
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/tags", response_model=List[TagCount])
+def get_summary_tags(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+    limit: int = Query(100, ge=1, le=1000)
+) -> Any:
+    """获取标签统计（按数量倒序）"""
+    return summary_repository.count_tags(db, user_id=current_user.id, limit=limit)
+
+
+@router.get("/export")
+def export_summaries(
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """以NDJSON流式导出当前用户的全部摘要（每行一条，格式与导入一致）"""
+    user_id = current_user.id
+    return StreamingResponse(
+        export_ndjson(
+            lambda db: summary_repository.iter_by_user_id(
+                db, user_id=user_id, batch_size=settings.EXPORT_BATCH_SIZE
+            ),
+            SummaryExport
+        ),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": 'attachment; filename="summaries.ndjson"'}
+    )
+
+
+@router.post("/import", response_model=ImportResult)
+async def import_summaries(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """从NDJSON请求体批量导入摘要，每IMPORT_CHUNK_SIZE行一个事务；ID已存在的跳过"""
+    user_id = current_user.id
+    return await import_ndjson(
+        request,
+        SummaryImport,
+        lambda items: summary_repository.bulk_import(db, user_id=user_id, items=items)
     )
 
 
 @router.get("/{summary_id}", response_model=Summary)
-def get_summary(
+async def get_summary(
     summary_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """获取单个摘要详情"""
-    summary = summary_repository.get(db, id=summary_id)
+    summary = await summary_repository.get_async(db, id=summary_id)
     if not summary or summary.user_id != current_user.id:
         raise HTTPException(
             status_code=HTTP_404_NOT_FOUND,
@@ -70,6 +159,28 @@ def get_summary(
     return summary
 
 
+@router.get("/{summary_id}/related", response_model=List[RelatedSummary], response_model_exclude_unset=True)
+def get_related_summaries(
+    summary_id: str,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+    limit: int = Query(10, ge=1, le=50)
+) -> Any:
+    """按本地向量的余弦相似度返回与该摘要最相关的摘要（降序），不调用模型"""
+    if not get_owned_ids(db, summary_repository.model, [summary_id], current_user.id):
+        raise HTTPException(
+            status_code=HTTP_404_NOT_FOUND,
+            detail="摘要不存在或无权访问"
+        )
+    matches = dict(related_index.search(db, current_user.id, [summary_id], limit)[summary_id])
+    items = summary_repository.get_list_items(
+        db, ids=list(matches), user_id=current_user.id, fields=RELATED_SUMMARY_FIELDS
+    )
+    for item in items:
+        item["score"] = round(matches[item["id"]], 4)
+    return items
+
+
 @router.post("/", response_model=Summary, status_code=HTTP_201_CREATED)
 @router.post("", response_model=Summary, status_code=HTTP_201_CREATED)
 def create_summary(
@@ -89,12 +200,9 @@ def create_summary(
         user_id=current_user.id
     )
     
-    # 添加source关联
+    # 添加source关联（一次查询完成归属校验）
     if source_ids:
-        for source_id in source_ids:
-            source = source_repository.get(db, id=source_id)
-            if source and source.user_id == current_user.id:
-                summary.sources.append(source)
+        summary.sources.extend(source_repository.get_owned(db, source_ids, current_user.id))
         
         db.add(summary)
         db.commit()
@@ -120,14 +228,8 @@ def update_summary(
     
     # 处理source_ids更新
     if summary_in.source_ids is not None:
-        # 清除现有关联
-        summary.sources = []
-        
-        # 添加新关联
-        for source_id in summary_in.source_ids:
-            source = source_repository.get(db, id=source_id)
-            if source and source.user_id == current_user.id:
-                summary.sources.append(source)
+        # 替换关联（一次查询完成归属校验）
+        summary.sources = source_repository.get_owned(db, summary_in.source_ids, current_user.id)
         
         # 从更新数据中移除source_ids，因为它不是模型的直接属性
         update_data = summary_in.model_dump(exclude_unset=True)
@@ -211,83 +313,15 @@ def toggle_important_summary(
     return summary
 
 
-# 异步生成摘要的后台任务
-async def generate_summary_task(
-    source_ids: List[str],
-    template_id: Optional[str],
-    parameters: dict,
-    user_id: str,
-    db: Session
-):
-    # 这里应该使用一个新的session，因为我们在一个新线程中
-    # 实际项目中应该使用适当的工具来管理这个会话
-    # 为了简化，这里直接使用传入的会话
-    
-    try:
-        # 获取源信息内容（实际项目中应该实现抓取源内容的机制）
-        content = "这是从信息源获取的示例内容，实际应用中应从源获取真实内容。"
-        
-        # 应用模板参数（如果有的话）
-        if template_id:
-            template = template_repository.get(db, id=template_id)
-            if template and template.user_id == user_id:
-                # 合并模板参数和请求参数
-                template_params = template.parameters
-                merged_params = {**template_params, **parameters}
-                parameters = merged_params
-        
-        # 调用AI服务生成摘要
-        summary_request = SummaryRequest(
-            content=content,
-            max_length=parameters.get("max_length", 2000),
-            focus_points=parameters.get("focus_points", []),
-            format=parameters.get("format", "markdown")
-        )
-        
-        summary_result = await ai_service.generate_summary(summary_request)
-        
-        # 创建摘要记录
-        summary_create = SummaryCreate(
-            title=f"摘要 {', '.join(source_ids)[:30]}...",  # 简单的标题生成
-            content=summary_result.summary,
-            key_points=summary_result.key_points,
-            tags=parameters.get("tags", []),
-            source_ids=source_ids,
-            user_id=user_id
-        )
-        
-        summary = summary_repository.create(db, obj_in=summary_create)
-        
-        # 添加source关联
-        for source_id in source_ids:
-            source = source_repository.get(db, id=source_id)
-            if source and source.user_id == user_id:
-                summary.sources.append(source)
-        
-        db.add(summary)
-        db.commit()
-        
-        return summary
-    except Exception as e:
-        # 记录错误（实际项目中应使用日志系统）
-        print(f"摘要生成失败：{str(e)}")
-        return None
-
-
-@router.post("/generate", response_model=dict, status_code=HTTP_202_ACCEPTED)
-def generate_summary(
+def validate_generate_request(
+    db: Session,
     request: SummaryGenerateRequest,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-) -> Any:
-    """异步生成摘要（从信息源）"""
+    user_id: int
+) -> List[str]:
+    """验证生成请求中的信息源和模板，返回有效的信息源ID"""
     # 验证source_ids是否属于当前用户
-    valid_source_ids = []
-    for source_id in request.source_ids:
-        source = source_repository.get(db, id=source_id)
-        if source and source.user_id == current_user.id:
-            valid_source_ids.append(source_id)
+    owned_ids = get_owned_ids(db, source_repository.model, request.source_ids, user_id)
+    valid_source_ids = [source_id for source_id in request.source_ids if source_id in owned_ids]
     
     if not valid_source_ids:
         raise HTTPException(
@@ -298,28 +332,216 @@ def generate_summary(
     # 验证模板（如果提供）
     if request.template_id:
         template = template_repository.get(db, id=request.template_id)
-        if not template or template.user_id != current_user.id:
+        if not template or template.user_id != user_id:
             raise HTTPException(
                 status_code=HTTP_404_NOT_FOUND,
                 detail="摘要模板不存在或无权访问"
             )
     
-    # 添加后台任务
-    background_tasks.add_task(
-        generate_summary_task,
-        valid_source_ids,
-        request.template_id,
-        request.parameters or {},
-        current_user.id,
-        db
+    return valid_source_ids
+
+
+@router.post("/generate", response_model=SummaryJobAccepted, status_code=HTTP_202_ACCEPTED)
+def generate_summary(
+    request: SummaryGenerateRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """异步生成摘要（从信息源），提交到任务队列"""
+    valid_source_ids = validate_generate_request(db, request, current_user.id)
+    
+    job = job_repository.create(
+        db,
+        user_id=current_user.id,
+        source_ids=valid_source_ids,
+        template_id=request.template_id,
+        parameters=request.parameters or {}
     )
     
-    return {"message": "摘要生成请求已接受，将在后台处理"}
+    try:
+        enqueue_summary_job(job.id)
+    except Exception as e:
+        print(f"摘要任务入队失败：{str(e)}")
+        job_repository.mark_failed(db, job, "任务队列不可用")
+        raise HTTPException(
+            status_code=HTTP_503_SERVICE_UNAVAILABLE,
+            detail="任务队列不可用，请稍后重试"
+        )
+    
+    return {"message": "摘要生成请求已接受，将在后台处理", "job_id": job.id}
+
+
+@router.get("/jobs/{job_id}", response_model=SummaryJob)
+def get_summary_job(
+    job_id: str,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """获取摘要生成任务状态"""
+    job = job_repository.get(db, id=job_id)
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(
+            status_code=HTTP_404_NOT_FOUND,
+            detail="生成任务不存在或无权访问"
+        )
+    return job
+
+
+@router.post("/generate/batch", response_model=SummaryBatchGenerateResponse)
+async def generate_summaries_batch(
+    request: SummaryBatchGenerateRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """批量生成摘要：一次性校验所有信息源，并发提交或执行"""
+    if len(request.items) > settings.SUMMARY_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST,
+            detail=f"单次批量生成最多{settings.SUMMARY_BATCH_MAX_ITEMS}项"
+        )
+    user_id = current_user.id
+    
+    def prepare() -> tuple:
+        # 所有信息源和模板各用一次查询完成归属校验
+        all_source_ids = [source_id for item in request.items for source_id in item.source_ids]
+        owned_sources = get_owned_ids(db, source_repository.model, all_source_ids, user_id)
+        template_ids = [item.template_id for item in request.items if item.template_id]
+        owned_templates = get_owned_ids(db, template_repository.model, template_ids, user_id)
+        
+        results, specs = [], []
+        for index, item in enumerate(request.items):
+            source_ids = [source_id for source_id in item.source_ids if source_id in owned_sources]
+            if not source_ids:
+                results.append(SummaryBatchItemResult(index=index, status="rejected", error="未找到有效的信息源"))
+            elif item.template_id and item.template_id not in owned_templates:
+                results.append(SummaryBatchItemResult(index=index, status="rejected", error="摘要模板不存在或无权访问"))
+            elif request.wait:
+                try:
+                    summary_request, parameters = build_summary_request(
+                        db, source_ids, item.template_id, item.parameters or {}, user_id
+                    )
+                except SourceContentMissing as e:
+                    results.append(SummaryBatchItemResult(index=index, status="rejected", error=str(e)))
+                    continue
+                results.append(SummaryBatchItemResult(index=index, status="queued"))
+                specs.append({
+                    "index": index,
+                    "source_ids": source_ids,
+                    "request": summary_request,
+                    "parameters": parameters
+                })
+            else:
+                results.append(SummaryBatchItemResult(index=index, status="queued"))
+                specs.append({
+                    "index": index,
+                    "source_ids": source_ids,
+                    "template_id": item.template_id,
+                    "parameters": item.parameters or {}
+                })
+        
+        if not request.wait and specs:
+            jobs = job_repository.create_many(db, user_id=user_id, specs=specs)
+            for spec, job in zip(specs, jobs):
+                result = results[spec["index"]]
+                result.job_id = job.id
+                try:
+                    enqueue_summary_job(job.id)
+                except Exception as e:
+                    print(f"摘要任务入队失败：{str(e)}")
+                    job_repository.mark_failed(db, job, "任务队列不可用")
+                    result.status, result.error = "failed", "任务队列不可用"
+        return results, specs
+    
+    results, specs = await run_in_threadpool(prepare)
+    
+    if request.wait and specs:
+        # 并发调用模型，实际并发数受AIService全局并发上限约束
+        outcomes = await asyncio.gather(
+            *(ai_service.generate_summary(spec["request"]) for spec in specs),
+            return_exceptions=True
+        )
+        
+        def save_all() -> None:
+            for spec, outcome in zip(specs, outcomes):
+                result = results[spec["index"]]
+                if isinstance(outcome, Exception):
+                    print(f"批量摘要生成失败（第{spec['index']}项）：{str(outcome)}")
+                    result.status, result.error = "failed", "摘要生成失败"
+                    continue
+                summary = save_generated_summary(
+                    db, spec["source_ids"], spec["parameters"], user_id, outcome
+                )
+                result.status, result.summary_id = "succeeded", summary.id
+        
+        await run_in_threadpool(save_all)
+    
+    counts = {"queued": 0, "succeeded": 0, "failed": 0, "rejected": 0}
+    for result in results:
+        counts[result.status] += 1
+    return {
+        "items": results,
+        "accepted": counts["queued"] + counts["succeeded"],
+        "rejected": counts["rejected"],
+        "failed": counts["failed"]
+    }
+
+
+def _sse_event(event: str, data: Any) -> str:
+    """格式化一条Server-Sent Events消息"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+@router.post("/generate/stream")
+def generate_summary_stream(
+    request: SummaryGenerateRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """流式生成摘要（SSE），逐段推送模型输出，完成后保存摘要"""
+    user_id = current_user.id
+    valid_source_ids = validate_generate_request(db, request, user_id)
+    try:
+        summary_request, parameters = build_summary_request(
+            db, valid_source_ids, request.template_id, request.parameters or {}, user_id
+        )
+    except SourceContentMissing as e:
+        raise HTTPException(
+            status_code=HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    
+    async def event_stream():
+        chunks = []
+        try:
+            async for text in ai_service.stream_summary(summary_request):
+                chunks.append(text)
+                yield _sse_event("delta", {"text": text})
+            
+            summary_result = ai_service.parse_result("".join(chunks))
+            # 请求的会话在响应开始前已关闭，这里使用独立会话保存结果
+            session = SessionLocal()
+            try:
+                summary = save_generated_summary(
+                    session, valid_source_ids, parameters, user_id, summary_result
+                )
+                data = Summary.model_validate(summary).model_dump(mode="json")
+            finally:
+                session.close()
+            yield _sse_event("done", data)
+        except Exception as e:
+            print(f"摘要流式生成失败：{str(e)}")
+            yield _sse_event("error", {"detail": "摘要生成失败"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.get("/templates", response_model=List[SummaryTemplate])
 def get_summary_templates(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """获取摘要模板列表"""
@@ -329,7 +551,7 @@ def get_summary_templates(
 @router.get("/templates/{template_id}", response_model=SummaryTemplate)
 def get_summary_template(
     template_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """获取单个摘要模板详情"""
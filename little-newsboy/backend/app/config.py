@@ -10,9 +10,29 @@ class Settings(BaseSettings):
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-for-development-only")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7天
+    # 密码哈希配置
+    PASSWORD_BCRYPT_ROUNDS: int = int(os.getenv("PASSWORD_BCRYPT_ROUNDS", "12"))  # 修改后旧哈希在用户下次登录时更新
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "0"))  # 密码哈希线程数，0表示CPU核数
+    # 令牌校验和用户查询缓存
+    # 用户更新或删除时只清除当前进程的缓存：多进程部署时，用户被禁用、删除或修改后，
+    # 其他进程最长在AUTH_CACHE_TTL_SECONDS内仍使用旧的用户信息（该值上限为app.api.deps.AUTH_CACHE_MAX_TTL_SECONDS）
+    AUTH_CACHE_ENABLED: bool = os.getenv("AUTH_CACHE_ENABLED", "True").lower() == "true"
+    AUTH_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+    AUTH_CACHE_TTL_SECONDS: int = int(os.getenv("AUTH_CACHE_TTL_SECONDS", "10"))  # 多进程部署时用户变更的最长生效延迟
     
     # 数据库配置
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./app.db")
+    # 异步引擎连接池（读接口使用），并发请求超过连接数时在池上排队而不占用线程
+    DB_ASYNC_POOL_SIZE: int = int(os.getenv("DB_ASYNC_POOL_SIZE", "20"))
+    DB_ASYNC_MAX_OVERFLOW: int = int(os.getenv("DB_ASYNC_MAX_OVERFLOW", "10"))
+    DB_ASYNC_POOL_TIMEOUT: float = float(os.getenv("DB_ASYNC_POOL_TIMEOUT", "30"))
+    # SQLite配置档：default保持驱动默认设置；production启用WAL等PRAGMA，只读会话使用独立连接池
+    SQLITE_PROFILE: str = os.getenv("SQLITE_PROFILE", "default")
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # 字节
+    SQLITE_CACHE_SIZE_KB: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", str(64 * 1024)))  # 每个连接的页缓存
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))  # 等待写锁的时间
+    DB_READ_POOL_SIZE: int = int(os.getenv("DB_READ_POOL_SIZE", "10"))
+    DB_READ_MAX_OVERFLOW: int = int(os.getenv("DB_READ_MAX_OVERFLOW", "20"))
     
     # MinIO配置
     MINIO_ENDPOINT: str = os.getenv("MINIO_ENDPOINT", "localhost:9000")
@@ -26,10 +46,99 @@ class Settings(BaseSettings):
     
     # Ollama配置
     OLLAMA_BASE_URL: str = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-    
+
+    # AI服务HTTP连接池配置
+    AI_HTTP_MAX_CONNECTIONS: int = int(os.getenv("AI_HTTP_MAX_CONNECTIONS", "100"))
+    AI_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("AI_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    AI_HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("AI_HTTP_KEEPALIVE_EXPIRY", "30"))
+    AI_HTTP2: bool = os.getenv("AI_HTTP2", "False").lower() == "true"
+    AI_HTTP_CONNECT_TIMEOUT: float = float(os.getenv("AI_HTTP_CONNECT_TIMEOUT", "5"))
+    AI_HTTP_READ_TIMEOUT: float = float(os.getenv("AI_HTTP_READ_TIMEOUT", "120"))
+    AI_HTTP_WRITE_TIMEOUT: float = float(os.getenv("AI_HTTP_WRITE_TIMEOUT", "10"))
+    AI_HTTP_POOL_TIMEOUT: float = float(os.getenv("AI_HTTP_POOL_TIMEOUT", "10"))
+    AI_MAX_CONCURRENCY: int = int(os.getenv("AI_MAX_CONCURRENCY", "8"))  # 同时进行的模型调用上限
+
+    # AI结果缓存配置
+    AI_CACHE_ENABLED: bool = os.getenv("AI_CACHE_ENABLED", "True").lower() == "true"
+    AI_CACHE_MAX_ENTRIES: int = int(os.getenv("AI_CACHE_MAX_ENTRIES", "1024"))
+    AI_CACHE_TTL_SECONDS: int = int(os.getenv("AI_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    AI_CACHE_DB_PATH: str = os.getenv("AI_CACHE_DB_PATH", "./llm_cache.db")  # 为空时只使用内存缓存
+    AI_CACHE_DB_MAX_ENTRIES: int = int(os.getenv("AI_CACHE_DB_MAX_ENTRIES", "100000"))
+
+    # 长文本分块摘要配置
+    AI_CHUNK_MAX_TOKENS: int = int(os.getenv("AI_CHUNK_MAX_TOKENS", "3000"))
+    AI_CHUNK_OVERLAP_TOKENS: int = int(os.getenv("AI_CHUNK_OVERLAP_TOKENS", "200"))
+    AI_CHUNK_CONCURRENCY: int = int(os.getenv("AI_CHUNK_CONCURRENCY", "4"))
+    AI_CHUNK_MAX_LEVELS: int = int(os.getenv("AI_CHUNK_MAX_LEVELS", "3"))  # 分层归并的最多层数，之后截断合并结果再归并一次
+
+    # 信息源抓取配置
+    FETCH_CONCURRENCY: int = int(os.getenv("FETCH_CONCURRENCY", "64"))  # 同时进行的抓取总数
+    FETCH_PER_HOST_LIMIT: int = int(os.getenv("FETCH_PER_HOST_LIMIT", "4"))  # 单个主机的并发连接上限
+    FETCH_MAX_CONNECTIONS: int = int(os.getenv("FETCH_MAX_CONNECTIONS", "100"))
+    FETCH_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("FETCH_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    FETCH_CONNECT_TIMEOUT: float = float(os.getenv("FETCH_CONNECT_TIMEOUT", "5"))
+    FETCH_READ_TIMEOUT: float = float(os.getenv("FETCH_READ_TIMEOUT", "20"))
+    FETCH_TOTAL_TIMEOUT: float = float(os.getenv("FETCH_TOTAL_TIMEOUT", "60"))  # 单次请求的总时限（不含排队）
+    FETCH_MAX_BYTES: int = int(os.getenv("FETCH_MAX_BYTES", str(5 * 1024 * 1024)))  # 响应体超出后截断
+    FETCH_MAX_ITEMS: int = int(os.getenv("FETCH_MAX_ITEMS", "50"))
+    FETCH_MAX_CONTENT_CHARS: int = int(os.getenv("FETCH_MAX_CONTENT_CHARS", "100000"))
+    FETCH_SAVE_BATCH_SIZE: int = int(os.getenv("FETCH_SAVE_BATCH_SIZE", "100"))
+    FETCH_USER_AGENT: str = os.getenv("FETCH_USER_AGENT", "LittleNewsboy/0.1")
+    FETCH_ALLOW_PRIVATE_ADDRESSES: bool = os.getenv("FETCH_ALLOW_PRIVATE_ADDRESSES", "False").lower() == "true"  # 允许抓取本机和内网地址，仅用于本地开发
+    # 可指向本地替身服务进行测试
+    FETCH_GITHUB_API_URL: str = os.getenv("FETCH_GITHUB_API_URL", "https://api.github.com")
+    FETCH_ARXIV_API_URL: str = os.getenv("FETCH_ARXIV_API_URL", "http://export.arxiv.org")
+
+    # 近似重复条目检测配置（MinHash LSH）
+    DEDUP_ENABLED: bool = os.getenv("DEDUP_ENABLED", "True").lower() == "true"
+    DEDUP_SOURCE_TYPES: str = os.getenv("DEDUP_SOURCE_TYPES", "news,community")  # 参与检测的信息源类型，逗号分隔
+    DEDUP_SIMILARITY: float = float(os.getenv("DEDUP_SIMILARITY", "0.7"))  # 文本3字片段集合的相似度（Jaccard）达到该值视为重复，不宜低于0.5
+    DEDUP_WINDOW_DAYS: int = int(os.getenv("DEDUP_WINDOW_DAYS", "14"))  # 只与最近这些天出现过的条目比较
+    DEDUP_MIN_CHARS: int = int(os.getenv("DEDUP_MIN_CHARS", "40"))  # 文本过短的条目不计算指纹
+
+    # 相关摘要配置（本地哈希n-gram向量）
+    RELATED_DIMENSIONS: int = int(os.getenv("RELATED_DIMENSIONS", "256"))  # 向量维度，修改后需执行 python -m app.tasks.related --rebuild
+    RELATED_MAX_CHARS: int = int(os.getenv("RELATED_MAX_CHARS", "4000"))  # 参与计算的正文长度上限
+    RELATED_INDEX_MAX_USERS: int = int(os.getenv("RELATED_INDEX_MAX_USERS", "16"))  # 内存中缓存向量矩阵的用户数
+    RELATED_TOMBSTONE_TTL_SECONDS: int = int(os.getenv("RELATED_TOMBSTONE_TTL_SECONDS", "86400"))  # 已删除摘要的墓碑行保留时长，内存索引超过该时长未同步时重建
+
+    # 运行指标（GET /metrics，Prometheus文本格式）
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+
+    # GitHub分析数据导入及响应缓存配置
+    GITHUB_TOKEN: str = os.getenv("GITHUB_TOKEN", "")  # 同步事件API时使用，可为空
+    GITHUB_INGEST_BATCH_SIZE: int = int(os.getenv("GITHUB_INGEST_BATCH_SIZE", "10000"))  # 导入文件时每批合并写入的行数
+    GITHUB_EVENTS_MAX_PAGES: int = int(os.getenv("GITHUB_EVENTS_MAX_PAGES", "3"))  # 事件API最多翻页数（每页100条）
+    GITHUB_TOP_CONTRIBUTORS: int = int(os.getenv("GITHUB_TOP_CONTRIBUTORS", "5"))
+    ANALYTICS_CACHE_TTL_SECONDS: int = int(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "300"))  # 分析响应的新鲜期
+    ANALYTICS_CACHE_STALE_SECONDS: int = int(os.getenv("ANALYTICS_CACHE_STALE_SECONDS", "3600"))  # 过期后先返回旧响应并后台刷新的宽限期
+    ANALYTICS_CACHE_MAX_ENTRIES: int = int(os.getenv("ANALYTICS_CACHE_MAX_ENTRIES", "1024"))
+
+    # 刷新调度配置
+    SCHEDULER_TICK_SECONDS: float = float(os.getenv("SCHEDULER_TICK_SECONDS", "5"))
+    SCHEDULER_RESYNC_SECONDS: int = int(os.getenv("SCHEDULER_RESYNC_SECONDS", "300"))  # 从数据库重新加载信息源的间隔
+    SCHEDULER_REALTIME_INTERVAL: int = int(os.getenv("SCHEDULER_REALTIME_INTERVAL", "900"))  # 实时信息源的刷新间隔（秒）
+    SCHEDULER_JITTER_RATIO: float = float(os.getenv("SCHEDULER_JITTER_RATIO", "0.1"))  # 每次刷新间隔的随机浮动比例
+    SCHEDULER_INITIAL_SPREAD_SECONDS: int = int(os.getenv("SCHEDULER_INITIAL_SPREAD_SECONDS", "1800"))  # 首次调度的分散窗口
+    SCHEDULER_MAX_DISPATCH: int = int(os.getenv("SCHEDULER_MAX_DISPATCH", "1000"))  # 每轮最多派发的信息源数
+    SCHEDULER_BATCH_SIZE: int = int(os.getenv("SCHEDULER_BATCH_SIZE", "200"))  # 每个刷新任务包含的信息源数
+    SCHEDULER_RETRY_SECONDS: int = int(os.getenv("SCHEDULER_RETRY_SECONDS", "60"))  # 派发失败后的重试间隔
+
     # Celery配置
     CELERY_BROKER_URL: str = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
     CELERY_RESULT_BACKEND: str = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
+    # 为True时任务在当前进程同步执行（测试用，可配合 memory:// broker）
+    CELERY_TASK_ALWAYS_EAGER: bool = os.getenv("CELERY_TASK_ALWAYS_EAGER", "False").lower() == "true"
+    SUMMARY_JOB_MAX_RETRIES: int = int(os.getenv("SUMMARY_JOB_MAX_RETRIES", "3"))
+    SUMMARY_JOB_RETRY_BACKOFF: int = int(os.getenv("SUMMARY_JOB_RETRY_BACKOFF", "30"))  # 秒，按指数退避
+    SUMMARY_BATCH_MAX_ITEMS: int = int(os.getenv("SUMMARY_BATCH_MAX_ITEMS", "500"))
+    SUMMARY_EXCERPT_LENGTH: int = int(os.getenv("SUMMARY_EXCERPT_LENGTH", "200"))  # 列表接口返回的正文摘录长度（字符）
+    
+    # 导入导出配置
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "500"))  # 导出时每批从游标读取的行数
+    IMPORT_CHUNK_SIZE: int = int(os.getenv("IMPORT_CHUNK_SIZE", "500"))  # 导入时每个事务写入的行数
+    IMPORT_MAX_ERRORS: int = int(os.getenv("IMPORT_MAX_ERRORS", "100"))  # 导入结果中最多返回的错误行数
+    IMPORT_MAX_LINE_BYTES: int = int(os.getenv("IMPORT_MAX_LINE_BYTES", "1048576"))  # 导入时单行的长度上限，超过的行记为失败
     
     class Config:
         env_file = ".env"
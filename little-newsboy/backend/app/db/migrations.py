@@ -0,0 +1,39 @@
+# 数据库迁移：应用和worker启动时把数据库升级到最新版本
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.db.repositories.summary import SummaryRepository
+from app.db.search import init_fts
+
+# backend目录，alembic.ini 和 alembic/ 所在位置
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+def get_alembic_config() -> Config:
+    """不依赖当前工作目录的Alembic配置"""
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    return config
+
+
+def upgrade_database(engine: Engine, revision: str = "head") -> None:
+    """执行尚未应用的迁移。首个迁移会跳过已存在的表，旧版本由create_all创建的数据库可以直接升级"""
+    config = get_alembic_config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, revision)
+
+
+def prepare_database(engine: Engine) -> None:
+    """启动时准备数据库：执行迁移、创建并回填全文索引、迁移旧摘要的标签、为没有向量的摘要计算向量。
+    由API的lifespan、worker的启动信号和命令行入口显式调用，导入模块时不访问数据库"""
+    upgrade_database(engine)
+    init_fts(engine)
+    with Session(engine) as db:
+        repository = SummaryRepository()
+        repository.backfill_tags(db)
+        repository.backfill_vectors(db)
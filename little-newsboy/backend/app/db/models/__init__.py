@@ -1,6 +1,14 @@
 from app.db.models.user import User
-from app.db.models.source import Source
-from app.db.models.summary import Summary, SummaryTemplate
+from app.db.models.source import Source, SourceFetch, SourceSchedule, ItemFingerprint, ItemFingerprintBand
+from app.db.models.summary import Summary, SummaryTag, SummaryTemplate, SummaryVector
+from app.db.models.job import SummaryJob
+from app.db.models.analytics import (
+    GitHubRepo, GitHubMonthlyStats, GitHubDailyStats, GitHubContributorMonthlyStats,
+    GitHubIssueLabelMonthlyStats, GitHubArchiveFile
+)
 
 # 导出所有模型，方便导入
-__all__ = ["User", "Source", "Summary", "SummaryTemplate"] 
\ No newline at end of file
+__all__ = ["User", "Source", "SourceFetch", "SourceSchedule", "ItemFingerprint", "ItemFingerprintBand",
+           "Summary", "SummaryTag", "SummaryTemplate", "SummaryVector", "SummaryJob",
+           "GitHubRepo", "GitHubMonthlyStats", "GitHubDailyStats", "GitHubContributorMonthlyStats",
+           "GitHubIssueLabelMonthlyStats", "GitHubArchiveFile"] 
\ No newline at end of file
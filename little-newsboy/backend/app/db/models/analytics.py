@@ -0,0 +1,88 @@
+from sqlalchemy import BigInteger, Boolean, Column, Date, DateTime, ForeignKey, Integer, String
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+
+
+class GitHubRepo(Base):
+    """已导入事件的GitHub仓库及其最新概况"""
+    __tablename__ = "github_repos"
+
+    id = Column(Integer, primary_key=True, index=True)
+    full_name = Column(String, unique=True, index=True, nullable=False)  # owner/name
+    name = Column(String, index=True, nullable=False)
+    description = Column(String, default="")
+    stars = Column(Integer, default=0)
+    forks = Column(Integer, default=0)
+    open_issues = Column(Integer, default=0)
+    watchers = Column(Integer, default=0)
+
+    # 概况来自仓库API或事件中附带的仓库信息，仅用更新的数据覆盖
+    metadata_at = Column(DateTime(timezone=True), nullable=True)
+    # 最近一条事件的时间和ID（事件API按此增量同步）
+    last_event_at = Column(DateTime(timezone=True), nullable=True)
+    last_event_id = Column(BigInteger, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class GitHubMonthlyStats(Base):
+    """仓库按月汇总的活动数"""
+    __tablename__ = "github_monthly_stats"
+
+    repo_id = Column(Integer, ForeignKey("github_repos.id", ondelete="CASCADE"), primary_key=True)
+    month = Column(Date, primary_key=True)  # 当月第一天
+    commits = Column(Integer, default=0)
+    pull_requests = Column(Integer, default=0)
+    issues = Column(Integer, default=0)
+    stars = Column(Integer, default=0)
+    forks = Column(Integer, default=0)
+    # 当月有提交、PR或issue的贡献者人数
+    contributors = Column(Integer, default=0)
+
+
+class GitHubDailyStats(Base):
+    """仓库按日汇总的活动数，用于近30天统计"""
+    __tablename__ = "github_daily_stats"
+
+    repo_id = Column(Integer, ForeignKey("github_repos.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    commits = Column(Integer, default=0)
+    pull_requests = Column(Integer, default=0)
+    issues = Column(Integer, default=0)
+    stars = Column(Integer, default=0)
+
+
+class GitHubContributorMonthlyStats(Base):
+    """贡献者在仓库中按月汇总的活动数"""
+    __tablename__ = "github_contributor_stats"
+
+    repo_id = Column(Integer, ForeignKey("github_repos.id", ondelete="CASCADE"), primary_key=True)
+    month = Column(Date, primary_key=True)
+    login = Column(String, primary_key=True)
+    avatar_url = Column(String, nullable=True)
+    commits = Column(Integer, default=0)
+    pull_requests = Column(Integer, default=0)
+    issues = Column(Integer, default=0)
+
+
+class GitHubIssueLabelMonthlyStats(Base):
+    """新建issue按标签按月汇总的数量（无标签的计入空字符串）"""
+    __tablename__ = "github_issue_label_stats"
+
+    repo_id = Column(Integer, ForeignKey("github_repos.id", ondelete="CASCADE"), primary_key=True)
+    month = Column(Date, primary_key=True)
+    label = Column(String, primary_key=True)
+    count = Column(Integer, default=0)
+
+
+class GitHubArchiveFile(Base):
+    """GH Archive文件的导入进度，已读完的文件重复导入时跳过"""
+    __tablename__ = "github_archive_files"
+
+    name = Column(String, primary_key=True)
+    # 已读取的行数，中断后从这里继续
+    lines = Column(Integer, default=0)
+    events = Column(Integer, default=0)
+    completed = Column(Boolean, default=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
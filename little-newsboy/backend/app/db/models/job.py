@@ -0,0 +1,33 @@
+from sqlalchemy import Column, String, Integer, DateTime, JSON, ForeignKey, Enum
+from sqlalchemy.sql import func
+import uuid
+import enum
+
+from app.db.session import Base
+
+class JobStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class SummaryJob(Base):
+    __tablename__ = "summary_jobs"
+
+    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
+    status = Column(Enum(JobStatus), default=JobStatus.PENDING, index=True)
+    source_ids = Column(JSON, default=list)
+    template_id = Column(String, nullable=True)
+    parameters = Column(JSON, default=dict)
+    attempts = Column(Integer, default=0)
+    error = Column(String, nullable=True)
+    
+    # 生成成功后关联的摘要
+    summary_id = Column(String, ForeignKey("summaries.id"), nullable=True)
+    
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,4 +1,8 @@
-from sqlalchemy import Boolean, Column, String, DateTime, JSON, ForeignKey, Enum
+from sqlalchemy import (
+    BigInteger, Boolean, Column, String, Integer, Text, DateTime, JSON, ForeignKey, Enum, Index, LargeBinary,
+    UniqueConstraint
+)
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
 import enum
@@ -28,6 +32,12 @@ class Status(str, enum.Enum):
 
 class Source(Base):
     __tablename__ = "sources"
+    __table_args__ = (
+        # 按用户列出信息源并按时间排序/键集分页
+        Index("ix_sources_user_created", "user_id", "created_at"),
+        # 按类型、状态过滤
+        Index("ix_sources_user_type_status", "user_id", "type", "status"),
+    )
 
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
     name = Column(String, index=True)
@@ -39,7 +49,85 @@ class Source(Base):
     filters = Column(JSON, default=dict)
     credentials = Column(JSON, default=dict)
     
-    user_id = Column(String, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"))
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now()) 
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # 最近一次抓取的结果
+    fetch = relationship("SourceFetch", uselist=False, cascade="all, delete-orphan")
+    # 刷新调度信息
+    schedule = relationship("SourceSchedule", uselist=False, cascade="all, delete-orphan")
+
+class SourceFetch(Base):
+    """信息源最近一次抓取的元数据和内容"""
+    __tablename__ = "source_fetches"
+
+    source_id = Column(String, ForeignKey("sources.id", ondelete="CASCADE"), primary_key=True)
+    url = Column(String)
+    
+    # 条件请求使用的缓存校验信息
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    
+    status_code = Column(Integer, nullable=True)
+    content_type = Column(String, nullable=True)
+    content_hash = Column(String, nullable=True)
+    bytes = Column(Integer, default=0)
+    truncated = Column(Boolean, default=False)
+    duration_ms = Column(Integer, default=0)
+    error = Column(String, nullable=True)
+    
+    # 解析出的条目及拼接后供摘要使用的正文
+    items = Column(JSON, default=list)
+    content = Column(Text, nullable=True)
+    
+    fetched_at = Column(DateTime(timezone=True), nullable=True)
+    # 内容最近一次发生变化的时间
+    changed_at = Column(DateTime(timezone=True), nullable=True)
+
+class SourceSchedule(Base):
+    """信息源的下次刷新时间，调度进程重启后据此恢复"""
+    __tablename__ = "source_schedules"
+
+    source_id = Column(String, ForeignKey("sources.id", ondelete="CASCADE"), primary_key=True)
+    next_run_at = Column(DateTime(timezone=True), index=True)
+    last_run_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class ItemFingerprint(Base):
+    """抓取条目的MinHash签名，用于发现同一用户不同信息源转载的近似重复内容"""
+    __tablename__ = "item_fingerprints"
+    __table_args__ = (
+        UniqueConstraint("source_id", "item_key", name="uq_item_fingerprints_source_item"),
+        # 清理时间窗口外的指纹
+        Index("ix_item_fingerprints_user_seen", "user_id", "seen_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    source_id = Column(String, ForeignKey("sources.id", ondelete="CASCADE"), nullable=False)
+    # 条目在信息源内的标识（链接或标题的哈希）
+    item_key = Column(String, nullable=False)
+    title = Column(String, nullable=True)
+    link = Column(String, nullable=True)
+    # 64个32位最小哈希（小端序）
+    signature = Column(LargeBinary, nullable=False)
+    # 最近一次在抓取结果中出现的时间，只与时间窗口内出现过的条目比较
+    seen_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class ItemFingerprintBand(Base):
+    """MinHash LSH分段：签名每4个值合成一个分段键，与新条目至少有一个分段键相同的指纹才作为候选比较，
+    查找只读取 (user_id, band_key) 索引命中的行，与指纹总数无关"""
+    __tablename__ = "item_fingerprint_bands"
+    __table_args__ = (
+        # 删除指纹时同时删除其分段键
+        Index("ix_item_fingerprint_bands_fingerprint", "fingerprint_id"),
+    )
+
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    band_key = Column(BigInteger, primary_key=True, autoincrement=False)
+    fingerprint_id = Column(
+        Integer, ForeignKey("item_fingerprints.id", ondelete="CASCADE"), primary_key=True, autoincrement=False
+    )
@@ -1,4 +1,6 @@
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, JSON, ForeignKey, Table, ARRAY
+from sqlalchemy import (
+    Column, String, Integer, DateTime, Boolean, JSON, ForeignKey, Table, ARRAY, Index, LargeBinary
+)
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import uuid
@@ -10,33 +12,92 @@ summary_source_association = Table(
     'summary_source_association',
     Base.metadata,
     Column('summary_id', String, ForeignKey('summaries.id')),
-    Column('source_id', String, ForeignKey('sources.id'))
+    Column('source_id', String, ForeignKey('sources.id')),
+    # 批量加载摘要的信息源，以及按信息源过滤摘要
+    Index('ix_summary_source_association_summary_source', 'summary_id', 'source_id'),
+    Index('ix_summary_source_association_source_id', 'source_id'),
 )
 
 class Summary(Base):
     __tablename__ = "summaries"
+    __table_args__ = (
+        # 按用户列出摘要并按时间排序/键集分页
+        Index("ix_summaries_user_created", "user_id", "created_at"),
+        # 按归档、重要标记过滤后按时间排序
+        Index("ix_summaries_user_flags_created", "user_id", "is_archived", "is_important", "created_at"),
+    )
 
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
     title = Column(String, index=True)
     content = Column(String)
+    # 正文的纯文本摘录，由SummaryRepository在写入时生成，列表接口返回它而不加载正文
+    excerpt = Column(String)
     key_points = Column(JSON, default=list)  # 存储为JSON数组
     tags = Column(JSON, default=list)  # 存储为JSON数组
     is_archived = Column(Boolean, default=False)
     is_important = Column(Boolean, default=False)
     
     # 关联用户
-    user_id = Column(String, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"))
     user = relationship("User", backref="summaries")
     
     # 关联信息源（多对多）
     sources = relationship("Source", secondary=summary_source_association, backref="summaries")
     
+    # 规范化的标签行，由SummaryRepository与tags保持同步
+    tag_links = relationship("SummaryTag", cascade="all, delete-orphan", lazy="select")
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    @property
+    def source_ids(self):
+        """关联信息源的ID列表（列表查询通过selectinload批量加载sources）"""
+        return [source.id for source in self.sources]
+
+
+class SummaryTag(Base):
+    __tablename__ = "summary_tags"
+    __table_args__ = (
+        # 按用户+标签过滤并按时间排序，也用于标签统计
+        Index("ix_summary_tags_user_tag_created", "user_id", "tag", "created_at"),
+    )
+
+    summary_id = Column(String, ForeignKey("summaries.id", ondelete="CASCADE"), primary_key=True)
+    tag = Column(String, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    # 与所属摘要的创建时间一致
+    created_at = Column(DateTime(timezone=True))
+
+
+class SummaryVector(Base):
+    """摘要的哈希n-gram向量（float32），用于查找相关摘要；由app.db.vectors通过ORM事件与摘要保持同步"""
+    __tablename__ = "summary_vectors"
+    __table_args__ = (
+        # 按用户增量读取新写入的行
+        Index("ix_summary_vectors_user_id", "user_id", "id"),
+        # 按写入时间清理过期的墓碑行
+        Index("ix_summary_vectors_deleted_at", "deleted_at"),
+        # ID单调递增、不复用，内存索引只需读取上次同步之后的行
+        {"sqlite_autoincrement": True},
+    )
+
+    # 摘要每次重新计算向量或被删除都删除旧行、写入新行
+    id = Column(Integer, primary_key=True)
+    # 摘要删除后保留墓碑行，因此不设外键
+    summary_id = Column(String, nullable=False, unique=True)
+    user_id = Column(Integer, nullable=False)
+    # 为空表示摘要已删除或没有可用特征，内存索引同步时据此移除
+    vector = Column(LargeBinary, nullable=True)
+    # 墓碑行的写入时间，超过RELATED_TOMBSTONE_TTL_SECONDS后清理
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
 
 
 class SummaryTemplate(Base):
     __tablename__ = "summary_templates"
+    __table_args__ = (
+        Index("ix_summary_templates_user_id", "user_id"),
+    )
 
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
     name = Column(String, index=True)
@@ -44,7 +105,7 @@ class SummaryTemplate(Base):
     parameters = Column(JSON, default=dict)  # 存储模板参数
     
     # 关联用户
-    user_id = Column(String, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"))
     user = relationship("User", backref="summary_templates")
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,106 @@
+from datetime import datetime
+from typing import Any, Iterable, List, Optional, Tuple
+import base64
+import json
+
+from sqlalchemy import DateTime, String, and_, asc, desc, func, or_, select
+from sqlalchemy.orm import Query, aliased
+
+
+class InvalidCursor(ValueError):
+    """游标无法解析"""
+
+
+def _coalesces(model: Any, sort_field: str) -> bool:
+    """可为空的文本排序列按空字符串参与排序和比较，NULL值不会使键集条件失效"""
+    column = getattr(model, sort_field).expression
+    return bool(column.nullable) and isinstance(column.type, String)
+
+
+def _sort_key(model: Any, sort_field: str) -> Any:
+    column = getattr(model, sort_field)
+    return func.coalesce(column, "") if _coalesces(model, sort_field) else column
+
+
+def encode_cursor(sort_field: str, sort_order: str, item: Any) -> str:
+    """根据一页的最后一条记录生成不透明游标"""
+    value = getattr(item, sort_field)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    elif value is None and _coalesces(type(item), sort_field):
+        value = ""
+    payload = {"f": sort_field, "o": sort_order, "id": item.id, "v": value}
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_fields: Iterable[str]) -> dict:
+    """解析游标，返回排序字段、方向、锚点ID和排序值；排序字段必须在sort_fields中"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("无效的分页游标") from e
+    if not isinstance(payload, dict) or not {"f", "o", "id"} <= payload.keys():
+        raise InvalidCursor("无效的分页游标")
+    if (
+        payload["f"] not in sort_fields
+        or payload["o"] not in ("asc", "desc")
+        or not isinstance(payload["id"], str)
+        or not isinstance(payload.get("v"), (str, int, float, bool, type(None)))
+    ):
+        raise InvalidCursor("无效的分页游标")
+    return payload
+
+
+def apply_keyset(
+    query: Query,
+    model: Any,
+    sort_field: str,
+    sort_order: str,
+    cursor: Optional[dict] = None,
+) -> Query:
+    """
+    按 (sort_field, id) 应用键集分页条件和排序
+
+    锚点排序值优先从数据库中按ID读取，保证与存储值逐字节一致；
+    锚点记录已被删除时退回游标中携带的值。可为空的文本列按coalesce(列, '')排序和比较。
+    """
+    column = _sort_key(model, sort_field)
+    descending = sort_order.lower() == "desc"
+
+    if cursor is not None:
+        value = cursor.get("v")
+        if value is None and _coalesces(model, sort_field):
+            value = ""
+        if value is not None and isinstance(column.type, DateTime):
+            try:
+                value = datetime.fromisoformat(value)
+            except (ValueError, TypeError) as e:
+                raise InvalidCursor("无效的分页游标") from e
+        anchor_model = aliased(model)
+        anchor = func.coalesce(
+            select(_sort_key(anchor_model, sort_field))
+            .where(anchor_model.id == cursor["id"])
+            .scalar_subquery(),
+            value,
+        )
+        if descending:
+            condition = or_(column < anchor, and_(column == anchor, model.id < cursor["id"]))
+        else:
+            condition = or_(column > anchor, and_(column == anchor, model.id > cursor["id"]))
+        query = query.filter(condition)
+
+    order_func = desc if descending else asc
+    return query.order_by(order_func(column), order_func(model.id))
+
+
+def split_keyset_page(
+    rows: List[Any], sort_field: str, sort_order: str, limit: int
+) -> Tuple[List[Any], Optional[str]]:
+    """查询时多取一条用于判断是否还有下一页，返回本页数据和下一页游标"""
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit and items:
+        next_cursor = encode_cursor(sort_field, sort_order, items[-1])
+    return items, next_cursor
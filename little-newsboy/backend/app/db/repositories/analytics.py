@@ -0,0 +1,238 @@
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Table, bindparam, desc, func, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.db.models.analytics import (
+    GitHubArchiveFile, GitHubContributorMonthlyStats, GitHubDailyStats, GitHubIssueLabelMonthlyStats,
+    GitHubMonthlyStats, GitHubRepo
+)
+
+# 每次executemany写入的行数
+_UPSERT_CHUNK_SIZE = 1000
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """SQLite读出的时间不带时区，统一按UTC比较"""
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+class GitHubAnalyticsRepository:
+    def get_repo(self, db: Session, repo_name: str) -> Optional[GitHubRepo]:
+        """按owner/name查找仓库；只给出仓库名时取star最多的同名仓库"""
+        if "/" in repo_name:
+            return db.query(GitHubRepo).filter(GitHubRepo.full_name == repo_name).first()
+        return (
+            db.query(GitHubRepo)
+            .filter(GitHubRepo.name == repo_name)
+            .order_by(desc(GitHubRepo.stars))
+            .first()
+        )
+
+    def get_archive_file(self, db: Session, name: str) -> Optional[GitHubArchiveFile]:
+        return db.query(GitHubArchiveFile).filter(GitHubArchiveFile.name == name).first()
+
+    def get_watermarks(self, db: Session, full_names: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """仓库 -> 已计入的最大事件ID；full_names为空时返回全部仓库"""
+        query = db.query(GitHubRepo.full_name, GitHubRepo.last_event_id).filter(GitHubRepo.last_event_id > 0)
+        if full_names is not None:
+            query = query.filter(GitHubRepo.full_name.in_(list(full_names)))
+        return dict(query.all())
+
+    def get_monthly(self, db: Session, repo_id: int, start_month: date) -> List[GitHubMonthlyStats]:
+        return db.query(GitHubMonthlyStats).filter(
+            GitHubMonthlyStats.repo_id == repo_id,
+            GitHubMonthlyStats.month >= start_month
+        ).all()
+
+    def sum_daily_commits(self, db: Session, repo_id: int, start_day: date) -> int:
+        return db.query(func.coalesce(func.sum(GitHubDailyStats.commits), 0)).filter(
+            GitHubDailyStats.repo_id == repo_id,
+            GitHubDailyStats.day >= start_day
+        ).scalar()
+
+    def get_top_contributors(self, db: Session, repo_id: int, start_month: date, limit: int = 5) -> List[Any]:
+        """统计窗口内按提交数排序的贡献者"""
+        commits = func.sum(GitHubContributorMonthlyStats.commits).label("commits")
+        pull_requests = func.sum(GitHubContributorMonthlyStats.pull_requests).label("pull_requests")
+        return (
+            db.query(
+                GitHubContributorMonthlyStats.login,
+                func.max(GitHubContributorMonthlyStats.avatar_url).label("avatar_url"),
+                commits,
+                pull_requests,
+                func.sum(GitHubContributorMonthlyStats.issues).label("issues"),
+            )
+            .filter(
+                GitHubContributorMonthlyStats.repo_id == repo_id,
+                GitHubContributorMonthlyStats.month >= start_month
+            )
+            .group_by(GitHubContributorMonthlyStats.login)
+            .order_by(desc(commits), desc(pull_requests), GitHubContributorMonthlyStats.login)
+            .limit(limit)
+            .all()
+        )
+
+    def count_contributors(self, db: Session, repo_id: int, start_month: date) -> int:
+        """统计窗口内有活动的贡献者人数"""
+        return db.query(func.count(func.distinct(GitHubContributorMonthlyStats.login))).filter(
+            GitHubContributorMonthlyStats.repo_id == repo_id,
+            GitHubContributorMonthlyStats.month >= start_month
+        ).scalar()
+
+    def get_issue_labels(self, db: Session, repo_id: int, start_month: date, limit: int = 6) -> List[Tuple[str, int]]:
+        """统计窗口内新建issue最多的标签"""
+        count = func.sum(GitHubIssueLabelMonthlyStats.count).label("count")
+        rows = (
+            db.query(GitHubIssueLabelMonthlyStats.label, count)
+            .filter(
+                GitHubIssueLabelMonthlyStats.repo_id == repo_id,
+                GitHubIssueLabelMonthlyStats.month >= start_month
+            )
+            .group_by(GitHubIssueLabelMonthlyStats.label)
+            .order_by(desc(count), GitHubIssueLabelMonthlyStats.label)
+            .limit(limit)
+            .all()
+        )
+        return [(label, label_count) for label, label_count in rows]
+
+    def _load_repos(self, db: Session, full_names: List[str]) -> Dict[str, GitHubRepo]:
+        repos = {
+            repo.full_name: repo
+            for repo in db.query(GitHubRepo).filter(GitHubRepo.full_name.in_(full_names))
+        }
+        for full_name in full_names:
+            if full_name not in repos:
+                repos[full_name] = GitHubRepo(
+                    full_name=full_name, name=full_name.split("/")[-1], description="",
+                    stars=0, forks=0, open_issues=0, watchers=0, last_event_id=0,
+                )
+                db.add(repos[full_name])
+        # 取得新仓库的ID
+        db.flush()
+        return repos
+
+    def save_batch(self, db: Session, batch: Any, archive_file: Optional[Tuple[str, int, int, bool]] = None) -> None:
+        """在一个事务中把一批事件的增量合并进汇总表
+
+        archive_file为(文件名, 已读取行数, 本批事件数, 是否读完)，与汇总在同一事务中记录，中断后可从进度处继续
+        """
+        repos = self._load_repos(db, list(batch.repos)) if batch.repos else {}
+        for full_name, delta in batch.repos.items():
+            repo = repos[full_name]
+            if delta["metadata"] is not None and (
+                repo.metadata_at is None or delta["metadata_at"] > as_utc(repo.metadata_at)
+            ):
+                for key, value in delta["metadata"].items():
+                    setattr(repo, key, value)
+                repo.metadata_at = delta["metadata_at"]
+            repo.stars = max(0, (repo.stars or 0) + delta["stars"])
+            repo.forks = max(0, (repo.forks or 0) + delta["forks"])
+            repo.open_issues = max(0, (repo.open_issues or 0) + delta["open_issues"])
+            if delta["last_event_at"] is not None and (
+                repo.last_event_at is None or delta["last_event_at"] > as_utc(repo.last_event_at)
+            ):
+                repo.last_event_at = delta["last_event_at"]
+            repo.last_event_id = max(repo.last_event_id or 0, delta["last_event_id"])
+
+        monthly_keys = [(repos[name].id, month) for name, month in batch.monthly]
+        self._increment(
+            db, GitHubMonthlyStats.__table__, ("repo_id", "month"),
+            ("commits", "pull_requests", "issues", "stars", "forks"),
+            [{"repo_id": repos[name].id, "month": month, **counts} for (name, month), counts in batch.monthly.items()],
+        )
+        self._increment(
+            db, GitHubDailyStats.__table__, ("repo_id", "day"),
+            ("commits", "pull_requests", "issues", "stars"),
+            [{"repo_id": repos[name].id, "day": day, **counts} for (name, day), counts in batch.daily.items()],
+        )
+        self._increment(
+            db, GitHubContributorMonthlyStats.__table__, ("repo_id", "month", "login"),
+            ("commits", "pull_requests", "issues"),
+            [
+                {"repo_id": repos[name].id, "month": month, "login": login,
+                 "avatar_url": batch.avatars.get(login), **counts}
+                for (name, month, login), counts in batch.contributors.items()
+            ],
+            replace=("avatar_url",),
+        )
+        self._increment(
+            db, GitHubIssueLabelMonthlyStats.__table__, ("repo_id", "month", "label"), ("count",),
+            [
+                {"repo_id": repos[name].id, "month": month, "label": label, "count": count}
+                for (name, month, label), count in batch.labels.items()
+            ],
+        )
+        # 按贡献者表重新统计涉及月份的贡献者人数（主键前缀范围计数）
+        if monthly_keys:
+            contributor = GitHubContributorMonthlyStats.__table__
+            monthly = GitHubMonthlyStats.__table__
+            db.execute(
+                monthly.update()
+                .where(monthly.c.repo_id == bindparam("b_repo_id"), monthly.c.month == bindparam("b_month"))
+                .values(contributors=(
+                    select(func.count())
+                    .where(contributor.c.repo_id == bindparam("b_repo_id"), contributor.c.month == bindparam("b_month"))
+                    .scalar_subquery()
+                )),
+                [{"b_repo_id": repo_id, "b_month": month} for repo_id, month in monthly_keys],
+            )
+
+        if archive_file is not None:
+            name, lines, events, completed = archive_file
+            progress = self.get_archive_file(db, name)
+            if progress is None:
+                progress = GitHubArchiveFile(name=name, lines=0, events=0, completed=False)
+                db.add(progress)
+            progress.lines = lines
+            progress.events = (progress.events or 0) + events
+            progress.completed = completed
+        db.commit()
+
+    @staticmethod
+    def _increment(
+        db: Session,
+        table: Table,
+        key_columns: Sequence[str],
+        counters: Sequence[str],
+        rows: List[Dict[str, Any]],
+        replace: Sequence[str] = (),
+    ) -> None:
+        """按主键批量累加计数：一条INSERT ... ON CONFLICT DO UPDATE语句executemany写入，不逐行查询和更新
+
+        rows中缺少的计数按0处理；replace中的列在新值非空时覆盖
+        """
+        if not rows:
+            return
+        params = [
+            {
+                **{column: row[column] for column in key_columns},
+                **{column: row.get(column, 0) for column in counters},
+                **{column: row.get(column) for column in replace},
+            }
+            for row in rows
+        ]
+        dialect = db.get_bind().dialect.name
+        if dialect == "mysql":
+            statement = mysql_insert(table)
+            statement = statement.on_duplicate_key_update({
+                **{column: table.c[column] + statement.inserted[column] for column in counters},
+                **{column: func.coalesce(statement.inserted[column], table.c[column]) for column in replace},
+            })
+        else:
+            statement = (postgresql_insert if dialect == "postgresql" else sqlite_insert)(table)
+            statement = statement.on_conflict_do_update(
+                index_elements=list(key_columns),
+                set_={
+                    **{column: table.c[column] + statement.excluded[column] for column in counters},
+                    **{column: func.coalesce(statement.excluded[column], table.c[column]) for column in replace},
+                },
+            )
+        for start in range(0, len(params), _UPSERT_CHUNK_SIZE):
+            db.execute(statement, params[start:start + _UPSERT_CHUNK_SIZE])
@@ -1,6 +1,6 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import Any, Dict, Generic, List, Optional, Set, Type, TypeVar, Union
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
-from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 
 from app.db.session import Base
@@ -9,6 +9,17 @@ ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+
+def get_owned_ids(db: Session, model: Type[Base], ids: List[Any], user_id: int) -> Set[Any]:
+    """一次查询返回ids中属于该用户的实体ID（model需有id和user_id列）"""
+    if not ids:
+        return set()
+    rows = db.query(model.id).filter(
+        model.id.in_(set(ids)),
+        model.user_id == user_id
+    ).all()
+    return {row[0] for row in rows}
+
 class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         """
@@ -18,13 +29,15 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             model: SQLAlchemy模型类
         """
         self.model = model
+        # 模型的列属性名，创建和更新时只写入这些字段
+        self.columns = frozenset(inspect(model).column_attrs.keys())
 
     def get(self, db: Session, id: Any) -> Optional[ModelType]:
         """根据ID获取实体"""
         return db.query(self.model).filter(self.model.id == id).first()
 
     def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100, user_id: Optional[str] = None
+        self, db: Session, *, skip: int = 0, limit: int = 100, user_id: Optional[int] = None
     ) -> List[ModelType]:
         """获取多个实体"""
         query = db.query(self.model)
@@ -32,13 +45,15 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             query = query.filter(self.model.user_id == user_id)
         return query.offset(skip).limit(limit).all()
 
-    def create(self, db: Session, *, obj_in: CreateSchemaType, user_id: Optional[str] = None) -> ModelType:
+    def create(self, db: Session, *, obj_in: CreateSchemaType, user_id: Optional[int] = None) -> ModelType:
         """创建新实体"""
-        obj_in_data = jsonable_encoder(obj_in)
+        # 直接按列映射，只保留模型的列字段，关联ID列表等由调用方单独处理
+        obj_in_data = obj_in.model_dump(include=self.columns)
         db_obj = self.model(**obj_in_data)
         if user_id and hasattr(db_obj, "user_id"):
             db_obj.user_id = user_id
         db.add(db_obj)
+        self._before_commit(db, db_obj)
         db.commit()
         db.refresh(db_obj)
         return db_obj
@@ -51,19 +66,23 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         obj_in: Union[UpdateSchemaType, Dict[str, Any]]
     ) -> ModelType:
         """更新实体"""
-        obj_data = jsonable_encoder(db_obj)
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.model_dump(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
+        for field, value in update_data.items():
+            if field in self.columns:
+                setattr(db_obj, field, value)
         db.add(db_obj)
+        self._before_commit(db, db_obj)
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
+    def _before_commit(self, db: Session, db_obj: ModelType) -> None:
+        """创建或更新提交前的扩展点，子类可在同一事务中维护派生数据"""
+        pass
+
     def remove(self, db: Session, *, id: Any) -> ModelType:
         """删除实体"""
         obj = db.query(self.model).get(id)
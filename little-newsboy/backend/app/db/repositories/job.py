@@ -0,0 +1,86 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.db.models.job import SummaryJob, JobStatus
+
+
+class SummaryJobRepository:
+    def get(self, db: Session, id: str) -> Optional[SummaryJob]:
+        """通过ID获取生成任务"""
+        return db.query(SummaryJob).filter(SummaryJob.id == id).first()
+
+    def create(
+        self,
+        db: Session,
+        *,
+        user_id: int,
+        source_ids: List[str],
+        template_id: Optional[str] = None,
+        parameters: Optional[dict] = None,
+    ) -> SummaryJob:
+        """创建待执行的生成任务"""
+        job = SummaryJob(
+            user_id=user_id,
+            source_ids=source_ids,
+            template_id=template_id,
+            parameters=parameters or {},
+            status=JobStatus.PENDING,
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    def create_many(self, db: Session, *, user_id: int, specs: List[dict]) -> List[SummaryJob]:
+        """在一个事务中批量创建生成任务"""
+        jobs = [
+            SummaryJob(
+                user_id=user_id,
+                source_ids=spec["source_ids"],
+                template_id=spec.get("template_id"),
+                parameters=spec.get("parameters") or {},
+                status=JobStatus.PENDING,
+            )
+            for spec in specs
+        ]
+        db.add_all(jobs)
+        db.commit()
+        return jobs
+
+    def mark_running(self, db: Session, job: SummaryJob) -> SummaryJob:
+        """标记任务开始执行，并记录尝试次数"""
+        job.status = JobStatus.RUNNING
+        job.attempts = (job.attempts or 0) + 1
+        job.started_at = datetime.now(timezone.utc)
+        db.commit()
+        return job
+
+    def mark_succeeded(self, db: Session, job: SummaryJob, summary_id: str) -> SummaryJob:
+        """标记任务成功"""
+        job.status = JobStatus.SUCCEEDED
+        job.summary_id = summary_id
+        job.error = None
+        job.finished_at = datetime.now(timezone.utc)
+        db.commit()
+        return job
+
+    def mark_failed(self, db: Session, job: SummaryJob, error: str, final: bool = True) -> SummaryJob:
+        """记录任务失败；非最终失败时回到等待重试状态"""
+        job.status = JobStatus.FAILED if final else JobStatus.PENDING
+        job.error = error
+        if final:
+            job.finished_at = datetime.now(timezone.utc)
+        db.commit()
+        return job
+
+    def count_unfinished(self, db: Session) -> Dict[JobStatus, int]:
+        """等待执行和执行中的任务数（按状态索引计数）"""
+        counts = dict(
+            db.query(SummaryJob.status, func.count())
+            .filter(SummaryJob.status.in_([JobStatus.PENDING, JobStatus.RUNNING]))
+            .group_by(SummaryJob.status)
+            .all()
+        )
+        return {status: counts.get(status, 0) for status in (JobStatus.PENDING, JobStatus.RUNNING)}
@@ -1,70 +1,204 @@
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+import uuid
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Dict, Any, Set, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, Query
+from sqlalchemy import desc, func, insert, select
 
-from app.db.models.source import Source, SourceType, UpdateFrequency, Priority, Status
-from app.schemas.source import SourceCreate, SourceUpdate
+from app.db.models.source import (
+    ItemFingerprint, ItemFingerprintBand, Source, SourceFetch, SourceSchedule, SourceType, UpdateFrequency, Priority, Status
+)
+from app.db.repositories.analytics import as_utc
+from app.db.pagination import InvalidCursor, apply_keyset, decode_cursor, split_keyset_page
+from app.schemas.source import SourceCreate, SourceImport, SourceUpdate
 
 
 class SourceRepository:
+    model = Source
+
     def get(self, db: Session, id: str) -> Optional[Source]:
         """通过ID获取信息源"""
         return db.query(Source).filter(Source.id == id).first()
 
-    def get_multi(
-        self, 
-        db: Session, 
-        user_id: str,
-        skip: int = 0, 
-        limit: int = 100,
+    def get_owned(self, db: Session, ids: List[str], user_id: int) -> List[Source]:
+        """一次查询获取属于该用户的信息源，按传入ID的顺序返回（忽略重复和无权访问的ID）"""
+        if not ids:
+            return []
+        rows = db.query(Source).filter(
+            Source.id.in_(set(ids)),
+            Source.user_id == user_id
+        ).all()
+        by_id = {source.id: source for source in rows}
+        return [by_id[id] for id in dict.fromkeys(ids) if id in by_id]
+
+    def get_many(self, db: Session, ids: List[str]) -> List[Source]:
+        """一次查询获取多个信息源"""
+        if not ids:
+            return []
+        return db.query(Source).filter(Source.id.in_(set(ids))).all()
+
+    async def get_async(self, db: AsyncSession, id: str) -> Optional[Source]:
+        """通过ID获取信息源（异步会话）"""
+        result = await db.execute(select(Source).where(Source.id == id))
+        return result.scalars().first()
+
+    @staticmethod
+    def _filters(
+        user_id: int,
         search: Optional[str] = None,
         source_type: Optional[SourceType] = None,
         status: Optional[Status] = None,
-    ) -> List[Source]:
-        """获取用户的所有信息源"""
-        query = db.query(Source).filter(Source.user_id == user_id)
+    ) -> List[Any]:
+        """信息源列表的过滤条件（同步和异步查询共用）"""
+        filters = [Source.user_id == user_id]
         
         # 应用搜索过滤
         if search:
-            query = query.filter(Source.name.ilike(f"%{search}%"))
+            filters.append(Source.name.ilike(f"%{search}%"))
         
         # 按类型过滤
         if source_type:
-            query = query.filter(Source.type == source_type)
+            filters.append(Source.type == source_type)
         
         # 按状态过滤
         if status:
-            query = query.filter(Source.status == status)
+            filters.append(Source.status == status)
+        
+        return filters
+
+    def _filtered_query(
+        self,
+        db: Session,
+        user_id: int,
+        search: Optional[str] = None,
+        source_type: Optional[SourceType] = None,
+        status: Optional[Status] = None,
+    ) -> Query:
+        """构建带过滤条件的信息源查询"""
+        return db.query(Source).filter(*self._filters(user_id, search, source_type, status))
+
+    @staticmethod
+    def _apply_page(query: Any, cursor: Optional[str], skip: int, limit: int) -> Any:
+        """应用 (created_at, id) 倒序的键集或偏移分页（多取一条用于生成下一页游标）"""
+        decoded = decode_cursor(cursor, ("created_at",)) if cursor else None
+        if decoded and decoded["o"] != "desc":
+            raise InvalidCursor("无效的分页游标")
+        
+        query = apply_keyset(query, Source, "created_at", "desc", decoded)
+        if decoded is None:
+            query = query.offset(skip)
+        return query.limit(limit + 1)
+
+    def get_multi(
+        self, 
+        db: Session, 
+        user_id: int,
+        skip: int = 0, 
+        limit: int = 100,
+        search: Optional[str] = None,
+        source_type: Optional[SourceType] = None,
+        status: Optional[Status] = None,
+    ) -> List[Source]:
+        """获取用户的所有信息源"""
+        query = self._filtered_query(db, user_id, search, source_type, status)
         
         # 排序并分页
         return query.order_by(desc(Source.created_at)).offset(skip).limit(limit).all()
 
+    def get_page(
+        self,
+        db: Session,
+        user_id: int,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+        search: Optional[str] = None,
+        source_type: Optional[SourceType] = None,
+        status: Optional[Status] = None,
+    ) -> Tuple[List[Source], Optional[str]]:
+        """按 (created_at, id) 倒序分页，传入cursor时使用键集分页，返回本页数据和下一页游标"""
+        query = self._filtered_query(db, user_id, search, source_type, status)
+        rows = self._apply_page(query, cursor, skip, limit).all()
+        return split_keyset_page(rows, "created_at", "desc", limit)
+
+    async def get_page_async(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+        search: Optional[str] = None,
+        source_type: Optional[SourceType] = None,
+        status: Optional[Status] = None,
+    ) -> Tuple[List[Source], Optional[str]]:
+        """分页获取信息源（异步会话），参数和返回值与get_page相同"""
+        query = select(Source).where(*self._filters(user_id, search, source_type, status))
+        result = await db.execute(self._apply_page(query, cursor, skip, limit))
+        return split_keyset_page(list(result.scalars().all()), "created_at", "desc", limit)
+
     def count(
         self, 
         db: Session, 
-        user_id: str,
+        user_id: int,
         search: Optional[str] = None,
         source_type: Optional[SourceType] = None,
         status: Optional[Status] = None,
     ) -> int:
         """计算符合条件的信息源总数"""
-        query = db.query(Source).filter(Source.user_id == user_id)
-        
-        # 应用搜索过滤
-        if search:
-            query = query.filter(Source.name.ilike(f"%{search}%"))
-        
-        # 按类型过滤
-        if source_type:
-            query = query.filter(Source.type == source_type)
-        
-        # 按状态过滤
-        if status:
-            query = query.filter(Source.status == status)
-        
-        return query.count()
+        return self._filtered_query(db, user_id, search, source_type, status).count()
 
-    def create(self, db: Session, obj_in: SourceCreate, user_id: str) -> Source:
+    async def count_async(
+        self, 
+        db: AsyncSession, 
+        user_id: int,
+        search: Optional[str] = None,
+        source_type: Optional[SourceType] = None,
+        status: Optional[Status] = None,
+    ) -> int:
+        """计算符合条件的信息源总数（异步会话）"""
+        query = select(func.count()).select_from(Source).where(
+            *self._filters(user_id, search, source_type, status)
+        )
+        return (await db.execute(query)).scalar_one()
+
+    def iter_by_user_id(self, db: Session, user_id: int, batch_size: int = 500) -> Iterator[Source]:
+        """按创建时间逐批读取用户的全部信息源（yield_per游标分批，内存占用与总数无关）"""
+        query = (
+            select(Source)
+            .where(Source.user_id == user_id)
+            .order_by(Source.created_at, Source.id)
+            .execution_options(yield_per=batch_size)
+        )
+        return iter(db.scalars(query))
+
+    def bulk_import(self, db: Session, items: List[SourceImport], user_id: int) -> Tuple[int, int]:
+        """在一个事务中批量写入一批信息源（executemany，不逐条刷新），ID已存在的跳过。
+        返回(导入数, 跳过数)；调度器会在下一轮为新信息源安排刷新"""
+        ids = [item.id for item in items if item.id]
+        seen = set(db.scalars(select(Source.id).where(Source.id.in_(ids)))) if ids else set()
+        now = datetime.now(timezone.utc)
+        rows = []
+        for item in items:
+            id = item.id or str(uuid.uuid4())
+            if id in seen:
+                continue
+            seen.add(id)
+            created_at = item.created_at or now
+            if created_at.tzinfo is not None:
+                created_at = created_at.astimezone(timezone.utc)
+            rows.append({
+                **item.model_dump(exclude={"id", "created_at"}),
+                "id": id,
+                "user_id": user_id,
+                "created_at": created_at,
+            })
+        if rows:
+            db.execute(insert(Source), rows)
+        db.commit()
+        return len(rows), len(items) - len(rows)
+
+    def create(self, db: Session, obj_in: SourceCreate, user_id: int) -> Source:
         """创建新信息源"""
         db_source = Source(
             name=obj_in.name,
@@ -99,11 +233,204 @@ class SourceRepository:
         if not db_source:
             return False
         
+        ItemFingerprintRepository().delete(db, ItemFingerprint.source_id == id)
         db.delete(db_source)
         db.commit()
         return True
 
 
+class SourceFetchRepository:
+    def get(self, db: Session, source_id: str) -> Optional[SourceFetch]:
+        """获取信息源最近一次抓取记录"""
+        return db.query(SourceFetch).filter(SourceFetch.source_id == source_id).first()
+
+    def get_many(self, db: Session, source_ids: List[str]) -> Dict[str, SourceFetch]:
+        """一次查询获取多个信息源的抓取记录，按信息源ID索引"""
+        if not source_ids:
+            return {}
+        rows = db.query(SourceFetch).filter(SourceFetch.source_id.in_(set(source_ids))).all()
+        return {row.source_id: row for row in rows}
+
+    def get_items(self, db: Session, source_ids: List[str]) -> List[Tuple[str, List[Dict[str, Any]], str]]:
+        """按给定顺序返回已抓取到内容的信息源的(信息源ID, 条目, 正文)"""
+        if not source_ids:
+            return []
+        rows = {
+            source_id: (source_id, items or [], content)
+            for source_id, items, content in db.query(SourceFetch.source_id, SourceFetch.items, SourceFetch.content)
+            .filter(SourceFetch.source_id.in_(set(source_ids)))
+            .all()
+        }
+        return [rows[source_id] for source_id in source_ids if source_id in rows and rows[source_id][2]]
+
+    def save_results(self, db: Session, results: List[Any]) -> List[SourceFetch]:
+        """在一个事务中写入一批抓取结果；304或失败时保留上次的内容"""
+        existing = self.get_many(db, [result.source_id for result in results])
+        now = datetime.now(timezone.utc)
+        rows = []
+        for result in results:
+            row = existing.get(result.source_id)
+            if row is None:
+                row = SourceFetch(source_id=result.source_id)
+                db.add(row)
+            row.url = result.url
+            row.status_code = result.status_code
+            row.duration_ms = result.duration_ms
+            row.error = result.error
+            row.fetched_at = now
+            if result.error is None and not result.not_modified:
+                if row.content_hash != result.content_hash:
+                    row.changed_at = now
+                row.etag = result.etag
+                row.last_modified = result.last_modified
+                row.content_type = result.content_type
+                row.content_hash = result.content_hash
+                row.bytes = result.bytes
+                row.truncated = result.truncated
+                row.items = result.items
+                row.content = result.content
+            elif result.not_modified:
+                # 304响应可能携带新的校验信息
+                row.etag = result.etag or row.etag
+                row.last_modified = result.last_modified or row.last_modified
+            rows.append(row)
+        db.commit()
+        return rows
+
+
+class ItemFingerprintRepository:
+    # 每条查询中IN列表的最大长度
+    LOOKUP_CHUNK_SIZE = 500
+
+    def get_by_keys(
+        self, db: Session, keys: List[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str], Tuple[int, bytes]]:
+        """按 (信息源ID, 条目标识) 查找已记录的条目 -> (指纹ID, 签名)"""
+        by_source: Dict[str, List[str]] = {}
+        for source_id, item_key in keys:
+            by_source.setdefault(source_id, []).append(item_key)
+        found = {}
+        for source_id, item_keys in by_source.items():
+            item_keys = sorted(set(item_keys))
+            for start in range(0, len(item_keys), self.LOOKUP_CHUNK_SIZE):
+                for item_key, id, signature in db.query(
+                    ItemFingerprint.item_key, ItemFingerprint.id, ItemFingerprint.signature
+                ).filter(
+                    ItemFingerprint.source_id == source_id,
+                    ItemFingerprint.item_key.in_(item_keys[start:start + self.LOOKUP_CHUNK_SIZE])
+                ):
+                    found[(source_id, item_key)] = (id, signature)
+        return found
+
+    def find_candidates(
+        self, db: Session, user_id: int, band_keys: Set[int], since: datetime
+    ) -> List[ItemFingerprint]:
+        """查找用户在since之后出现过、且至少有一个分段键在band_keys中的指纹
+
+        先在 item_fingerprint_bands 的主键索引上取出命中的指纹ID，再按ID读取指纹，
+        读取的行数只与分段碰撞数相关，而与指纹总数无关
+        """
+        keys = sorted(band_keys)
+        ids: Set[int] = set()
+        for start in range(0, len(keys), self.LOOKUP_CHUNK_SIZE):
+            ids.update(db.scalars(
+                select(ItemFingerprintBand.fingerprint_id).where(
+                    ItemFingerprintBand.user_id == user_id,
+                    ItemFingerprintBand.band_key.in_(keys[start:start + self.LOOKUP_CHUNK_SIZE])
+                )
+            ))
+        ids = sorted(ids)
+        candidates = []
+        for start in range(0, len(ids), self.LOOKUP_CHUNK_SIZE):
+            candidates.extend(
+                row for row in db.query(ItemFingerprint).filter(
+                    ItemFingerprint.id.in_(ids[start:start + self.LOOKUP_CHUNK_SIZE])
+                )
+                if as_utc(row.seen_at) >= since
+            )
+        return candidates
+
+    def save(
+        self,
+        db: Session,
+        user_id: int,
+        rows: List[Tuple[Dict[str, Any], List[int]]],
+        seen_ids: List[int],
+        now: datetime,
+        prune_before: datetime,
+    ) -> None:
+        """写入新指纹及其分段键、刷新再次出现的条目的时间并清理时间窗口外的指纹；不提交，随抓取结果一起提交"""
+        if rows:
+            ids = db.scalars(
+                insert(ItemFingerprint).returning(ItemFingerprint.id, sort_by_parameter_order=True),
+                [row for row, _ in rows]
+            ).all()
+            db.execute(insert(ItemFingerprintBand), [
+                {"user_id": user_id, "band_key": band_key, "fingerprint_id": id}
+                for id, (_, band_keys) in zip(ids, rows)
+                for band_key in set(band_keys)
+            ])
+        for start in range(0, len(seen_ids), self.LOOKUP_CHUNK_SIZE):
+            db.query(ItemFingerprint).filter(
+                ItemFingerprint.id.in_(seen_ids[start:start + self.LOOKUP_CHUNK_SIZE])
+            ).update({ItemFingerprint.seen_at: now}, synchronize_session=False)
+        self.delete(db, ItemFingerprint.user_id == user_id, ItemFingerprint.seen_at < prune_before)
+
+    def delete(self, db: Session, *criteria) -> None:
+        """删除满足条件的指纹及其分段键（SQLite默认不启用外键约束，不会级联删除）；不提交"""
+        ids = select(ItemFingerprint.id).where(*criteria)
+        db.query(ItemFingerprintBand).filter(
+            ItemFingerprintBand.fingerprint_id.in_(ids)
+        ).delete(synchronize_session=False)
+        db.query(ItemFingerprint).filter(*criteria).delete(synchronize_session=False)
+
+
+class SourceScheduleRepository:
+    def get_active(
+        self, db: Session
+    ) -> List[Tuple[str, UpdateFrequency, Priority, Optional[datetime], Optional[datetime]]]:
+        """一次查询获取所有启用的信息源及其下次、上次刷新时间（尚未调度或尚未刷新的为None）"""
+        return db.query(
+            Source.id, Source.update_frequency, Source.priority, SourceSchedule.next_run_at, SourceSchedule.last_run_at
+        ).outerjoin(
+            SourceSchedule, SourceSchedule.source_id == Source.id
+        ).filter(
+            Source.status == Status.ACTIVE
+        ).all()
+
+    def get_states(self, db: Session, source_ids: List[str]) -> Dict[str, Tuple[Status, UpdateFrequency, Priority]]:
+        """获取信息源当前的状态、刷新频率和优先级"""
+        if not source_ids:
+            return {}
+        rows = db.query(
+            Source.id, Source.status, Source.update_frequency, Source.priority
+        ).filter(Source.id.in_(set(source_ids))).all()
+        return {row[0]: tuple(row[1:]) for row in rows}
+
+    def save(
+        self,
+        db: Session,
+        next_runs: Dict[str, datetime],
+        last_run_at: Optional[datetime] = None,
+    ) -> None:
+        """在一个事务中写入下次刷新时间（不存在时创建）"""
+        if not next_runs:
+            return
+        existing = {
+            row.source_id: row
+            for row in db.query(SourceSchedule).filter(SourceSchedule.source_id.in_(set(next_runs)))
+        }
+        for source_id, next_run_at in next_runs.items():
+            row = existing.get(source_id)
+            if row is None:
+                row = SourceSchedule(source_id=source_id)
+                db.add(row)
+            row.next_run_at = next_run_at
+            if last_run_at is not None:
+                row.last_run_at = last_run_at
+        db.commit()
+
+
 # 保留旧的函数接口以保持兼容性
 def get_source_by_id(db: Session, source_id: str) -> Optional[Source]:
     """通过ID获取信息源"""
@@ -111,7 +438,7 @@ def get_source_by_id(db: Session, source_id: str) -> Optional[Source]:
 
 def get_sources(
     db: Session, 
-    user_id: str,
+    user_id: int,
     skip: int = 0, 
     limit: int = 100,
     search: Optional[str] = None,
@@ -123,9 +450,24 @@ def get_sources(
         db, user_id, skip, limit, search, source_type, status
     )
 
+def get_sources_page(
+    db: Session, 
+    user_id: int,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    search: Optional[str] = None,
+    source_type: Optional[SourceType] = None,
+    status: Optional[Status] = None,
+) -> Tuple[List[Source], Optional[str]]:
+    """分页获取用户的信息源，返回本页数据和下一页游标"""
+    return SourceRepository().get_page(
+        db, user_id, limit, cursor, skip, search, source_type, status
+    )
+
 def count_sources(
     db: Session, 
-    user_id: str,
+    user_id: int,
     search: Optional[str] = None,
     source_type: Optional[SourceType] = None,
     status: Optional[Status] = None,
@@ -135,11 +477,11 @@ def count_sources(
         db, user_id, search, source_type, status
     )
 
-def create_source(db: Session, source_data: SourceCreate, user_id: str) -> Source:
+def create_source(db: Session, source_data: SourceCreate, user_id: int) -> Source:
     """创建新信息源"""
     return SourceRepository().create(db, source_data, user_id)
 
-def update_source(db: Session, source_id: str, source_data: SourceUpdate, user_id: str) -> Optional[Source]:
+def update_source(db: Session, source_id: str, source_data: SourceUpdate, user_id: int) -> Optional[Source]:
     """更新现有信息源"""
     repo = SourceRepository()
     db_source = repo.get(db, id=source_id)
@@ -149,7 +491,7 @@ def update_source(db: Session, source_id: str, source_data: SourceUpdate, user_i
     
     return repo.update(db, db_source, source_data)
 
-def delete_source(db: Session, source_id: str, user_id: str) -> bool:
+def delete_source(db: Session, source_id: str, user_id: int) -> bool:
     """删除信息源"""
     repo = SourceRepository()
     db_source = repo.get(db, id=source_id)
@@ -1,86 +1,375 @@
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, asc, func
+import re
+import uuid
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Dict, Any, Sequence, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, Query, load_only, selectinload
+from sqlalchemy import Select, delete, desc, asc, func, insert, literal_column, select, Table
+
+from app.config import settings
+from app.db import search as fts
+from app.db import vectors
+from app.db.pagination import InvalidCursor, apply_keyset, decode_cursor, split_keyset_page
 
 from app.db.repositories.base import BaseRepository
-from app.db.models.summary import Summary, SummaryTemplate
-from app.schemas.summary import SummaryCreate, SummaryUpdate, SummaryTemplateCreate, SummaryTemplateUpdate
+from app.db.models.source import Source
+from app.db.models.summary import Summary, SummaryTag, SummaryTemplate, SummaryVector, summary_source_association
+from app.schemas.summary import (
+    SummaryCreate, SummaryImport, SummaryUpdate, SummaryTemplateCreate, SummaryTemplateUpdate
+)
+
+
+# 生成摘录时去掉的Markdown标记：链接/图片保留文字，列表符号和强调、标题、引用等符号删除
+_MARKDOWN_LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_MARKDOWN_MARKUP = re.compile(r"^\s*(?:[-+*]|\d+\.)\s+|[#>*`~]+", re.M)
+
+
+def build_excerpt(content: Optional[str], length: int = settings.SUMMARY_EXCERPT_LENGTH) -> Optional[str]:
+    """正文 -> 列表展示的纯文本摘录，合并空白，超出长度时截断"""
+    if content is None:
+        return None
+    text = " ".join(_MARKDOWN_MARKUP.sub("", _MARKDOWN_LINK.sub(r"\1", content)).split())
+    return text if len(text) <= length else text[:length].rstrip() + "…"
+
+
+def apply_fts_match(query: Query, fts_table: Table, source_table: str, match_query: str) -> Query:
+    """通过rowid关联FTS5索引表并应用MATCH条件"""
+    return query.join(
+        fts_table, fts_table.c.rowid == literal_column(f"{source_table}.rowid")
+    ).filter(literal_column(fts_table.name).op("MATCH")(match_query))
+
+
+def snippet_column(fts_table_name: str) -> Any:
+    """FTS5高亮片段列（命中词前后为标记字符，由attach_snippets转义后替换为<mark>标签）"""
+    return func.snippet(literal_column(fts_table_name), -1, fts.SNIPPET_START, fts.SNIPPET_END, "…", 24)
+
+
+def attach_snippets(rows: List[Any]) -> List[Any]:
+    """把 (实体, 片段) 行转换为带snippet属性的实体列表"""
+    items = []
+    for item, item_snippet in rows:
+        item.snippet = fts.format_snippet(item_snippet)
+        items.append(item)
+    return items
+
+
+def fetch_with_snippets(query: Query, fts_table_name: str, use_fts: bool) -> List[Any]:
+    """执行查询；全文搜索时为每条结果附加高亮片段"""
+    if not use_fts:
+        return query.all()
+    return attach_snippets(query.add_columns(snippet_column(fts_table_name)).all())
 
 
 class SummaryRepository(BaseRepository[Summary, SummaryCreate, SummaryUpdate]):
+    # 支持游标分页的排序字段（可为空的title按空字符串排序）
+    KEYSET_SORT_FIELDS = ("created_at", "title")
+    
     def __init__(self):
         super().__init__(Summary)
     
-    def get_by_user_id(self, db: Session, *, user_id: str) -> List[Summary]:
+    @staticmethod
+    def _with_sources(query: Query) -> Query:
+        """批量预加载关联信息源的ID，避免逐条懒加载"""
+        return query.options(selectinload(Summary.sources).load_only(Source.id))
+    
+    def get(self, db: Session, id: Any) -> Optional[Summary]:
+        """根据ID获取摘要（同时加载关联信息源）"""
+        return self._with_sources(db.query(self.model)).filter(self.model.id == id).first()
+    
+    async def get_async(self, db: AsyncSession, id: Any) -> Optional[Summary]:
+        """根据ID获取摘要（异步会话）"""
+        result = await db.execute(self._with_sources(select(self.model)).where(self.model.id == id))
+        return result.scalars().first()
+    
+    def get_by_user_id(self, db: Session, *, user_id: int) -> List[Summary]:
         """获取用户的所有摘要"""
-        return db.query(self.model).filter(self.model.user_id == user_id).all()
+        return self._with_sources(db.query(self.model)).filter(self.model.user_id == user_id).all()
     
-    def get_multi_paginated(
+    def iter_by_user_id(self, db: Session, *, user_id: int, batch_size: int = 500) -> Iterator[Summary]:
+        """按创建时间逐批读取用户的全部摘要（yield_per游标分批，内存占用与总数无关）"""
+        query = (
+            self._with_sources(select(self.model))
+            .where(self.model.user_id == user_id)
+            .order_by(self.model.created_at, self.model.id)
+            .execution_options(yield_per=batch_size)
+        )
+        return iter(db.scalars(query))
+    
+    def bulk_import(self, db: Session, *, user_id: int, items: List[SummaryImport]) -> Tuple[int, int]:
+        """在一个事务中批量写入一批摘要（executemany，不逐条刷新），同时写入标签表、
+        信息源关联、全文索引和向量；ID已存在的摘要跳过。返回(导入数, 跳过数)"""
+        ids = [item.id for item in items if item.id]
+        seen = set(db.scalars(select(self.model.id).where(self.model.id.in_(ids)))) if ids else set()
+        source_ids = {source_id for item in items for source_id in item.source_ids}
+        owned = set(db.scalars(
+            select(Source.id).where(Source.id.in_(source_ids), Source.user_id == user_id)
+        )) if source_ids else set()
+        now = datetime.now(timezone.utc)
+        rows, tag_rows, link_rows = [], [], []
+        for item in items:
+            id = item.id or str(uuid.uuid4())
+            if id in seen:
+                continue
+            seen.add(id)
+            created_at = item.created_at or now
+            if created_at.tzinfo is not None:
+                created_at = created_at.astimezone(timezone.utc)
+            tags = list(dict.fromkeys(tag for tag in item.tags if tag))
+            rows.append({
+                "id": id,
+                "title": item.title,
+                "content": item.content,
+                "excerpt": build_excerpt(item.content),
+                "key_points": item.key_points,
+                "tags": tags,
+                "is_archived": item.is_archived,
+                "is_important": item.is_important,
+                "user_id": user_id,
+                "created_at": created_at,
+            })
+            tag_rows.extend(
+                {"summary_id": id, "tag": tag, "user_id": user_id, "created_at": created_at} for tag in tags
+            )
+            link_rows.extend(
+                {"summary_id": id, "source_id": source_id}
+                for source_id in dict.fromkeys(item.source_ids) if source_id in owned
+            )
+        if rows:
+            db.execute(insert(self.model), rows)
+            if tag_rows:
+                db.execute(insert(SummaryTag), tag_rows)
+            if link_rows:
+                db.execute(insert(summary_source_association), link_rows)
+            fts.index_rows(db.connection(), self.model, [row["id"] for row in rows])
+            vectors.index_rows(db.connection(), [row["id"] for row in rows])
+        db.commit()
+        return len(rows), len(items) - len(rows)
+    
+    def _before_commit(self, db: Session, db_obj: Summary) -> None:
+        """重新生成正文摘录，并同步规范化标签表"""
+        db_obj.excerpt = build_excerpt(db_obj.content)
+        tags = list(dict.fromkeys(tag for tag in (db_obj.tags or []) if tag))
+        current = {link.tag for link in db_obj.tag_links}
+        if current == set(tags) and all(link.user_id == db_obj.user_id for link in db_obj.tag_links):
+            return
+        # 刷新以取得服务端生成的创建时间
+        db.flush()
+        db_obj.tag_links = [
+            SummaryTag(tag=tag, user_id=db_obj.user_id, created_at=db_obj.created_at)
+            for tag in tags
+        ]
+    
+    def count_tags(self, db: Session, *, user_id: int, limit: int = 100) -> List[Dict[str, Any]]:
+        """统计用户各标签下的摘要数量（只读取标签表）"""
+        count = func.count().label("count")
+        rows = (
+            db.query(SummaryTag.tag, count)
+            .filter(SummaryTag.user_id == user_id)
+            .group_by(SummaryTag.tag)
+            .order_by(desc(count), asc(SummaryTag.tag))
+            .limit(limit)
+            .all()
+        )
+        return [{"tag": tag, "count": tag_count} for tag, tag_count in rows]
+    
+    def backfill_tags(self, db: Session, batch_size: int = 500) -> int:
+        """标签表为空时从JSON列一次性迁移已有摘要的标签"""
+        if db.query(SummaryTag.summary_id).first() is not None:
+            return 0
+        ids = [id for id, tags in db.query(self.model.id, self.model.tags) if tags]
+        for start in range(0, len(ids), batch_size):
+            batch = db.query(self.model).filter(self.model.id.in_(ids[start:start + batch_size]))
+            for summary in batch.all():
+                self._before_commit(db, summary)
+            db.commit()
+        return len(ids)
+    
+    def backfill_vectors(self, db: Session, batch_size: int = 500, rebuild: bool = False) -> int:
+        """为还没有向量行的摘要计算向量，rebuild为True时重新计算全部摘要（如修改向量维度后）。
+        返回处理的摘要数"""
+        if rebuild:
+            db.execute(delete(SummaryVector))
+            db.commit()
+        ids = list(db.scalars(
+            select(self.model.id)
+            .outerjoin(SummaryVector, SummaryVector.summary_id == self.model.id)
+            .where(SummaryVector.id.is_(None), self.model.user_id.isnot(None))
+        ))
+        for start in range(0, len(ids), batch_size):
+            vectors.index_rows(db.connection(), ids[start:start + batch_size])
+            db.commit()
+        return len(ids)
+    
+    def get_list_items(
+        self, db: Session, *, ids: List[str], user_id: int, fields: Sequence[str]
+    ) -> List[Dict[str, Any]]:
+        """按给定顺序返回用户的摘要，只加载并返回fields中的字段（字段含义同列表接口）"""
+        if not ids:
+            return []
+        columns = {"id", *(field for field in fields if field in self.columns)}
+        query = (
+            select(self.model)
+            .where(self.model.id.in_(ids), self.model.user_id == user_id)
+            .options(load_only(*(getattr(self.model, column) for column in columns)))
+        )
+        if "source_ids" in fields:
+            query = self._with_sources(query)
+        rows = {item.id: item for item in db.scalars(query)}
+        return [
+            {field: getattr(rows[id], field, None) for field in fields}
+            for id in ids if id in rows
+        ]
+    
+    def get_multi_paginated(self, db: Session, **kwargs: Any) -> Dict[str, Any]:
+        """
+        分页获取摘要，支持排序、过滤和搜索
+        
+        传入cursor时按 (sort_field, id) 键集分页，排序方式以游标为准；
+        include_total为False时跳过总数统计。
+        传入fields时只加载这些字段对应的列，items为只含这些字段的字典。参数见_list_statements。
+        """
+        statement, count_statement, plan = self._list_statements(**kwargs)
+        total = db.execute(count_statement).scalar_one() if count_statement is not None else None
+        return self._page_result(db.execute(statement), total, plan)
+    
+    async def get_multi_paginated_async(self, db: AsyncSession, **kwargs: Any) -> Dict[str, Any]:
+        """分页获取摘要（异步会话），参数和返回值与get_multi_paginated相同"""
+        statement, count_statement, plan = self._list_statements(**kwargs)
+        total = (await db.execute(count_statement)).scalar_one() if count_statement is not None else None
+        return self._page_result(await db.execute(statement), total, plan)
+    
+    def _list_statements(
         self, 
-        db: Session, 
         *, 
-        user_id: str,
+        user_id: int,
         skip: int = 0, 
         limit: int = 20,
-        sort_field: str = "created_at",
+        sort_field: Optional[str] = "created_at",
         sort_order: str = "desc",
         tag: Optional[str] = None,
         search: Optional[str] = None,
         is_archived: Optional[bool] = None,
         is_important: Optional[bool] = None,
-        source_id: Optional[str] = None
-    ) -> Dict[str, Any]:
-        """
-        分页获取摘要，支持排序、过滤和搜索
-        """
+        source_id: Optional[str] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        fields: Optional[Sequence[str]] = None
+    ) -> Tuple[Select, Optional[Select], Dict[str, Any]]:
+        """构建分页查询和总数查询（同步和异步会话共用），返回查询语句及分页信息"""
         # 基础查询
-        query = db.query(self.model).filter(self.model.user_id == user_id)
+        query = select(self.model).where(self.model.user_id == user_id)
         
         # 应用过滤条件
         if tag:
-            query = query.filter(self.model.tags.contains([tag]))
+            # 通过规范化标签表过滤，可使用 (user_id, tag, created_at) 索引
+            query = query.where(self.model.id.in_(
+                select(SummaryTag.summary_id).where(
+                    SummaryTag.user_id == user_id,
+                    SummaryTag.tag == tag
+                )
+            ))
         
-        if search:
+        match_query = fts.build_match_query(search) if search else None
+        use_fts = match_query is not None and fts.is_enabled()
+        if use_fts:
+            query = apply_fts_match(query, fts.summaries_fts, "summaries", match_query)
+        elif search:
             search_term = f"%{search}%"
-            query = query.filter(
+            query = query.where(
                 (self.model.title.ilike(search_term)) | 
                 (self.model.content.ilike(search_term))
             )
         
         if is_archived is not None:
-            query = query.filter(self.model.is_archived == is_archived)
+            query = query.where(self.model.is_archived == is_archived)
             
         if is_important is not None:
-            query = query.filter(self.model.is_important == is_important)
+            query = query.where(self.model.is_important == is_important)
             
         if source_id:
-            query = query.filter(
+            query = query.where(
                 self.model.sources.any(id=source_id)
             )
         
-        # 计算总数
-        total = query.count()
+        # 总数查询（可选）
+        count_query = (
+            select(func.count()).select_from(query.subquery()) if include_total else None
+        )
         
-        # 应用排序
+        decoded = decode_cursor(cursor, self.KEYSET_SORT_FIELDS) if cursor else None
+        if decoded:
+            sort_field, sort_order = decoded["f"], decoded["o"]
+        
+        # 应用排序：全文搜索默认按相关度（bm25，标题权重更高）
         order_func = desc if sort_order.lower() == "desc" else asc
-        if hasattr(self.model, sort_field):
-            query = query.order_by(order_func(getattr(self.model, sort_field)))
+        keyset_field = None
+        if use_fts and sort_field in (None, "relevance"):
+            if decoded:
+                raise InvalidCursor("相关度排序不支持游标分页")
+            query = query.order_by(func.bm25(literal_column("summaries_fts"), 2.0, 1.0))
         else:
-            query = query.order_by(order_func(self.model.created_at))
+            if not (sort_field and hasattr(self.model, sort_field)):
+                sort_field = "created_at"
+            if sort_field in self.KEYSET_SORT_FIELDS:
+                keyset_field = sort_field
+                query = apply_keyset(query, self.model, sort_field, sort_order, decoded)
+            elif decoded:
+                raise InvalidCursor("该排序字段不支持游标分页")
+            else:
+                query = query.order_by(order_func(getattr(self.model, sort_field)))
         
-        # 应用分页
-        items = query.offset(skip).limit(limit).all()
+        # 应用分页（多取一条用于生成下一页游标）
+        if decoded is None:
+            query = query.offset(skip)
+        query = query.limit(limit + 1)
+        if fields is None:
+            query = self._with_sources(query)
+        else:
+            # 只加载需要的列（正文等未选择的列不读取），键集分页还需要排序字段
+            columns = {"id", *(field for field in fields if field in self.columns)}
+            if keyset_field:
+                columns.add(keyset_field)
+            query = query.options(load_only(*(getattr(self.model, column) for column in columns)))
+            if "source_ids" in fields:
+                query = self._with_sources(query)
+        if use_fts:
+            query = query.add_columns(snippet_column("summaries_fts"))
+        
+        plan = {
+            "use_fts": use_fts,
+            "keyset_field": keyset_field,
+            "sort_order": sort_order,
+            "skip": skip,
+            "limit": limit,
+            "cursor": decoded,
+            "fields": fields,
+        }
+        return query, count_query, plan
+    
+    @staticmethod
+    def _page_result(result: Any, total: Optional[int], plan: Dict[str, Any]) -> Dict[str, Any]:
+        """把查询结果整理为分页响应"""
+        rows = attach_snippets(result.all()) if plan["use_fts"] else list(result.scalars().all())
+        limit, skip, keyset_field = plan["limit"], plan["skip"], plan["keyset_field"]
+        if keyset_field:
+            items, next_cursor = split_keyset_page(rows, keyset_field, plan["sort_order"], limit)
+        else:
+            items, next_cursor = rows[:limit], None
+        if plan["fields"] is not None:
+            # 未加载的列在异步会话中无法懒加载，只读取选择的字段（snippet仅全文搜索时存在）
+            items = [{field: getattr(item, field, None) for field in plan["fields"]} for item in items]
         
         return {
             "items": items,
             "total": total,
-            "page": skip // limit + 1,
+            "page": skip // limit + 1 if plan["cursor"] is None else None,
             "size": limit,
             "page_size": limit,  # 兼容字段
-            "total_pages": (total + limit - 1) // limit  # 兼容字段
+            "total_pages": (total + limit - 1) // limit if total is not None else None,  # 兼容字段
+            "next_cursor": next_cursor
         }
     
-    def toggle_archived(self, db: Session, *, summary_id: str, user_id: str) -> Optional[Summary]:
+    def toggle_archived(self, db: Session, *, summary_id: str, user_id: int) -> Optional[Summary]:
         """切换摘要的归档状态"""
         summary = db.query(self.model).filter(
             self.model.id == summary_id,
@@ -95,7 +384,7 @@ class SummaryRepository(BaseRepository[Summary, SummaryCreate, SummaryUpdate]):
         
         return summary
     
-    def toggle_important(self, db: Session, *, summary_id: str, user_id: str) -> Optional[Summary]:
+    def toggle_important(self, db: Session, *, summary_id: str, user_id: int) -> Optional[Summary]:
         """切换摘要的重要标记"""
         summary = db.query(self.model).filter(
             self.model.id == summary_id,
@@ -115,7 +404,7 @@ class SummaryTemplateRepository(BaseRepository[SummaryTemplate, SummaryTemplateC
     def __init__(self):
         super().__init__(SummaryTemplate)
     
-    def get_by_user_id(self, db: Session, *, user_id: str) -> List[SummaryTemplate]:
+    def get_by_user_id(self, db: Session, *, user_id: int) -> List[SummaryTemplate]:
         """获取用户的所有摘要模板"""
         return db.query(self.model).filter(self.model.user_id == user_id).all()
     
@@ -123,10 +412,10 @@ class SummaryTemplateRepository(BaseRepository[SummaryTemplate, SummaryTemplateC
         self, 
         db: Session, 
         *, 
-        user_id: str,
+        user_id: int,
         skip: int = 0, 
         limit: int = 20,
-        sort_field: str = "created_at",
+        sort_field: Optional[str] = "created_at",
         sort_order: str = "desc",
         search: Optional[str] = None
     ) -> Dict[str, Any]:
@@ -137,7 +426,11 @@ class SummaryTemplateRepository(BaseRepository[SummaryTemplate, SummaryTemplateC
         query = db.query(self.model).filter(self.model.user_id == user_id)
         
         # 应用搜索
-        if search:
+        match_query = fts.build_match_query(search) if search else None
+        use_fts = match_query is not None and fts.is_enabled()
+        if use_fts:
+            query = apply_fts_match(query, fts.summary_templates_fts, "summary_templates", match_query)
+        elif search:
             search_term = f"%{search}%"
             query = query.filter(
                 (self.model.name.ilike(search_term)) | 
@@ -149,13 +442,15 @@ class SummaryTemplateRepository(BaseRepository[SummaryTemplate, SummaryTemplateC
         
         # 应用排序
         order_func = desc if sort_order.lower() == "desc" else asc
-        if hasattr(self.model, sort_field):
+        if use_fts and sort_field in (None, "relevance"):
+            query = query.order_by(func.bm25(literal_column("summary_templates_fts"), 2.0, 1.0))
+        elif sort_field and hasattr(self.model, sort_field):
             query = query.order_by(order_func(getattr(self.model, sort_field)))
         else:
             query = query.order_by(order_func(self.model.created_at))
         
         # 应用分页
-        items = query.offset(skip).limit(limit).all()
+        items = fetch_with_snippets(query.offset(skip).limit(limit), "summary_templates_fts", use_fts)
         
         return {
             "items": items,
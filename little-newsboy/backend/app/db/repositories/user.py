@@ -1,8 +1,9 @@
 from typing import Optional
 
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash, verify_and_update_password, verify_password
 from app.db.models.user import User
 from app.schemas.user import UserCreate
 
@@ -18,9 +19,10 @@ def get_user_by_username(db: Session, username: str) -> Optional[User]:
     """通过用户名获取用户"""
     return db.query(User).filter(User.username == username).first()
 
-def create_user(db: Session, user_data: UserCreate) -> User:
-    """创建新用户"""
-    hashed_password = get_password_hash(user_data.password)
+def create_user(db: Session, user_data: UserCreate, hashed_password: Optional[str] = None) -> User:
+    """创建新用户（可传入预先计算好的密码哈希）"""
+    if hashed_password is None:
+        hashed_password = get_password_hash(user_data.password)
     db_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -44,4 +46,28 @@ def authenticate_user(db: Session, username_or_email: str, password: str) -> Opt
     if not user or not verify_password(password, user.hashed_password):
         return None
     
-    return user 
\ No newline at end of file
+    return user
+
+def get_user_by_username_or_email(db: Session, username_or_email: str) -> Optional[User]:
+    """通过用户名或邮箱获取用户"""
+    return get_user_by_username(db, username_or_email) or get_user_by_email(db, username_or_email)
+
+def update_password_hash(db: Session, user: User, hashed_password: str) -> None:
+    """保存重新计算的密码哈希"""
+    user.hashed_password = hashed_password
+    db.commit()
+
+async def authenticate_user_async(db: Session, username_or_email: str, password: str) -> Optional[User]:
+    """验证用户身份：数据库访问在线程池中执行，密码校验在专用哈希线程池中执行；
+    哈希的成本因子与当前配置不一致时顺带更新"""
+    user = await run_in_threadpool(get_user_by_username_or_email, db, username_or_email)
+    if not user:
+        return None
+    
+    valid, new_hash = await verify_and_update_password(password, user.hashed_password)
+    if not valid:
+        return None
+    
+    if new_hash:
+        await run_in_threadpool(update_password_hash, db, user, new_hash)
+    return user
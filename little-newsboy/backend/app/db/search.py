@@ -0,0 +1,222 @@
+# SQLite FTS5全文索引
+# 摘要和摘要模板各对应一张FTS5虚拟表，rowid与主表rowid一致，通过ORM事件在创建、更新和删除时同步。
+# 中日韩文字按单字切分后写入索引，查询时按短语匹配，从而支持中文子串检索。
+import html
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Column, Integer, MetaData, Table, bindparam, event, inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.models.summary import Summary, SummaryTemplate
+
+# 中日韩字符
+_CJK = r"\u3000-\u303f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef"
+# CJK字符与相邻非空白字符之间的边界
+_CJK_BOUNDARY_PATTERN = re.compile(rf"(?<=[{_CJK}])(?=\S)|(?<=\S)(?=[{_CJK}])")
+# snippet()在命中词前后插入的标记：用正文中不会出现的控制字符，转义正文后再替换为<mark>标签
+SNIPPET_START = "\x02"
+SNIPPET_END = "\x03"
+# 索引文本中相邻CJK字符之间插入的空格（考虑高亮标记）
+_CJK_GAP_PATTERN = re.compile(
+    rf"(?<=[{_CJK}])[{SNIPPET_END}]? (?=[{SNIPPET_START}]?[{_CJK}])"
+)
+
+# 各模型对应的索引表及索引列
+FTS_CONFIG: Dict[Any, Dict[str, Any]] = {
+    Summary: {"table": "summaries_fts", "source": "summaries", "columns": ["title", "content"]},
+    SummaryTemplate: {"table": "summary_templates_fts", "source": "summary_templates", "columns": ["name", "description"]},
+}
+
+# 供查询拼接使用的轻量表定义（不参与create_all）
+_fts_metadata = MetaData()
+summaries_fts = Table(
+    "summaries_fts", _fts_metadata,
+    Column("rowid", Integer), Column("title"), Column("content"),
+)
+summary_templates_fts = Table(
+    "summary_templates_fts", _fts_metadata,
+    Column("rowid", Integer), Column("name"), Column("description"),
+)
+
+# 当前数据库是否启用了FTS5
+_enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def segment(value: Optional[str]) -> str:
+    """将CJK字符拆分为单字token，其余文本保持原样（去掉与高亮标记相同的控制字符）"""
+    if not value:
+        return ""
+    return _CJK_BOUNDARY_PATTERN.sub(" ", value.replace(SNIPPET_START, "").replace(SNIPPET_END, ""))
+
+
+def desegment(value: Optional[str]) -> Optional[str]:
+    """去掉索引文本中CJK字符之间的空格，用于展示片段"""
+    if value is None:
+        return None
+    return _CJK_GAP_PATTERN.sub(lambda match: match.group().rstrip(" "), value).strip()
+
+
+def format_snippet(value: Optional[str]) -> Optional[str]:
+    """snippet()的结果 -> 可直接插入HTML的片段：正文转义，只保留命中词的<mark>标签"""
+    if value is None:
+        return None
+    escaped = html.escape(desegment(value))
+    return escaped.replace(SNIPPET_START, "<mark>").replace(SNIPPET_END, "</mark>")
+
+
+def build_match_query(search: str) -> Optional[str]:
+    """把用户输入转换为FTS5查询：每个词作为一个短语，词之间为AND"""
+    phrases = []
+    for term in search.split():
+        tokens = segment(term).split()
+        if tokens:
+            phrase = " ".join(tokens).replace('"', '""')
+            phrases.append(f'"{phrase}"')
+    return " ".join(phrases) or None
+
+
+def init_fts(engine: Engine) -> bool:
+    """创建FTS5虚拟表（仅SQLite），新建时回填已有数据"""
+    global _enabled
+    if engine.dialect.name != "sqlite":
+        _enabled = False
+        return False
+
+    with engine.begin() as conn:
+        try:
+            conn.execute(text("CREATE VIRTUAL TABLE IF NOT EXISTS temp.__fts5_probe USING fts5(x)"))
+            conn.execute(text("DROP TABLE IF EXISTS temp.__fts5_probe"))
+        except Exception:
+            # SQLite未编译FTS5时退回LIKE搜索
+            print("SQLite不支持FTS5，全文搜索使用LIKE")
+            _enabled = False
+            return False
+
+        for model, config in FTS_CONFIG.items():
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": config["table"]},
+            ).first()
+            if exists:
+                continue
+            columns = ", ".join(config["columns"])
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE {config['table']} USING fts5({columns}, tokenize = 'unicode61')"
+            ))
+            _rebuild(conn, config)
+
+    _enabled = True
+    return True
+
+
+def rebuild_fts(engine: Engine) -> None:
+    """全量重建索引。主表没有INTEGER主键，VACUUM可能改变rowid，执行VACUUM后需调用"""
+    if not _enabled:
+        return
+    with engine.begin() as conn:
+        for config in FTS_CONFIG.values():
+            conn.execute(text(f"DELETE FROM {config['table']}"))
+            _rebuild(conn, config)
+
+
+def _rebuild(conn: Connection, config: Dict[str, Any]) -> None:
+    """从主表回填索引"""
+    columns = config["columns"]
+    rows = conn.execute(
+        text(f"SELECT rowid, {', '.join(columns)} FROM {config['source']}")
+    ).fetchall()
+    if not rows:
+        return
+    placeholders = ", ".join(f":{column}" for column in columns)
+    conn.execute(
+        text(f"INSERT INTO {config['table']} (rowid, {', '.join(columns)}) VALUES (:rowid, {placeholders})"),
+        [
+            {"rowid": row[0], **{column: segment(row[i + 1]) for i, column in enumerate(columns)}}
+            for row in rows
+        ],
+    )
+
+
+def index_rows(conn: Connection, model: Any, ids: List[str], batch_size: int = 500) -> None:
+    """重建指定行的索引（批量写入等绕过ORM事件的场景使用），每批ID一次查询、批量写入"""
+    if not _enabled or not ids:
+        return
+    config = FTS_CONFIG[model]
+    columns = config["columns"]
+    select_rows = text(
+        f"SELECT rowid, {', '.join(columns)} FROM {config['source']} WHERE id IN :ids"
+    ).bindparams(bindparam("ids", expanding=True))
+    placeholders = ", ".join(f":{column}" for column in columns)
+    for start in range(0, len(ids), batch_size):
+        rows = conn.execute(select_rows, {"ids": list(ids[start:start + batch_size])}).all()
+        if not rows:
+            continue
+        conn.execute(
+            text(f"DELETE FROM {config['table']} WHERE rowid = :rowid"),
+            [{"rowid": row[0]} for row in rows],
+        )
+        conn.execute(
+            text(f"INSERT INTO {config['table']} (rowid, {', '.join(columns)}) VALUES (:rowid, {placeholders})"),
+            [
+                {"rowid": row[0], **{column: segment(value) for column, value in zip(columns, row[1:])}}
+                for row in rows
+            ],
+        )
+
+
+def _insert_row(conn: Connection, config: Dict[str, Any], rowid: int, values: Dict[str, Any]) -> None:
+    columns = config["columns"]
+    placeholders = ", ".join(f":{column}" for column in columns)
+    conn.execute(
+        text(f"INSERT INTO {config['table']} (rowid, {', '.join(columns)}) VALUES (:rowid, {placeholders})"),
+        {"rowid": rowid, **{column: segment(values.get(column)) for column in columns}},
+    )
+
+
+def _delete_row(conn: Connection, config: Dict[str, Any], id: str) -> None:
+    conn.execute(
+        text(
+            f"DELETE FROM {config['table']} WHERE rowid = "
+            f"(SELECT rowid FROM {config['source']} WHERE id = :id)"
+        ),
+        {"id": id},
+    )
+
+
+def _sync_insert(mapper, connection: Connection, target) -> None:
+    if not _enabled:
+        return
+    config = FTS_CONFIG[mapper.class_]
+    rowid = connection.execute(
+        text(f"SELECT rowid FROM {config['source']} WHERE id = :id"), {"id": target.id}
+    ).scalar()
+    _insert_row(connection, config, rowid, {column: getattr(target, column) for column in config["columns"]})
+
+
+def _sync_update(mapper, connection: Connection, target) -> None:
+    if not _enabled:
+        return
+    config = FTS_CONFIG[mapper.class_]
+    # 仅在索引列变化时重建（如归档、标记重要不影响索引）
+    state = inspect(target)
+    if not any(state.attrs[column].history.has_changes() for column in config["columns"]):
+        return
+    _delete_row(connection, config, target.id)
+    _sync_insert(mapper, connection, target)
+
+
+def _sync_delete(mapper, connection: Connection, target) -> None:
+    if not _enabled:
+        return
+    _delete_row(connection, FTS_CONFIG[mapper.class_], target.id)
+
+
+for _model in FTS_CONFIG:
+    event.listen(_model, "after_insert", _sync_insert)
+    event.listen(_model, "after_update", _sync_update)
+    event.listen(_model, "before_delete", _sync_delete)
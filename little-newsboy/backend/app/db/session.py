@@ -1,17 +1,108 @@
-from sqlalchemy import create_engine
+from typing import List
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import settings
 
+# SQLite生产配置：WAL模式下读写互不阻塞，只读会话使用独立连接池
+SQLITE_PRODUCTION = (
+    make_url(settings.DATABASE_URL).get_backend_name() == "sqlite"
+    and settings.SQLITE_PROFILE.lower() == "production"
+)
+
+
+def sqlite_pragmas(read_only: bool = False) -> List[str]:
+    """生产配置下每个新连接执行的PRAGMA"""
+    pragmas = [
+        "PRAGMA journal_mode=WAL",
+        # WAL模式下NORMAL只在检查点时同步，断电可能丢失最近的事务但不会损坏数据库
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+        # 负数表示以KiB为单位
+        f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}",
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    return pragmas
+
+
+def apply_sqlite_profile(engine: Engine, read_only: bool = False) -> None:
+    """为引擎的新连接设置PRAGMA（未启用生产配置时不做任何事）"""
+    if not SQLITE_PRODUCTION:
+        return
+    pragmas = sqlite_pragmas(read_only)
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
 # 创建SQLAlchemy引擎
 engine = create_engine(
     settings.DATABASE_URL, connect_args={"check_same_thread": False}
 )
+apply_sqlite_profile(engine)
 
 # 创建数据库会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 只读引擎：生产配置下使用独立连接池，读请求不会排在写请求之后等待连接
+if SQLITE_PRODUCTION:
+    read_engine = create_engine(
+        settings.DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        pool_size=settings.DB_READ_POOL_SIZE,
+        max_overflow=settings.DB_READ_MAX_OVERFLOW,
+    )
+    apply_sqlite_profile(read_engine, read_only=True)
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+else:
+    read_engine = engine
+    ReadSessionLocal = SessionLocal
+
+# 同步驱动对应的异步驱动
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def get_async_url(url: str) -> str:
+    """把同步数据库地址转换为异步驱动地址（已指定驱动时保持不变）"""
+    parsed = make_url(url)
+    if "+" in parsed.drivername:
+        return url
+    drivername = _ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+# 异步引擎：读多的接口使用，等待数据库时不占用线程池
+async_engine = create_async_engine(
+    get_async_url(settings.DATABASE_URL),
+    # aiosqlite默认不使用连接池，这里显式启用以复用连接
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=settings.DB_ASYNC_POOL_SIZE,
+    max_overflow=settings.DB_ASYNC_MAX_OVERFLOW,
+    pool_timeout=settings.DB_ASYNC_POOL_TIMEOUT,
+)
+apply_sqlite_profile(async_engine.sync_engine)
+
+# 异步会话工厂；提交后不过期对象，便于会话关闭后序列化响应
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 # 创建Base类，用于创建模型类
 Base = declarative_base()
 
@@ -21,4 +112,17 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+# 只读数据库依赖项，会话不能写入（生产配置下由PRAGMA query_only保证）
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# 异步数据库依赖项
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,109 @@
+# SQL语句计数工具，用于检查接口是否存在N+1查询；以及记录语句耗时的运行指标
+import re
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, Iterator, List, Optional, Union
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.services.metrics import db_statement_duration_seconds, db_statement_errors_total
+
+# 指标中的语句类型，其余（PRAGMA、WITH等）记为other
+_OPERATIONS = {"select", "insert", "update", "delete"}
+_FIRST_WORD = re.compile(r"\s*(\w+)")
+
+
+class StatementCounter:
+    """记录期间执行的SQL语句"""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_statements(*engines: Union[Engine, AsyncEngine]) -> Iterator[StatementCounter]:
+    """统计代码块内在这些引擎上执行的SQL语句数（异步引擎按其底层同步引擎统计）
+
+    用法：
+        with count_statements(engine, async_engine) as counter:
+            client.get("/api/v1/summaries")
+        print(counter.count)
+    """
+    counter = StatementCounter()
+    targets = [
+        engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+        for engine in engines
+    ]
+    for target in targets:
+        event.listen(target, "before_cursor_execute", counter._on_execute)
+    try:
+        yield counter
+    finally:
+        for target in targets:
+            event.remove(target, "before_cursor_execute", counter._on_execute)
+
+
+@contextmanager
+def assert_max_statements(
+    limit: int, *engines: Union[Engine, AsyncEngine], label: Optional[str] = None
+) -> Iterator[StatementCounter]:
+    """断言代码块内在这些引擎上执行的SQL语句数不超过limit，超出时列出全部语句"""
+    with count_statements(*engines) as counter:
+        yield counter
+    if counter.count > limit:
+        statements = "\n".join(f"  {statement}" for statement in counter.statements)
+        raise AssertionError(
+            f"{label or '代码块'}执行了{counter.count}条SQL语句，超过上限{limit}：\n{statements}"
+        )
+
+
+def _operation(statement: str) -> str:
+    match = _FIRST_WORD.match(statement)
+    operation = match.group(1).lower() if match else ""
+    return operation if operation in _OPERATIONS else "other"
+
+
+def instrument_engine(engine: Union[Engine, AsyncEngine], name: str) -> Callable[[], None]:
+    """在引擎上记录每条SQL语句的耗时和错误（db_statement_*指标，engine标签为name），返回移除记录的函数
+
+    开始时间保存在执行上下文上；executemany的一批参数计为一条语句。
+    """
+    target = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+
+    # 语句文本来自编译缓存，重复出现的语句直接取到对应的直方图
+    @lru_cache(maxsize=2048)
+    def _histogram(statement: str):
+        return db_statement_duration_seconds.labels(name, _operation(statement))
+
+    @event.listens_for(target, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+        if context is not None:
+            context._metrics_started = time.perf_counter()
+
+    @event.listens_for(target, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+        started = getattr(context, "_metrics_started", None)
+        if started is not None:
+            _histogram(statement).observe(time.perf_counter() - started)
+
+    @event.listens_for(target, "handle_error")
+    def _error(exception_context) -> None:
+        statement = exception_context.statement or ""
+        db_statement_errors_total.labels(name, _operation(statement)).inc()
+
+    def remove() -> None:
+        event.remove(target, "before_cursor_execute", _before)
+        event.remove(target, "after_cursor_execute", _after)
+        event.remove(target, "handle_error", _error)
+
+    return remove
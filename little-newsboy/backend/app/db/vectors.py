@@ -0,0 +1,133 @@
+# 摘要的本地向量表示
+# 标题、标签和正文开头的n-gram特征（中日韩文字取相邻两字，其他文字按词）经带符号的特征哈希映射到
+# RELATED_DIMENSIONS维，按次线性词频加权后归一化，以float32存入summary_vectors，两条摘要向量的内积即余弦相似度。
+# 与全文索引一样通过ORM事件在创建、更新和删除时同步；批量导入等绕过ORM事件的写入调用index_rows。
+# 每次变化都删除旧行并写入新行（自增ID），删除摘要时写入向量为空的墓碑行，读取方按ID增量同步即可得到全部变化。
+# 墓碑行保留RELATED_TOMBSTONE_TTL_SECONDS，在之后的删除中顺带清理；更久未同步的内存索引需要重建（见services/related.py）。
+import math
+import re
+import zlib
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import delete, event, inspect, insert, select
+from sqlalchemy.engine import Connection
+
+from app.config import settings
+from app.db.models.summary import Summary, SummaryVector
+
+DIMENSIONS = settings.RELATED_DIMENSIONS
+# 计算向量用到的摘要字段，只有它们变化时才重新计算
+VECTOR_FIELDS = ("title", "content", "tags")
+# 标题和标签的特征权重高于正文
+TITLE_WEIGHT = 2.0
+TAG_WEIGHT = 3.0
+
+_CJK_RUN = r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]+"
+_TOKEN_PATTERN = re.compile(rf"({_CJK_RUN})|[^\W_]{{2,}}")
+
+
+def _ngram_counts(text: str) -> Counter:
+    """中日韩文字连续片段取相邻两字（单字片段取单字），其他文字取长度不小于2的词"""
+    counts: Counter = Counter()
+    for match in _TOKEN_PATTERN.finditer(text.lower()):
+        token = match.group()
+        if match.group(1) and len(token) > 1:
+            counts.update(token[i:i + 2] for i in range(len(token) - 1))
+        else:
+            counts[token] += 1
+    return counts
+
+
+def embed(title: Optional[str], content: Optional[str], tags: Optional[Iterable[str]]) -> Optional[np.ndarray]:
+    """摘要 -> 单位长度的float32向量，没有可用特征时返回None"""
+    features: List[Tuple[str, float]] = []
+    for text, weight in ((title, TITLE_WEIGHT), ((content or "")[:settings.RELATED_MAX_CHARS], 1.0)):
+        features.extend(
+            (feature, weight * (1.0 + math.log(count))) for feature, count in _ngram_counts(text or "").items()
+        )
+    features.extend((f"#{tag.lower()}", TAG_WEIGHT) for tag in dict.fromkeys(tags or []) if tag)
+    if not features:
+        return None
+    hashes = np.fromiter((zlib.crc32(feature.encode()) for feature, _ in features), dtype=np.uint32, count=len(features))
+    weights = np.fromiter((weight for _, weight in features), dtype=np.float64, count=len(features))
+    # 最高位决定符号，使哈希冲突的特征相互抵消而不是累加
+    weights[hashes >= 1 << 31] *= -1
+    vector = np.bincount(hashes % DIMENSIONS, weights=weights, minlength=DIMENSIONS)
+    norm = np.linalg.norm(vector)
+    if norm == 0:
+        return None
+    return (vector / norm).astype(np.float32)
+
+
+def to_bytes(vector: np.ndarray) -> bytes:
+    return vector.astype("<f4").tobytes()
+
+
+def from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype="<f4")
+
+
+def _write(
+    conn: Connection, rows: List[Tuple[str, Optional[int], Optional[bytes]]], deleted_at: Optional[datetime] = None
+) -> None:
+    """写入一批 (摘要ID, 用户ID, 向量)：删除旧行后写入新行；摘要已删除时传入deleted_at，写入墓碑行"""
+    rows = [row for row in rows if row[1] is not None]
+    if not rows:
+        return
+    conn.execute(delete(SummaryVector).where(SummaryVector.summary_id.in_([row[0] for row in rows])))
+    conn.execute(insert(SummaryVector), [
+        {"summary_id": id, "user_id": user_id, "vector": vector, "deleted_at": deleted_at}
+        for id, user_id, vector in rows
+    ])
+
+
+def _embed_row(
+    id: str, user_id: Optional[int], title: Any, content: Any, tags: Any
+) -> Tuple[str, Optional[int], Optional[bytes]]:
+    vector = embed(title, content, tags)
+    return id, user_id, to_bytes(vector) if vector is not None else None
+
+
+def index_rows(conn: Connection, ids: List[str], batch_size: int = 500) -> None:
+    """重新计算指定摘要的向量（批量写入等绕过ORM事件的场景使用），每批ID一次查询、批量写入"""
+    for start in range(0, len(ids), batch_size):
+        rows = conn.execute(
+            select(Summary.id, Summary.user_id, Summary.title, Summary.content, Summary.tags)
+            .where(Summary.id.in_(ids[start:start + batch_size]))
+        ).all()
+        _write(conn, [_embed_row(*row) for row in rows])
+
+
+def purge_tombstones(conn: Connection, before: datetime) -> int:
+    """删除before之前写入的墓碑行，返回删除的行数。
+
+    只清理足够旧的墓碑行：其他进程中的内存索引可能还没有同步到较新的墓碑行，
+    超过保留时长未同步的索引会整体重建，不再需要它们。
+    """
+    return conn.execute(delete(SummaryVector).where(SummaryVector.deleted_at < before)).rowcount
+
+
+def _sync_insert(mapper, connection: Connection, target: Summary) -> None:
+    _write(connection, [_embed_row(target.id, target.user_id, target.title, target.content, target.tags)])
+
+
+def _sync_update(mapper, connection: Connection, target: Summary) -> None:
+    # 仅在相关字段变化时重新计算（如归档、标记重要不影响向量）
+    state = inspect(target)
+    if not any(state.attrs[field].history.has_changes() for field in VECTOR_FIELDS):
+        return
+    _sync_insert(mapper, connection, target)
+
+
+def _sync_delete(mapper, connection: Connection, target: Summary) -> None:
+    now = datetime.now(timezone.utc)
+    _write(connection, [(target.id, target.user_id, None)], deleted_at=now)
+    purge_tombstones(connection, now - timedelta(seconds=settings.RELATED_TOMBSTONE_TTL_SECONDS))
+
+
+event.listen(Summary, "after_insert", _sync_insert)
+event.listen(Summary, "after_update", _sync_update)
+event.listen(Summary, "before_delete", _sync_delete)
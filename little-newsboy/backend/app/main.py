@@ -1,12 +1,97 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict
+
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.deps import auth_cache_stats
+from app.api.middleware import MetricsMiddleware
 from app.api.routes import api_router
+from app.api.routes.analytics import analytics_cache
 from app.config import settings
-from app.db.session import Base, engine
+from app.db.migrations import prepare_database
+from app.db.repositories.job import SummaryJobRepository
+from app.db.session import ReadSessionLocal, async_engine, engine, read_engine
+from app.db.statements import instrument_engine
+from app.services.ai import ai_service
+from app.services.fetcher import source_fetcher
+from app.services.metrics import CONTENT_TYPE, CallbackCollector, registry, render
+from app.services.related import related_index
+
+def _cache_stats() -> Dict[str, Dict[str, Any]]:
+    """各进程内缓存的命中统计"""
+    auth = auth_cache_stats()
+    caches = {"auth_token": auth["token"], "auth_user": auth["user"], "analytics": analytics_cache.stats()}
+    if ai_service.cache is not None:
+        caches["ai"] = ai_service.cache.stats()
+    return caches
+
+
+def _queue_depth():
+    """摘要生成队列中等待执行和执行中的任务数（采集时查询，包含所有worker进程）"""
+    with ReadSessionLocal() as db:
+        counts = SummaryJobRepository().count_unfinished(db)
+    return [((status.value,), count) for status, count in counts.items()]
+
+
+def _register_metrics() -> Callable[[], None]:
+    """记录SQL语句耗时，注册在采集时读取的缓存、相关摘要索引和任务队列统计；返回撤销注册的函数"""
+    removers = [instrument_engine(engine, "primary"), instrument_engine(async_engine, "async")]
+    if read_engine is not engine:
+        removers.append(instrument_engine(read_engine, "read"))
+
+    collectors = [
+        CallbackCollector(
+            "counter", f"cache_{field}_total", f"进程内缓存的{description}次数", ("cache",),
+            collect=lambda field=field: [((name,), stats[field]) for name, stats in _cache_stats().items()],
+        )
+        for field, description in (("hits", "命中"), ("misses", "未命中"), ("evictions", "淘汰"))
+    ]
+    collectors += [
+        CallbackCollector(
+            "gauge", "cache_entries", "进程内缓存的条目数（AI缓存为内存层）", ("cache",),
+            collect=lambda: [
+                ((name,), stats.get("entries", stats.get("memory_entries", 0))) for name, stats in _cache_stats().items()
+            ],
+        ),
+        CallbackCollector(
+            "gauge", "related_index_rows", "相关摘要内存索引中的向量数",
+            collect=lambda: [((), related_index.stats()["rows"])],
+        ),
+        CallbackCollector(
+            "gauge", "related_index_users", "相关摘要内存索引缓存的用户数",
+            collect=lambda: [((), related_index.stats()["users"])],
+        ),
+        CallbackCollector("gauge", "summary_job_queue_depth", "摘要生成任务数（按状态）", ("status",), collect=_queue_depth),
+    ]
+    for collector in collectors:
+        registry.register(collector)
+
+    def unregister() -> None:
+        for collector in collectors:
+            registry.unregister(collector)
+        for remove in removers:
+            remove()
+
+    return unregister
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：启动和关闭共享资源"""
+    # 创建或升级数据库表
+    prepare_database(engine)
+    unregister_metrics = _register_metrics() if settings.METRICS_ENABLED else None
+    await ai_service.startup()
+    await source_fetcher.startup()
+    yield
+    await source_fetcher.shutdown()
+    await ai_service.shutdown()
+    await async_engine.dispose()
+    if unregister_metrics is not None:
+        unregister_metrics()
 
-# 创建数据库表
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="小报童 API",
@@ -14,6 +99,9 @@ app = FastAPI(
     version="0.1.0",
     # 禁用尾部斜杠自动重定向
     redirect_slashes=False,
+    lifespan=lifespan,
+    # 使用orjson序列化JSON响应
+    default_response_class=ORJSONResponse,
 )
 
 # 配置CORS中间件
@@ -28,6 +116,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
 @app.get("/")
 async def root():
@@ -35,7 +125,18 @@ async def root():
 
 @app.get("/healthcheck")
 async def healthcheck():
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "auth_cache": auth_cache_stats(),
+        "analytics_cache": analytics_cache.stats(),
+        "related_index": related_index.stats(),
+    }
+
+if settings.METRICS_ENABLED:
+    # 同步接口：采集时的数据库查询在线程池中执行
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return Response(render(), media_type=CONTENT_TYPE)
 
 # 包含API路由
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+from pydantic import BaseModel, ConfigDict
+
+from app.db.models.job import JobStatus
+
+
+class SummaryJob(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    status: JobStatus
+    source_ids: List[str] = []
+    template_id: Optional[str] = None
+    parameters: Dict[str, Any] = {}
+    attempts: int = 0
+    error: Optional[str] = None
+    summary_id: Optional[str] = None
+    user_id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class SummaryJobAccepted(BaseModel):
+    message: str
+    job_id: str
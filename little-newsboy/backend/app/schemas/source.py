@@ -47,19 +47,35 @@ class SourceUpdate(BaseModel):
 # 返回信息源信息时使用
 class Source(SourceBase):
     id: str
-    user_id: str
+    user_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
 
+# 导出的一行NDJSON记录，与SourceImport格式一致
+class SourceExport(SourceBase):
+    id: str
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+# 导入时使用，未提供ID时生成新ID；ID已存在时跳过
+class SourceImport(SourceBase):
+    id: Optional[str] = None
+    created_at: Optional[datetime] = None
+
 # 用于分页响应
 class SourcesPage(BaseModel):
     items: List[Source]
-    total: int
-    page: int
-    size: int
+    total: Optional[int] = None  # include_total=false时不统计
+    page: Optional[int] = None  # 游标分页时为空
+    size: Optional[int] = None
+    # 下一页游标，为空表示没有更多数据
+    next_cursor: Optional[str] = None
     page_size: Optional[int] = None
     total_pages: Optional[int] = None
     
@@ -27,7 +27,7 @@ class SummaryUpdate(BaseModel):
 
 class SummaryInDBBase(SummaryBase):
     id: str
-    user_id: str
+    user_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
     is_archived: bool = False
@@ -38,14 +38,74 @@ class SummaryInDBBase(SummaryBase):
 
 
 class Summary(SummaryInDBBase):
-    pass
+    # 全文搜索时返回的高亮片段
+    snippet: Optional[str] = None
+
+
+class SummaryListItem(BaseModel):
+    """摘要列表项：以摘录代替正文；通过fields参数选择字段时只包含所选字段，因此除id外均可缺省"""
+    id: str
+    title: Optional[str] = None
+    excerpt: Optional[str] = None
+    content: Optional[str] = None
+    key_points: Optional[List[str]] = None
+    source_ids: Optional[List[str]] = None
+    tags: Optional[List[str]] = None
+    user_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    is_archived: Optional[bool] = None
+    is_important: Optional[bool] = None
+    # 全文搜索时返回的高亮片段
+    snippet: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+# 列表接口未指定fields时返回的字段（不含正文和要点）
+SUMMARY_LIST_FIELDS = (
+    "id", "title", "excerpt", "source_ids", "tags", "user_id",
+    "created_at", "updated_at", "is_archived", "is_important", "snippet",
+)
+
+
+class RelatedSummary(SummaryListItem):
+    """相关摘要：列表项字段加上与所查摘要的余弦相似度"""
+    score: float
+
+
+# 相关摘要接口返回的列表项字段
+RELATED_SUMMARY_FIELDS = tuple(field for field in SUMMARY_LIST_FIELDS if field != "snippet")
+
+
+class SummaryExport(SummaryBase):
+    """导出的一行NDJSON记录，与SummaryImport格式一致"""
+    id: str
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    is_archived: bool = False
+    is_important: bool = False
+
+    class Config:
+        from_attributes = True
+
+
+class SummaryImport(SummaryBase):
+    # 未提供ID时生成新ID；ID已存在时跳过
+    id: Optional[str] = None
+    created_at: Optional[datetime] = None
+    is_archived: bool = False
+    is_important: bool = False
 
 
 class SummariesPage(BaseModel):
-    items: List[Summary]
-    total: int
-    page: int
+    items: List[SummaryListItem]
+    total: Optional[int] = None  # include_total=false时不统计
+    page: Optional[int] = None  # 游标分页时为空
     size: int
+    # 下一页游标，为空表示没有更多数据
+    next_cursor: Optional[str] = None
     
     # 兼容性字段，确保API响应验证通过
     page_size: Optional[int] = None
@@ -56,6 +116,11 @@ class SummariesPage(BaseModel):
         extra = "allow"  # 允许额外字段
 
 
+class TagCount(BaseModel):
+    tag: str
+    count: int
+
+
 class SummaryTemplateBase(BaseModel):
     name: str
     description: str
@@ -74,7 +139,7 @@ class SummaryTemplateUpdate(BaseModel):
 
 class SummaryTemplateInDBBase(SummaryTemplateBase):
     id: str
-    user_id: str
+    user_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -83,10 +148,32 @@ class SummaryTemplateInDBBase(SummaryTemplateBase):
 
 
 class SummaryTemplate(SummaryTemplateInDBBase):
-    pass
+    # 全文搜索时返回的高亮片段
+    snippet: Optional[str] = None
 
 
 class SummaryGenerateRequest(BaseModel):
     source_ids: List[str]
     template_id: Optional[str] = None
-    parameters: Optional[Dict[str, Any]] = {} 
\ No newline at end of file
+    parameters: Optional[Dict[str, Any]] = {} 
+
+
+class SummaryBatchGenerateRequest(BaseModel):
+    items: List[SummaryGenerateRequest] = Field(..., min_length=1)
+    # 为True时在请求内并发生成并直接返回结果，否则提交到任务队列
+    wait: bool = False
+
+
+class SummaryBatchItemResult(BaseModel):
+    index: int
+    status: str  # queued / succeeded / failed / rejected
+    job_id: Optional[str] = None
+    summary_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class SummaryBatchGenerateResponse(BaseModel):
+    items: List[SummaryBatchItemResult]
+    accepted: int  # 已入队或已生成
+    rejected: int  # 校验未通过（信息源、模板无效或没有内容）
+    failed: int  # 入队或生成失败
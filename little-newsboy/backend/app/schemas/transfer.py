@@ -0,0 +1,14 @@
+from typing import List
+from pydantic import BaseModel
+
+
+class ImportLineError(BaseModel):
+    line: int
+    detail: str
+
+
+class ImportResult(BaseModel):
+    imported: int = 0
+    skipped: int = 0  # ID已存在的行
+    failed: int = 0  # 校验失败的行
+    errors: List[ImportLineError] = []
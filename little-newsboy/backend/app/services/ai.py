@@ -1,27 +1,107 @@
-from typing import List, Dict, Any, Optional
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 import httpx
 import os
 import json
 import asyncio
+import re
+import time
 from pydantic import BaseModel
 
+from app.config import settings
+from app.services.cache import LLMCache
+from app.services.metrics import ai_request_duration_seconds, ai_request_errors_total
+
 # AI提供商类型
 class AIProvider:
     OPENAI = "openai"
     OLLAMA = "ollama"
 
+# 错误信息中的提供商名称
+_PROVIDER_NAMES = {AIProvider.OPENAI: "OpenAI", AIProvider.OLLAMA: "Ollama"}
+
 # 摘要请求模型
 class SummaryRequest(BaseModel):
     content: str
     max_length: int = 2000
     focus_points: List[str] = []
     format: str = "markdown"
+    bypass_cache: bool = False  # 为True时跳过缓存直接调用模型
 
 # 摘要结果模型
 class SummaryResult(BaseModel):
     summary: str
     key_points: List[str]
 
+# 流式输出结束的标记
+_STREAM_END = object()
+
+# 中日韩字符，每个字符约占一个token
+_CJK_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]")
+# 句子边界（中英文标点及换行）
+_SENTENCE_PATTERN = re.compile(r"(?<=[。！？；.!?;\n])")
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算文本token数：CJK字符按1个计，其余按约4个字符1个计"""
+    cjk_count = len(_CJK_PATTERN.findall(text))
+    other_count = len(text) - cjk_count
+    return cjk_count + (other_count + 3) // 4
+
+
+def _split_to_units(text: str, max_tokens: int) -> List[str]:
+    """将文本拆成不超过max_tokens的单元：段落 -> 句子 -> 硬切分"""
+    units = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if estimate_tokens(paragraph) <= max_tokens:
+            units.append(paragraph)
+            continue
+        for sentence in _SENTENCE_PATTERN.split(paragraph):
+            if not sentence.strip():
+                continue
+            if estimate_tokens(sentence) <= max_tokens:
+                units.append(sentence)
+                continue
+            # 超长句子按字符硬切分
+            step = max(1, len(sentence) * max_tokens // estimate_tokens(sentence))
+            units.extend(sentence[i:i + step] for i in range(0, len(sentence), step))
+    return units
+
+
+def split_content(text: str, max_tokens: int, overlap_tokens: int = 0) -> List[str]:
+    """按token预算在自然边界处切分文本，相邻分块保留少量重叠上下文"""
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+    
+    overlap_tokens = min(overlap_tokens, max_tokens // 2)
+    chunks = []
+    current: List[str] = []
+    current_tokens = 0
+    for unit in _split_to_units(text, max_tokens - overlap_tokens - 1):
+        # 额外计入分块内的段落分隔符
+        unit_tokens = estimate_tokens(unit) + 1
+        if current and current_tokens + unit_tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            # 从上一分块末尾取重叠部分
+            tail: List[str] = []
+            tail_tokens = 0
+            for previous in reversed(current):
+                previous_tokens = estimate_tokens(previous) + 1
+                if tail_tokens + previous_tokens > overlap_tokens:
+                    break
+                tail.insert(0, previous)
+                tail_tokens += previous_tokens
+            current, current_tokens = tail, tail_tokens
+        current.append(unit)
+        current_tokens += unit_tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
 class AIService:
     """AI服务集成，支持OpenAI和Ollama"""
     
@@ -32,90 +112,236 @@ class AIService:
         self.openai_model = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
         self.ollama_url = os.getenv("OLLAMA_URL", "http://localhost:11434")
         self.ollama_model = os.getenv("OLLAMA_MODEL", "llama2")
+        # 每个提供商一个长连接客户端，随应用生命周期启动和关闭
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        # 全局模型调用并发上限（在事件循环内按需创建）
+        self._limiter: Optional[asyncio.Semaphore] = None
+        # 相同请求的结果缓存
+        self.cache: Optional[LLMCache] = None
+        if settings.AI_CACHE_ENABLED:
+            self.cache = LLMCache(
+                max_entries=settings.AI_CACHE_MAX_ENTRIES,
+                ttl_seconds=settings.AI_CACHE_TTL_SECONDS,
+                db_path=settings.AI_CACHE_DB_PATH or None,
+                db_max_entries=settings.AI_CACHE_DB_MAX_ENTRIES,
+            )
+    
+    def _create_client(self, base_url: str) -> httpx.AsyncClient:
+        """创建带连接池、keep-alive和分阶段超时的HTTP客户端"""
+        http2 = settings.AI_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                # 未安装h2时退回HTTP/1.1
+                print("未安装h2，AI服务HTTP/2已禁用")
+                http2 = False
+        
+        return httpx.AsyncClient(
+            base_url=base_url,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.AI_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.AI_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.AI_HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                connect=settings.AI_HTTP_CONNECT_TIMEOUT,
+                read=settings.AI_HTTP_READ_TIMEOUT,
+                write=settings.AI_HTTP_WRITE_TIMEOUT,
+                pool=settings.AI_HTTP_POOL_TIMEOUT,
+            ),
+        )
+    
+    def _get_client(self, provider: str) -> httpx.AsyncClient:
+        """获取提供商对应的共享客户端（未启动时按需创建）"""
+        client = self._clients.get(provider)
+        if client is None or client.is_closed:
+            base_url = "https://api.openai.com" if provider == AIProvider.OPENAI else self.ollama_url
+            client = self._create_client(base_url)
+            self._clients[provider] = client
+        return client
+    
+    def _get_limiter(self) -> asyncio.Semaphore:
+        """获取跨请求共享的模型调用信号量"""
+        if self._limiter is None:
+            self._limiter = asyncio.Semaphore(max(1, settings.AI_MAX_CONCURRENCY))
+        return self._limiter
+    
+    async def startup(self) -> None:
+        """应用启动时预先创建当前提供商的客户端"""
+        self._get_client(self.provider)
+    
+    async def shutdown(self) -> None:
+        """应用关闭时释放所有连接"""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+        if self.cache is not None:
+            self.cache.close()
     
     async def generate_summary(self, request: SummaryRequest) -> SummaryResult:
-        """生成内容摘要"""
-        if self.provider == AIProvider.OPENAI:
-            return await self._generate_with_openai(request)
+        """生成内容摘要（优先读取缓存）"""
+        use_cache = self.cache is not None and not request.bypass_cache
+        if use_cache:
+            cache_key = self._cache_key(request)
+            cached = await self.cache.aget(cache_key)
+            if cached is not None:
+                return SummaryResult(**cached)
+        
+        if estimate_tokens(request.content) > settings.AI_CHUNK_MAX_TOKENS:
+            result = await self._generate_map_reduce(request)
         else:
-            return await self._generate_with_ollama(request)
+            async with self._get_limiter():
+                if self.provider == AIProvider.OPENAI:
+                    result = await self._generate_with_openai(request)
+                else:
+                    result = await self._generate_with_ollama(request)
+        
+        if self.cache is not None:
+            await self.cache.aset(self._cache_key(request), result.model_dump())
+        return result
     
-    async def _generate_with_openai(self, request: SummaryRequest) -> SummaryResult:
-        """使用OpenAI生成摘要"""
-        # 构建提示词
-        system_prompt = "你是一个专业的内容分析助手，擅长提取内容的核心信息并生成摘要。"
-        user_prompt = f"""
-        请对以下内容生成一个摘要，并列出关键要点。
+    def _model(self, provider: str) -> str:
+        """提供商当前使用的模型"""
+        return self.openai_model if provider == AIProvider.OPENAI else self.ollama_model
+    
+    @asynccontextmanager
+    async def _track_call(self, provider: str, stream: bool = False) -> AsyncIterator[None]:
+        """记录一次模型调用的耗时；失败时按异常类型计数并输出错误后重新抛出"""
+        model = self._model(provider)
+        mode = "stream" if stream else "generate"
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            ai_request_errors_total.labels(provider, model, mode, type(e).__name__).inc()
+            print(f"{_PROVIDER_NAMES.get(provider, provider)} API {'流式' if stream else ''}调用失败: {str(e)}")
+            raise
+        finally:
+            ai_request_duration_seconds.labels(provider, model, mode).observe(time.perf_counter() - started)
+    
+    def _cache_key(self, request: SummaryRequest) -> str:
+        """计算请求的缓存键"""
+        return LLMCache.make_key(
+            self.provider,
+            self._model(self.provider),
+            self._build_prompt(request),
+            request.max_length,
+            request.focus_points,
+            request.format,
+        )
+    
+    async def _map_chunks(self, request: SummaryRequest) -> Tuple[SummaryRequest, List[str]]:
+        """分块并发生成局部摘要（map阶段），返回合并请求和局部要点"""
+        chunks = split_content(
+            request.content,
+            settings.AI_CHUNK_MAX_TOKENS,
+            settings.AI_CHUNK_OVERLAP_TOKENS,
+        )
+        semaphore = asyncio.Semaphore(max(1, settings.AI_CHUNK_CONCURRENCY))
+        chunk_length = max(200, request.max_length // len(chunks))
         
-        摘要长度要求：不超过{request.max_length}字符
-        摘要格式：{request.format}
-        特别关注点：{', '.join(request.focus_points) if request.focus_points else '无特别要求'}
+        async def summarize_chunk(chunk: str) -> SummaryResult:
+            async with semaphore:
+                return await self.generate_summary(SummaryRequest(
+                    content=chunk,
+                    max_length=chunk_length,
+                    focus_points=request.focus_points,
+                    format=request.format,
+                    bypass_cache=request.bypass_cache,
+                ))
         
-        内容：
-        {request.content}
+        partials = await asyncio.gather(*(summarize_chunk(chunk) for chunk in chunks))
         
-        请按以下格式返回：
+        key_points = []
+        for partial in partials:
+            for point in partial.key_points:
+                if point not in key_points:
+                    key_points.append(point)
         
-        ## 摘要
-        <在这里生成摘要内容>
+        # 合并局部摘要和去重后的局部要点作为reduce阶段的输入
+        sections = [
+            f"### 第{index}部分\n{partial.summary}"
+            for index, partial in enumerate(partials, start=1)
+        ]
+        if key_points:
+            sections.append("### 各部分要点\n" + "\n".join(f"- {point}" for point in key_points))
+        combined = "\n\n".join(sections)
         
-        ## 关键要点
-        - 要点1
-        - 要点2
-        - ...
+        reduce_request = SummaryRequest(
+            content=combined,
+            max_length=request.max_length,
+            focus_points=request.focus_points,
+            format=request.format,
+            bypass_cache=request.bypass_cache,
+        )
+        return reduce_request, key_points
+    
+    async def _reduce_input(self, request: SummaryRequest) -> Tuple[SummaryRequest, List[str]]:
+        """分层map直到合并结果不超过分块大小，返回reduce请求和最后一层的局部要点
+
+        最多AI_CHUNK_MAX_LEVELS层，之后截断合并结果，只再reduce一次
         """
+        key_points: List[str] = []
+        for _ in range(max(1, settings.AI_CHUNK_MAX_LEVELS)):
+            request, key_points = await self._map_chunks(request)
+            if estimate_tokens(request.content) <= settings.AI_CHUNK_MAX_TOKENS:
+                return request, key_points
+        content = split_content(request.content, settings.AI_CHUNK_MAX_TOKENS)[0]
+        return request.model_copy(update={"content": content}), key_points
+    
+    async def _generate_map_reduce(self, request: SummaryRequest) -> SummaryResult:
+        """长文本分块摘要：并发map局部摘要，再reduce为最终结果"""
+        reduce_request, key_points = await self._reduce_input(request)
+        result = await self.generate_summary(reduce_request)
+        return SummaryResult(
+            summary=result.summary,
+            key_points=result.key_points or key_points
+        )
+    
+    async def stream_summary(self, request: SummaryRequest) -> AsyncIterator[str]:
+        """流式生成内容摘要，逐段返回模型输出的文本
+
+        模型输出由后台任务读入队列，全局并发名额在模型输出结束时即释放，不受客户端读取快慢的影响；
+        调用方提前关闭生成器（如客户端断开）时取消读取
+        """
+        # 长文本先完成map阶段，再流式输出reduce结果
+        if estimate_tokens(request.content) > settings.AI_CHUNK_MAX_TOKENS:
+            request, _ = await self._reduce_input(request)
+        
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        async def read_upstream() -> None:
+            try:
+                async with self._get_limiter():
+                    if self.provider == AIProvider.OPENAI:
+                        stream = self._stream_with_openai(request)
+                    else:
+                        stream = self._stream_with_ollama(request)
+                    async for text in stream:
+                        queue.put_nowait(text)
+            except Exception as e:
+                queue.put_nowait(e)
+            else:
+                queue.put_nowait(_STREAM_END)
         
+        reader = asyncio.ensure_future(read_upstream())
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "https://api.openai.com/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.openai_api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": self.openai_model,
-                        "messages": [
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": user_prompt}
-                        ],
-                        "temperature": 0.3
-                    },
-                    timeout=60.0
-                )
-                
-                response.raise_for_status()
-                result = response.json()
-                
-                # 解析响应
-                full_content = result["choices"][0]["message"]["content"]
-                
-                # 提取摘要和关键点
-                summary_part = ""
-                key_points = []
-                
-                if "## 摘要" in full_content and "## 关键要点" in full_content:
-                    summary_part = full_content.split("## 摘要")[1].split("## 关键要点")[0].strip()
-                    key_points_text = full_content.split("## 关键要点")[1].strip()
-                    key_points = [point.strip().lstrip("- ") for point in key_points_text.split("\n") if point.strip()]
-                else:
-                    # 简单的后备方案
-                    summary_part = full_content
-                
-                return SummaryResult(
-                    summary=summary_part,
-                    key_points=key_points
-                )
-                
-        except Exception as e:
-            # 在实际应用中，这里应该增加更好的错误处理和日志记录
-            print(f"OpenAI API 调用失败: {str(e)}")
-            raise
+            while True:
+                item = await queue.get()
+                if item is _STREAM_END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            reader.cancel()
     
-    async def _generate_with_ollama(self, request: SummaryRequest) -> SummaryResult:
-        """使用Ollama生成摘要"""
-        # 构建提示词
-        prompt = f"""
+    def _build_prompt(self, request: SummaryRequest) -> str:
+        """构建摘要提示词"""
+        return f"""
         请对以下内容生成一个摘要，并列出关键要点。
         
         摘要长度要求：不超过{request.max_length}字符
@@ -135,46 +361,127 @@ class AIService:
         - 要点2
         - ...
         """
+    
+    def parse_result(self, full_content: str) -> SummaryResult:
+        """从模型输出中提取摘要和关键点"""
+        summary_part = ""
+        key_points = []
         
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.ollama_url}/api/generate",
-                    json={
-                        "model": self.ollama_model,
-                        "prompt": prompt,
-                        "stream": False
-                    },
-                    timeout=120.0
-                )
-                
+        if "## 摘要" in full_content and "## 关键要点" in full_content:
+            summary_part = full_content.split("## 摘要")[1].split("## 关键要点")[0].strip()
+            key_points_text = full_content.split("## 关键要点")[1].strip()
+            key_points = [point.strip().lstrip("- ") for point in key_points_text.split("\n") if point.strip()]
+        else:
+            # 简单的后备方案
+            summary_part = full_content
+        
+        return SummaryResult(
+            summary=summary_part,
+            key_points=key_points
+        )
+    
+    def _openai_request(self, request: SummaryRequest, stream: bool = False) -> Dict[str, Any]:
+        """构建OpenAI请求参数"""
+        system_prompt = "你是一个专业的内容分析助手，擅长提取内容的核心信息并生成摘要。"
+        return {
+            "headers": {
+                "Authorization": f"Bearer {self.openai_api_key}",
+                "Content-Type": "application/json"
+            },
+            "json": {
+                "model": self.openai_model,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": self._build_prompt(request)}
+                ],
+                "temperature": 0.3,
+                "stream": stream
+            }
+        }
+    
+    def _ollama_request(self, request: SummaryRequest, stream: bool = False) -> Dict[str, Any]:
+        """构建Ollama请求参数"""
+        return {
+            "json": {
+                "model": self.ollama_model,
+                "prompt": self._build_prompt(request),
+                "stream": stream
+            }
+        }
+    
+    async def _generate_with_openai(self, request: SummaryRequest) -> SummaryResult:
+        """使用OpenAI生成摘要"""
+        async with self._track_call(AIProvider.OPENAI):
+            client = self._get_client(AIProvider.OPENAI)
+            response = await client.post(
+                "/v1/chat/completions",
+                **self._openai_request(request)
+            )
+            
+            response.raise_for_status()
+            result = response.json()
+            
+            # 解析响应
+            full_content = result["choices"][0]["message"]["content"]
+            return self.parse_result(full_content)
+    
+    async def _generate_with_ollama(self, request: SummaryRequest) -> SummaryResult:
+        """使用Ollama生成摘要"""
+        async with self._track_call(AIProvider.OLLAMA):
+            client = self._get_client(AIProvider.OLLAMA)
+            response = await client.post(
+                "/api/generate",
+                **self._ollama_request(request)
+            )
+            
+            response.raise_for_status()
+            result = response.json()
+            
+            # 解析响应
+            full_content = result.get("response", "")
+            return self.parse_result(full_content)
+    
+    async def _stream_with_openai(self, request: SummaryRequest) -> AsyncIterator[str]:
+        """使用OpenAI流式生成摘要（解析SSE数据行）"""
+        async with self._track_call(AIProvider.OPENAI, stream=True):
+            client = self._get_client(AIProvider.OPENAI)
+            async with client.stream(
+                "POST",
+                "/v1/chat/completions",
+                **self._openai_request(request, stream=True)
+            ) as response:
                 response.raise_for_status()
-                result = response.json()
-                
-                # 解析响应
-                full_content = result.get("response", "")
-                
-                # 提取摘要和关键点
-                summary_part = ""
-                key_points = []
-                
-                if "## 摘要" in full_content and "## 关键要点" in full_content:
-                    summary_part = full_content.split("## 摘要")[1].split("## 关键要点")[0].strip()
-                    key_points_text = full_content.split("## 关键要点")[1].strip()
-                    key_points = [point.strip().lstrip("- ") for point in key_points_text.split("\n") if point.strip()]
-                else:
-                    # 简单的后备方案
-                    summary_part = full_content
-                
-                return SummaryResult(
-                    summary=summary_part,
-                    key_points=key_points
-                )
-                
-        except Exception as e:
-            # 在实际应用中，这里应该增加更好的错误处理和日志记录
-            print(f"Ollama API 调用失败: {str(e)}")
-            raise
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    chunk = json.loads(data)
+                    choices = chunk.get("choices") or [{}]
+                    text = choices[0].get("delta", {}).get("content")
+                    if text:
+                        yield text
+    
+    async def _stream_with_ollama(self, request: SummaryRequest) -> AsyncIterator[str]:
+        """使用Ollama流式生成摘要（解析NDJSON行）"""
+        async with self._track_call(AIProvider.OLLAMA, stream=True):
+            client = self._get_client(AIProvider.OLLAMA)
+            async with client.stream(
+                "POST",
+                "/api/generate",
+                **self._ollama_request(request, stream=True)
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    chunk = json.loads(line)
+                    text = chunk.get("response")
+                    if text:
+                        yield text
+                    if chunk.get("done"):
+                        break
     
     # 这里可以添加更多的AI服务功能，如摘要质量评估、内容分类等
 
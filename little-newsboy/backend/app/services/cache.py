@@ -0,0 +1,414 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from collections import OrderedDict
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+class LLMCache:
+    """LLM结果缓存：内存LRU + SQLite持久层，支持TTL和容量淘汰
+
+    持久层读写是阻塞的文件I/O，异步调用方使用aget/aset，在线程池中访问持久层，不阻塞事件循环。
+    内存层和持久层各用一把锁，内存命中不需要等待正在进行的磁盘读写。
+    """
+
+    # 持久层每写入这么多条才清理一次过期和超出容量的条目（条目数最多超出上限这么多）
+    DISK_EVICT_INTERVAL = 100
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: int = 7 * 24 * 3600,
+        db_path: Optional[str] = None,
+        db_max_entries: int = 100000,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.db_max_entries = db_max_entries
+
+        # 内存层：key -> (写入时间, 值)
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        # 持久层命中后待更新的访问时间，随下一次写入一起提交
+        self._touched: Dict[str, float] = {}
+        self._writes_since_evict = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: str,
+        prompt: str,
+        max_length: int,
+        focus_points: List[str],
+        format: str,
+    ) -> str:
+        """根据请求内容计算缓存键"""
+        payload = json.dumps(
+            [provider, model, prompt, max_length, list(focus_points), format],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _get_conn(self) -> Optional[sqlite3.Connection]:
+        """获取持久层连接（首次使用时建表），调用方持有_db_lock"""
+        if not self.db_path:
+            return None
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_llm_cache_accessed_at ON llm_cache (accessed_at)"
+            )
+            # 按写入时间清理过期条目时走索引
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_llm_cache_created_at ON llm_cache (created_at)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, created_at: float, value: Dict[str, Any]) -> None:
+        """写入内存层并按LRU淘汰"""
+        with self._lock:
+            self._memory[key] = (created_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                self.evictions += 1
+
+    def _get_memory(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            created_at, value = entry
+            if self._expired(created_at, now):
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return value
+
+    def _get_disk(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        """查找持久层，命中时放入内存层；未命中计入misses"""
+        with self._db_lock:
+            conn = self._get_conn()
+            row = None
+            if conn is not None:
+                row = conn.execute(
+                    "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+            if row is None or self._expired(row[1], now):
+                # 过期的行留给定期清理
+                self.misses += 1
+                return None
+            self._touched[key] = now
+        value = json.loads(row[0])
+        self._remember(key, row[1], value)
+        self.disk_hits += 1
+        return value
+
+    def _set_disk(self, key: str, value: Dict[str, Any], now: float) -> None:
+        with self._db_lock:
+            conn = self._get_conn()
+            if conn is None:
+                return
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now),
+            )
+            self._flush_touched(conn)
+            self._writes_since_evict += 1
+            if self._writes_since_evict >= self.DISK_EVICT_INTERVAL:
+                self._evict_disk(conn, now)
+                self._writes_since_evict = 0
+            conn.commit()
+
+    def _flush_touched(self, conn: sqlite3.Connection) -> None:
+        if self._touched:
+            conn.executemany(
+                "UPDATE llm_cache SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存，依次查找内存层和持久层"""
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is not None:
+            return value
+        return self._get_disk(key, now)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """写入缓存（内存层和持久层）"""
+        now = time.time()
+        self._remember(key, now, value)
+        self._set_disk(key, value, now)
+
+    async def aget(self, key: str) -> Optional[Dict[str, Any]]:
+        """get的异步版本：内存层直接查找，持久层在线程池中查找"""
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is not None:
+            return value
+        if not self.db_path:
+            self.misses += 1
+            return None
+        return await asyncio.to_thread(self._get_disk, key, now)
+
+    async def aset(self, key: str, value: Dict[str, Any]) -> None:
+        """set的异步版本：持久层在线程池中写入"""
+        now = time.time()
+        self._remember(key, now, value)
+        if self.db_path:
+            await asyncio.to_thread(self._set_disk, key, value, now)
+
+    def _evict_disk(self, conn: sqlite3.Connection, now: float) -> None:
+        """清理持久层中过期和超出容量的条目"""
+        if self.ttl_seconds > 0:
+            conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+        count = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        overflow = count - self.db_max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY accessed_at LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += overflow
+
+    def clear(self) -> None:
+        """清空全部缓存"""
+        with self._lock:
+            self._memory.clear()
+        with self._db_lock:
+            self._touched.clear()
+            conn = self._get_conn()
+            if conn is not None:
+                conn.execute("DELETE FROM llm_cache")
+                conn.commit()
+
+    def close(self) -> None:
+        """提交待更新的访问时间并关闭持久层连接"""
+        with self._db_lock:
+            if self._conn is not None:
+                self._flush_touched(self._conn)
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        """返回命中统计"""
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return {
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": hits / total if total else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+
+class TTLCache:
+    """线程安全的内存LRU缓存，每个条目可单独指定过期时间"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 60):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        # key -> (过期时间, 值)
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Any) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: Any, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """写入缓存，ttl_seconds为空时使用默认过期时间"""
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Any) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """返回命中统计"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._data),
+        }
+
+
+class CachedResponse:
+    """缓存的响应体及其强ETag"""
+
+    __slots__ = ("body", "etag", "fresh_until", "stale_until")
+
+    def __init__(self, body: bytes, fresh_until: float, stale_until: float):
+        self.body = body
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+
+    def max_age(self) -> int:
+        """剩余的新鲜时间（秒），用于Cache-Control"""
+        return max(0, int(self.fresh_until - time.monotonic()))
+
+
+class ResponseCache:
+    """异步响应缓存（在事件循环内使用）
+
+    - 新鲜期内直接返回缓存的响应体
+    - 过期后的宽限期内先返回旧响应，同时在后台刷新（stale-while-revalidate）
+    - 同一个键同时只计算一次，其余请求等待同一个结果（single-flight）
+    compute返回None（如资源不存在）时不缓存
+    """
+
+    def __init__(self, ttl_seconds: float = 300, stale_seconds: float = 3600, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+
+        self._data: "OrderedDict[Any, CachedResponse]" = OrderedDict()
+        # 正在计算的键 -> 计算任务
+        self._inflight: Dict[Any, "asyncio.Task"] = {}
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        # 未命中时等待同一个计算结果的请求数
+        self.coalesced = 0
+        self.computes = 0
+        self.errors = 0
+        self.evictions = 0
+
+    async def get(self, key: Any, compute: Callable[[], Awaitable[Optional[bytes]]]) -> Optional[CachedResponse]:
+        now = time.monotonic()
+        entry = self._data.get(key)
+        if entry is not None:
+            if entry.fresh_until > now:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry
+            if entry.stale_until > now:
+                self._data.move_to_end(key)
+                self.stale_hits += 1
+                self._refresh(key, compute)
+                return entry
+            del self._data[key]
+        if key in self._inflight:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+        # shield：某个等待的请求被取消时不影响计算本身和其他等待者
+        return await asyncio.shield(self._refresh(key, compute))
+
+    def _refresh(self, key: Any, compute: Callable[[], Awaitable[Optional[bytes]]]) -> "asyncio.Task":
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._compute(key, compute))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    async def _compute(self, key: Any, compute: Callable[[], Awaitable[Optional[bytes]]]) -> Optional[CachedResponse]:
+        self.computes += 1
+        try:
+            body = await compute()
+        except Exception as e:
+            self.errors += 1
+            stale = self._data.get(key)
+            if stale is not None and stale.stale_until > time.monotonic():
+                # 后台刷新失败时继续使用旧响应
+                print(f"刷新缓存失败，继续使用旧响应：{str(e)}")
+                return stale
+            raise
+        if body is None:
+            self._data.pop(key, None)
+            return None
+        now = time.monotonic()
+        entry = CachedResponse(body, now + self.ttl_seconds, now + self.ttl_seconds + self.stale_seconds)
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def delete(self, key: Any) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """返回命中统计"""
+        total = self.hits + self.stale_hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "computes": self.computes,
+            "errors": self.errors,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.stale_hits) / total if total else 0.0,
+            "entries": len(self._data),
+            "inflight": len(self._inflight),
+        }
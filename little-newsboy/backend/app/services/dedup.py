@@ -0,0 +1,220 @@
+# 近似重复条目检测
+# 新闻、社区类信息源经常转载同一篇内容。抓取时为条目计算MinHash签名（字符3-gram集合，64个取值），
+# 通过LSH分段（16段×4个值）找出同一用户近期在其他信息源出现过的候选条目，估计的Jaccard相似度达到阈值的视为重复：
+# 重复条目仍保留在items中并标记duplicate_of，但不计入供摘要使用的正文；生成摘要时再在所选信息源的条目之间去重一次。
+import hashlib
+import re
+import struct
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.models.source import Source
+from app.db.repositories.source import ItemFingerprintRepository
+from app.services.fetcher import FetchResult, render_content
+
+fingerprint_repository = ItemFingerprintRepository()
+
+NUM_PERM = 64
+BAND_ROWS = 4
+BANDS = NUM_PERM // BAND_ROWS
+SHINGLE_SIZE = 3
+# 参与计算的文本长度上限（规范化后），转载内容的标题和开头通常一致
+MAX_FINGERPRINT_CHARS = 2000
+
+_NON_WORD_PATTERN = re.compile(r"[\W_]+")
+_SIGNATURE_FORMAT = struct.Struct(f"<{NUM_PERM}I")
+_BAND_FORMAT = struct.Struct(f"<{BAND_ROWS + 1}I")
+# 单次排列MinHash：片段的64位哈希低6位选桶、高26位参与取最小值；空桶从右侧最近的非空桶借值，
+# 并加上距离×_EMPTY避免与真实取值相同
+_VALUE_SHIFT = 64 - 26
+_EMPTY = 1 << 26
+
+Signature = Tuple[int, ...]
+
+
+def minhash(text: str) -> Optional[Signature]:
+    """计算文本的MinHash签名，规范化后过短的文本返回None"""
+    normalized = _NON_WORD_PATTERN.sub("", text.lower())[:MAX_FINGERPRINT_CHARS]
+    if len(normalized) < max(settings.DEDUP_MIN_CHARS, SHINGLE_SIZE):
+        return None
+    shingles = {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+    hashes = struct.unpack(
+        f"<{len(shingles)}Q",
+        b"".join(hashlib.blake2b(shingle.encode(), digest_size=8).digest() for shingle in shingles),
+    )
+    values = [_EMPTY] * NUM_PERM
+    for value in hashes:
+        bin_, value = value & (NUM_PERM - 1), value >> _VALUE_SHIFT
+        if value < values[bin_]:
+            values[bin_] = value
+    signature = []
+    for bin_ in range(NUM_PERM):
+        distance = 0
+        while values[(bin_ + distance) % NUM_PERM] == _EMPTY:
+            distance += 1
+        signature.append(values[(bin_ + distance) % NUM_PERM] + distance * _EMPTY)
+    return tuple(signature)
+
+
+def similarity(a: Signature, b: Signature) -> float:
+    """由签名估计的Jaccard相似度"""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def band_keys(signature: Signature) -> List[int]:
+    """每段BAND_ROWS个值（连同段号）哈希为一个64位有符号整数，可直接存入BIGINT"""
+    return [
+        int.from_bytes(
+            hashlib.blake2b(
+                _BAND_FORMAT.pack(band, *signature[band * BAND_ROWS:(band + 1) * BAND_ROWS]), digest_size=8
+            ).digest(),
+            "little", signed=True,
+        )
+        for band in range(BANDS)
+    ]
+
+
+def pack_signature(signature: Signature) -> bytes:
+    return _SIGNATURE_FORMAT.pack(*signature)
+
+
+def unpack_signature(data: bytes) -> Signature:
+    return _SIGNATURE_FORMAT.unpack(data)
+
+
+def item_text(item: Dict[str, Any]) -> str:
+    return f"{item.get('title') or ''}\n{item.get('text') or ''}"
+
+
+def item_key(item: Dict[str, Any]) -> str:
+    """条目在信息源内的标识：有链接时用链接，否则用标题和发布时间"""
+    raw = item.get("link") or f"{item.get('title') or ''}\n{item.get('published') or ''}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+class MinHashIndex:
+    """内存中的LSH索引：按分段键分桶，查找时只比较至少有一段相同的签名"""
+
+    def __init__(self):
+        self._buckets: Dict[int, List[Tuple[Signature, Hashable, Any]]] = defaultdict(list)
+
+    def add(self, signature: Signature, key: Hashable, payload: Any = None, keys: Optional[List[int]] = None) -> None:
+        for band_key in keys or band_keys(signature):
+            self._buckets[band_key].append((signature, key, payload))
+
+    def find(
+        self,
+        signature: Signature,
+        ignore: Optional[Callable[[Hashable], bool]] = None,
+        threshold: float = settings.DEDUP_SIMILARITY,
+        keys: Optional[List[int]] = None,
+    ) -> Optional[Tuple[Hashable, Any]]:
+        """返回相似度最高且不低于阈值的(key, payload)，忽略ignore(key)为真的签名"""
+        best, best_similarity = None, 0.0
+        for band_key in keys or band_keys(signature):
+            for candidate, key, payload in self._buckets.get(band_key, ()):
+                if ignore is not None and ignore(key):
+                    continue
+                value = similarity(signature, candidate)
+                if value >= threshold and value > best_similarity:
+                    best, best_similarity = (key, payload), value
+        return best
+
+
+def dedup_source_types() -> Set[str]:
+    return {value.strip() for value in settings.DEDUP_SOURCE_TYPES.split(",") if value.strip()}
+
+
+def dedup_owners(sources: Iterable[Source]) -> Dict[str, int]:
+    """参与近似重复检测的信息源 -> 所属用户"""
+    if not settings.DEDUP_ENABLED:
+        return {}
+    types = dedup_source_types()
+    return {source.id: source.user_id for source in sources if source.type in types and source.user_id is not None}
+
+
+def dedupe_fetch_results(db: Session, results: List[FetchResult], owners: Dict[str, int]) -> int:
+    """为新抓取的条目计算签名，与同一用户时间窗口内在其他信息源出现过的条目比较并标记近似重复
+    （同一信息源的条目之间不比较，再次抓取到的条目也不会被标记为自身的重复），
+    重复条目不计入result.content（全部重复时保留原正文）；新指纹写入会话，随抓取结果一起提交。返回标记的条目数
+    """
+    now = datetime.now(timezone.utc)
+    since = now - timedelta(days=settings.DEDUP_WINDOW_DAYS)
+    entries: Dict[int, List[Tuple[FetchResult, Dict[str, Any], str, Signature, List[int]]]] = defaultdict(list)
+    for result in results:
+        user_id = owners.get(result.source_id)
+        if user_id is None or result.error is not None or result.not_modified:
+            continue
+        for item in result.items:
+            item.pop("duplicate_of", None)
+            signature = minhash(item_text(item))
+            if signature is None:
+                continue
+            entries[user_id].append((result, item, item_key(item), signature, band_keys(signature)))
+
+    marked = 0
+    for user_id, user_entries in entries.items():
+        known = fingerprint_repository.get_by_keys(db, [(result.source_id, key) for result, _, key, *_ in user_entries])
+        index = MinHashIndex()
+        for row in fingerprint_repository.find_candidates(
+            db, user_id, {band_key for *_, keys in user_entries for band_key in keys}, since
+        ):
+            index.add(unpack_signature(row.signature), (row.source_id, row.item_key), {
+                "source_id": row.source_id, "title": row.title, "link": row.link,
+            })
+
+        new_rows, seen_ids = [], []
+        for result, item, key, signature, keys in user_entries:
+            match = index.find(signature, ignore=lambda candidate: candidate[0] == result.source_id, keys=keys)
+            if match is not None:
+                item["duplicate_of"] = match[1]
+                marked += 1
+                continue
+            if (result.source_id, key) in known:
+                if known[(result.source_id, key)] is not None:
+                    seen_ids.append(known[(result.source_id, key)][0])
+            else:
+                known[(result.source_id, key)] = None
+                new_rows.append(({
+                    "user_id": user_id, "source_id": result.source_id, "item_key": key,
+                    "title": item.get("title"), "link": item.get("link"),
+                    "signature": pack_signature(signature), "seen_at": now,
+                }, keys))
+            index.add(signature, (result.source_id, key), {
+                "source_id": result.source_id, "title": item.get("title"), "link": item.get("link"),
+            }, keys=keys)
+        fingerprint_repository.save(db, user_id, new_rows, seen_ids, now, prune_before=since)
+
+    for result in {id(result): result for user_entries in entries.values() for result, *_ in user_entries}.values():
+        kept = [item for item in result.items if not item.get("duplicate_of")]
+        result.content = render_content(kept or result.items, settings.FETCH_MAX_CONTENT_CHARS)
+    return marked
+
+
+def dedupe_source_items(db: Session, rows: List[Tuple[str, List[Dict[str, Any]]]]) -> List[List[Dict[str, Any]]]:
+    """生成摘要前按信息源顺序去重：去掉抓取时已标记为重复的条目，以及与前面已保留条目近似重复的条目
+    （只有参与检测的信息源的条目在抓取时记录了签名）
+    """
+    keyed = [[(item, item_key(item)) for item in items if not item.get("duplicate_of")] for _, items in rows]
+    signatures = fingerprint_repository.get_by_keys(
+        db, [(source_id, key) for (source_id, _), items in zip(rows, keyed) for _, key in items]
+    )
+    index = MinHashIndex()
+    kept_lists = []
+    for (source_id, _), items in zip(rows, keyed):
+        kept = []
+        for item, key in items:
+            known = signatures.get((source_id, key))
+            if known is not None:
+                signature = unpack_signature(known[1])
+                keys = band_keys(signature)
+                if index.find(signature, keys=keys) is not None:
+                    continue
+                index.add(signature, id(item), keys=keys)
+            kept.append(item)
+        kept_lists.append(kept)
+    return kept_lists
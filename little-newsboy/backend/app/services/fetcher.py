@@ -0,0 +1,495 @@
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from html.parser import HTMLParser
+from urllib.parse import quote, urlparse
+import asyncio
+import hashlib
+import ipaddress
+import json
+import re
+import socket
+import time
+import xml.etree.ElementTree as ET
+
+import httpx
+from pydantic import BaseModel
+
+from app.config import settings
+from app.db.models.source import SourceType
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_CHARSET_PATTERN = re.compile(r"charset=[\"']?([\w.:-]+)")
+
+
+# 抓取目标：信息源字段和上次抓取校验信息的快照，与数据库会话解耦
+class FetchTarget(BaseModel):
+    id: str
+    type: SourceType
+    url: str
+    filters: Optional[Dict[str, Any]] = None
+    credentials: Optional[Dict[str, Any]] = None
+    previous_url: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @classmethod
+    def from_source(cls, source: Any, previous: Optional[Any] = None) -> "FetchTarget":
+        target = cls(
+            id=source.id,
+            type=source.type,
+            url=source.url,
+            filters=source.filters,
+            credentials=source.credentials,
+        )
+        if previous is not None:
+            target.previous_url = previous.url
+            target.etag = previous.etag
+            target.last_modified = previous.last_modified
+        return target
+
+
+# 抓取结果模型
+class FetchResult(BaseModel):
+    source_id: str
+    url: str
+    status_code: Optional[int] = None
+    not_modified: bool = False  # 服务器返回304，沿用上次内容
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_type: Optional[str] = None
+    content_hash: Optional[str] = None
+    bytes: int = 0
+    truncated: bool = False
+    duration_ms: int = 0
+    items: List[Dict[str, Any]] = []
+    content: Optional[str] = None
+    error: Optional[str] = None
+
+
+class _TextExtractor(HTMLParser):
+    """提取HTML中的标题和正文文本，忽略脚本和样式"""
+    _SKIP_TAGS = {"script", "style", "noscript", "template", "svg"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self._parts: List[str] = []
+        self._skip = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP_TAGS:
+            self._skip += 1
+        elif tag == "title":
+            self._in_title = True
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIP_TAGS and self._skip:
+            self._skip -= 1
+        elif tag == "title":
+            self._in_title = False
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        if self._in_title:
+            self.title += data
+        else:
+            self._parts.append(data)
+
+    def text(self) -> str:
+        return _WHITESPACE_PATTERN.sub(" ", " ".join(self._parts)).strip()
+
+
+def html_to_text(value: Optional[str]) -> str:
+    """去掉HTML标签，返回压缩空白后的纯文本"""
+    if not value:
+        return ""
+    if "<" not in value:
+        return _WHITESPACE_PATTERN.sub(" ", value).strip()
+    parser = _TextExtractor()
+    parser.feed(value)
+    parser.close()
+    return parser.text()
+
+
+def _item(title: Any, link: Any = None, text: Any = None, published: Any = None) -> Dict[str, Any]:
+    return {
+        "title": html_to_text(str(title)) if title else "",
+        "link": str(link).strip() if link else None,
+        "published": str(published).strip() if published else None,
+        "text": html_to_text(str(text)) if text else "",
+    }
+
+
+def _parse_feed(root: ET.Element, max_items: int) -> List[Dict[str, Any]]:
+    """解析RSS 2.0 / RSS 1.0 / Atom（含arXiv API）"""
+    items = []
+    if root.tag == f"{_ATOM}feed":
+        for entry in root.iter(f"{_ATOM}entry"):
+            link = entry.find(f"{_ATOM}link[@rel='alternate']")
+            if link is None:
+                link = entry.find(f"{_ATOM}link")
+            items.append(_item(
+                entry.findtext(f"{_ATOM}title"),
+                link.get("href") if link is not None else None,
+                entry.findtext(f"{_ATOM}summary") or entry.findtext(f"{_ATOM}content"),
+                entry.findtext(f"{_ATOM}updated") or entry.findtext(f"{_ATOM}published"),
+            ))
+            if len(items) >= max_items:
+                break
+        return items
+
+    # RSS的item可能带命名空间（RSS 1.0/RDF），按本地名匹配
+    for element in root.iter():
+        if not element.tag.rsplit("}", 1)[-1] == "item":
+            continue
+        fields = {child.tag.rsplit("}", 1)[-1]: (child.text or "") for child in element}
+        items.append(_item(
+            fields.get("title"),
+            fields.get("link"),
+            fields.get("description") or fields.get("encoded"),
+            fields.get("pubDate") or fields.get("date"),
+        ))
+        if len(items) >= max_items:
+            break
+    return items
+
+
+def _github_event_text(event: Dict[str, Any]) -> str:
+    """把GitHub事件的payload压缩为一段说明文字"""
+    payload = event.get("payload") or {}
+    parts = []
+    for commit in payload.get("commits") or []:
+        parts.append(commit.get("message", ""))
+    for key in ("pull_request", "issue", "release"):
+        obj = payload.get(key)
+        if isinstance(obj, dict):
+            parts.append(obj.get("title") or obj.get("name") or "")
+            parts.append(obj.get("body") or "")
+    comment = payload.get("comment")
+    if isinstance(comment, dict):
+        parts.append(comment.get("body") or "")
+    return "\n".join(part for part in parts if part)
+
+
+def _parse_json(data: Any, max_items: int) -> List[Dict[str, Any]]:
+    """解析JSON响应：GitHub事件列表或通用的条目列表"""
+    if isinstance(data, dict):
+        data = data.get("items") or data.get("data") or [data]
+    if not isinstance(data, list):
+        return []
+    items = []
+    for entry in data[:max_items]:
+        if not isinstance(entry, dict):
+            continue
+        if "type" in entry and isinstance(entry.get("repo"), dict):
+            actor = (entry.get("actor") or {}).get("login", "")
+            items.append(_item(
+                f"{entry['type']} {entry['repo'].get('name', '')} {actor}".strip(),
+                None,
+                _github_event_text(entry),
+                entry.get("created_at"),
+            ))
+        else:
+            items.append(_item(
+                entry.get("title") or entry.get("name") or entry.get("full_name"),
+                entry.get("html_url") or entry.get("url"),
+                entry.get("body") or entry.get("description") or entry.get("summary"),
+                entry.get("published_at") or entry.get("created_at") or entry.get("updated_at"),
+            ))
+    return items
+
+
+def parse_items(body: bytes, content_type: str, max_items: int) -> List[Dict[str, Any]]:
+    """根据响应类型解析出条目列表（JSON、RSS/Atom或HTML）"""
+    content_type = (content_type or "").lower()
+    head = body[:512].lstrip().lower()
+
+    if "json" in content_type or head[:1] in (b"[", b"{"):
+        try:
+            return _parse_json(json.loads(body), max_items)
+        except ValueError:
+            pass
+
+    if "xml" in content_type or "rss" in content_type or "atom" in content_type \
+            or head.startswith((b"<?xml", b"<rss", b"<feed", b"<rdf")):
+        try:
+            return _parse_feed(ET.fromstring(body), max_items)
+        except ET.ParseError:
+            pass
+
+    charset = _CHARSET_PATTERN.search(content_type)
+    try:
+        html = body.decode(charset.group(1) if charset else "utf-8", errors="replace")
+    except LookupError:
+        html = body.decode("utf-8", errors="replace")
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    text = parser.text()
+    if not text:
+        return []
+    return [_item(parser.title.strip(), None, text)]
+
+
+def render_content(items: List[Dict[str, Any]], max_chars: int) -> str:
+    """把条目拼接为摘要模型的输入正文"""
+    blocks = []
+    for item in items:
+        lines = [line for line in (item.get("title"), item.get("link"), item.get("text")) if line]
+        if lines:
+            blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)[:max_chars]
+
+
+def _github_request(source: Any) -> Tuple[str, Dict[str, str]]:
+    """GitHub仓库或用户主页转换为事件API"""
+    headers = {"Accept": "application/vnd.github+json"}
+    token = (source.credentials or {}).get("token")
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+
+    parsed = urlparse(source.url)
+    if parsed.netloc not in ("github.com", "www.github.com"):
+        return source.url, headers
+    parts = [part for part in parsed.path.split("/") if part]
+    per_page = min(settings.FETCH_MAX_ITEMS, 100)
+    base = settings.FETCH_GITHUB_API_URL.rstrip("/")
+    if len(parts) >= 2:
+        return f"{base}/repos/{parts[0]}/{parts[1]}/events?per_page={per_page}", headers
+    if len(parts) == 1:
+        return f"{base}/users/{parts[0]}/events/public?per_page={per_page}", headers
+    return source.url, headers
+
+
+def _arxiv_request(source: Any) -> Tuple[str, Dict[str, str]]:
+    """arXiv分类列表页或检索条件转换为arXiv API查询"""
+    headers = {"Accept": "application/atom+xml"}
+    query = (source.filters or {}).get("query")
+    if not query:
+        parsed = urlparse(source.url)
+        parts = [part for part in parsed.path.split("/") if part]
+        if parsed.netloc.endswith("arxiv.org") and len(parts) >= 2 and parts[0] == "list":
+            query = f"cat:{parts[1]}"
+    if not query:
+        return source.url, headers
+    base = settings.FETCH_ARXIV_API_URL.rstrip("/")
+    return (
+        f"{base}/api/query?search_query={quote(query)}"
+        f"&sortBy=submittedDate&sortOrder=descending&max_results={settings.FETCH_MAX_ITEMS}",
+        headers,
+    )
+
+
+def _feed_request(source: Any) -> Tuple[str, Dict[str, str]]:
+    """博客、社区和新闻源直接请求订阅地址或页面"""
+    return source.url, {
+        "Accept": "application/rss+xml, application/atom+xml, application/xml;q=0.9, text/html;q=0.8, */*;q=0.5"
+    }
+
+
+# 各类型信息源的请求构造方式
+REQUEST_BUILDERS = {
+    SourceType.GITHUB: _github_request,
+    SourceType.ARXIV: _arxiv_request,
+    SourceType.BLOG: _feed_request,
+    SourceType.COMMUNITY: _feed_request,
+    SourceType.NEWS: _feed_request,
+}
+
+
+class UnsafeAddressError(Exception):
+    """抓取地址不是http(s)，或解析到本机、内网、链路本地（含云厂商元数据服务）等非公网地址"""
+
+
+async def _resolve(host: str, port: int) -> List[str]:
+    """解析主机名的全部地址（在事件循环的线程池中执行）"""
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return [info[4][0] for info in infos]
+
+
+def _is_public(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if ip.version == 6 and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def _parse_body(result: FetchResult, data: bytes) -> None:
+    """解析响应体并生成正文（在线程池中执行，不阻塞事件循环）"""
+    result.bytes = len(data)
+    result.content_hash = hashlib.sha256(data).hexdigest()
+    result.items = parse_items(data, result.content_type, settings.FETCH_MAX_ITEMS)
+    result.content = render_content(result.items, settings.FETCH_MAX_CONTENT_CHARS)
+
+
+class _HostLimit:
+    """单个主机的并发信号量，以及正在使用或等待它的抓取数"""
+    __slots__ = ("semaphore", "users")
+
+    def __init__(self):
+        self.semaphore = asyncio.Semaphore(max(1, settings.FETCH_PER_HOST_LIMIT))
+        self.users = 0
+
+
+class SourceFetcher:
+    """信息源抓取引擎：共享连接池、全局及单主机并发限制、条件请求和流式读取"""
+
+    def __init__(
+        self,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        resolver: Optional[Callable[[str, int], Awaitable[List[str]]]] = None,
+    ):
+        # 可注入自定义transport（如httpx.MockTransport）和域名解析用于测试
+        self.transport = transport
+        self.resolver = resolver or _resolve
+        self._client: Optional[httpx.AsyncClient] = None
+        self._limiter: Optional[asyncio.Semaphore] = None
+        # 只保留有抓取进行中或排队的主机，数量不超过并发抓取数
+        self._host_limits: Dict[str, _HostLimit] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """获取共享客户端（未启动时按需创建）"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                transport=self.transport,
+                follow_redirects=True,
+                # 每次请求（包括每一跳重定向）发出前检查目标地址
+                event_hooks={"request": [self._check_address]},
+                headers={"User-Agent": settings.FETCH_USER_AGENT},
+                limits=httpx.Limits(
+                    max_connections=settings.FETCH_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.FETCH_MAX_KEEPALIVE_CONNECTIONS,
+                ),
+                timeout=httpx.Timeout(
+                    settings.FETCH_READ_TIMEOUT,
+                    connect=settings.FETCH_CONNECT_TIMEOUT,
+                ),
+            )
+        return self._client
+
+    async def _check_address(self, request: httpx.Request) -> None:
+        """信息源地址由用户填写，拒绝解析到非公网地址的请求，避免借服务端访问本机和内网服务"""
+        url = request.url
+        if url.scheme not in ("http", "https"):
+            raise UnsafeAddressError(f"不支持的协议：{url.scheme}")
+        if settings.FETCH_ALLOW_PRIVATE_ADDRESSES:
+            return
+        try:
+            addresses = [str(ipaddress.ip_address(url.host))]
+        except ValueError:
+            addresses = await self.resolver(url.host, url.port or (443 if url.scheme == "https" else 80))
+        if not addresses or not all(_is_public(address) for address in addresses):
+            raise UnsafeAddressError(f"拒绝抓取非公网地址：{url.host}")
+
+    def _get_limiter(self) -> asyncio.Semaphore:
+        if self._limiter is None:
+            self._limiter = asyncio.Semaphore(max(1, settings.FETCH_CONCURRENCY))
+        return self._limiter
+
+    @asynccontextmanager
+    async def _host_limit(self, url: str) -> AsyncIterator[None]:
+        """占用主机的并发名额，避免对同一站点并发过高；主机没有其他抓取时移除其信号量"""
+        host = urlparse(url).netloc.lower()
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = _HostLimit()
+        limit.users += 1
+        try:
+            async with limit.semaphore:
+                yield
+        finally:
+            limit.users -= 1
+            if limit.users == 0:
+                del self._host_limits[host]
+
+    async def startup(self) -> None:
+        self._get_client()
+
+    async def shutdown(self) -> None:
+        """释放连接"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def build_request(self, source: Any) -> Tuple[str, Dict[str, str]]:
+        """按信息源类型构造请求地址和请求头"""
+        builder = REQUEST_BUILDERS.get(source.type, _feed_request)
+        return builder(source)
+
+    async def fetch(self, target: FetchTarget) -> FetchResult:
+        """抓取单个信息源；地址未变时携带上次的校验信息发起条件请求"""
+        url, headers = self.build_request(target)
+        if target.previous_url == url:
+            if target.etag:
+                headers["If-None-Match"] = target.etag
+            if target.last_modified:
+                headers["If-Modified-Since"] = target.last_modified
+
+        result = FetchResult(source_id=target.id, url=url)
+        body = bytearray()
+        started = time.monotonic()
+        try:
+            # 先占用主机名额再占用全局名额，避免同一主机的排队请求占满全局并发
+            async with self._host_limit(url), self._get_limiter():
+                started = time.monotonic()
+                await asyncio.wait_for(
+                    self._download(result, url, headers, body), settings.FETCH_TOTAL_TIMEOUT
+                )
+            # 解析在释放连接和并发名额后、在线程池中进行
+            if result.error is None and not result.not_modified:
+                await asyncio.to_thread(_parse_body, result, bytes(body))
+        except asyncio.TimeoutError:
+            result.error = "抓取超时"
+        except UnsafeAddressError as e:
+            result.error = str(e)
+        except httpx.HTTPError as e:
+            result.error = f"{type(e).__name__}: {str(e)}"[:500]
+        except Exception as e:
+            print(f"抓取信息源失败（{target.id}）：{str(e)}")
+            result.error = str(e)[:500]
+        result.duration_ms = int((time.monotonic() - started) * 1000)
+        return result
+
+    async def _download(
+        self, result: FetchResult, url: str, headers: Dict[str, str], body: bytearray
+    ) -> None:
+        """发起请求并流式读取响应体，超出大小上限时截断"""
+        async with self._get_client().stream("GET", url, headers=headers) as response:
+            result.status_code = response.status_code
+            result.etag = response.headers.get("ETag")
+            result.last_modified = response.headers.get("Last-Modified")
+            result.content_type = response.headers.get("Content-Type")
+            if response.status_code == 304:
+                result.not_modified = True
+                return
+            if response.status_code >= 400:
+                result.error = f"HTTP {response.status_code}"
+                return
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                if len(body) > settings.FETCH_MAX_BYTES:
+                    # 不再读取剩余内容，关闭响应即可释放连接
+                    del body[settings.FETCH_MAX_BYTES:]
+                    result.truncated = True
+                    break
+
+    async def fetch_iter(self, targets: Iterable[FetchTarget]) -> AsyncIterator[FetchResult]:
+        """并发抓取多个信息源，按完成顺序产出结果"""
+        tasks = [asyncio.ensure_future(self.fetch(target)) for target in targets]
+        try:
+            for future in asyncio.as_completed(tasks):
+                yield await future
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def fetch_many(self, targets: Iterable[FetchTarget]) -> List[FetchResult]:
+        """并发抓取多个信息源"""
+        return [result async for result in self.fetch_iter(targets)]
+
+
+# 全局抓取引擎实例
+source_fetcher = SourceFetcher()
@@ -0,0 +1,326 @@
+# GitHub项目分析
+# 从GH Archive格式的事件文件（每行一个事件，可gzip压缩）或事件API（可指向本地替身服务）逐条读取事件，
+# 在内存中按仓库、月份合并为增量后分批写入汇总表；分析接口只读取汇总表，不再重新计算。
+import gzip
+import json
+import os
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import httpx
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.repositories.analytics import GitHubAnalyticsRepository, as_utc
+from app.schemas.analytics import (
+    GitHubActivityData, GitHubAnalyticsResponse, GitHubContributorStats, GitHubIssueData
+)
+
+analytics_repository = GitHubAnalyticsRepository()
+
+# 统计周期 -> 月数
+PERIOD_MONTHS = {
+    "last_3_months": 3,
+    "last_6_months": 6,
+    "last_year": 12,
+}
+
+# 没有标签的issue归入的分类名
+UNLABELED = "其他"
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    """value为当月第一天，返回前后若干个月的第一天"""
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _parse_time(value: Any) -> Optional[datetime]:
+    if not isinstance(value, str):
+        return None
+    try:
+        return as_utc(datetime.fromisoformat(value.replace("Z", "+00:00")))
+    except ValueError:
+        return None
+
+
+def _event_id(event: Dict[str, Any]) -> int:
+    try:
+        return int(event.get("id") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _repo_metadata(data: Dict[str, Any]) -> Dict[str, Any]:
+    """仓库API响应或事件中附带的仓库信息 -> 仓库概况"""
+    return {
+        "description": data.get("description") or "",
+        "stars": data.get("stargazers_count") or 0,
+        "forks": data.get("forks_count") or 0,
+        "open_issues": data.get("open_issues_count") or 0,
+        # watchers_count与stargazers_count相同，关注者数为subscribers_count
+        "watchers": data.get("subscribers_count") or data.get("watchers_count") or 0,
+    }
+
+
+class RollupBatch:
+    """一批事件在内存中的增量汇总，同一仓库、同一月份的事件合并后再写入数据库
+
+    watermarks为 仓库 -> 已计入的最大事件ID，ID不大于它的事件已经计入过（如由事件API同步），忽略
+    """
+
+    def __init__(self, watermarks: Optional[Dict[str, int]] = None):
+        self.watermarks = watermarks or {}
+        self.events = 0
+        # full_name -> 仓库概况的增量（最新事件、star/fork/未关闭issue变化、最新概况）
+        self.repos: Dict[str, Dict[str, Any]] = {}
+        self.monthly: Dict[Tuple[str, date], Counter] = defaultdict(Counter)
+        self.daily: Dict[Tuple[str, date], Counter] = defaultdict(Counter)
+        self.contributors: Dict[Tuple[str, date, str], Counter] = defaultdict(Counter)
+        self.avatars: Dict[str, str] = {}
+        self.labels: Dict[Tuple[str, date, str], int] = defaultdict(int)
+
+    def __len__(self) -> int:
+        return self.events
+
+    def _repo(self, full_name: str) -> Dict[str, Any]:
+        if full_name not in self.repos:
+            self.repos[full_name] = {
+                "last_event_at": None, "last_event_id": 0,
+                "stars": 0, "forks": 0, "open_issues": 0,
+                "metadata": None, "metadata_at": None,
+            }
+        return self.repos[full_name]
+
+    def set_metadata(self, full_name: str, data: Dict[str, Any], at: datetime) -> None:
+        """记录某一时刻的仓库概况；此前累计的增量已包含在概况中，清零"""
+        repo = self._repo(full_name)
+        if repo["metadata_at"] is not None and repo["metadata_at"] >= at:
+            return
+        repo.update(metadata=_repo_metadata(data), metadata_at=at, stars=0, forks=0, open_issues=0)
+
+    def _count(self, full_name: str, day: date, counter: str, amount: int = 1) -> None:
+        self.monthly[(full_name, month_start(day))][counter] += amount
+        if counter != "forks":
+            self.daily[(full_name, day)][counter] += amount
+
+    def _contribute(self, full_name: str, day: date, actor: Dict[str, Any], counter: str, amount: int = 1) -> None:
+        login = actor.get("login")
+        if not login or amount <= 0:
+            return
+        self.contributors[(full_name, month_start(day), login)][counter] += amount
+        if actor.get("avatar_url"):
+            self.avatars[login] = actor["avatar_url"]
+
+    def add(self, event: Dict[str, Any], repos: Optional[Set[str]] = None) -> bool:
+        """合并一个事件，返回是否计入（格式不完整、不在repos中或已计入过的事件忽略）"""
+        full_name = (event.get("repo") or {}).get("name")
+        created_at = _parse_time(event.get("created_at"))
+        if not full_name or created_at is None or (repos is not None and full_name not in repos):
+            return False
+        watermark = self.watermarks.get(full_name)
+        if watermark and _event_id(event) <= watermark:
+            return False
+        self.events += 1
+        repo = self._repo(full_name)
+        if repo["last_event_at"] is None or created_at > repo["last_event_at"]:
+            repo["last_event_at"] = created_at
+        repo["last_event_id"] = max(repo["last_event_id"], _event_id(event))
+
+        day = created_at.date()
+        kind = event.get("type")
+        payload = event.get("payload") or {}
+        actor = event.get("actor") or {}
+        action = payload.get("action")
+        if kind == "PushEvent":
+            commits = payload.get("distinct_size", payload.get("size", len(payload.get("commits") or [])))
+            if commits:
+                self._count(full_name, day, "commits", commits)
+                self._contribute(full_name, day, actor, "commits", commits)
+        elif kind == "PullRequestEvent":
+            base = ((payload.get("pull_request") or {}).get("base") or {}).get("repo")
+            if isinstance(base, dict):
+                self.set_metadata(full_name, base, created_at)
+            if action == "opened":
+                self._count(full_name, day, "pull_requests")
+                self._contribute(full_name, day, actor, "pull_requests")
+        elif kind == "IssuesEvent":
+            if action == "opened":
+                self._count(full_name, day, "issues")
+                self._contribute(full_name, day, actor, "issues")
+                labels = [label.get("name") for label in (payload.get("issue") or {}).get("labels") or []]
+                for label in [label for label in labels if label] or [UNLABELED]:
+                    self.labels[(full_name, month_start(day), label)] += 1
+                repo["open_issues"] += 1
+            elif action == "reopened":
+                repo["open_issues"] += 1
+            elif action == "closed":
+                repo["open_issues"] -= 1
+        elif kind == "WatchEvent":
+            self._count(full_name, day, "stars")
+            repo["stars"] += 1
+        elif kind == "ForkEvent":
+            self._count(full_name, day, "forks")
+            repo["forks"] += 1
+        return True
+
+
+def iter_archive_events(path: str, skip: int = 0) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+    """逐行读取GH Archive文件（.json或.json.gz），返回(行号, 事件)，无法解析的行事件为None"""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        for line_number, line in enumerate(f, 1):
+            if line_number <= skip:
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                event = None
+            yield line_number, event if isinstance(event, dict) else None
+
+
+def archive_progress_key(path: str, repos: Optional[Set[str]] = None) -> str:
+    """导入进度的记录键：文件名，有仓库过滤条件时附加排序后的仓库列表"""
+    name = os.path.basename(path)
+    return f"{name}#{','.join(sorted(repos))}" if repos else name
+
+
+def ingest_archive(
+    db: Session,
+    path: str,
+    repos: Optional[Iterable[str]] = None,
+    batch_size: int = settings.GITHUB_INGEST_BATCH_SIZE,
+) -> int:
+    """导入一个GH Archive文件，每batch_size行写入一次汇总和读取进度；已导入的文件跳过，中断后从进度处继续
+
+    repos为空时导入文件中的全部仓库，返回计入的事件数。进度按文件名和仓库过滤条件分别记录，
+    同一文件可以分几次导入不同的仓库。仓库已计入的事件（ID不大于仓库的last_event_id，来自事件API同步
+    或此前的导入）不再重复计入，因此同一仓库的文件需按时间顺序导入。
+    """
+    repo_filter = set(repos) if repos else None
+    name = archive_progress_key(path, repo_filter)
+    progress = analytics_repository.get_archive_file(db, name)
+    if progress is not None and progress.completed:
+        return 0
+    lines = progress.lines if progress is not None else 0
+    counted = 0
+    # 开始导入前的位置；文件内事件的ID不严格递增，导入过程中不更新
+    watermarks = analytics_repository.get_watermarks(db, repo_filter)
+    batch = RollupBatch(watermarks)
+    for line_number, event in iter_archive_events(path, skip=lines):
+        lines = line_number
+        if event is not None:
+            batch.add(event, repo_filter)
+        if line_number % batch_size == 0:
+            counted += len(batch)
+            analytics_repository.save_batch(db, batch, archive_file=(name, lines, len(batch), False))
+            batch = RollupBatch(watermarks)
+    counted += len(batch)
+    analytics_repository.save_batch(db, batch, archive_file=(name, lines, len(batch), True))
+    return counted
+
+
+async def sync_repo_events(db: Session, full_name: str, client: httpx.AsyncClient) -> int:
+    """从事件API增量同步一个仓库：只计入ID大于上次同步位置的事件，并以仓库API的概况为准
+
+    事件API按时间倒序分页返回，遇到已同步的事件即停止翻页；返回计入的事件数
+    """
+    base = settings.FETCH_GITHUB_API_URL.rstrip("/")
+    repo = analytics_repository.get_repo(db, full_name)
+    watermark = repo.last_event_id if repo is not None and repo.last_event_id else 0
+    events: List[Dict[str, Any]] = []
+    for page in range(1, settings.GITHUB_EVENTS_MAX_PAGES + 1):
+        response = await client.get(f"{base}/repos/{full_name}/events", params={"per_page": 100, "page": page})
+        response.raise_for_status()
+        page_events = [event for event in response.json() if isinstance(event, dict)]
+        new_events = [event for event in page_events if _event_id(event) > watermark]
+        events.extend(new_events)
+        if len(page_events) < 100 or len(new_events) < len(page_events):
+            break
+
+    batch = RollupBatch()
+    for event in sorted(events, key=_event_id):
+        batch.add(event, {full_name})
+    response = await client.get(f"{base}/repos/{full_name}")
+    if response.status_code == 200:
+        batch.set_metadata(full_name, response.json(), datetime.now(timezone.utc))
+    analytics_repository.save_batch(db, batch)
+    return len(batch)
+
+
+def github_client() -> httpx.AsyncClient:
+    headers = {"Accept": "application/vnd.github+json", "User-Agent": settings.FETCH_USER_AGENT}
+    if settings.GITHUB_TOKEN:
+        headers["Authorization"] = f"Bearer {settings.GITHUB_TOKEN}"
+    return httpx.AsyncClient(
+        headers=headers,
+        timeout=httpx.Timeout(settings.FETCH_READ_TIMEOUT, connect=settings.FETCH_CONNECT_TIMEOUT),
+    )
+
+
+def build_github_analytics(db: Session, repo_name: str, period: str) -> Optional[GitHubAnalyticsResponse]:
+    """由汇总表组装分析数据，仓库不存在时返回None
+
+    统计窗口以仓库最近一次事件所在月份为终点，离线导入的历史数据同样可以查看
+    """
+    repo = analytics_repository.get_repo(db, repo_name)
+    if repo is None:
+        return None
+    months = PERIOD_MONTHS.get(period, 6)
+    last_event_at = as_utc(repo.last_event_at) or datetime.now(timezone.utc)
+    end_month = month_start(last_event_at.date())
+    start_month = add_months(end_month, -(months - 1))
+
+    monthly = {row.month: row for row in analytics_repository.get_monthly(db, repo.id, start_month)}
+    activity_data = []
+    for i in range(months):
+        month = add_months(start_month, i)
+        row = monthly.get(month)
+        activity_data.append(GitHubActivityData(
+            name=month.strftime("%m月"),
+            commits=row.commits if row else 0,
+            pull_requests=row.pull_requests if row else 0,
+            issues=row.issues if row else 0,
+            stars=row.stars if row else 0,
+        ))
+
+    contributors = [
+        GitHubContributorStats(
+            name=row.login,
+            commits=row.commits,
+            pull_requests=row.pull_requests,
+            issues=row.issues,
+            avatar=row.avatar_url,
+            profile_url=f"https://github.com/{row.login}",
+        )
+        for row in analytics_repository.get_top_contributors(
+            db, repo.id, start_month, limit=settings.GITHUB_TOP_CONTRIBUTORS
+        )
+    ]
+    issue_categories = [
+        GitHubIssueData(name=label, count=count)
+        for label, count in analytics_repository.get_issue_labels(db, repo.id, start_month, limit=6)
+    ]
+
+    return GitHubAnalyticsResponse(
+        name=repo.name,
+        full_name=repo.full_name,
+        description=repo.description or "",
+        stars=repo.stars or 0,
+        forks=repo.forks or 0,
+        open_issues=repo.open_issues or 0,
+        watchers=repo.watchers or 0,
+        last_updated=last_event_at,
+        activity_data=activity_data,
+        contributors=contributors,
+        issue_categories=issue_categories,
+        commit_count_30d=analytics_repository.sum_daily_commits(
+            db, repo.id, last_event_at.date() - timedelta(days=29)
+        ),
+        active_contributors=analytics_repository.count_contributors(db, repo.id, start_month),
+    )
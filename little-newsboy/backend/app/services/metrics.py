@@ -0,0 +1,102 @@
+# 运行指标
+# 基于prometheus_client，使用独立的CollectorRegistry（不含默认的进程和平台指标），由GET /metrics输出。
+# 指标按进程统计：Celery worker进程内的模型调用不会出现在API进程的/metrics中，队列深度在采集时从数据库读取。
+from typing import Callable, Iterable, Sequence, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, disable_created_metrics, generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# 不输出各计数器和直方图的*_created时间戳样本
+disable_created_metrics()
+
+LabelValues = Tuple[str, ...]
+
+# HTTP接口和SQL语句的耗时分桶（秒）
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 模型调用耗时较长
+AI_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+registry = CollectorRegistry()
+
+
+class CallbackCollector:
+    """在采集时调用collect计算的指标，collect返回 (标签值, 数值) 列表
+
+    用于把已有的统计（如各缓存的stats()）和需要查询的值（如任务队列深度）输出为指标，
+    不必在它们的代码路径上另外计数。collect出错（如数据库不可用）时跳过该指标，不影响其余指标。
+    """
+
+    _FAMILIES = {"counter": CounterMetricFamily, "gauge": GaugeMetricFamily}
+
+    def __init__(
+        self,
+        metric_type: str,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        collect: Callable[[], Iterable[Tuple[LabelValues, float]]] = lambda: (),
+    ):
+        self._family = self._FAMILIES[metric_type]
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._collect = collect
+
+    def _new_family(self):
+        return self._family(self.name, self.documentation, labels=self.labelnames)
+
+    def describe(self):
+        # 注册时只取指标名，不调用collect
+        return [self._new_family()]
+
+    def collect(self):
+        family = self._new_family()
+        try:
+            for values, value in self._collect():
+                family.add_metric([str(label) for label in values], value)
+        except Exception as e:
+            metrics_collect_errors_total.labels(self.name).inc()
+            print(f"指标{self.name}采集失败：{str(e)}")
+            return
+        yield family
+
+
+http_requests_total = Counter(
+    "http_requests_total", "按路由模板、方法和状态码统计的HTTP请求数",
+    ("method", "route", "status"), registry=registry,
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "按路由模板统计的HTTP请求耗时（至响应最后一个字节发出）",
+    ("method", "route"), buckets=DEFAULT_BUCKETS, registry=registry,
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress", "正在处理的HTTP请求数", ("method",), registry=registry,
+)
+db_statement_duration_seconds = Histogram(
+    "db_statement_duration_seconds", "按引擎和语句类型统计的SQL语句执行耗时",
+    ("engine", "operation"), buckets=DEFAULT_BUCKETS, registry=registry,
+)
+db_statement_errors_total = Counter(
+    "db_statement_errors_total", "执行出错的SQL语句数", ("engine", "operation"), registry=registry,
+)
+ai_request_duration_seconds = Histogram(
+    "ai_request_duration_seconds", "模型调用耗时（流式调用至输出结束）",
+    ("provider", "model", "mode"), buckets=AI_BUCKETS, registry=registry,
+)
+ai_request_errors_total = Counter(
+    "ai_request_errors_total", "按异常类型统计的模型调用失败次数",
+    ("provider", "model", "mode", "error"), registry=registry,
+)
+metrics_collect_errors_total = Counter(
+    "metrics_collect_errors_total", "采集时计算的指标出错的次数", ("metric",), registry=registry,
+)
+
+
+def render() -> bytes:
+    """按Prometheus文本格式输出全部指标"""
+    return generate_latest(registry)
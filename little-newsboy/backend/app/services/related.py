@@ -0,0 +1,172 @@
+# 相关摘要检索
+# 每个用户的摘要向量在内存中保存为一个float32矩阵（每行一条摘要，单位长度），查找时矩阵乘以查询向量即得到
+# 全部余弦相似度，再用argpartition取前k个。矩阵从summary_vectors增量同步：表的ID单调递增，摘要的每次变化
+# （新建、重新计算、删除时的墓碑行）都是一个新行，每次查找前只读取上次同步之后写入的行。
+# 摘要也可能由Celery worker等其他进程写入，因此以数据库为准，而不是在本进程的写入路径上维护。
+# 墓碑行只保留RELATED_TOMBSTONE_TTL_SECONDS，超过该时长未同步的索引可能错过已清理的墓碑行，因此整体重建。
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.models.summary import SummaryVector
+from app.db.vectors import DIMENSIONS, from_bytes
+
+# 同步时每批读取的向量行数
+SYNC_BATCH_SIZE = 5000
+# 批量查找时每批的查询向量数，限制相似度矩阵的大小
+QUERY_BATCH_SIZE = 64
+
+
+class _UserIndex:
+    """一个用户的向量矩阵；删除的行清零并留作复用"""
+
+    def __init__(self):
+        self.reset()
+        self.lock = threading.Lock()
+
+    def reset(self) -> None:
+        self.matrix = np.zeros((0, DIMENSIONS), dtype=np.float32)
+        self.ids: List[Optional[str]] = []
+        self.positions: Dict[str, int] = {}
+        self.free: List[int] = []
+        # 已同步的最大summary_vectors.id，以及上次同步开始的时间（time.monotonic）
+        self.last_id = 0
+        self.synced_at: Optional[float] = None
+
+    def put(self, summary_id: str, vector: np.ndarray) -> None:
+        position = self.positions.get(summary_id)
+        if position is None:
+            position = self.free.pop() if self.free else self._append()
+            self.positions[summary_id] = position
+            self.ids[position] = summary_id
+        self.matrix[position] = vector
+
+    def _append(self) -> int:
+        position = len(self.ids)
+        if position == self.matrix.shape[0]:
+            # 容量按倍数增长，均摊后每行复制一次
+            grown = np.zeros((max(16, position * 2), DIMENSIONS), dtype=np.float32)
+            grown[:position] = self.matrix[:position]
+            self.matrix = grown
+        self.ids.append(None)
+        return position
+
+    def remove(self, summary_id: str) -> None:
+        position = self.positions.pop(summary_id, None)
+        if position is not None:
+            self.matrix[position] = 0
+            self.ids[position] = None
+            self.free.append(position)
+
+    def search(self, summary_ids: List[str], limit: int) -> Dict[str, List[Tuple[str, float]]]:
+        """批量查找：每个查询一行相似度，排除自身和已删除的行"""
+        results: Dict[str, List[Tuple[str, float]]] = {}
+        queries = [(id, self.positions[id]) for id in summary_ids if id in self.positions]
+        size = len(self.ids)
+        matrix = self.matrix[:size]
+        for start in range(0, len(queries), QUERY_BATCH_SIZE):
+            batch = queries[start:start + QUERY_BATCH_SIZE]
+            scores = matrix[[position for _, position in batch]] @ matrix.T
+            for row, (summary_id, position) in enumerate(batch):
+                scores[row, position] = -np.inf
+            k = min(limit, size - 1)
+            if k <= 0:
+                results.update((summary_id, []) for summary_id, _ in batch)
+                continue
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            for row, (summary_id, _) in enumerate(batch):
+                order = top[row][np.argsort(-scores[row, top[row]])]
+                # 已删除的行和没有共同特征的摘要相似度不大于0
+                results[summary_id] = [
+                    (self.ids[position], float(scores[row, position]))
+                    for position in order if scores[row, position] > 0 and self.ids[position] is not None
+                ]
+        return results
+
+
+class RelatedIndex:
+    """按用户缓存向量矩阵（LRU，最多RELATED_INDEX_MAX_USERS个用户），查找前从数据库增量同步"""
+
+    def __init__(
+        self,
+        max_users: int = settings.RELATED_INDEX_MAX_USERS,
+        tombstone_ttl: float = settings.RELATED_TOMBSTONE_TTL_SECONDS,
+    ):
+        self.max_users = max_users
+        self.tombstone_ttl = tombstone_ttl
+        self._indexes: "OrderedDict[int, _UserIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.queries = 0
+        self.synced_rows = 0
+        self.rebuilds = 0
+
+    def _get(self, user_id: int) -> _UserIndex:
+        with self._lock:
+            index = self._indexes.get(user_id)
+            if index is None:
+                index = self._indexes[user_id] = _UserIndex()
+            self._indexes.move_to_end(user_id)
+            while len(self._indexes) > self.max_users:
+                self._indexes.popitem(last=False)
+            return index
+
+    def _sync(self, db: Session, user_id: int, index: _UserIndex) -> None:
+        """读取上次同步之后写入的行：有向量的加入或替换，墓碑行移除"""
+        started = time.monotonic()
+        if index.synced_at is not None and started - index.synced_at > self.tombstone_ttl:
+            index.reset()
+            self.rebuilds += 1
+        index.synced_at = started
+        max_id = db.scalar(select(func.max(SummaryVector.id)).where(SummaryVector.user_id == user_id))
+        if max_id is None or max_id <= index.last_id:
+            return
+        rows = db.execute(
+            select(SummaryVector.id, SummaryVector.summary_id, SummaryVector.vector)
+            .where(SummaryVector.user_id == user_id, SummaryVector.id > index.last_id)
+            .order_by(SummaryVector.id)
+            .execution_options(yield_per=SYNC_BATCH_SIZE)
+        )
+        for id, summary_id, vector in rows:
+            if vector is None:
+                index.remove(summary_id)
+            else:
+                index.put(summary_id, from_bytes(vector))
+            index.last_id = id
+            self.synced_rows += 1
+
+    def search(
+        self, db: Session, user_id: int, summary_ids: List[str], limit: int = 10
+    ) -> Dict[str, List[Tuple[str, float]]]:
+        """返回每条摘要最相关的limit条摘要及余弦相似度（降序）；没有向量的摘要结果为空"""
+        index = self._get(user_id)
+        with index.lock:
+            self._sync(db, user_id, index)
+            results = index.search(summary_ids, limit)
+        self.queries += 1
+        return {summary_id: results.get(summary_id, []) for summary_id in summary_ids}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._indexes.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            users = len(self._indexes)
+            rows = sum(len(index.positions) for index in self._indexes.values())
+        return {
+            "users": users,
+            "rows": rows,
+            "queries": self.queries,
+            "synced_rows": self.synced_rows,
+            "rebuilds": self.rebuilds,
+        }
+
+
+related_index = RelatedIndex()
@@ -0,0 +1,187 @@
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+import heapq
+import random
+import time
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.models.source import Priority, Status, UpdateFrequency
+from app.db.repositories.source import SourceScheduleRepository
+
+# 各刷新频率对应的间隔（秒）
+FREQUENCY_INTERVALS = {
+    UpdateFrequency.REALTIME: settings.SCHEDULER_REALTIME_INTERVAL,
+    UpdateFrequency.DAILY: 24 * 3600,
+    UpdateFrequency.WEEKLY: 7 * 24 * 3600,
+}
+
+# 同时到期时按优先级派发，数值越小越先派发
+PRIORITY_RANKS = {
+    Priority.HIGH: 0,
+    Priority.MEDIUM: 1,
+    Priority.LOW: 2,
+}
+
+
+def _interval(frequency: Optional[UpdateFrequency]) -> int:
+    return FREQUENCY_INTERVALS.get(frequency, FREQUENCY_INTERVALS[UpdateFrequency.DAILY])
+
+
+def _timestamp(value: datetime) -> float:
+    # SQLite读回的时间不带时区，按UTC处理
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def next_run_time(frequency: Optional[UpdateFrequency], base: datetime, rng: random.Random) -> datetime:
+    """下次刷新时间：一个刷新间隔加上随机浮动，避免同频率的信息源长期集中在同一时刻"""
+    interval = _interval(frequency)
+    jitter = interval * settings.SCHEDULER_JITTER_RATIO
+    return base + timedelta(seconds=interval + rng.uniform(-jitter, jitter))
+
+
+def initial_run_time(frequency: Optional[UpdateFrequency], now: datetime, rng: random.Random) -> datetime:
+    """首次调度时间在分散窗口内均匀分布，避免大量新信息源同时触发"""
+    spread = min(_interval(frequency), settings.SCHEDULER_INITIAL_SPREAD_SECONDS)
+    return now + timedelta(seconds=rng.uniform(0, spread))
+
+
+class RefreshScheduler:
+    """
+    信息源刷新调度器
+
+    内存中维护按下次刷新时间排序的最小堆，到期的信息源按优先级分批投递刷新任务；
+    下次刷新时间持久化在source_schedules表中，进程重启后从数据库恢复。
+    信息源的新增、暂停和频率变化在定期重新同步时生效，派发前还会再确认一次状态。
+    """
+
+    def __init__(
+        self,
+        dispatch: Optional[Callable[[List[str]], None]] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        if dispatch is None:
+            from app.tasks.source import enqueue_source_refresh
+            dispatch = enqueue_source_refresh
+        self.dispatch = dispatch
+        self.rng = rng or random.Random()
+        self.repository = SourceScheduleRepository()
+        # 堆元素为 (到期时间戳, 信息源ID)；被替换或移除的元素在出堆时跳过
+        self._heap: List[Tuple[float, str]] = []
+        # 信息源ID -> (到期时间戳, 优先级序号)
+        self._entries: Dict[str, Tuple[float, int]] = {}
+        self._synced_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def schedule(self, source_id: str, due: float, priority: Optional[Priority]) -> None:
+        """加入或更新信息源的到期时间"""
+        self._entries[source_id] = (due, PRIORITY_RANKS.get(priority, PRIORITY_RANKS[Priority.MEDIUM]))
+        heapq.heappush(self._heap, (due, source_id))
+
+    def unschedule(self, source_id: str) -> None:
+        self._entries.pop(source_id, None)
+
+    def next_due(self) -> Optional[float]:
+        """最近一个到期时间戳"""
+        while self._heap:
+            due, source_id = self._heap[0]
+            entry = self._entries.get(source_id)
+            if entry is not None and entry[0] == due:
+                return due
+            heapq.heappop(self._heap)
+        return None
+
+    def sync(self, db: Session, now: Optional[datetime] = None) -> None:
+        """从数据库重建调度堆，为尚未调度的信息源分配首次刷新时间
+
+        刷新频率调高后，下次刷新时间不晚于上次刷新时间加新频率的间隔
+        """
+        now = now or datetime.now(timezone.utc)
+        new_runs: Dict[str, datetime] = {}
+        self._entries = {}
+        for source_id, frequency, priority, next_run_at, last_run_at in self.repository.get_active(db):
+            if next_run_at is None:
+                next_run_at = initial_run_time(frequency, now, self.rng)
+                new_runs[source_id] = next_run_at
+            elif last_run_at is not None:
+                latest = _timestamp(last_run_at) + _interval(frequency)
+                if _timestamp(next_run_at) > latest:
+                    next_run_at = datetime.fromtimestamp(latest, timezone.utc)
+                    new_runs[source_id] = next_run_at
+            self._entries[source_id] = (
+                _timestamp(next_run_at),
+                PRIORITY_RANKS.get(priority, PRIORITY_RANKS[Priority.MEDIUM]),
+            )
+        self._heap = [(due, source_id) for source_id, (due, _) in self._entries.items()]
+        heapq.heapify(self._heap)
+        self.repository.save(db, new_runs)
+        self._synced_at = time.monotonic()
+
+    def pop_due(self, now: float, limit: int) -> List[str]:
+        """取出已到期的信息源，按 (优先级, 到期时间) 排序后返回前limit个，其余放回堆中"""
+        due_ids = []
+        while self._heap and self._heap[0][0] <= now:
+            due, source_id = heapq.heappop(self._heap)
+            entry = self._entries.get(source_id)
+            if entry is None or entry[0] != due:
+                continue
+            due_ids.append(source_id)
+
+        due_ids.sort(key=lambda source_id: (self._entries[source_id][1], self._entries[source_id][0]))
+        for source_id in due_ids[limit:]:
+            heapq.heappush(self._heap, (self._entries[source_id][0], source_id))
+        return due_ids[:limit]
+
+    def tick(self, db: Session, now: Optional[datetime] = None) -> List[str]:
+        """执行一轮调度，返回本轮派发的信息源ID"""
+        now = now or datetime.now(timezone.utc)
+        if self._synced_at is None or time.monotonic() - self._synced_at >= settings.SCHEDULER_RESYNC_SECONDS:
+            self.sync(db, now)
+
+        due_ids = self.pop_due(now.timestamp(), settings.SCHEDULER_MAX_DISPATCH)
+        if not due_ids:
+            return []
+
+        # 派发前再确认一次状态，期间被暂停或删除的信息源移出调度
+        states = self.repository.get_states(db, due_ids)
+        dispatched, next_runs = [], {}
+        for source_id in due_ids:
+            state = states.get(source_id)
+            if state is None or state[0] != Status.ACTIVE:
+                self.unschedule(source_id)
+                continue
+            _, frequency, priority = state
+            next_runs[source_id] = next_run_time(frequency, now, self.rng)
+            self.schedule(source_id, _timestamp(next_runs[source_id]), priority)
+            dispatched.append(source_id)
+
+        # 按优先级顺序分批投递，高优先级的批次先入队
+        batch_size = max(1, settings.SCHEDULER_BATCH_SIZE)
+        for start in range(0, len(dispatched), batch_size):
+            batch = dispatched[start:start + batch_size]
+            try:
+                self.dispatch(batch)
+            except Exception as e:
+                print(f"信息源刷新任务入队失败：{str(e)}")
+                retry_at = now.timestamp() + settings.SCHEDULER_RETRY_SECONDS
+                for source_id in dispatched[start:]:
+                    next_runs.pop(source_id, None)
+                    self.schedule(source_id, retry_at, states[source_id][2])
+                dispatched = dispatched[:start]
+                break
+
+        self.repository.save(db, next_runs, last_run_at=now)
+        return dispatched
+
+    def seconds_until_next(self, now: Optional[float] = None) -> float:
+        """距离最近一个到期时间的秒数，不超过一个调度周期"""
+        now = now if now is not None else time.time()
+        due = self.next_due()
+        if due is None:
+            return settings.SCHEDULER_TICK_SECONDS
+        return min(max(0.0, due - now), settings.SCHEDULER_TICK_SECONDS)
@@ -0,0 +1,67 @@
+from typing import Dict, List
+
+from anyio import from_thread
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.models.source import Source, SourceFetch
+from app.db.repositories.source import SourceFetchRepository, SourceRepository
+from app.services.dedup import dedup_owners, dedupe_fetch_results
+from app.services.fetcher import FetchResult, FetchTarget, SourceFetcher
+
+
+source_repository = SourceRepository()
+fetch_repository = SourceFetchRepository()
+
+
+def save_fetch_results(db: Session, results: List[FetchResult], owners: Dict[str, int]) -> List[SourceFetch]:
+    """标记近似重复条目后写入一批抓取结果（指纹与结果在同一事务中提交）"""
+    if owners:
+        dedupe_fetch_results(db, results, owners)
+    return fetch_repository.save_results(db, results)
+
+
+def build_fetch_targets(db: Session, sources: List[Source]) -> List[FetchTarget]:
+    """读取上次抓取记录（一次查询），生成与会话无关的抓取目标"""
+    previous = fetch_repository.get_many(db, [source.id for source in sources])
+    return [FetchTarget.from_source(source, previous.get(source.id)) for source in sources]
+
+
+async def refresh_sources(db: Session, sources: List[Source], fetcher: SourceFetcher) -> Dict[str, int]:
+    """并发抓取一批信息源，按完成顺序分批写入结果，返回统计"""
+    targets = build_fetch_targets(db, sources)
+    owners = dedup_owners(sources)
+    stats = {"total": len(targets), "updated": 0, "not_modified": 0, "failed": 0}
+    pending: List[FetchResult] = []
+    async for result in fetcher.fetch_iter(targets):
+        if result.error:
+            stats["failed"] += 1
+        elif result.not_modified:
+            stats["not_modified"] += 1
+        else:
+            stats["updated"] += 1
+        pending.append(result)
+        if len(pending) >= settings.FETCH_SAVE_BATCH_SIZE:
+            save_fetch_results(db, pending, owners)
+            pending = []
+    if pending:
+        save_fetch_results(db, pending, owners)
+    return stats
+
+
+async def ensure_source_contents(db: Session, source_ids: List[str], fetcher: SourceFetcher) -> None:
+    """抓取尚无内容的信息源"""
+    fetched = fetch_repository.get_many(db, source_ids)
+    missing = [
+        source_id for source_id in source_ids
+        if source_id not in fetched or not fetched[source_id].content
+    ]
+    if missing:
+        await refresh_sources(db, source_repository.get_many(db, missing), fetcher)
+
+
+def refresh_source_from_thread(db: Session, source: Source, fetcher: SourceFetcher) -> SourceFetch:
+    """在同步路由的工作线程中抓取单个信息源：请求在主事件循环上执行，复用共享连接池"""
+    target = build_fetch_targets(db, [source])[0]
+    result = from_thread.run(fetcher.fetch, target)
+    return save_fetch_results(db, [result], dedup_owners([source]))[0]
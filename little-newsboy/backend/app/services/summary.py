@@ -0,0 +1,128 @@
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.models.job import SummaryJob
+from app.db.models.summary import Summary
+from app.db.repositories.summary import SummaryRepository, SummaryTemplateRepository
+from app.db.repositories.source import SourceFetchRepository, SourceRepository
+from app.schemas.summary import SummaryCreate
+from app.services.ai import AIService, SummaryRequest, SummaryResult
+from app.services.dedup import dedupe_source_items
+from app.services.fetcher import SourceFetcher, render_content
+from app.services.source import ensure_source_contents
+
+
+summary_repository = SummaryRepository()
+template_repository = SummaryTemplateRepository()
+source_repository = SourceRepository()
+fetch_repository = SourceFetchRepository()
+
+
+class SourceContentMissing(ValueError):
+    """信息源尚未抓取到内容"""
+
+
+def _render_sources(
+    rows: List[Tuple[str, List[Dict[str, Any]], str]], item_lists: List[List[Dict[str, Any]]]
+) -> List[str]:
+    """按信息源把保留的条目拼接为正文，没有条目的信息源使用抓取时的正文"""
+    return [
+        render_content(kept, settings.FETCH_MAX_CONTENT_CHARS) if items else content
+        for (_, items, content), kept in zip(rows, item_lists)
+    ]
+
+
+def collect_source_contents(db: Session, source_ids: List[str], dedup: bool = True) -> List[str]:
+    """按顺序返回各信息源的摘要输入正文
+
+    dedup为True时去掉近似重复的条目（抓取时已标记的，以及所选信息源之间互相重复的），
+    全部条目都被去掉时退回不去重的正文；为False时包含全部条目
+    """
+    rows = fetch_repository.get_items(db, source_ids)
+    if dedup:
+        item_lists = dedupe_source_items(db, [(source_id, items) for source_id, items, _ in rows])
+        contents = [content for content in _render_sources(rows, item_lists) if content]
+        if contents:
+            return contents
+    return [content for content in _render_sources(rows, [items for _, items, _ in rows]) if content]
+
+
+def build_summary_request(
+    db: Session,
+    source_ids: List[str],
+    template_id: Optional[str],
+    parameters: dict,
+    user_id: int
+) -> Tuple[SummaryRequest, dict]:
+    """根据信息源最近抓取的内容、模板和请求参数构建AI摘要请求，返回请求及合并后的参数
+
+    参数dedup（默认开启）控制是否在调用模型前去掉近似重复的条目
+    """
+    # 应用模板参数（如果有的话）
+    if template_id:
+        template = template_repository.get(db, id=template_id)
+        if template and template.user_id == user_id:
+            # 合并模板参数和请求参数
+            template_params = template.parameters
+            merged_params = {**template_params, **parameters}
+            parameters = merged_params
+    
+    content = "\n\n".join(
+        collect_source_contents(db, source_ids, dedup=parameters.get("dedup", settings.DEDUP_ENABLED))
+    )
+    if not content:
+        raise SourceContentMissing("信息源尚未抓取到内容，请先刷新信息源")
+    
+    summary_request = SummaryRequest(
+        content=content,
+        max_length=parameters.get("max_length", 2000),
+        focus_points=parameters.get("focus_points", []),
+        format=parameters.get("format", "markdown"),
+        bypass_cache=parameters.get("bypass_cache", False)
+    )
+    return summary_request, parameters
+
+
+def save_generated_summary(
+    db: Session,
+    source_ids: List[str],
+    parameters: dict,
+    user_id: int,
+    summary_result: SummaryResult
+) -> Summary:
+    """将AI生成结果保存为摘要记录"""
+    summary_create = SummaryCreate(
+        title=f"摘要 {', '.join(source_ids)[:30]}...",  # 简单的标题生成
+        content=summary_result.summary,
+        key_points=summary_result.key_points,
+        tags=parameters.get("tags", []),
+        source_ids=source_ids
+    )
+    
+    summary = summary_repository.create(db, obj_in=summary_create, user_id=user_id)
+    
+    # 添加source关联（一次查询完成归属校验）
+    summary.sources.extend(source_repository.get_owned(db, source_ids, user_id))
+    
+    db.add(summary)
+    db.commit()
+    db.refresh(summary)
+    
+    return summary
+
+
+
+async def run_summary_job(
+    db: Session, job: SummaryJob, service: AIService, fetcher: SourceFetcher
+) -> Summary:
+    """执行一个摘要生成任务（先抓取尚无内容的信息源），返回保存后的摘要"""
+    source_ids = job.source_ids or []
+    await ensure_source_contents(db, source_ids, fetcher)
+    summary_request, parameters = build_summary_request(
+        db, source_ids, job.template_id, job.parameters or {}, job.user_id
+    )
+    summary_result = await service.generate_summary(summary_request)
+    return save_generated_summary(
+        db, source_ids, parameters, job.user_id, summary_result
+    )
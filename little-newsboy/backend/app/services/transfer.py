@@ -0,0 +1,121 @@
+# NDJSON导入导出
+# 导出按yield_per分批读取并逐批写出响应，导入逐行解析请求体并按块批量写入，内存占用与数据总量无关。
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, List, Optional, Tuple, Type
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.session import ReadSessionLocal
+from app.schemas.transfer import ImportLineError, ImportResult
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def export_ndjson(
+    rows: Callable[[Session], Iterable[Any]],
+    schema: Type[BaseModel],
+    batch_size: int = settings.EXPORT_BATCH_SIZE,
+) -> Iterator[bytes]:
+    """逐批序列化查询结果为NDJSON
+
+    请求的会话在响应开始前已关闭，这里使用独立的只读会话；每批合并为一次写出，减少线程切换
+    """
+    session = ReadSessionLocal()
+    try:
+        lines: List[str] = []
+        for row in rows(session):
+            lines.append(schema.model_validate(row).model_dump_json())
+            if len(lines) >= batch_size:
+                yield ("\n".join(lines) + "\n").encode()
+                lines = []
+        if lines:
+            yield ("\n".join(lines) + "\n").encode()
+    finally:
+        session.close()
+
+
+async def read_ndjson_lines(
+    request: Request, max_line_bytes: int = settings.IMPORT_MAX_LINE_BYTES
+) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """逐行读取请求体，返回(行号, 内容)，跳过空行；超过max_line_bytes的行内容为None
+
+    每个数据块只切分它自身，未结束的行尾留到下一块拼接，总耗时与请求体大小成线性；
+    超长的行只记录长度、不再缓存，内存占用不超过单个数据块加一行的上限
+    """
+    head: List[bytes] = []  # 上一块末尾未结束的行
+    head_size = 0
+    line_number = 0
+    async for chunk in request.stream():
+        *lines, rest = chunk.split(b"\n")
+        if lines and head_size:
+            head_size += len(lines[0])
+            lines[0] = b"".join(head) + lines[0] if head_size <= max_line_bytes else None
+            head, head_size = [], 0
+        for line in lines:
+            line_number += 1
+            if line is None or len(line) > max_line_bytes:
+                yield line_number, None
+            elif line.strip():
+                yield line_number, line
+        if rest:
+            head_size += len(rest)
+            if head_size <= max_line_bytes:
+                head.append(rest)
+            else:
+                head = []
+    if head_size > max_line_bytes:
+        yield line_number + 1, None
+    elif head_size:
+        line = b"".join(head)
+        if line.strip():
+            yield line_number + 1, line
+
+
+def _format_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in item['loc'])}: {item['msg']}" if item["loc"] else item["msg"]
+        for item in error.errors()
+    )
+
+
+async def import_ndjson(
+    request: Request,
+    schema: Type[BaseModel],
+    write_chunk: Callable[[List[Any]], Tuple[int, int]],
+    chunk_size: int = settings.IMPORT_CHUNK_SIZE,
+) -> ImportResult:
+    """逐行校验NDJSON并按块调用write_chunk写入（每块一个事务，在线程池中执行）
+
+    校验失败和超过IMPORT_MAX_LINE_BYTES的行跳过并记录行号，不影响其余行
+    """
+    result = ImportResult()
+    chunk: List[Any] = []
+
+    def fail(line_number: int, detail: str) -> None:
+        result.failed += 1
+        if len(result.errors) < settings.IMPORT_MAX_ERRORS:
+            result.errors.append(ImportLineError(line=line_number, detail=detail))
+
+    async def flush() -> None:
+        imported, skipped = await run_in_threadpool(write_chunk, chunk)
+        result.imported += imported
+        result.skipped += skipped
+
+    async for line_number, line in read_ndjson_lines(request):
+        if line is None:
+            fail(line_number, f"行长度超过{settings.IMPORT_MAX_LINE_BYTES}字节")
+            continue
+        try:
+            chunk.append(schema.model_validate_json(line))
+        except ValidationError as e:
+            fail(line_number, _format_error(e))
+            continue
+        if len(chunk) >= chunk_size:
+            await flush()
+            chunk = []
+    if chunk:
+        await flush()
+    return result
@@ -0,0 +1,63 @@
+# GitHub分析数据导入
+#   python -m app.tasks.analytics archive 2024-01-01-15.json.gz ... [--repo owner/name ...]
+#   python -m app.tasks.analytics sync owner/name ...
+import argparse
+from typing import List, Optional
+
+from app.db.migrations import prepare_database
+from app.db.session import SessionLocal, engine
+from app.services.github_analytics import github_client, ingest_archive, sync_repo_events
+from app.tasks.worker import celery_app, run_async
+
+
+@celery_app.task(name="analytics.ingest_archive")
+def ingest_archive_job(paths: List[str], repos: Optional[List[str]] = None) -> int:
+    """按顺序导入GH Archive文件，返回计入的事件数"""
+    db = SessionLocal()
+    try:
+        return sum(ingest_archive(db, path, repos) for path in paths)
+    finally:
+        db.close()
+
+
+async def _sync_repos(full_names: List[str]) -> int:
+    db = SessionLocal()
+    try:
+        async with github_client() as client:
+            counted = 0
+            for full_name in full_names:
+                try:
+                    counted += await sync_repo_events(db, full_name, client)
+                except Exception as e:
+                    db.rollback()
+                    print(f"同步GitHub仓库{full_name}失败：{str(e)}")
+            return counted
+    finally:
+        db.close()
+
+
+@celery_app.task(name="analytics.sync_repos")
+def sync_repos_job(full_names: List[str]) -> int:
+    """从事件API增量同步仓库，单个仓库失败不影响其余仓库"""
+    return run_async(lambda service, fetcher: _sync_repos(full_names))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="导入GitHub事件并更新分析汇总表")
+    commands = parser.add_subparsers(dest="command", required=True)
+    archive = commands.add_parser("archive", help="导入GH Archive文件（每行一个事件，可gzip压缩）")
+    archive.add_argument("paths", nargs="+")
+    archive.add_argument("--repo", action="append", dest="repos", help="只导入这些仓库（owner/name），可重复")
+    sync = commands.add_parser("sync", help="从事件API增量同步仓库（FETCH_GITHUB_API_URL可指向本地替身服务）")
+    sync.add_argument("repos", nargs="+")
+    args = parser.parse_args(argv)
+    prepare_database(engine)
+
+    if args.command == "archive":
+        print(f"已导入{ingest_archive_job(args.paths, args.repos)}个事件")
+    else:
+        print(f"已同步{sync_repos_job(args.repos)}个事件")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+# 相关摘要向量维护
+#   python -m app.tasks.related            为还没有向量行的摘要计算向量
+#   python -m app.tasks.related --rebuild  重新计算全部摘要的向量（修改RELATED_DIMENSIONS后）
+# 新建、更新和删除摘要时向量由ORM事件同步，缺少向量的摘要在启动时由prepare_database补齐，一般不需要手动执行。
+import argparse
+
+from app.db.repositories.summary import SummaryRepository
+from app.db.migrations import prepare_database
+from app.db.session import SessionLocal, engine
+from app.tasks.worker import celery_app
+
+
+@celery_app.task(name="related.backfill_vectors")
+def backfill_vectors_job(rebuild: bool = False) -> int:
+    """计算摘要向量，返回处理的摘要数"""
+    db = SessionLocal()
+    try:
+        return SummaryRepository().backfill_vectors(db, rebuild=rebuild)
+    finally:
+        db.close()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="计算相关摘要使用的摘要向量")
+    parser.add_argument("--rebuild", action="store_true", help="清空summary_vectors表后重新计算全部摘要")
+    args = parser.parse_args(argv)
+    prepare_database(engine)
+    print(f"已计算{backfill_vectors_job(args.rebuild)}条摘要的向量")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+# 信息源刷新调度进程：python -m app.tasks.scheduler
+import time
+
+from app.db.migrations import prepare_database
+from app.db.session import SessionLocal, engine
+from app.services.scheduler import RefreshScheduler
+
+
+def run_forever(scheduler: RefreshScheduler) -> None:
+    """循环执行调度，空闲时睡眠到最近一个到期时间（不超过一个调度周期）"""
+    while True:
+        db = SessionLocal()
+        try:
+            dispatched = scheduler.tick(db)
+            if dispatched:
+                print(f"已派发{len(dispatched)}个信息源刷新，调度中共{len(scheduler)}个信息源")
+        except Exception as e:
+            db.rollback()
+            print(f"信息源调度失败：{str(e)}")
+        finally:
+            db.close()
+        time.sleep(scheduler.seconds_until_next())
+
+
+if __name__ == "__main__":
+    prepare_database(engine)
+    try:
+        run_forever(RefreshScheduler())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,23 @@
+from typing import List
+
+from app.db.session import SessionLocal
+from app.services.source import refresh_sources, source_repository
+from app.tasks.worker import celery_app, run_async
+
+
+@celery_app.task(name="sources.refresh")
+def refresh_sources_job(source_ids: List[str]):
+    """并发抓取一批信息源，单个信息源的失败记录在抓取结果中"""
+    db = SessionLocal()
+    try:
+        sources = source_repository.get_many(db, source_ids)
+        if not sources:
+            return None
+        return run_async(lambda service, fetcher: refresh_sources(db, sources, fetcher))
+    finally:
+        db.close()
+
+
+def enqueue_source_refresh(source_ids: List[str]) -> None:
+    """将信息源刷新投递到队列"""
+    refresh_sources_job.delay(list(source_ids))
@@ -0,0 +1,47 @@
+from app.config import settings
+from app.db.models.job import JobStatus
+from app.db.repositories.job import SummaryJobRepository
+from app.db.session import SessionLocal
+from app.services.summary import run_summary_job
+from app.tasks.worker import celery_app, run_async
+
+job_repository = SummaryJobRepository()
+
+
+@celery_app.task(
+    bind=True,
+    name="summary.generate",
+    max_retries=settings.SUMMARY_JOB_MAX_RETRIES,
+)
+def generate_summary_job(self, job_id: str):
+    """执行摘要生成任务，失败时按指数退避重试"""
+    db = SessionLocal()
+    try:
+        job = job_repository.get(db, id=job_id)
+        if job is None or job.status == JobStatus.SUCCEEDED:
+            return None
+        
+        job_repository.mark_running(db, job)
+        try:
+            summary = run_async(lambda service, fetcher: run_summary_job(db, job, service, fetcher))
+        except Exception as e:
+            db.rollback()
+            final = self.request.retries >= self.max_retries
+            job_repository.mark_failed(db, job, str(e), final=final)
+            print(f"摘要生成失败（任务 {job_id}，第{job.attempts}次）：{str(e)}")
+            if final:
+                return None
+            raise self.retry(
+                exc=e,
+                countdown=settings.SUMMARY_JOB_RETRY_BACKOFF * (2 ** self.request.retries)
+            )
+        
+        job_repository.mark_succeeded(db, job, summary.id)
+        return summary.id
+    finally:
+        db.close()
+
+
+def enqueue_summary_job(job_id: str) -> None:
+    """将生成任务投递到队列"""
+    generate_summary_job.delay(job_id)
@@ -0,0 +1,51 @@
+import asyncio
+import threading
+
+from celery import Celery
+from celery.signals import worker_init
+
+from app.config import settings
+from app.db.migrations import prepare_database
+from app.db.session import engine
+from app.services.ai import AIService
+from app.services.fetcher import SourceFetcher
+
+celery_app = Celery(
+    "little_newsboy",
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND,
+    include=["app.tasks.summary", "app.tasks.source", "app.tasks.analytics", "app.tasks.related"],
+)
+
+celery_app.conf.update(
+    task_always_eager=settings.CELERY_TASK_ALWAYS_EAGER,
+    task_eager_propagates=False,
+    # 任务状态记录在summary_jobs表中，无需结果后端
+    task_ignore_result=True,
+    # 任务执行完成后再确认，worker崩溃时任务会重新投递
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    # LLM调用耗时较长，每个worker进程只预取一个任务
+    worker_prefetch_multiplier=1,
+    task_serializer="json",
+    accept_content=["json"],
+)
+
+
+@worker_init.connect
+def _prepare_database(**kwargs) -> None:
+    """独立worker进程启动时（派生执行进程之前）确保数据表为最新版本"""
+    prepare_database(engine)
+
+
+# 每个执行线程持有独立的事件循环、AI服务和抓取引擎，保证HTTP连接池在同一个循环内复用
+_local = threading.local()
+
+
+def run_async(coro_factory):
+    """在当前线程的常驻事件循环中运行协程，coro_factory接收该线程的AI服务和抓取引擎"""
+    if not hasattr(_local, "loop"):
+        _local.loop = asyncio.new_event_loop()
+        _local.ai_service = AIService()
+        _local.fetcher = SourceFetcher()
+    return _local.loop.run_until_complete(coro_factory(_local.ai_service, _local.fetcher))
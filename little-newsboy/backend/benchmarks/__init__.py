@@ -0,0 +1,19 @@
+# 性能基准脚本
+import os
+import tempfile
+
+
+def use_temp_database(name: str) -> str:
+    """使用独立的临时数据库并创建表，返回数据库所在目录
+
+    须在导入app中的任何模块之前调用：数据库地址在导入配置时读取
+    """
+    db_dir = tempfile.mkdtemp(prefix=f"bench-{name}-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(db_dir, 'bench.db')}"
+    os.environ.setdefault("AI_CACHE_DB_PATH", "")
+    from app.db.migrations import prepare_database
+    from app.db.session import engine
+
+    # 基准通过ASGI传输直接调用应用，不经过lifespan
+    prepare_database(engine)
+    return db_dir
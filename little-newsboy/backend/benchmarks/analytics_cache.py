@@ -0,0 +1,120 @@
+"""
+分析接口缓存基准：模拟大量用户同时打开看板，对比每个请求都重新组装响应与
+按(repo_name, period)缓存（single-flight + ETag/304）时的延迟和计算次数
+
+用法（在backend目录下）：
+    python -m benchmarks.analytics_cache --requests 2000 --repos 5
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+from benchmarks import use_temp_database
+
+# 必须在导入应用之前调用
+use_temp_database("analytics")
+
+import httpx  # noqa: E402
+from fastapi.concurrency import run_in_threadpool  # noqa: E402
+
+from app.api.routes.analytics import _render_github_analytics, analytics_cache  # noqa: E402
+from app.db.session import SessionLocal, async_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.github_analytics import RollupBatch, analytics_repository  # noqa: E402
+
+PERIODS = ["last_3_months", "last_6_months", "last_year"]
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def _seed(repos: int, users: int) -> None:
+    batch = RollupBatch()
+    for repo in range(repos):
+        for month in range(1, 13):
+            for user in range(users):
+                batch.add({
+                    "id": str(len(batch) + 1), "type": "PushEvent", "repo": {"name": f"org/repo{repo}"},
+                    "actor": {"login": f"user{user}"}, "payload": {"size": 3},
+                    "created_at": f"2024-{month:02d}-{user % 28 + 1:02d}T00:00:00Z",
+                })
+    with SessionLocal() as db:
+        analytics_repository.save_batch(db, batch)
+
+
+def _report(label: str, latencies: list, elapsed: float, extra: str = "") -> None:
+    print(f"{label}: {len(latencies)} requests in {elapsed:.2f}s -> {len(latencies) / elapsed:.0f}/s "
+          f"(p50 {statistics.median(latencies) * 1000:.1f}ms, p95 {_percentile(latencies, 0.95) * 1000:.1f}ms){extra}")
+
+
+async def _timed(coro) -> float:
+    started = time.perf_counter()
+    await coro
+    return time.perf_counter() - started
+
+
+async def _run(args) -> None:
+    keys = [(f"org/repo{i % args.repos}", PERIODS[i % len(PERIODS)]) for i in range(args.requests)]
+
+    # 对比：每个请求都在线程池中重新组装响应
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(
+        _timed(run_in_threadpool(_render_github_analytics, repo, period)) for repo, period in keys
+    ))
+    _report("uncached", latencies, time.perf_counter() - started)
+
+    transport = httpx.ASGITransport(app=app)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", limits=limits) as client:
+        async def get(repo: str, period: str, headers: dict = None) -> httpx.Response:
+            response = await client.get(f"/api/v1/analytics/github/{repo}", params={"period": period}, headers=headers)
+            assert response.status_code in (200, 304), response.status_code
+            return response
+
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*(_timed(get(repo, period)) for repo, period in keys))
+        stats = analytics_cache.stats()
+        _report("cold cache", latencies, time.perf_counter() - started,
+                f", computes {stats['computes']} for {len(set(keys))} keys")
+        assert stats["computes"] == len(set(keys))
+
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*(_timed(get(repo, period)) for repo, period in keys))
+        _report("warm cache", latencies, time.perf_counter() - started)
+
+        etags = {key: (await get(*key)).headers["etag"] for key in set(keys)}
+        statuses = []
+
+        async def conditional(repo: str, period: str) -> None:
+            response = await get(repo, period, {"If-None-Match": etags[(repo, period)]})
+            statuses.append(response.status_code)
+
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*(_timed(conditional(repo, period)) for repo, period in keys))
+        _report("if-none-match", latencies, time.perf_counter() - started,
+                f", {statuses.count(304)} x 304")
+        assert statuses.count(304) == len(keys)
+        assert analytics_cache.stats()["computes"] == len(set(keys))
+    # ASGITransport不执行lifespan，需自行关闭异步连接池
+    await async_engine.dispose()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--repos", type=int, default=5)
+    parser.add_argument("--users", type=int, default=200)
+    args = parser.parse_args(argv)
+    _seed(args.repos, args.users)
+    asyncio.run(_run(args))
+    print("ok")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,133 @@
+"""
+并发读取基准：大量并发请求同时读取摘要列表和详情，统计吞吐、延迟和占用的线程数
+
+列表和详情接口使用异步会话，等待数据库时不占用线程池；
+对比用的标签统计接口仍是同步路由，并发受线程池（默认40）和同步连接池大小限制。
+
+用法（在backend目录下）：
+    python -m benchmarks.concurrent_reads --requests 5000 --concurrency 1000 --compare-sync
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+
+from benchmarks import use_temp_database
+
+# 必须在导入应用之前调用
+use_temp_database("reads")
+
+import httpx  # noqa: E402
+
+from app.core.security import create_access_token  # noqa: E402
+from app.db.models.summary import Summary  # noqa: E402
+from app.db.models.user import User  # noqa: E402
+from app.db.session import SessionLocal, async_engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def _setup(summaries: int) -> tuple:
+    with SessionLocal() as db:
+        user = User(username="bench", email="bench@example.com", hashed_password="-", is_active=True)
+        db.add(user)
+        db.commit()
+        user_id = user.id
+        db.add_all([
+            Summary(user_id=user_id, title=f"summary {i}", content=f"content {i} " * 50, tags=["bench"])
+            for i in range(summaries)
+        ])
+        db.commit()
+        summary_id = db.query(Summary.id).filter(Summary.user_id == user_id).first()[0]
+    return create_access_token({"sub": str(user_id)}), summary_id
+
+
+async def _measure(client: httpx.AsyncClient, paths: list, headers: dict, args) -> dict:
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, errors = [], []
+    peak_threads = threading.active_count()
+    done = asyncio.Event()
+
+    async def sample_threads() -> None:
+        nonlocal peak_threads
+        while not done.is_set():
+            peak_threads = max(peak_threads, threading.active_count())
+            await asyncio.sleep(0.01)
+
+    async def read(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.get(paths[i % len(paths)], headers=headers)
+                response.raise_for_status()
+            except Exception as e:
+                # 同步接口在连接池耗尽时会超时失败，计入错误而不中断基准
+                errors.append(type(e).__name__)
+                return
+            latencies.append(time.perf_counter() - started)
+
+    sampler = asyncio.create_task(sample_threads())
+    started = time.perf_counter()
+    await asyncio.gather(*(read(i) for i in range(args.requests)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await sampler
+    return {"elapsed": elapsed, "latencies": latencies, "errors": errors, "peak_threads": peak_threads}
+
+
+def _report(label: str, result: dict, requests: int) -> None:
+    latencies = result["latencies"] or [0.0]
+    print(f"{label}: {requests} requests in {result['elapsed']:.2f}s -> {requests / result['elapsed']:.0f}/s "
+          f"(p50 {statistics.median(latencies) * 1000:.1f}ms, "
+          f"p95 {_percentile(latencies, 0.95) * 1000:.1f}ms, "
+          f"errors {len(result['errors'])}, "
+          f"peak threads {result['peak_threads']})")
+
+
+async def _run(args) -> None:
+    token, summary_id = _setup(args.summaries)
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", limits=limits) as client:
+        # 预热连接池和认证缓存
+        (await client.get("/api/v1/summaries", headers=headers)).raise_for_status()
+
+        async_result = await _measure(client, [
+            f"/api/v1/summaries?page_size={args.page_size}",
+            f"/api/v1/summaries/{summary_id}",
+        ], headers, args)
+        sync_result = (
+            await _measure(client, ["/api/v1/summaries/tags"], headers, args) if args.compare_sync else None
+        )
+    # ASGITransport不执行lifespan，需自行关闭异步连接池
+    await async_engine.dispose()
+
+    print(f"concurrency: {args.concurrency}, async pool: "
+          f"{os.getenv('DB_ASYNC_POOL_SIZE', '20')}+{os.getenv('DB_ASYNC_MAX_OVERFLOW', '10')}")
+    _report("async list/detail", async_result, args.requests)
+    if sync_result is not None:
+        _report("sync tags (threadpool)", sync_result, args.requests)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=1000)
+    parser.add_argument("--summaries", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--compare-sync", action="store_true", help="同样的并发读取同步的标签统计接口作为对比")
+    asyncio.run(_run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,177 @@
+"""
+近似重复检测基准：MinHash签名的计算速度、检出率和误报率；指纹库规模增长时抓取批次查找近似重复的耗时
+（LSH分段索引与逐条比较全部签名对比）；以及转载内容较多时去重前后送入模型的正文长度
+
+用法（在backend目录下）：
+    python -m benchmarks.dedup --corpus 1000 10000 100000
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks import use_temp_database
+
+# 必须在导入应用之前调用
+use_temp_database("dedup")
+
+from app.db.models.source import ItemFingerprint, Source, SourceType  # noqa: E402
+from app.db.repositories.source import ItemFingerprintRepository  # noqa: E402
+from app.db.models.user import User  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+from app.services.dedup import (  # noqa: E402
+    NUM_PERM, band_keys, dedupe_fetch_results, dedupe_source_items, item_key, item_text, minhash, pack_signature,
+    similarity, unpack_signature
+)
+from app.config import settings  # noqa: E402
+from app.services.fetcher import FetchResult, render_content  # noqa: E402
+
+repository = ItemFingerprintRepository()
+
+# 常用汉字，随机组成新闻正文
+_CHARS = "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法所民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点从业本去把性好应开它合还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质气第向道命此变条只没结解问意建月公无系军很情者最立代想已通并提直题党程展五果料象员革位入常文总次品式活设及管特件长求老头基资边流路级少图山统接知较将组见计别她手角期根论运农指几九区强放决西被干做必战先回则任取据处队南给色光门即保治北造百规热领七海口东导器压志世金增争济阶油思术极交受联什认六共权收证改清己美再采转更单风切打白教速花带安场身车例真务具万每目至达走积示议声报斗完类八离华名确才科张信马节话米整空元况今集温传土许步群广石记需段研界拉林律叫且究观越织装影算低持音众书布复容儿须际商非验连断深难近矿千周委素技备半办青省列习响约支般史感劳便团往酸历市克何除消构府称太准精值号率族维划选标写存候毛亲快效斯院查江型眼王按格养易置派层片始却专状育厂京识适属圆包火住调满县局照参红细引听该铁价严"
+
+
+def _text(rng: random.Random, chars: int) -> str:
+    return "".join(rng.choice(_CHARS) for _ in range(chars))
+
+
+def _near_copy(rng: random.Random, text: str, edits: int) -> str:
+    """模拟转载：替换若干字并加上来源说明"""
+    chars = list(text)
+    for _ in range(edits):
+        chars[rng.randrange(len(chars))] = rng.choice(_CHARS)
+    return "".join(chars) + "（来源：转载）"
+
+
+def _accuracy(rng: random.Random, samples: int, chars: int) -> None:
+    originals = [_text(rng, chars) for _ in range(samples)]
+    signatures = [minhash(text) for text in originals]
+    started = time.perf_counter()
+    copies = [minhash(_near_copy(rng, text, edits=3)) for text in originals]
+    elapsed = time.perf_counter() - started
+    threshold = settings.DEDUP_SIMILARITY
+    # 检出要求分段键至少有一个相同（LSH候选）且相似度达到阈值
+    detected = sum(
+        bool(set(band_keys(a)) & set(band_keys(b))) and similarity(a, b) >= threshold
+        for a, b in zip(signatures, copies)
+    )
+    false_positives = sum(
+        similarity(signatures[i], signatures[j]) >= threshold
+        for i in range(samples) for j in range(i + 1, samples)
+    )
+    pairs = samples * (samples - 1) // 2
+    print(f"minhash: {samples / elapsed:.0f} items/s ({chars} chars), "
+          f"near copies detected {detected}/{samples}, false positives {false_positives}/{pairs} pairs")
+    assert detected >= samples * 0.95
+    assert false_positives <= pairs * 0.001
+
+
+def _seed_corpus(db, user_id: int, source_id: str, rng: random.Random, size: int, start: int) -> None:
+    """随机签名的指纹，分段键与真实条目一样写入分段表"""
+    now = datetime.now(timezone.utc)
+    rows = []
+    for i in range(start, size):
+        signature = tuple(rng.getrandbits(32) for _ in range(NUM_PERM))
+        rows.append(({
+            "user_id": user_id, "source_id": source_id, "item_key": f"corpus-{i}", "title": f"item {i}",
+            "link": None, "signature": pack_signature(signature), "seen_at": now,
+        }, band_keys(signature)))
+        if len(rows) == 10000:
+            repository.save(db, user_id, rows, [], now, prune_before=now - timedelta(days=1))
+            rows = []
+    if rows:
+        repository.save(db, user_id, rows, [], now, prune_before=now - timedelta(days=1))
+    db.commit()
+
+
+def _lookup(db, user_id: int, source_id: str, rng: random.Random, batch: int, chars: int) -> tuple:
+    """一个抓取批次（batch条新条目）查找近似重复的耗时；不提交，回滚后指纹库不变"""
+    items = [{"title": f"new {i}", "link": f"https://example.com/{rng.random()}", "text": _text(rng, chars)}
+             for i in range(batch)]
+    result = FetchResult(source_id=source_id, url="https://example.com/feed", items=items)
+    started = time.perf_counter()
+    dedupe_fetch_results(db, [result], {source_id: user_id})
+    elapsed = time.perf_counter() - started
+    db.rollback()
+    return elapsed, [minhash(item_text(item)) for item in items]
+
+
+def _linear_scan(db, user_id: int, signatures: list) -> float:
+    """对比：取出全部签名逐条估计相似度"""
+    started = time.perf_counter()
+    corpus = [
+        unpack_signature(value)
+        for (value,) in db.query(ItemFingerprint.signature).filter(ItemFingerprint.user_id == user_id)
+    ]
+    for signature in signatures:
+        any(similarity(signature, other) >= settings.DEDUP_SIMILARITY for other in corpus)
+    return time.perf_counter() - started
+
+
+def _content_savings(db, user_id: int, rng: random.Random, sources: int, stories: int, chars: int) -> None:
+    """sources个信息源各自转载同一批stories篇内容中的一部分，依次抓取后生成摘要"""
+    pool = [_text(rng, chars) for _ in range(stories)]
+    owners, results = {}, []
+    for index in range(sources):
+        source = Source(name=f"reprint {index}", type=SourceType.NEWS, url=f"https://example.com/{index}", user_id=user_id)
+        db.add(source)
+        db.commit()
+        owners[source.id] = user_id
+        items = [
+            {"title": f"story {i}", "link": f"https://example.com/{index}/{i}", "text": _near_copy(rng, pool[i], edits=2)}
+            for i in rng.sample(range(stories), stories // 2)
+        ]
+        results.append(FetchResult(source_id=source.id, url=source.url, items=items))
+    before = sum(len(render_content(result.items, 10 ** 9)) for result in results)
+    marked = dedupe_fetch_results(db, results, owners)
+    db.commit()
+    kept = dedupe_source_items(db, [(result.source_id, result.items) for result in results])
+    after = sum(len(render_content(items, 10 ** 9)) for items in kept)
+    unique = len({item["title"] for items in kept for item in items})
+    print(f"summary input: {before} -> {after} chars ({after / before:.0%}), "
+          f"{sum(len(result.items) for result in results)} -> {sum(map(len, kept))} items "
+          f"({marked} marked at fetch), {unique}/{stories} stories kept")
+    assert sum(map(len, kept)) == unique
+    assert all(item_key(item) for items in kept for item in items)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--batch", type=int, default=50, help="每个抓取批次的新条目数")
+    parser.add_argument("--chars", type=int, default=600)
+    parser.add_argument("--samples", type=int, default=300)
+    args = parser.parse_args(argv)
+    rng = random.Random(0)
+
+    _accuracy(rng, args.samples, args.chars)
+
+    with SessionLocal() as db:
+        user = User(username="bench", email="bench@example.com", hashed_password="-", is_active=True)
+        db.add(user)
+        db.commit()
+        source = Source(name="bench", type=SourceType.NEWS, url="https://example.com/feed", user_id=user.id)
+        db.add(source)
+        db.commit()
+        seeded = 0
+        timings = []
+        for size in sorted(args.corpus):
+            _seed_corpus(db, user.id, source.id, rng, size, seeded)
+            seeded = size
+            elapsed, signatures = min((_lookup(db, user.id, source.id, rng, args.batch, args.chars) for _ in range(3)),
+                                  key=lambda timing: timing[0])
+            linear = _linear_scan(db, user.id, signatures)
+            timings.append(elapsed)
+            print(f"corpus {size:>7}: batch of {args.batch} banded lookup {elapsed * 1000:7.1f}ms, "
+                  f"linear scan {linear * 1000:8.1f}ms")
+        # 指纹库增大两个数量级，查找耗时不应随之线性增长
+        assert timings[-1] < timings[0] * 5
+
+        _content_savings(db, user.id, rng, sources=5, stories=40, chars=args.chars)
+    print("ok")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
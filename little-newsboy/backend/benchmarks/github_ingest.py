@@ -0,0 +1,81 @@
+"""
+GitHub分析导入基准：生成GH Archive格式的事件文件，统计导入吞吐，
+以及从汇总表组装分析响应的耗时和SQL语句数（与事件总数无关）
+
+用法（在backend目录下）：
+    python -m benchmarks.github_ingest --events 200000 --repos 50
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+from benchmarks import use_temp_database
+
+# 必须在导入应用之前调用
+_db_dir = use_temp_database("github")
+
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.db.statements import count_statements  # noqa: E402
+from app.services.github_analytics import build_github_analytics, ingest_archive  # noqa: E402
+
+EVENT_TYPES = ["PushEvent"] * 6 + ["PullRequestEvent", "IssuesEvent", "WatchEvent", "ForkEvent"]
+
+
+def _write_archive(path: str, args) -> None:
+    rng = random.Random(0)
+    with gzip.open(path, "wt") as f:
+        for i in range(args.events):
+            kind = rng.choice(EVENT_TYPES)
+            payload = {"size": rng.randint(1, 5)} if kind == "PushEvent" else {"action": "opened"}
+            if kind == "IssuesEvent":
+                payload["issue"] = {"labels": [{"name": rng.choice(["bug", "enhancement", "docs"])}]}
+            # 事件按时间顺序分布在一年内
+            day = i * 365 // args.events
+            f.write(json.dumps({
+                "id": str(i + 1),
+                "type": kind,
+                "actor": {"login": f"user{rng.randrange(args.users)}"},
+                "repo": {"name": f"org/repo{rng.randrange(args.repos)}"},
+                "payload": payload,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(1704067200 + day * 86400)),
+            }) + "\n")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=200000)
+    parser.add_argument("--repos", type=int, default=50)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    path = os.path.join(_db_dir, "2024-12-31-0.json.gz")
+    _write_archive(path, args)
+    with SessionLocal() as db:
+        started = time.perf_counter()
+        counted = ingest_archive(db, path)
+        elapsed = time.perf_counter() - started
+        print(f"ingest: {counted} events in {elapsed:.2f}s -> {counted / elapsed:.0f} events/s")
+        assert counted == args.events
+        assert ingest_archive(db, path) == 0, "已导入的文件应跳过"
+
+        latencies = []
+        for i in range(args.lookups):
+            started = time.perf_counter()
+            with count_statements(engine) as counter:
+                response = build_github_analytics(db, f"org/repo{i % args.repos}", "last_year")
+            latencies.append(time.perf_counter() - started)
+            assert response is not None and len(response.activity_data) == 12
+        print(f"build response: p50 {statistics.median(latencies) * 1000:.2f}ms, "
+              f"max {max(latencies) * 1000:.2f}ms, {counter.count} statements")
+        assert counter.count <= 6
+    print("ok")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,115 @@
+"""
+登录吞吐基准：并发登录的同时持续读取摘要列表，统计登录吞吐和读请求延迟
+
+用法（在backend目录下）：
+    python -m benchmarks.login_throughput --logins 200 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+from benchmarks import use_temp_database
+
+# 必须在导入应用之前调用
+use_temp_database("login")
+
+import httpx  # noqa: E402
+
+from app.core.security import create_access_token, get_password_hash  # noqa: E402
+from app.db.models.user import User  # noqa: E402
+from app.db.session import SessionLocal, async_engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+PASSWORD = "Bench_pass1"
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def _setup(users: int) -> str:
+    with SessionLocal() as db:
+        hashed = get_password_hash(PASSWORD)
+        db.add_all([
+            User(username=f"bench{i}", email=f"bench{i}@example.com", hashed_password=hashed, is_active=True)
+            for i in range(users)
+        ])
+        db.commit()
+        first = db.query(User).filter(User.username == "bench0").first()
+        return create_access_token({"sub": str(first.id)})
+
+
+async def _run(args) -> None:
+    token = _setup(args.users)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(args.concurrency)
+        login_latencies, read_latencies = [], []
+        done = asyncio.Event()
+
+        async def login(i: int) -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/api/v1/auth/login", json={
+                    "username_or_email": f"bench{i % args.users}", "password": PASSWORD
+                })
+                response.raise_for_status()
+                login_latencies.append(time.perf_counter() - started)
+
+        async def reader() -> None:
+            headers = {"Authorization": f"Bearer {token}"}
+            while not done.is_set():
+                started = time.perf_counter()
+                response = await client.get("/api/v1/summaries", headers=headers)
+                response.raise_for_status()
+                read_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(args.read_interval)
+
+        # 先测无登录负载时的读延迟作为基线
+        readers = [asyncio.create_task(reader()) for _ in range(args.readers)]
+        await asyncio.sleep(args.baseline_seconds)
+        done.set()
+        await asyncio.gather(*readers)
+        baseline_latencies, read_latencies = read_latencies, []
+        done.clear()
+
+        readers = [asyncio.create_task(reader()) for _ in range(args.readers)]
+        started = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(args.logins)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await asyncio.gather(*readers)
+    # ASGITransport不执行lifespan，需自行关闭异步连接池
+    await async_engine.dispose()
+
+    print(f"bcrypt rounds: {os.getenv('PASSWORD_BCRYPT_ROUNDS', '12')}")
+    print(f"logins: {args.logins} in {elapsed:.2f}s -> {args.logins / elapsed:.1f}/s "
+          f"(p50 {statistics.median(login_latencies) * 1000:.0f}ms, "
+          f"p95 {_percentile(login_latencies, 0.95) * 1000:.0f}ms)")
+    print(f"summary reads without logins: {len(baseline_latencies)} "
+          f"(p50 {statistics.median(baseline_latencies) * 1000:.1f}ms, "
+          f"p95 {_percentile(baseline_latencies, 0.95) * 1000:.1f}ms)")
+    print(f"summary reads during logins: {len(read_latencies)} "
+          f"(p50 {statistics.median(read_latencies) * 1000:.1f}ms, "
+          f"p95 {_percentile(read_latencies, 0.95) * 1000:.1f}ms)")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--read-interval", type=float, default=0.01)
+    parser.add_argument("--baseline-seconds", type=float, default=2.0)
+    asyncio.run(_run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,122 @@
+"""
+运行指标基准：指标中间件给每个HTTP请求增加的耗时、SQL语句耗时监听给每条语句增加的耗时
+（与注册了空监听的引擎对比，扣除SQLAlchemy派发事件本身的开销），
+以及/metrics输出（路由数较多时）的生成耗时；并检查输出符合Prometheus文本格式
+
+用法（在backend目录下）：
+    python -m benchmarks.metrics --requests 20000 --statements 20000
+"""
+import argparse
+import asyncio
+import os
+import re
+import sys
+import time
+
+from benchmarks import use_temp_database
+
+# 必须在导入应用之前调用
+_db_dir = use_temp_database("metrics")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine, event, text  # noqa: E402
+
+from app.api.middleware import MetricsMiddleware  # noqa: E402
+from app.db.statements import instrument_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.metrics import http_request_duration_seconds, render  # noqa: E402
+
+# 文本格式的样本行：名称、可选标签、数值
+_SAMPLE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_][a-zA-Z0-9_]*="([^"\\]|\\.)*",?)*\})? \S+$')
+
+
+async def _endpoint(scope, receive, send) -> None:
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def _asgi_per_request(asgi_app, requests: int) -> float:
+    """直接调用ASGI应用，测量每个请求的平均耗时（不含网络和路由）"""
+    scope = {"type": "http", "method": "GET", "path": "/bench", "headers": []}
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    async def run() -> float:
+        started = time.perf_counter()
+        for _ in range(requests):
+            await asgi_app(dict(scope), receive, send)
+        return time.perf_counter() - started
+
+    return min(asyncio.run(run()) for _ in range(3)) / requests
+
+
+def _per_statement(engines: list, statements: int) -> list:
+    """各引擎执行SELECT 1的平均耗时；交替测量5轮取最小值，减少抖动的影响"""
+    best = [float("inf")] * len(engines)
+    for _ in range(5):
+        for index, engine in enumerate(engines):
+            with engine.connect() as conn:
+                started = time.perf_counter()
+                for _ in range(statements):
+                    conn.execute(text("SELECT 1"))
+                best[index] = min(best[index], time.perf_counter() - started)
+    return [elapsed / statements for elapsed in best]
+
+
+def _noop(*args) -> None:
+    pass
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--statements", type=int, default=20000)
+    parser.add_argument("--routes", type=int, default=200, help="/metrics输出中的路由标签数")
+    args = parser.parse_args(argv)
+
+    plain = _asgi_per_request(_endpoint, args.requests)
+    measured = _asgi_per_request(MetricsMiddleware(_endpoint), args.requests)
+    print(f"middleware        {(measured - plain) * 1e6:6.2f}us per request "
+          f"({plain * 1e6:.2f}us -> {measured * 1e6:.2f}us)")
+
+    url = f"sqlite:///{os.path.join(_db_dir, 'statements.db')}"
+    plain_engine, noop_engine, instrumented_engine = create_engine(url), create_engine(url), create_engine(url)
+    event.listen(noop_engine, "before_cursor_execute", _noop)
+    event.listen(noop_engine, "after_cursor_execute", _noop)
+    instrument_engine(instrumented_engine, "bench")
+    plain, noop, instrumented = _per_statement([plain_engine, noop_engine, instrumented_engine], args.statements)
+    print(f"statement events  {(instrumented - plain) * 1e6:6.2f}us per statement, "
+          f"{(instrumented - noop) * 1e6:.2f}us over empty listeners "
+          f"(plain {plain * 1e6:.2f}us, empty listeners {noop * 1e6:.2f}us, instrumented {instrumented * 1e6:.2f}us)")
+
+    with TestClient(app) as client:
+        client.get("/healthcheck")
+        client.get("/api/v1/summaries/missing")
+        for index in range(args.routes):
+            http_request_duration_seconds.labels("GET", f"/bench/{index}").observe(index / 1000)
+        started = time.perf_counter()
+        output = render().decode()
+        render_seconds = time.perf_counter() - started
+        response = client.get("/metrics")
+
+    lines = [line for line in output.splitlines() if line and not line.startswith("#")]
+    invalid = [line for line in lines if not _SAMPLE.match(line)]
+    print(f"render            {render_seconds * 1000:6.2f}ms for {len(lines)} samples ({len(output)} bytes)")
+    assert not invalid, invalid[:5]
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    for name in ("http_request_duration_seconds_bucket", "http_requests_in_progress", "db_statement_duration_seconds_count",
+                 "summary_job_queue_depth", "cache_hits_total"):
+        assert name in response.text, name
+    assert 'route="/api/v1/summaries/{summary_id}"' in response.text
+    # 单核机器上逐条语句的计时抖动较大，只检查最轻的语句耗时没有因监听而翻倍
+    assert instrumented - plain < plain
+    print("ok")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
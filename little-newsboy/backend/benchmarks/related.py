@@ -0,0 +1,143 @@
+"""
+相关摘要基准：按主题生成大量摘要（批量导入时计算向量），测量首次查找（从数据库载入全部向量）、
+增量同步后的单条查找和批量查找的耗时，对比每次请求都从数据库读取全部向量再计算的方式；
+并检查前k条结果与所查摘要同主题的比例
+
+用法（在backend目录下）：
+    python -m benchmarks.related --summaries 100000
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from benchmarks import use_temp_database
+
+# 必须在导入应用之前调用
+use_temp_database("related")
+
+import numpy as np  # noqa: E402
+
+from app.db.models.summary import Summary, SummaryVector  # noqa: E402
+from app.db.models.user import User  # noqa: E402
+from app.db.repositories.summary import SummaryRepository  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+from app.db.vectors import from_bytes  # noqa: E402
+from app.schemas.summary import SummaryCreate, SummaryImport  # noqa: E402
+from app.services.related import RelatedIndex  # noqa: E402
+
+repository = SummaryRepository()
+
+_CHARS = "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法所民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点从业本去把性好应开它合还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质气第向道命此变条只没结解问意建月公无系军很情者最立代想已通并提直题党程展五果料象员革位入常文总次品式活设及管特件长求老头基资边流路级少图山统接知较将组见计别她手角期根论运农指几九区强放决西被干做必战先回则任取据处队南给色光门即保治北造百规热领七海口东导器压志世金增争济阶油思术极交受联什认六共权收证改清己美再采转更单风切打白教速花带安场身车例真务具万每目至达走积示议声报斗完类八离华名确才科张信马节话米整空元况今集温传土许步群广石记需段研界拉林律叫且究观越织装影算低持音众书布复容儿须际商非验连断深难近矿千周委素技备半办青省列习响约支般史感劳便团往酸历市克何除消构府称太准精值号率族维划选标写存候毛亲快效斯院查江型眼王按格养易置派层片始却专状育厂京识适属圆包火住调满县局照参红细引听该铁价严"
+
+
+def _vocabulary(rng: random.Random, topics: int, words: int) -> list:
+    """每个主题一组双字词"""
+    return [["".join(rng.sample(_CHARS, 2)) for _ in range(words)] for _ in range(topics)]
+
+
+def _summary(rng: random.Random, vocabulary: list, topic: int, index: int) -> SummaryImport:
+    words = vocabulary[topic]
+    # 正文一半是本主题的词，一半是随机主题的词
+    body = [rng.choice(words) for _ in range(40)] + [rng.choice(rng.choice(vocabulary)) for _ in range(40)]
+    rng.shuffle(body)
+    return SummaryImport(
+        title="".join(rng.sample(words, 3)), content="，".join(body), tags=[],
+        key_points=[], created_at=None, id=f"s{index}",
+    )
+
+
+def _seed(rng: random.Random, user_id: int, vocabulary: list, count: int) -> list:
+    topics = len(vocabulary)
+    labels = []
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        for start in range(0, count, 1000):
+            items = []
+            for index in range(start, min(count, start + 1000)):
+                topic = index % topics
+                labels.append(topic)
+                items.append(_summary(rng, vocabulary, topic, index))
+            repository.bulk_import(db, user_id=user_id, items=items)
+    elapsed = time.perf_counter() - started
+    print(f"seeded {count} summaries in {elapsed:.1f}s ({elapsed / count * 1e6:.0f}us per summary incl. vectors)")
+    return labels
+
+
+def _naive(db, user_id: int, summary_id: str, limit: int) -> list:
+    """对比：每次请求都读取用户全部向量并计算"""
+    rows = db.execute(
+        SummaryVector.__table__.select().where(SummaryVector.user_id == user_id)
+    ).all()
+    ids = [row.summary_id for row in rows]
+    matrix = np.vstack([from_bytes(row.vector) for row in rows])
+    query = matrix[ids.index(summary_id)]
+    scores = matrix @ query
+    return [ids[i] for i in np.argsort(-scores)[1:limit + 1]]
+
+
+def _timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--summaries", type=int, default=100000)
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+    rng = random.Random(0)
+
+    with SessionLocal() as db:
+        user = User(username="bench", email="bench@example.com", hashed_password="-", is_active=True)
+        db.add(user)
+        db.commit()
+        user_id = user.id
+    vocabulary = _vocabulary(rng, args.topics, 40)
+    labels = _seed(rng, user_id, vocabulary, args.summaries)
+    index = RelatedIndex()
+    sample = [f"s{i}" for i in rng.sample(range(args.summaries), args.queries)]
+
+    with SessionLocal() as db:
+        cold = _timed(lambda: index.search(db, user_id, [sample[0]], args.limit))
+        latencies, precision = [], []
+        for summary_id in sample:
+            started = time.perf_counter()
+            matches = index.search(db, user_id, [summary_id], args.limit)[summary_id]
+            latencies.append(time.perf_counter() - started)
+            topic = labels[int(summary_id[1:])]
+            precision.append(sum(labels[int(id[1:])] == topic for id, _ in matches) / args.limit)
+        batch = _timed(lambda: index.search(db, user_id, sample[:64], args.limit))
+        naive = statistics.median(_timed(lambda: _naive(db, user_id, summary_id, args.limit)) for summary_id in sample[:5])
+
+        # 增量维护：新建一条摘要后查找只需同步一行；删除后核对ID
+        created = repository.create(db, obj_in=SummaryCreate(
+            **_summary(rng, vocabulary, 0, -1).model_dump(include={"title", "content", "tags"})
+        ), user_id=user_id)
+        after_create = _timed(lambda: index.search(db, user_id, [created.id], args.limit))
+        found = index.search(db, user_id, [created.id], args.limit)[created.id]
+        db.delete(db.get(Summary, sample[0]))
+        db.commit()
+        after_delete = _timed(lambda: index.search(db, user_id, [sample[1]], args.limit))
+        assert sample[0] not in {id for id, _ in index.search(db, user_id, [sample[1]], args.summaries)[sample[1]]}
+
+    print(f"cold load + query {cold * 1000:8.1f}ms  ({args.summaries} vectors)")
+    print(f"warm query        p50 {statistics.median(latencies) * 1000:6.2f}ms  "
+          f"p95 {sorted(latencies)[int(len(latencies) * 0.95)] * 1000:6.2f}ms")
+    print(f"batch of 64       {batch * 1000:8.1f}ms  ({batch / 64 * 1000:.2f}ms per query)")
+    print(f"naive per request {naive * 1000:8.1f}ms  (read all vectors from the database)")
+    print(f"after create      {after_create * 1000:8.2f}ms  after delete {after_delete * 1000:8.2f}ms")
+    print(f"top-{args.limit} same-topic precision {statistics.mean(precision):.1%}, "
+          f"new summary -> topic0 {sum(labels[int(id[1:])] == 0 for id, _ in found)}/{len(found)}")
+    print(f"index stats {index.stats()}")
+    assert statistics.median(latencies) < naive / 10
+    assert statistics.mean(precision) >= 0.9
+    print("ok")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,144 @@
+"""
+序列化基准：按接口统计响应序列化耗时（按response_model校验之后的部分），对比标准库json
+（JSONResponse，原默认响应类）与orjson（ORJSONResponse）；以及BaseRepository.create中
+jsonable_encoder与按列model_dump构造模型参数的耗时
+
+用法（在backend目录下）：
+    python -m benchmarks.serialization --items 100 --rounds 200
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks import use_temp_database
+
+# 必须在导入应用之前调用
+use_temp_database("serialization")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+
+from app.db.models.user import User  # noqa: E402
+from app.db.repositories.source import SourceRepository  # noqa: E402
+from app.db.repositories.summary import SummaryRepository  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.schemas.analytics import (  # noqa: E402
+    GitHubActivityData, GitHubAnalyticsResponse, GitHubContributorStats, GitHubIssueData
+)
+from app.schemas.source import SourceCreate  # noqa: E402
+from app.schemas.summary import SummaryCreate  # noqa: E402
+
+summary_repository = SummaryRepository()
+source_repository = SourceRepository()
+
+# 约2KB的中文正文
+CONTENT = "新闻摘要正文，包含若干要点与引用。" * 40
+
+
+def _response_field(path: str):
+    for route in app.routes:
+        if getattr(route, "path", None) == path and "GET" in route.methods:
+            return route.response_field
+    raise LookupError(path)
+
+
+def _seed(items: int) -> int:
+    with SessionLocal() as db:
+        user = User(username="bench", email="bench@example.com", hashed_password="-", is_active=True)
+        db.add(user)
+        db.commit()
+        for i in range(items):
+            source = source_repository.create(db, SourceCreate(
+                name=f"信息源{i}", type="news", url=f"https://example.com/{i}/feed",
+                filters={"keywords": ["科技", "财经"]},
+            ), user.id)
+            summary_repository.create(db, obj_in=SummaryCreate(
+                title=f"摘要{i}", content=CONTENT, key_points=["要点一", "要点二", "要点三"],
+                source_ids=[source.id], tags=["科技", f"标签{i % 10}"],
+            ), user_id=user.id)
+        return user.id
+
+
+def _analytics() -> GitHubAnalyticsResponse:
+    return GitHubAnalyticsResponse(
+        name="repo", full_name="org/repo", description="仓库描述", stars=1000, forks=100,
+        open_issues=10, watchers=50, last_updated=datetime.now(timezone.utc),
+        activity_data=[
+            GitHubActivityData(name=f"{month:02d}月", commits=100, pull_requests=10, issues=5, stars=20)
+            for month in range(1, 13)
+        ],
+        contributors=[
+            GitHubContributorStats(
+                name=f"user{i}", commits=50, pull_requests=5, issues=2,
+                avatar=f"https://avatars.example.com/{i}", profile_url=f"https://github.com/user{i}",
+            )
+            for i in range(5)
+        ],
+        issue_categories=[GitHubIssueData(name=f"label{i}", count=10) for i in range(6)],
+        commit_count_30d=30, active_contributors=20,
+    )
+
+
+def _timeit(fn, rounds: int) -> float:
+    """返回每次调用的平均耗时（微秒）"""
+    fn()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+def _report(label: str, before: float, after: float) -> None:
+    print(f"{label:<24} json {before:9.1f}us  orjson {after:9.1f}us  ({before / after:.1f}x)")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    user_id = _seed(args.items)
+    with SessionLocal() as db:
+        cases = [
+            ("GET /summaries", "/api/v1/summaries",
+             summary_repository.get_multi_paginated(db, user_id=user_id, limit=args.items)),
+            ("GET /sources/sources", "/api/v1/sources/sources", {
+                "items": source_repository.get_page(db, user_id, limit=args.items)[0],
+                "total": args.items, "page": 1, "size": args.items, "page_size": args.items,
+                "pages": 1, "next_cursor": None,
+            }),
+        ]
+        detail = summary_repository.get_multi_paginated(db, user_id=user_id, limit=1)["items"][0]
+        cases.append(("GET /summaries/{id}", "/api/v1/summaries/{summary_id}", detail))
+        cases.append(("GET /analytics/github", "/api/v1/analytics/github/{repo_name:path}", _analytics()))
+
+        for label, path, data in cases:
+            # 按response_model校验和导出（两种响应类相同），之后只是编码方式不同
+            content = asyncio.run(serialize_response(field=_response_field(path), response_content=data))
+            before = _timeit(lambda: JSONResponse(content).body, args.rounds)
+            after = _timeit(lambda: ORJSONResponse(content).body, args.rounds)
+            _report(label, before, after)
+            assert after < before
+
+    obj_in = SummaryCreate(
+        title="摘要", content=CONTENT, key_points=["要点一", "要点二"], source_ids=["a", "b"], tags=["科技"]
+    )
+    columns = summary_repository.columns
+    before = _timeit(
+        lambda: {key: value for key, value in jsonable_encoder(obj_in).items() if key in columns},
+        args.rounds * 10,
+    )
+    after = _timeit(lambda: obj_in.model_dump(include=columns), args.rounds * 10)
+    print(f"{'BaseRepository.create':<24} jsonable_encoder {before:.1f}us  model_dump {after:.1f}us  "
+          f"({before / after:.1f}x)")
+    assert after < before
+    print("ok")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,127 @@
+"""
+SQLite读写争用基准：后台线程持续批量写入摘要的同时，多个线程读取摘要列表，
+统计读延迟、读失败数和写入吞吐，对比default和production两种SQLite配置档
+
+用法（在backend目录下）：
+    python -m benchmarks.sqlite_contention --profile both --seconds 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks import use_temp_database
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def _run_profile(args) -> None:
+    # 必须在导入应用之前设置，每个配置档使用独立的临时数据库
+    os.environ["SQLITE_PROFILE"] = args.profile
+    use_temp_database("sqlite")
+
+    from app.db.models.summary import Summary
+    from app.db.models.user import User
+    from app.db.repositories.summary import SummaryRepository
+    from app.db.session import ReadSessionLocal, SessionLocal, engine
+
+    repository = SummaryRepository()
+    with SessionLocal() as db:
+        user = User(username="bench", email="bench@example.com", hashed_password="-", is_active=True)
+        db.add(user)
+        db.commit()
+        user_id = user.id
+
+    def summaries(count: int, offset: int) -> list:
+        return [
+            Summary(user_id=user_id, title=f"summary {offset + i}", content=f"content {offset + i} " * 200)
+            for i in range(count)
+        ]
+
+    with SessionLocal() as db:
+        db.add_all(summaries(args.seed, 0))
+        db.commit()
+
+    stop = threading.Event()
+    read_latencies, read_errors, written = [], [], [0]
+    lock = threading.Lock()
+
+    def writer() -> None:
+        offset = args.seed
+        while not stop.is_set():
+            with SessionLocal() as db:
+                db.add_all(summaries(args.write_batch, offset))
+                db.commit()
+            offset += args.write_batch
+            with lock:
+                written[0] += args.write_batch
+
+    def reader() -> None:
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                with ReadSessionLocal() as db:
+                    repository.get_multi_paginated(db, user_id=user_id, limit=20)
+            except Exception as e:
+                with lock:
+                    read_errors.append(type(e).__name__)
+                continue
+            with lock:
+                read_latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=writer) for _ in range(args.writers)]
+    threads += [threading.Thread(target=reader) for _ in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    with engine.connect() as conn:
+        journal_mode = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+    print(f"[{args.profile}] journal_mode={journal_mode}, "
+          f"{args.writers} writers x {args.write_batch} rows, {args.readers} readers, {args.seconds:.0f}s")
+    print(f"[{args.profile}] writes: {written[0]} rows -> {written[0] / args.seconds:.0f}/s")
+    print(f"[{args.profile}] reads: {len(read_latencies)} -> {len(read_latencies) / args.seconds:.0f}/s "
+          f"(p50 {statistics.median(read_latencies or [0.0]) * 1000:.1f}ms, "
+          f"p95 {_percentile(read_latencies, 0.95) * 1000:.1f}ms, "
+          f"max {max(read_latencies or [0.0]) * 1000:.1f}ms, "
+          f"errors {len(read_errors)})")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", choices=["default", "production", "both"], default="both")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=1)
+    parser.add_argument("--write-batch", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    if args.profile != "both":
+        _run_profile(args)
+        return
+    # 配置档在导入时读取，每个配置档在独立进程中运行
+    options = [
+        "--seconds", str(args.seconds), "--readers", str(args.readers), "--writers", str(args.writers),
+        "--write-batch", str(args.write_batch), "--seed", str(args.seed),
+    ]
+    for profile in ("default", "production"):
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.sqlite_contention", "--profile", profile, *options],
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,109 @@
+"""
+摘要列表投影基准：长正文摘要的列表页，对比加载并返回完整正文（fields包含content、key_points）、
+默认列表字段（摘录代替正文）和只取少量字段时的查询耗时、响应体积和接口延迟
+
+用法（在backend目录下）：
+    python -m benchmarks.summary_list --rows 2000 --content-chars 20000
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+from benchmarks import use_temp_database
+
+# 必须在导入应用之前调用
+use_temp_database("summary-list")
+
+import httpx  # noqa: E402
+
+from app.core.security import create_access_token  # noqa: E402
+from app.db.models.user import User  # noqa: E402
+from app.db.repositories.summary import SummaryRepository  # noqa: E402
+from app.db.session import SessionLocal, async_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.schemas.summary import SUMMARY_LIST_FIELDS, SummaryImport  # noqa: E402
+
+repository = SummaryRepository()
+
+# 对比：旧版列表接口返回的字段
+FULL_FIELDS = ",".join([*SUMMARY_LIST_FIELDS, "content", "key_points"])
+CASES = [
+    ("full content", FULL_FIELDS),
+    ("default (excerpt)", None),
+    ("fields=id,title,tags", "id,title,tags"),
+]
+
+
+def _seed(rows: int, content_chars: int) -> int:
+    with SessionLocal() as db:
+        user = User(username="bench", email="bench@example.com", hashed_password="-", is_active=True)
+        db.add(user)
+        db.commit()
+        paragraph = "## 要点\n- 这是一段较长的摘要正文，用于模拟长篇内容。\n"
+        content = (paragraph * (content_chars // len(paragraph) + 1))[:content_chars]
+        for start in range(0, rows, 500):
+            repository.bulk_import(db, user_id=user.id, items=[
+                SummaryImport(
+                    title=f"summary {i}", content=content,
+                    key_points=[f"要点{j}" for j in range(10)], tags=["bench", f"tag{i % 10}"],
+                )
+                for i in range(start, min(rows, start + 500))
+            ])
+        return user.id
+
+
+def _query_ms(user_id: int, fields, rounds: int) -> float:
+    selected = fields.split(",") if fields else list(SUMMARY_LIST_FIELDS)
+    latencies = []
+    with SessionLocal() as db:
+        for _ in range(rounds):
+            started = time.perf_counter()
+            repository.get_multi_paginated(db, user_id=user_id, limit=100, include_total=False, fields=selected)
+            latencies.append(time.perf_counter() - started)
+            db.expunge_all()
+    return statistics.median(latencies) * 1000
+
+
+async def _requests(user_id: int, rounds: int) -> list:
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+    transport = httpx.ASGITransport(app=app)
+    results = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+        for label, fields in CASES:
+            params = {"page_size": 100, "include_total": "false"}
+            if fields:
+                params["fields"] = fields
+            latencies, size = [], 0
+            for _ in range(rounds):
+                started = time.perf_counter()
+                response = await client.get("/api/v1/summaries", params=params)
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+                size = len(response.content)
+            results.append((label, fields, size, statistics.median(latencies) * 1000))
+    # ASGITransport不执行lifespan，需自行关闭异步连接池
+    await async_engine.dispose()
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--content-chars", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    user_id = _seed(args.rows, args.content_chars)
+    results = asyncio.run(_requests(user_id, args.rounds))
+    for label, fields, size, latency in results:
+        print(f"{label:<22} payload {size / 1024:8.1f}KB  request p50 {latency:6.1f}ms  "
+              f"query p50 {_query_ms(user_id, fields, args.rounds):6.1f}ms")
+    full, default = results[0][2], results[1][2]
+    assert default * 10 < full, "默认列表的响应体积应小一个数量级"
+    print("ok")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
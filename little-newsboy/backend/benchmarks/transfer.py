@@ -0,0 +1,123 @@
+"""
+导入导出基准：通过导入接口批量写入摘要，与逐条create+commit+refresh对比写入吞吐和SQL语句数；
+再对比流式导出与get_by_user_id一次性加载的内存峰值
+
+用法（在backend目录下）：
+    python -m benchmarks.transfer --rows 20000
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+import tracemalloc
+
+from benchmarks import use_temp_database
+
+# 必须在导入应用之前调用
+use_temp_database("transfer")
+
+import httpx  # noqa: E402
+
+from app.core.security import create_access_token  # noqa: E402
+from app.db.models.user import User  # noqa: E402
+from app.db.repositories.summary import SummaryRepository  # noqa: E402
+from app.db.session import SessionLocal, async_engine, engine  # noqa: E402
+from app.db.statements import count_statements  # noqa: E402
+from app.main import app  # noqa: E402
+from app.schemas.summary import SummaryCreate, SummaryExport  # noqa: E402
+from app.services.transfer import export_ndjson  # noqa: E402
+
+repository = SummaryRepository()
+
+
+def _create_user(name: str) -> int:
+    with SessionLocal() as db:
+        user = User(username=name, email=f"{name}@example.com", hashed_password="-", is_active=True)
+        db.add(user)
+        db.commit()
+        return user.id
+
+
+def _line(i: int) -> str:
+    return json.dumps({
+        "title": f"summary {i}", "content": f"content {i} " * 100,
+        "key_points": ["point"], "tags": ["bench", f"tag{i % 10}"],
+    })
+
+
+def _per_row(user_id: int, rows: int) -> tuple:
+    """对比：逐条create+commit+refresh"""
+    with SessionLocal() as db, count_statements(engine) as counter:
+        started = time.perf_counter()
+        for i in range(rows):
+            repository.create(db, obj_in=SummaryCreate.model_validate_json(_line(i)), user_id=user_id)
+        elapsed = time.perf_counter() - started
+    return elapsed, counter.count
+
+
+async def _bulk(user_id: int, rows: int) -> tuple:
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+    body = ("\n".join(_line(i) for i in range(rows)) + "\n").encode()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        with count_statements(engine) as counter:
+            started = time.perf_counter()
+            response = await client.post("/api/v1/summaries/import", content=body, headers=headers)
+            elapsed = time.perf_counter() - started
+    # ASGITransport不执行lifespan，需自行关闭异步连接池
+    await async_engine.dispose()
+    response.raise_for_status()
+    return elapsed, counter.count, response.json()
+
+
+def _peak_memory(fn) -> tuple:
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak, elapsed
+
+
+def _stream_export(user_id: int) -> int:
+    size = 0
+    for chunk in export_ndjson(lambda db: repository.iter_by_user_id(db, user_id=user_id, batch_size=500), SummaryExport):
+        size += len(chunk)
+    return size
+
+
+def _load_all(user_id: int) -> int:
+    with SessionLocal() as db:
+        rows = repository.get_by_user_id(db, user_id=user_id)
+        return sum(len(SummaryExport.model_validate(row).model_dump_json()) + 1 for row in rows)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--per-row", type=int, default=500, help="逐条写入对比的行数")
+    args = parser.parse_args(argv)
+
+    per_row_elapsed, per_row_statements = _per_row(_create_user("per-row"), args.per_row)
+    print(f"per-row create: {args.per_row} rows in {per_row_elapsed:.2f}s -> "
+          f"{args.per_row / per_row_elapsed:.0f} rows/s, {per_row_statements / args.per_row:.1f} statements/row")
+
+    user_id = _create_user("bulk")
+    bulk_elapsed, bulk_statements, result = asyncio.run(_bulk(user_id, args.rows))
+    print(f"bulk import: {args.rows} rows in {bulk_elapsed:.2f}s -> "
+          f"{args.rows / bulk_elapsed:.0f} rows/s, {bulk_statements / args.rows:.2f} statements/row")
+    assert result["imported"] == args.rows, result
+
+    streamed, stream_peak, stream_elapsed = _peak_memory(lambda: _stream_export(user_id))
+    loaded, load_peak, load_elapsed = _peak_memory(lambda: _load_all(user_id))
+    print(f"stream export: {streamed / 1e6:.1f}MB in {stream_elapsed:.2f}s, peak memory {stream_peak / 1e6:.1f}MB")
+    print(f"load all:      {loaded / 1e6:.1f}MB in {load_elapsed:.2f}s, peak memory {load_peak / 1e6:.1f}MB")
+    assert streamed == loaded
+    assert stream_peak < load_peak
+    print("ok")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,26 @@
+import os
+import tempfile
+
+# 必须在导入应用之前设置，测试使用独立的临时数据库
+_db_dir = tempfile.mkdtemp(prefix="tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ["AI_CACHE_DB_PATH"] = ""
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.db.migrations import prepare_database  # noqa: E402
+from app.db.session import engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    """创建表和全文索引（与应用启动时相同），不使用client的测试也可以访问数据库"""
+    prepare_database(engine)
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as client:
+        yield client
@@ -0,0 +1,57 @@
+"""
+长文本分块摘要：reduce输入包含去重后的局部要点，分层归并不超过AI_CHUNK_MAX_LEVELS层
+"""
+import asyncio
+
+from app.config import settings
+from app.services.ai import AIService, SummaryRequest, SummaryResult, estimate_tokens
+
+
+class _EchoService(AIService):
+    """不调用模型：摘要原样返回输入（不压缩），要点为固定的两条"""
+
+    def __init__(self):
+        super().__init__()
+        self.cache = None
+        self.requests = []
+
+    async def _generate_with_openai(self, request: SummaryRequest) -> SummaryResult:
+        self.requests.append(request.content)
+        return SummaryResult(summary=request.content, key_points=["共同要点", f"要点{len(self.requests) % 2}"])
+
+    async def _stream_with_openai(self, request: SummaryRequest):
+        self.requests.append(request.content)
+        yield request.content
+
+
+def _content(paragraphs: int) -> str:
+    return "\n\n".join(f"第{i}段。" + "内容" * 40 for i in range(paragraphs))
+
+
+def test_reduce_input_includes_key_points(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "AI_CHUNK_MAX_TOKENS", 200)
+    service = _EchoService()
+    service.provider = "openai"
+    # 局部摘要原样返回时合并结果仍会超长，这里只检查第一层的合并输入
+    reduce_request, key_points = asyncio.run(service._map_chunks(SummaryRequest(content=_content(4))))
+    assert key_points == ["共同要点", "要点1", "要点0"]
+    assert reduce_request.content.count("共同要点") == 1
+    assert "### 各部分要点" in reduce_request.content
+
+
+def test_levels_are_capped(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "AI_CHUNK_MAX_TOKENS", 200)
+    monkeypatch.setattr(settings, "AI_CHUNK_MAX_LEVELS", 3)
+    service = _EchoService()
+    service.provider = "openai"
+    asyncio.run(service.generate_summary(SummaryRequest(content=_content(10))))
+    # 摘要不压缩时每层合并结果都会变长，达到层数上限后截断并只reduce一次
+    final = service.requests[-1]
+    assert estimate_tokens(final) <= settings.AI_CHUNK_MAX_TOKENS
+
+    async def stream():
+        return [text async for text in service.stream_summary(SummaryRequest(content=_content(10)))]
+
+    calls = len(service.requests)
+    assert estimate_tokens(asyncio.run(stream())[0]) <= settings.AI_CHUNK_MAX_TOKENS
+    assert len(service.requests) - calls == calls
@@ -0,0 +1,154 @@
+"""
+异步列表查询与同步查询返回相同的结果（排序、过滤、全文搜索、游标分页和字段选择）
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.db.models.source import Source, SourceType, Status
+from app.db.models.user import User
+from app.db.repositories.source import SourceRepository
+from app.db.repositories.summary import SummaryRepository
+from app.db.session import AsyncSessionLocal, SessionLocal, async_engine
+from app.schemas.summary import SummaryImport
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+SUMMARY_QUERIES = [
+    {},
+    {"skip": 3, "limit": 4},
+    {"sort_field": "title", "sort_order": "asc", "limit": 5},
+    {"tag": "even"},
+    {"is_archived": True},
+    {"is_important": False, "include_total": False},
+    {"search": "关键词"},
+    {"fields": ["id", "title", "excerpt", "source_ids"]},
+    {"fields": ["id", "tags"], "sort_field": "title", "limit": 3},
+]
+
+
+@pytest.fixture(scope="module")
+def data() -> dict:
+    with SessionLocal() as db:
+        user = User(username="async-lists", email="async-lists@example.com", hashed_password="-", is_active=True)
+        db.add(user)
+        db.commit()
+        sources = [
+            Source(
+                name=f"源 {i}", type=SourceType.BLOG, url=f"https://example.com/async/{i}", user_id=user.id,
+                status=Status.PAUSED if i % 3 == 0 else Status.ACTIVE,
+                created_at=START + timedelta(hours=i // 2),
+            )
+            for i in range(9)
+        ]
+        db.add_all(sources)
+        db.commit()
+        items = [
+            SummaryImport(
+                title=f"摘要 {i % 7}",
+                content=("包含关键词的正文 " if i % 4 == 0 else "普通正文 ") * 5,
+                tags=["even" if i % 2 == 0 else "odd"],
+                source_ids=[sources[i % len(sources)].id],
+                is_archived=i % 5 == 0,
+                # 每两条摘要创建时间相同，检验排序字段相等时按ID排序
+                created_at=START + timedelta(hours=i // 2),
+            )
+            for i in range(15)
+        ]
+        SummaryRepository().bulk_import(db, user_id=user.id, items=items)
+        return {"user_id": user.id}
+
+
+def _run(coro_factory):
+    async def run():
+        try:
+            async with AsyncSessionLocal() as db:
+                return await coro_factory(db)
+        finally:
+            # 连接池中的连接绑定在本次事件循环上
+            await async_engine.dispose()
+    return asyncio.run(run())
+
+
+def _normalize(page: dict) -> dict:
+    items = [item if isinstance(item, dict) else item.id for item in page["items"]]
+    return {**page, "items": items}
+
+
+def _walk(fetch) -> list:
+    """沿next_cursor读取全部页"""
+    pages, cursor = [], None
+    while True:
+        page = fetch(cursor)
+        pages.append(page)
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("query", SUMMARY_QUERIES)
+def test_summary_list_parity(data: dict, query: dict) -> None:
+    repository = SummaryRepository()
+    kwargs = {"user_id": data["user_id"], **query}
+    with SessionLocal() as db:
+        expected = _normalize(repository.get_multi_paginated(db, **kwargs))
+    actual = _normalize(_run(lambda db: repository.get_multi_paginated_async(db, **kwargs)))
+    assert expected["items"]
+    assert actual == expected
+
+
+@pytest.mark.parametrize("sort", [("created_at", "desc"), ("created_at", "asc"), ("title", "asc")])
+def test_summary_cursor_parity(data: dict, sort) -> None:
+    repository = SummaryRepository()
+    sort_field, sort_order = sort
+    kwargs = {"user_id": data["user_id"], "limit": 4, "sort_field": sort_field, "sort_order": sort_order}
+
+    def fetch_sync(cursor):
+        with SessionLocal() as db:
+            return _normalize(repository.get_multi_paginated(db, cursor=cursor, include_total=False, **kwargs))
+
+    def fetch_async(cursor):
+        return _normalize(_run(
+            lambda db: repository.get_multi_paginated_async(db, cursor=cursor, include_total=False, **kwargs)
+        ))
+
+    expected = _walk(fetch_sync)
+    assert _walk(fetch_async) == expected
+    ids = [id for page in expected for id in page["items"]]
+    assert len(ids) == len(set(ids)) == 15
+
+
+@pytest.mark.parametrize("query", [{}, {"status": Status.PAUSED}, {"search": "源 1"}, {"skip": 2, "limit": 3}])
+def test_source_page_parity(data: dict, query: dict) -> None:
+    repository = SourceRepository()
+    filters = {key: value for key, value in query.items() if key not in ("skip", "limit")}
+    with SessionLocal() as db:
+        rows, next_cursor = repository.get_page(db, data["user_id"], **query)
+        expected = ([row.id for row in rows], next_cursor, repository.count(db, data["user_id"], **filters))
+
+    async def fetch(db):
+        rows, next_cursor = await repository.get_page_async(db, data["user_id"], **query)
+        return [row.id for row in rows], next_cursor, await repository.count_async(db, data["user_id"], **filters)
+
+    assert expected[0]
+    assert _run(fetch) == expected
+
+
+def test_source_cursor_parity(data: dict) -> None:
+    repository = SourceRepository()
+
+    def fetch_sync(cursor):
+        with SessionLocal() as db:
+            rows, next_cursor = repository.get_page(db, data["user_id"], limit=2, cursor=cursor)
+            return {"items": [row.id for row in rows], "next_cursor": next_cursor}
+
+    def fetch_async(cursor):
+        async def fetch(db):
+            rows, next_cursor = await repository.get_page_async(db, data["user_id"], limit=2, cursor=cursor)
+            return {"items": [row.id for row in rows], "next_cursor": next_cursor}
+        return _run(fetch)
+
+    expected = _walk(fetch_sync)
+    assert _walk(fetch_async) == expected
+    assert sum(len(page["items"]) for page in expected) == 9
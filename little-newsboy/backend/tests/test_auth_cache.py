@@ -0,0 +1,103 @@
+"""
+认证缓存：重复请求命中令牌和用户缓存；ORM更新用户时清除缓存，
+绕过ORM事件的变更（如其他进程）在过期时间后生效
+"""
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from app.api import deps
+from app.config import settings
+from app.core.security import create_access_token
+from app.db.models.user import User
+from app.db.session import SessionLocal, async_engine
+from app.db.statements import count_statements
+from app.services import cache
+
+ME_URL = f"{settings.API_V1_STR}/auth/me"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """只替换缓存模块使用的时钟"""
+    now = [time.monotonic()]
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    deps.token_cache.clear()
+    deps.user_cache.clear()
+    return now
+
+
+def _user(name: str) -> dict:
+    with SessionLocal() as db:
+        user = User(username=name, email=f"{name}@example.com", hashed_password="-", is_active=True)
+        db.add(user)
+        db.commit()
+        return {"id": user.id, "headers": {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}}
+
+
+def test_ttl_is_capped() -> None:
+    assert deps.AUTH_CACHE_TTL_SECONDS == min(settings.AUTH_CACHE_TTL_SECONDS, deps.AUTH_CACHE_MAX_TTL_SECONDS)
+    assert deps.token_cache.ttl_seconds == deps.user_cache.ttl_seconds == deps.AUTH_CACHE_TTL_SECONDS
+
+
+def test_repeated_requests_hit_cache(client: TestClient, clock) -> None:
+    user = _user("cache_hits")
+    assert client.get(ME_URL, headers=user["headers"]).status_code == 200
+    token_hits, user_hits = deps.token_cache.hits, deps.user_cache.hits
+
+    with count_statements(async_engine) as counter:
+        response = client.get(ME_URL, headers=user["headers"])
+    assert response.status_code == 200
+    assert response.json()["username"] == "cache_hits"
+    assert counter.count == 0
+    assert deps.token_cache.hits == token_hits + 1
+    assert deps.user_cache.hits == user_hits + 1
+
+
+def test_deactivation_invalidates_cache(client: TestClient, clock) -> None:
+    user = _user("cache_deactivate")
+    assert client.get(ME_URL, headers=user["headers"]).status_code == 200
+    with SessionLocal() as db:
+        db.get(User, user["id"]).is_active = False
+        db.commit()
+
+    response = client.get(ME_URL, headers=user["headers"])
+    assert response.status_code == 400
+    assert response.json()["detail"] == "用户未激活"
+
+
+def test_deleted_user_is_rejected(client: TestClient, clock) -> None:
+    user = _user("cache_delete")
+    assert client.get(ME_URL, headers=user["headers"]).status_code == 200
+    with SessionLocal() as db:
+        db.delete(db.get(User, user["id"]))
+        db.commit()
+    assert client.get(ME_URL, headers=user["headers"]).status_code == 401
+
+
+def test_changes_outside_orm_apply_after_ttl(client: TestClient, clock) -> None:
+    user = _user("cache_expiry")
+    assert client.get(ME_URL, headers=user["headers"]).status_code == 200
+    # 批量更新不触发ORM事件，相当于其他进程中的变更
+    with SessionLocal() as db:
+        db.execute(update(User).where(User.id == user["id"]).values(is_active=False))
+        db.commit()
+
+    clock[0] += deps.AUTH_CACHE_TTL_SECONDS - 1
+    assert client.get(ME_URL, headers=user["headers"]).status_code == 200
+    clock[0] += 2
+    assert client.get(ME_URL, headers=user["headers"]).status_code == 400
+
+
+def test_token_entry_expires_with_token(client: TestClient, clock) -> None:
+    user = _user("cache_token_exp")
+    token = create_access_token({"sub": str(user["id"])}, expires_delta=timedelta(seconds=5))
+    assert client.get(ME_URL, headers={"Authorization": f"Bearer {token}"}).status_code == 200
+    assert deps.token_cache.get(token) == user["id"]
+    # 令牌有效期短于缓存过期时间时，缓存条目随令牌过期
+    clock[0] += 6
+    assert deps.token_cache.get(token) is None
@@ -0,0 +1,95 @@
+"""
+近似重复条目：其他信息源转载的条目标记duplicate_of且不计入正文；同一信息源的条目之间不比较；
+只与时间窗口内出现过的条目比较
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import pytest
+
+from app.config import settings
+from app.db.models.source import ItemFingerprint, Source, SourceFetch, SourceType
+from app.db.models.user import User
+from app.db.session import SessionLocal
+from app.services.fetcher import FetchResult
+from app.services.source import save_fetch_results
+
+STORY = "央行今日宣布下调存款准备金率零点五个百分点，释放长期资金约一万亿元，以支持实体经济发展和稳定市场预期"
+OTHER = "本周多地迎来强降雨天气，气象部门发布暴雨橙色预警，提醒市民减少外出并注意防范城市内涝和山洪等灾害"
+
+
+@pytest.fixture
+def sources() -> List[str]:
+    name = f"dedup_{uuid.uuid4().hex[:8]}"
+    with SessionLocal() as db:
+        user = User(username=name, email=f"{name}@example.com", hashed_password="-", is_active=True)
+        db.add(user)
+        db.commit()
+        rows = [
+            Source(name=f"{name}_{i}", type=SourceType.NEWS, url=f"https://example.com/{name}/{i}", user_id=user.id)
+            for i in range(2)
+        ]
+        db.add_all(rows)
+        db.commit()
+        return [source.id for source in rows]
+
+
+def _item(slug: str, text: str) -> dict:
+    return {"title": slug, "link": f"https://example.com/{slug}", "text": text}
+
+
+def _fetch(source_ids: List[str], source_id: str, *items: dict) -> FetchResult:
+    """保存一次抓取结果，返回标记后的结果"""
+    result = FetchResult(source_id=source_id, url=f"https://example.com/{source_id}", items=list(items))
+    with SessionLocal() as db:
+        sources = db.query(Source).filter(Source.id.in_(source_ids)).all()
+        save_fetch_results(db, [result], {source.id: source.user_id for source in sources})
+    return result
+
+
+def test_repost_is_marked_and_left_out_of_content(sources: List[str]) -> None:
+    original, repost = sources
+    _fetch(sources, original, _item("story", STORY))
+    result = _fetch(sources, repost, _item("story-repost", STORY + "（转载）"), _item("rain", OTHER))
+
+    duplicate, unique = result.items
+    assert duplicate["duplicate_of"] == {
+        "source_id": original, "title": "story", "link": "https://example.com/story",
+    }
+    assert "duplicate_of" not in unique
+    assert "story-repost" not in result.content
+    assert OTHER in result.content
+    with SessionLocal() as db:
+        # 标记保留在保存的条目中
+        saved = db.query(SourceFetch).filter(SourceFetch.source_id == repost).one()
+        assert saved.items[0]["duplicate_of"]["source_id"] == original
+        assert "story-repost" not in saved.content
+        # 重复条目不记录指纹
+        assert db.query(ItemFingerprint).filter(ItemFingerprint.source_id == repost).count() == 1
+
+
+def test_same_source_items_are_not_compared(sources: List[str]) -> None:
+    source_id = sources[0]
+    first = _fetch(sources, source_id, _item("story", STORY))
+    # 再次抓取到同一条目，以及同一信息源内相似的条目，均不标记
+    again = _fetch(sources, source_id, _item("story", STORY), _item("story-update", STORY + "（更新）"))
+    assert not any("duplicate_of" in item for item in first.items + again.items)
+    assert "story-update" in again.content
+
+
+def test_items_outside_window_are_not_matched(sources: List[str]) -> None:
+    original, repost = sources
+    _fetch(sources, original, _item("story", STORY))
+    with SessionLocal() as db:
+        db.query(ItemFingerprint).filter(ItemFingerprint.source_id == original).update({
+            ItemFingerprint.seen_at: datetime.now(timezone.utc) - timedelta(days=settings.DEDUP_WINDOW_DAYS + 1)
+        })
+        db.commit()
+
+    result = _fetch(sources, repost, _item("story-repost", STORY + "（转载）"))
+    assert "duplicate_of" not in result.items[0]
+    assert "story-repost" in result.content
+    with SessionLocal() as db:
+        # 时间窗口外的指纹被清理
+        assert db.query(ItemFingerprint).filter(ItemFingerprint.source_id == original).count() == 0
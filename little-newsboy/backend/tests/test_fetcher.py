@@ -0,0 +1,82 @@
+"""
+信息源抓取：单主机并发不超过FETCH_PER_HOST_LIMIT，抓取结束后不保留主机的信号量；
+拒绝解析到非公网地址的信息源（包括重定向的目标）
+"""
+import asyncio
+from collections import Counter
+
+import httpx
+
+from app.config import settings
+from app.db.models.source import SourceType
+from app.services.fetcher import FetchTarget, SourceFetcher
+
+# 测试中的域名：*.internal.test解析到内网地址，其余解析到公网地址
+ADDRESSES = {"metadata.internal.test": ["169.254.169.254"], "db.internal.test": ["93.184.216.34", "10.0.0.5"]}
+
+
+async def _resolve(host: str, port: int) -> list:
+    return ADDRESSES.get(host, ["93.184.216.34"])
+
+
+FEED = b'<?xml version="1.0"?><rss><channel><item><title>t</title><link>https://example.com/1</link></item></channel></rss>'
+
+
+def test_host_limits_are_enforced_and_released() -> None:
+    active: Counter = Counter()
+    peak: Counter = Counter()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        active[host] += 1
+        peak[host] = max(peak[host], active[host])
+        await asyncio.sleep(0.01)
+        active[host] -= 1
+        return httpx.Response(200, content=FEED, headers={"Content-Type": "application/rss+xml"})
+
+    async def run():
+        fetcher = SourceFetcher(transport=httpx.MockTransport(handler), resolver=_resolve)
+        targets = [
+            FetchTarget(id=f"{host}-{i}", type=SourceType.NEWS, url=f"https://{host}.example.com/feed/{i}")
+            for host in ("busy", *(f"host{n}" for n in range(50))) for i in range(10 if host == "busy" else 1)
+        ]
+        results = await fetcher.fetch_many(targets)
+        await fetcher.shutdown()
+        return fetcher, results
+
+    fetcher, results = asyncio.run(run())
+    assert len(results) == 60
+    assert all(result.error is None for result in results)
+    assert peak["busy.example.com"] == settings.FETCH_PER_HOST_LIMIT
+    assert fetcher._host_limits == {}
+
+
+def test_private_addresses_are_rejected() -> None:
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(str(request.url))
+        if request.url.path == "/redirect":
+            return httpx.Response(302, headers={"Location": "http://127.0.0.1:8000/admin"})
+        return httpx.Response(200, content=FEED, headers={"Content-Type": "application/rss+xml"})
+
+    async def run(url: str):
+        fetcher = SourceFetcher(transport=httpx.MockTransport(handler), resolver=_resolve)
+        result = await fetcher.fetch(FetchTarget(id="ssrf", type=SourceType.NEWS, url=url))
+        await fetcher.shutdown()
+        return result
+
+    for url in (
+        "http://127.0.0.1/feed", "http://[::1]/feed", "http://192.168.1.1/feed", "http://[::ffff:10.0.0.1]/feed",
+        "http://metadata.internal.test/latest/meta-data/", "http://db.internal.test/feed", "file:///etc/passwd",
+    ):
+        result = asyncio.run(run(url))
+        assert result.error is not None and result.items == [], url
+    assert requested == []
+
+    # 重定向到内网地址时，重定向的请求不会发出
+    result = asyncio.run(run("https://public.example.com/redirect"))
+    assert "127.0.0.1" in result.error
+    assert requested == ["https://public.example.com/redirect"]
+
+    assert asyncio.run(run("https://public.example.com/feed")).error is None
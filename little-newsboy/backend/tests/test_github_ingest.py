@@ -0,0 +1,47 @@
+"""
+GH Archive导入：按仓库过滤条件分别记录进度，已计入的事件不重复计入
+"""
+import json
+
+from app.db.session import SessionLocal
+from app.services.github_analytics import analytics_repository, ingest_archive
+
+
+def _write_archive(path, repos, start_id: int, count: int) -> None:
+    with open(path, "w") as f:
+        for i in range(count):
+            for repo in repos:
+                f.write(json.dumps({
+                    "id": str(start_id + i), "type": "WatchEvent", "repo": {"name": repo},
+                    "actor": {"login": "someone"}, "payload": {}, "created_at": "2024-03-01T00:00:00Z",
+                }) + "\n")
+
+
+def _monthly_stars(db, repo: str) -> int:
+    record = analytics_repository.get_repo(db, repo)
+    return sum(row.stars for row in analytics_repository.get_monthly(db, record.id, record.last_event_at.date().replace(day=1)))
+
+
+def test_filtered_reingest_and_watermarks(tmp_path) -> None:
+    path = tmp_path / "2024-03-01-0.json"
+    _write_archive(path, ["ingest/a", "ingest/b"], 1000, 5)
+    with SessionLocal() as db:
+        assert ingest_archive(db, str(path), ["ingest/a"]) == 5
+        # 同一文件换一个仓库过滤条件仍会导入
+        assert ingest_archive(db, str(path), ["ingest/b"]) == 5
+        assert ingest_archive(db, str(path), ["ingest/b"]) == 0
+        # 不过滤时两个仓库的事件都已计入
+        assert ingest_archive(db, str(path)) == 0
+        assert _monthly_stars(db, "ingest/a") == 5
+        assert _monthly_stars(db, "ingest/b") == 5
+
+
+def test_archive_skips_events_already_synced(tmp_path) -> None:
+    path = tmp_path / "2024-03-01-1.json"
+    _write_archive(path, ["ingest/c"], 2000, 10)
+    with SessionLocal() as db:
+        # 模拟事件API已同步到ID 2004
+        _write_archive(tmp_path / "synced.json", ["ingest/c"], 2000, 5)
+        assert ingest_archive(db, str(tmp_path / "synced.json")) == 5
+        assert ingest_archive(db, str(path)) == 5
+        assert _monthly_stars(db, "ingest/c") == 10
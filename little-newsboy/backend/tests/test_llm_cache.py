@@ -0,0 +1,48 @@
+"""
+LLM结果缓存：持久层命中、访问时间的延迟提交和定期容量淘汰
+"""
+import asyncio
+import sqlite3
+
+from app.services.cache import LLMCache
+
+
+def test_disk_hit_from_another_instance(tmp_path) -> None:
+    path = str(tmp_path / "cache.db")
+    writer = LLMCache(db_path=path)
+    asyncio.run(writer.aset("key", {"summary": "s"}))
+    writer.close()
+
+    reader = LLMCache(db_path=path)
+    assert asyncio.run(reader.aget("key")) == {"summary": "s"}
+    assert asyncio.run(reader.aget("key")) == {"summary": "s"}
+    assert asyncio.run(reader.aget("missing")) is None
+    assert (reader.disk_hits, reader.memory_hits, reader.misses) == (1, 1, 1)
+    reader.close()
+
+
+def test_touch_is_committed_with_next_write(tmp_path) -> None:
+    path = str(tmp_path / "cache.db")
+    cache = LLMCache(db_path=path)
+    cache.set("old", {"v": 1})
+    cache._memory.clear()
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE llm_cache SET accessed_at = 0")
+    assert cache.get("old") == {"v": 1}
+    cache.set("new", {"v": 2})
+    with sqlite3.connect(path) as conn:
+        accessed_at = conn.execute("SELECT accessed_at FROM llm_cache WHERE key = 'old'").fetchone()[0]
+    assert accessed_at > 0
+    cache.close()
+
+
+def test_capacity_eviction_runs_periodically(tmp_path) -> None:
+    path = str(tmp_path / "cache.db")
+    cache = LLMCache(db_path=path, db_max_entries=10)
+    for i in range(LLMCache.DISK_EVICT_INTERVAL):
+        cache.set(f"key{i}", {"v": i})
+    with sqlite3.connect(path) as conn:
+        count = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+    assert count == 10
+    assert cache.evictions >= LLMCache.DISK_EVICT_INTERVAL - 10
+    cache.close()
@@ -0,0 +1,89 @@
+"""
+运行指标：/metrics按路由模板统计请求，采集时读取任务队列深度；采集时计算的指标出错不影响其余指标
+"""
+from fastapi.testclient import TestClient
+from prometheus_client import CollectorRegistry, generate_latest
+from prometheus_client.parser import text_string_to_metric_families
+
+from app.db.models.job import JobStatus, SummaryJob
+from app.db.models.user import User
+from app.db.repositories.job import SummaryJobRepository
+from app.db.session import SessionLocal
+from app.services.metrics import CallbackCollector, registry as app_registry
+
+
+def _scrape(client: TestClient) -> dict:
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    return {family.name: family for family in text_string_to_metric_families(response.text)}
+
+
+def _samples(family, name: str):
+    return [sample for sample in family.samples if sample.name == name]
+
+
+def test_requests_are_labelled_by_route_template(client: TestClient) -> None:
+    for summary_id in ("missing-1", "missing-2"):
+        assert client.get(f"/api/v1/summaries/{summary_id}").status_code == 401
+    assert client.get("/no/such/path/123").status_code == 404
+
+    families = _scrape(client)
+    requests = _samples(families["http_requests"], "http_requests_total")  # 计数器的指标族名不含_total
+    routes = {sample.labels["route"] for sample in requests}
+    assert "/api/v1/summaries/{summary_id}" in routes
+    assert "<unmatched>" in routes
+    # 原始路径不会成为标签值
+    assert not any("missing" in route or "123" in route for route in routes)
+    detail = [
+        sample for sample in requests
+        if sample.labels == {"method": "GET", "route": "/api/v1/summaries/{summary_id}", "status": "401"}
+    ]
+    assert detail and detail[0].value >= 2
+
+    durations = _samples(families["http_request_duration_seconds"], "http_request_duration_seconds_count")
+    assert any(sample.labels["route"] == "/api/v1/summaries/{summary_id}" for sample in durations)
+    assert "db_statement_duration_seconds" in families
+    assert "http_requests_created" not in {
+        sample.name for family in families.values() for sample in family.samples
+    }
+
+
+def test_queue_depth_gauge(client: TestClient) -> None:
+    with SessionLocal() as db:
+        user = User(username="metrics", email="metrics@example.com", hashed_password="-", is_active=True)
+        db.add(user)
+        db.commit()
+        db.add_all([
+            SummaryJob(status=JobStatus.PENDING, user_id=user.id),
+            SummaryJob(status=JobStatus.PENDING, user_id=user.id),
+            SummaryJob(status=JobStatus.RUNNING, user_id=user.id),
+            SummaryJob(status=JobStatus.SUCCEEDED, user_id=user.id),
+        ])
+        db.commit()
+        expected = {status.value: count for status, count in SummaryJobRepository().count_unfinished(db).items()}
+
+    family = _scrape(client)["summary_job_queue_depth"]
+    assert family.type == "gauge"
+    values = {sample.labels["status"]: sample.value for sample in family.samples}
+    assert values == expected
+    assert values[JobStatus.PENDING.value] >= 2
+    assert values[JobStatus.RUNNING.value] >= 1
+
+
+def test_failing_collector_is_skipped() -> None:
+    def broken():
+        raise RuntimeError("数据库不可用")
+
+    registry = CollectorRegistry()
+    registry.register(CallbackCollector("gauge", "broken_value", "采集出错的指标", collect=broken))
+    registry.register(CallbackCollector("counter", "working_total", "正常的指标", ("kind",), collect=lambda: [(("a",), 3)]))
+    def errors() -> float:
+        return app_registry.get_sample_value("metrics_collect_errors_total", {"metric": "broken_value"}) or 0.0
+
+    before = errors()
+
+    output = generate_latest(registry).decode()
+    assert 'working_total{kind="a"} 3.0' in output
+    assert "broken_value" not in output
+    assert errors() == before + 1
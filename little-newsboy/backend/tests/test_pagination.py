@@ -0,0 +1,118 @@
+"""
+游标分页：结构不正确的游标返回400而不是500
+"""
+import base64
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.security import create_access_token
+from app.db.models.source import Source, SourceType
+from app.db.models.summary import Summary
+from app.db.models.user import User
+from app.db.session import SessionLocal
+
+ENDPOINTS = ["/api/v1/summaries", "/api/v1/sources/sources"]
+
+
+def _encode(payload) -> str:
+    raw = json.dumps(payload).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode(cursor: str) -> dict:
+    return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+
+
+@pytest.fixture(scope="module")
+def headers() -> dict:
+    with SessionLocal() as db:
+        user = User(username="cursor", email="cursor@example.com", hashed_password="-", is_active=True)
+        db.add(user)
+        db.commit()
+        for i in range(3):
+            db.add(Source(name=f"source {i}", type=SourceType.BLOG, url=f"https://example.com/{i}", user_id=user.id))
+            db.add(Summary(title=f"summary {i}", content="content", user_id=user.id))
+        db.commit()
+        return {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+
+
+@pytest.mark.parametrize("endpoint", ENDPOINTS)
+@pytest.mark.parametrize("payload", [[1], 1, "x", None, {}, {"f": "created_at", "o": "desc"}])
+def test_malformed_cursor(client: TestClient, headers: dict, endpoint: str, payload) -> None:
+    response = client.get(endpoint, params={"cursor": _encode(payload)}, headers=headers)
+    assert response.status_code == 400, response.text
+
+
+@pytest.mark.parametrize("endpoint", ENDPOINTS)
+@pytest.mark.parametrize("key", ["f", "o", "id", "v"])
+@pytest.mark.parametrize("value", [[1], {"a": 1}, 1.5, "not-a-field"])
+def test_tampered_cursor(client: TestClient, headers: dict, endpoint: str, key: str, value) -> None:
+    first = client.get(endpoint, params={"page_size": 1}, headers=headers)
+    cursor = first.json()["next_cursor"]
+    assert client.get(endpoint, params={"cursor": cursor}, headers=headers).status_code == 200
+    payload = _decode(cursor)
+    payload[key] = value
+    response = client.get(endpoint, params={"cursor": _encode(payload)}, headers=headers)
+    # 锚点ID换成另一个字符串仍是合法游标
+    expected = 200 if (key, value) == ("id", "not-a-field") else 400
+    assert response.status_code == expected, response.text
+
+
+@pytest.mark.parametrize("endpoint", ENDPOINTS)
+def test_undecodable_cursor(client: TestClient, headers: dict, endpoint: str) -> None:
+    response = client.get(endpoint, params={"cursor": "%%%"}, headers=headers)
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+def test_title_cursor_with_null_titles(client: TestClient, sort_order: str) -> None:
+    # title可为空：空标题按空字符串排序，以它为锚点的下一页不会为空
+    with SessionLocal() as db:
+        user = User(username=f"null-titles-{sort_order}", email=f"null-titles-{sort_order}@example.com",
+                    hashed_password="-", is_active=True)
+        db.add(user)
+        db.commit()
+        titles = [None, "b", None, "", "a", None, "c"]
+        db.add_all([Summary(title=title, content="content", user_id=user.id) for title in titles])
+        db.commit()
+        rows = db.query(Summary.id, Summary.title).filter(Summary.user_id == user.id).all()
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+    expected = [id for _, id in sorted(((title or "", id) for id, title in rows), reverse=sort_order == "desc")]
+
+    seen, cursor = [], None
+    while True:
+        params = {"sort_field": "title", "sort_order": sort_order, "page_size": 2, "include_total": "false"}
+        if cursor:
+            params = {"cursor": cursor}
+        response = client.get("/api/v1/summaries", params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        seen.extend(item["id"] for item in response.json()["items"])
+        cursor = response.json()["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == expected
+
+
+def test_title_cursor_after_null_anchor_deleted(client: TestClient) -> None:
+    with SessionLocal() as db:
+        user = User(username="null-anchor", email="null-anchor@example.com", hashed_password="-", is_active=True)
+        db.add(user)
+        db.commit()
+        db.add_all([Summary(title=title, content="content", user_id=user.id) for title in (None, None, "a")])
+        db.commit()
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+
+    first = client.get(
+        "/api/v1/summaries", params={"sort_field": "title", "sort_order": "asc", "page_size": 1}, headers=headers
+    ).json()
+    (anchor,) = first["items"]
+    assert anchor["title"] is None
+    assert _decode(first["next_cursor"])["v"] == ""
+    with SessionLocal() as db:
+        db.delete(db.get(Summary, anchor["id"]))
+        db.commit()
+
+    rest = client.get("/api/v1/summaries", params={"cursor": first["next_cursor"]}, headers=headers).json()
+    assert [item["title"] for item in rest["items"]] == [None, "a"]
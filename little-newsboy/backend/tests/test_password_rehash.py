@@ -0,0 +1,45 @@
+"""
+登录时的密码哈希升级：成本因子与配置不一致的哈希在登录成功后重新计算，登录失败时保持不变
+"""
+from passlib.hash import bcrypt
+
+from app.config import settings
+from app.core.security import pwd_context
+from app.db.models.user import User
+from app.db.session import SessionLocal
+
+LOGIN_URL = f"{settings.API_V1_STR}/auth/login"
+
+
+def _rounds(hashed_password: str) -> int:
+    return int(hashed_password.split("$")[2])
+
+
+def _stored_hash(user_id: int) -> str:
+    with SessionLocal() as db:
+        return db.get(User, user_id).hashed_password
+
+
+def test_login_rehashes_outdated_password(client) -> None:
+    old_hash = bcrypt.using(rounds=4).hash("secret-password")
+    with SessionLocal() as db:
+        user = User(username="rehash", email="rehash@example.com", hashed_password=old_hash, is_active=True)
+        db.add(user)
+        db.commit()
+        user_id = user.id
+
+    response = client.post(LOGIN_URL, json={"username_or_email": "rehash", "password": "wrong-password"})
+    assert response.status_code == 401
+    assert _stored_hash(user_id) == old_hash
+
+    response = client.post(LOGIN_URL, json={"username_or_email": "rehash", "password": "secret-password"})
+    assert response.status_code == 200
+    new_hash = _stored_hash(user_id)
+    assert new_hash != old_hash
+    assert _rounds(new_hash) == settings.PASSWORD_BCRYPT_ROUNDS
+    assert pwd_context.verify("secret-password", new_hash)
+
+    # 已是当前成本因子的哈希不再重新计算
+    response = client.post(LOGIN_URL, json={"username_or_email": "rehash@example.com", "password": "secret-password"})
+    assert response.status_code == 200
+    assert _stored_hash(user_id) == new_hash
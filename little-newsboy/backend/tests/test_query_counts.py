@@ -0,0 +1,89 @@
+"""
+接口SQL语句数检查：每个接口的语句数不超过各自的上限，且按不同数据规模请求时不随条目数增长
+"""
+from fastapi.testclient import TestClient
+
+from app.api.routes import summary as summary_routes
+from app.core.security import create_access_token
+from app.db.models.source import Source, SourceType
+from app.db.models.summary import Summary
+from app.db.models.user import User
+from app.db.session import SessionLocal, async_engine, engine
+from app.db.statements import assert_max_statements
+
+SOURCES_PER_SUMMARY = 3
+
+# 各接口的SQL语句数上限（已缓存登录用户）；多出一条即视为退化，确有需要时再调整
+STATEMENT_LIMITS = {
+    "list": 3,
+    "detail": 2,
+    "create": 11,
+    "update": 7,
+    "generate": 3,
+}
+
+
+def _seed(user_id: int, summaries: int) -> None:
+    with SessionLocal() as db:
+        sources = [
+            Source(name=f"source {i}", type=SourceType.BLOG, url=f"https://example.com/{i}", user_id=user_id)
+            for i in range(SOURCES_PER_SUMMARY)
+        ]
+        db.add_all(sources)
+        for i in range(summaries):
+            db.add(Summary(
+                title=f"summary {i}", content="content", tags=["bench"],
+                user_id=user_id, sources=sources,
+            ))
+        db.commit()
+
+
+def _measure(client: TestClient, headers: dict, source_ids: list) -> dict:
+    counts = {}
+    summary_id = client.get("/api/v1/summaries", headers=headers).json()["items"][0]["id"]
+    requests = {
+        "list": lambda: client.get("/api/v1/summaries?page_size=50", headers=headers),
+        "detail": lambda: client.get(f"/api/v1/summaries/{summary_id}", headers=headers),
+        "create": lambda: client.post("/api/v1/summaries", headers=headers, json={
+            "title": "new", "content": "content", "source_ids": source_ids
+        }),
+        "update": lambda: client.put(f"/api/v1/summaries/{summary_id}", headers=headers, json={
+            "source_ids": source_ids
+        }),
+        "generate": lambda: client.post("/api/v1/summaries/generate", headers=headers, json={
+            "source_ids": source_ids
+        }),
+    }
+    # 先清空关联，两轮的更新都是从0个信息源改为全部信息源
+    client.put(f"/api/v1/summaries/{summary_id}", headers=headers, json={"source_ids": []})
+    for name, request in requests.items():
+        with assert_max_statements(STATEMENT_LIMITS[name], engine, async_engine, label=name) as counter:
+            response = request()
+        response.raise_for_status()
+        counts[name] = counter.count
+    return counts
+
+
+def test_statement_counts_do_not_grow(client: TestClient, monkeypatch) -> None:
+    # 只统计创建任务的语句，不投递到任务队列
+    monkeypatch.setattr(summary_routes, "enqueue_summary_job", lambda job_id: None)
+    with SessionLocal() as db:
+        user = User(username="counts", email="counts@example.com", hashed_password="-", is_active=True)
+        db.add(user)
+        db.commit()
+        user_id = user.id
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+    _seed(user_id, 5)
+    with SessionLocal() as db:
+        source_ids = [source.id for source in db.query(Source).filter(Source.user_id == user_id)]
+    small = _measure(client, headers, source_ids)
+
+    # 摘要数量增加10倍、每个请求涉及的信息源数量翻倍
+    _seed(user_id, 50)
+    with SessionLocal() as db:
+        source_ids = [source.id for source in db.query(Source).filter(Source.user_id == user_id)]
+    large = _measure(client, headers, source_ids)
+
+    for name in small:
+        assert large[name] <= small[name], f"{name}的SQL语句数随数据量增长：{small[name]} -> {large[name]}"
@@ -0,0 +1,179 @@
+"""
+查询计划检查：对仓库层的每个热点查询执行 EXPLAIN QUERY PLAN，确认按用户过滤的查询走索引而不是全表扫描
+"""
+import re
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Tuple
+
+import pytest
+from sqlalchemy import event
+
+from app.db.models.job import SummaryJob
+from app.db.models.source import Source, SourceType, Status
+from app.db.models.summary import Summary, SummaryTemplate
+from app.db.models.user import User
+from app.db.repositories.job import SummaryJobRepository
+from app.db.repositories.source import (
+    ItemFingerprintRepository, SourceFetchRepository, SourceRepository, SourceScheduleRepository
+)
+from app.db.repositories.summary import SummaryRepository, SummaryTemplateRepository
+from app.db.repositories.user import get_user_by_username_or_email
+from app.db.session import SessionLocal, engine
+from app.services.github_analytics import RollupBatch, analytics_repository, build_github_analytics
+from app.services.related import RelatedIndex
+
+# 需要检查的业务表；FTS5虚拟表按MATCH查找，不在此列
+CHECKED_TABLES = {
+    "users", "sources", "summaries", "summary_templates", "summary_jobs",
+    "summary_tags", "summary_source_association", "source_fetches", "source_schedules",
+    "github_repos", "github_monthly_stats", "github_daily_stats", "github_contributor_stats",
+    "github_issue_label_stats", "item_fingerprints", "item_fingerprint_bands", "summary_vectors",
+}
+
+# 允许全表扫描的查询及原因
+ALLOWED_SCANS = {
+    # 调度器定期加载全部启用的信息源，本身就是全量读取
+    "schedule.get_active": {"sources", "source_schedules"},
+}
+
+_SCAN_PATTERN = re.compile(r"^SCAN (\w+)")
+
+
+@contextmanager
+def _capture() -> Iterator[List[Tuple[str, tuple]]]:
+    """记录期间执行的SQL语句及参数"""
+    captured: List[Tuple[str, tuple]] = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+
+
+def _full_scans(plan: List[str]) -> List[str]:
+    """计划中未使用索引的全表扫描"""
+    scans = []
+    for detail in plan:
+        match = _SCAN_PATTERN.match(detail)
+        if match and match.group(1) in CHECKED_TABLES and "INDEX" not in detail:
+            scans.append(match.group(1))
+    return scans
+
+
+@pytest.fixture(scope="module")
+def ids() -> Dict[str, str]:
+    """三个用户各自的信息源、摘要、模板和任务，以及分析数据和指纹"""
+    with SessionLocal() as db:
+        users = [User(username=f"plan{i}", email=f"plan{i}@example.com", hashed_password="-", is_active=True)
+                 for i in range(3)]
+        db.add_all(users)
+        db.commit()
+        user_id = users[0].id
+        for user in users:
+            sources = [
+                Source(name=f"source {i}", type=SourceType.BLOG, url=f"https://example.com/{i}", user_id=user.id)
+                for i in range(10)
+            ]
+            db.add_all(sources)
+            for i in range(30):
+                db.add(Summary(
+                    title=f"summary {i}", content="content", tags=["plan", f"tag{i % 3}"],
+                    is_archived=i % 2 == 0, user_id=user.id, sources=sources[:2],
+                ))
+            db.add(SummaryTemplate(name="template", description="description", user_id=user.id))
+            db.add(SummaryJob(source_ids=[sources[0].id], user_id=user.id))
+        db.commit()
+        SummaryRepository().backfill_tags(db)
+        batch = RollupBatch()
+        for repo in ("plan/one", "plan/two"):
+            for i in range(30):
+                batch.add({
+                    "id": str(i), "type": "PushEvent", "repo": {"name": repo}, "actor": {"login": f"user{i % 4}"},
+                    "payload": {"size": 2}, "created_at": f"2024-{i % 12 + 1:02d}-01T00:00:00Z",
+                })
+        analytics_repository.save_batch(db, batch)
+        now = datetime.now(timezone.utc)
+        for user in users:
+            owned = db.query(Source).filter(Source.user_id == user.id).first()
+            ItemFingerprintRepository().save(db, user.id, [({
+                "user_id": user.id, "source_id": owned.id, "item_key": "item", "title": "item", "link": None,
+                "signature": bytes(256), "seen_at": now,
+            }, list(range(16)))], [], now, prune_before=datetime(2024, 1, 1, tzinfo=timezone.utc))
+        db.commit()
+        source = db.query(Source).filter(Source.user_id == user_id).first()
+        summary = db.query(Summary).filter(Summary.user_id == user_id).first()
+        cursor = SummaryRepository().get_multi_paginated(db, user_id=user_id, limit=5)["next_cursor"]
+        return {"user_id": user_id, "source_id": source.id, "summary_id": summary.id, "cursor": cursor}
+
+
+summaries = SummaryRepository()
+templates = SummaryTemplateRepository()
+sources = SourceRepository()
+fetches = SourceFetchRepository()
+schedules = SourceScheduleRepository()
+jobs = SummaryJobRepository()
+fingerprints = ItemFingerprintRepository()
+since = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+QUERIES = {
+    "summary.list": lambda db, ids: summaries.get_multi_paginated(db, user_id=ids["user_id"]),
+    "summary.list_cursor": lambda db, ids: summaries.get_multi_paginated(
+        db, user_id=ids["user_id"], cursor=ids["cursor"]
+    ),
+    "summary.list_flags": lambda db, ids: summaries.get_multi_paginated(
+        db, user_id=ids["user_id"], is_archived=False, is_important=False
+    ),
+    "summary.list_tag": lambda db, ids: summaries.get_multi_paginated(db, user_id=ids["user_id"], tag="tag1"),
+    "summary.list_source": lambda db, ids: summaries.get_multi_paginated(
+        db, user_id=ids["user_id"], source_id=ids["source_id"]
+    ),
+    "summary.list_search": lambda db, ids: summaries.get_multi_paginated(db, user_id=ids["user_id"], search="summary"),
+    "summary.get": lambda db, ids: summaries.get(db, ids["summary_id"]),
+    "summary.count_tags": lambda db, ids: summaries.count_tags(db, user_id=ids["user_id"]),
+    "template.list": lambda db, ids: templates.get_multi(db, user_id=ids["user_id"]),
+    "template.list_paginated": lambda db, ids: templates.get_multi_paginated(db, user_id=ids["user_id"]),
+    "source.page": lambda db, ids: sources.get_page(db, ids["user_id"]),
+    "source.page_filtered": lambda db, ids: sources.get_page(
+        db, ids["user_id"], source_type=SourceType.BLOG, status=Status.ACTIVE
+    ),
+    "source.count": lambda db, ids: sources.count(db, ids["user_id"], source_type=SourceType.BLOG),
+    "source.owned": lambda db, ids: sources.get_owned(db, [ids["source_id"]], ids["user_id"]),
+    "fetch.get_many": lambda db, ids: fetches.get_many(db, [ids["source_id"]]),
+    "fetch.get_items": lambda db, ids: fetches.get_items(db, [ids["source_id"]]),
+    "fingerprint.by_keys": lambda db, ids: fingerprints.get_by_keys(db, [(ids["source_id"], "item")]),
+    "fingerprint.candidates": lambda db, ids: fingerprints.find_candidates(db, ids["user_id"], {1, 2, 100}, since),
+    "related.search": lambda db, ids: RelatedIndex().search(db, ids["user_id"], [ids["summary_id"]]),
+    "related.summaries": lambda db, ids: summaries.get_list_items(
+        db, ids=[ids["summary_id"]], user_id=ids["user_id"], fields=["id", "title", "source_ids"]
+    ),
+    "schedule.get_active": lambda db, ids: schedules.get_active(db),
+    "job.get": lambda db, ids: jobs.get(db, "missing"),
+    "user.login_lookup": lambda db, ids: get_user_by_username_or_email(db, "plan0"),
+    "analytics.github": lambda db, ids: build_github_analytics(db, "plan/one", "last_year"),
+    "analytics.github_by_name": lambda db, ids: build_github_analytics(db, "one", "last_year"),
+}
+
+
+@pytest.mark.parametrize("name", list(QUERIES))
+def test_query_uses_indexes(ids: Dict[str, str], name: str) -> None:
+    with SessionLocal() as db:
+        with _capture() as captured:
+            QUERIES[name](db, ids)
+        assert captured, f"{name}没有执行查询"
+        allowed = ALLOWED_SCANS.get(name, set())
+        failures = []
+        for statement, parameters in captured:
+            plan = [
+                row[3] for row in
+                db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            ]
+            scans = [table for table in _full_scans(plan) if table not in allowed]
+            if scans:
+                failures.append(f"全表扫描 {', '.join(scans)}\n  {statement}\n    " + "\n    ".join(plan))
+    assert not failures, f"{name}未使用索引：\n" + "\n".join(failures)
@@ -0,0 +1,87 @@
+"""
+相关摘要：墓碑行超过保留时长才清理，超过该时长未同步的内存索引整体重建；
+启动时为没有向量的摘要补齐向量
+"""
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, select, text, update
+
+from app.db import vectors
+from app.db.migrations import prepare_database, upgrade_database
+from app.db.models.summary import Summary, SummaryVector
+from app.db.models.user import User
+from app.db.session import SessionLocal
+from app.services.related import RelatedIndex
+
+
+def _seed(db, name: str):
+    user = User(username=name, email=f"{name}@example.com", hashed_password="-", is_active=True)
+    db.add(user)
+    db.commit()
+    summaries = [
+        Summary(title=f"rust async runtime {i}", content="tokio executor scheduling", tags=["rust"], user_id=user.id)
+        for i in range(3)
+    ]
+    db.add_all(summaries)
+    db.commit()
+    return user.id, [summary.id for summary in summaries]
+
+
+def _tombstones(db, summary_ids):
+    return set(db.scalars(
+        select(SummaryVector.summary_id).where(SummaryVector.summary_id.in_(summary_ids), SummaryVector.deleted_at.isnot(None))
+    ))
+
+
+def test_only_expired_tombstones_are_purged() -> None:
+    with SessionLocal() as db:
+        _, ids = _seed(db, "tombstones")
+        db.delete(db.get(Summary, ids[0]))
+        db.commit()
+        assert _tombstones(db, ids) == {ids[0]}
+        # 新写入的墓碑行保留，其他进程的索引可能还没有同步到
+        db.delete(db.get(Summary, ids[1]))
+        db.commit()
+        assert _tombstones(db, ids) == {ids[0], ids[1]}
+        # 超过保留时长的墓碑行在之后的删除中清理
+        db.execute(
+            update(SummaryVector).where(SummaryVector.summary_id == ids[0])
+            .values(deleted_at=datetime.now(timezone.utc) - timedelta(days=30))
+        )
+        db.delete(db.get(Summary, ids[2]))
+        db.commit()
+        assert _tombstones(db, ids) == {ids[1], ids[2]}
+
+
+def test_index_idle_past_ttl_is_rebuilt() -> None:
+    index = RelatedIndex(tombstone_ttl=60)
+    with SessionLocal() as db:
+        user_id, ids = _seed(db, "rebuild")
+        assert {id for id, _ in index.search(db, user_id, [ids[0]])[ids[0]]} == {ids[1], ids[2]}
+        db.delete(db.get(Summary, ids[1]))
+        db.commit()
+        vectors.purge_tombstones(db.connection(), datetime.now(timezone.utc) + timedelta(days=1))
+        db.commit()
+        # 模拟索引长时间未同步、其间墓碑行已被清理：重建之前索引仍保留已删除的摘要
+        assert ids[1] in {id for id, _ in index.search(db, user_id, [ids[0]])[ids[0]]}
+        index._indexes[user_id].synced_at -= 120
+        assert {id for id, _ in index.search(db, user_id, [ids[0]])[ids[0]]} == {ids[2]}
+        assert index.stats()["rebuilds"] == 1
+
+
+def test_vectors_are_backfilled_on_startup(tmp_path) -> None:
+    # 迁移只建表，升级前已有的摘要在prepare_database中补齐向量
+    engine = create_engine(f"sqlite:///{tmp_path / 'vectors.db'}")
+    upgrade_database(engine, "0005")
+    with engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO summaries (id, title, content, tags, user_id) VALUES "
+            "('s1', 'rust async', 'tokio executor', '[\"rust\"]', 1), ('s2', '', '', '[]', 1), ('s3', 'x', 'y', '[]', NULL)"
+        ))
+    prepare_database(engine)
+    with engine.connect() as connection:
+        rows = dict(connection.execute(select(SummaryVector.summary_id, SummaryVector.vector)).all())
+    assert set(rows) == {"s1", "s2"}
+    assert rows["s1"] == vectors.to_bytes(vectors.embed("rust async", "tokio executor", ["rust"]))
+    assert rows["s2"] is None
+    engine.dispose()
@@ -0,0 +1,176 @@
+"""
+响应缓存：同一个键的并发未命中只计算一次，过期后的宽限期内先返回旧响应并在后台刷新；
+分析接口按If-None-Match（弱比较）返回304
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.routes import analytics
+from app.services import cache
+from app.services.cache import ResponseCache
+
+URL = "/api/v1/analytics/github/octo/repo"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """只替换缓存模块使用的时钟"""
+    now = [time.monotonic()]
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+class Renderer:
+    """可控制完成时机的渲染函数，记录调用次数"""
+
+    def __init__(self, *bodies):
+        self.bodies = list(bodies)
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        body = self.bodies.pop(0)
+        if isinstance(body, Exception):
+            raise body
+        return body
+
+
+def test_fresh_entries_are_reused(clock) -> None:
+    async def run():
+        responses = ResponseCache(ttl_seconds=10, stale_seconds=60)
+        render = Renderer(b"first")
+        first = await responses.get("key", render)
+        clock[0] += 9
+        second = await responses.get("key", render)
+        return responses, render, first, second
+
+    responses, render, first, second = asyncio.run(run())
+    assert second is first
+    assert first.body == b"first"
+    assert render.calls == 1
+    assert (responses.hits, responses.misses) == (1, 1)
+
+
+def test_concurrent_misses_render_once(clock) -> None:
+    async def run():
+        responses = ResponseCache()
+        render = Renderer(b"body")
+        render.release.clear()
+        waiters = [asyncio.ensure_future(responses.get("key", render)) for _ in range(10)]
+        await asyncio.sleep(0)
+        # 其中一个等待者被取消不影响计算和其他等待者
+        waiters[0].cancel()
+        render.release.set()
+        results = await asyncio.gather(*waiters[1:])
+        return responses, render, results
+
+    responses, render, results = asyncio.run(run())
+    assert render.calls == 1
+    assert {id(entry) for entry in results} == {id(results[0])}
+    assert results[0].body == b"body"
+    assert (responses.misses, responses.coalesced, responses.computes) == (1, 9, 1)
+    assert responses.stats()["inflight"] == 0
+
+
+def test_stale_entry_is_served_while_refreshing(clock) -> None:
+    async def run():
+        responses = ResponseCache(ttl_seconds=10, stale_seconds=60)
+        render = Renderer(b"old", b"new")
+        old = await responses.get("key", render)
+        clock[0] += 11
+
+        render.release.clear()
+        stale = await responses.get("key", render)
+        # 刷新进行中：再次请求仍返回旧响应，不会重复刷新
+        again = await responses.get("key", render)
+        assert responses.stats()["inflight"] == 1
+        render.release.set()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        fresh = await responses.get("key", render)
+        return responses, render, old, stale, again, fresh
+
+    responses, render, old, stale, again, fresh = asyncio.run(run())
+    assert stale is old and again is old
+    assert fresh.body == b"new"
+    assert fresh.etag != old.etag
+    assert render.calls == 2
+    assert responses.stale_hits == 2
+
+
+def test_failed_refresh_keeps_stale_entry(clock) -> None:
+    async def run():
+        responses = ResponseCache(ttl_seconds=10, stale_seconds=60)
+        render = Renderer(b"old", RuntimeError("数据库不可用"))
+        old = await responses.get("key", render)
+        clock[0] += 11
+        stale = await responses.get("key", render)
+        await asyncio.sleep(0)
+        return responses, old, stale, await responses.get("key", render)
+
+    responses, old, stale, after = asyncio.run(run())
+    assert stale is old and after is old
+    assert responses.errors == 1
+
+
+def test_expired_entries_and_missing_resources(clock) -> None:
+    async def run():
+        responses = ResponseCache(ttl_seconds=10, stale_seconds=60)
+        first = await responses.get("key", Renderer(b"old"))
+        clock[0] += 71
+        # 超过宽限期后同步重新计算
+        second = await responses.get("key", Renderer(b"new"))
+        missing = await responses.get("missing", Renderer(None))
+        return responses, first, second, missing
+
+    responses, first, second, missing = asyncio.run(run())
+    assert (first.body, second.body) == (b"old", b"new")
+    assert missing is None
+    assert responses.stats()["entries"] == 1
+
+
+@pytest.fixture
+def analytics_body(monkeypatch):
+    analytics.analytics_cache.clear()
+    body = b'{"repo_name":"octo/repo"}'
+    monkeypatch.setattr(analytics, "_render_github_analytics", lambda repo_name, period: body)
+    yield body
+    analytics.analytics_cache.clear()
+
+
+@pytest.mark.parametrize("if_none_match, status", [
+    (None, 200),
+    ('"other"', 200),
+    ("{etag}", 304),
+    ("W/{etag}", 304),
+    ('"other", {etag}', 304),
+    ('W/"other", W/{etag}', 304),
+    ("*", 304),
+])
+def test_if_none_match(client: TestClient, analytics_body: bytes, if_none_match, status: int) -> None:
+    first = client.get(URL)
+    assert first.status_code == 200
+    assert first.content == analytics_body
+    etag = first.headers["etag"]
+    assert etag.startswith('"') and not etag.startswith("W/")
+
+    headers = {"If-None-Match": if_none_match.format(etag=etag)} if if_none_match else {}
+    response = client.get(URL, headers=headers)
+    assert response.status_code == status
+    assert response.headers["etag"] == etag
+    assert "max-age=" in response.headers["cache-control"]
+    assert response.content == (b"" if status == 304 else analytics_body)
+
+
+def test_missing_repository_is_not_cached(client: TestClient, monkeypatch) -> None:
+    analytics.analytics_cache.clear()
+    monkeypatch.setattr(analytics, "_render_github_analytics", lambda repo_name, period: None)
+    assert client.get(URL).status_code == 404
+    assert analytics.analytics_cache.stats()["entries"] == 0
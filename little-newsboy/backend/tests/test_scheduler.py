@@ -0,0 +1,147 @@
+"""
+信息源刷新调度：到期信息源按优先级派发、刷新时间的随机浮动、重启恢复、派发失败重试及刷新频率变化
+每个测试使用独立的内存数据库，不受其他测试创建的信息源影响
+"""
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+from app.db.models.source import Priority, Source, SourceSchedule, SourceType, Status, UpdateFrequency
+from app.db.models.user import User
+from app.db.session import Base
+from app.services.scheduler import FREQUENCY_INTERVALS, RefreshScheduler
+
+NOW = datetime(2024, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(User(id=1, username="scheduler", email="scheduler@example.com", hashed_password="-", is_active=True))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _add(db, name: str, priority=Priority.MEDIUM, frequency=UpdateFrequency.DAILY, next_run_at=None, last_run_at=None):
+    source = Source(id=name, name=name, type=SourceType.BLOG, url=f"https://example.com/{name}", user_id=1,
+                    priority=priority, update_frequency=frequency, status=Status.ACTIVE)
+    db.add(source)
+    if next_run_at is not None:
+        db.add(SourceSchedule(source_id=name, next_run_at=next_run_at, last_run_at=last_run_at))
+    db.commit()
+    return source
+
+
+def _scheduler(dispatched: list, fail: bool = False) -> RefreshScheduler:
+    def dispatch(batch):
+        if fail:
+            raise RuntimeError("broker down")
+        dispatched.append(list(batch))
+    return RefreshScheduler(dispatch=dispatch, rng=random.Random(42))
+
+
+def _next_run(db, source_id: str) -> datetime:
+    db.expire_all()
+    return db.get(SourceSchedule, source_id).next_run_at.replace(tzinfo=timezone.utc)
+
+
+def test_due_sources_dispatch_by_priority(db, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "SCHEDULER_MAX_DISPATCH", 2)
+    _add(db, "low", Priority.LOW, next_run_at=NOW - timedelta(minutes=30))
+    _add(db, "medium", Priority.MEDIUM, next_run_at=NOW - timedelta(minutes=10))
+    _add(db, "high", Priority.HIGH, next_run_at=NOW - timedelta(minutes=1))
+    _add(db, "later", Priority.HIGH, next_run_at=NOW + timedelta(hours=1))
+    dispatched: list = []
+    scheduler = _scheduler(dispatched)
+    # 同时到期时高优先级先派发，超出每轮上限的留到下一轮
+    assert scheduler.tick(db, NOW) == ["high", "medium"]
+    assert scheduler.tick(db, NOW) == ["low"]
+    assert scheduler.tick(db, NOW) == []
+    assert dispatched == [["high", "medium"], ["low"]]
+
+
+def test_next_runs_stay_within_jitter(db) -> None:
+    for i in range(20):
+        _add(db, f"s{i}", next_run_at=NOW - timedelta(seconds=1))
+    scheduler = _scheduler([])
+    assert len(scheduler.tick(db, NOW)) == 20
+    interval = FREQUENCY_INTERVALS[UpdateFrequency.DAILY]
+    jitter = timedelta(seconds=interval * settings.SCHEDULER_JITTER_RATIO)
+    runs = [_next_run(db, f"s{i}") for i in range(20)]
+    assert all(NOW + timedelta(seconds=interval) - jitter <= run <= NOW + timedelta(seconds=interval) + jitter for run in runs)
+    assert len(set(runs)) == 20
+
+
+def test_new_sources_are_spread_and_recovered_after_restart(db) -> None:
+    for i in range(10):
+        _add(db, f"new{i}")
+    first = _scheduler([])
+    assert first.tick(db, NOW) == []
+    runs = {f"new{i}": _next_run(db, f"new{i}") for i in range(10)}
+    spread = timedelta(seconds=settings.SCHEDULER_INITIAL_SPREAD_SECONDS)
+    assert all(NOW <= run <= NOW + spread for run in runs.values())
+    # 重启后从数据库恢复同样的到期时间，而不是重新分配
+    restarted = _scheduler([])
+    restarted.sync(db, NOW)
+    assert restarted.next_due() == min(run.timestamp() for run in runs.values())
+    assert restarted.tick(db, NOW + spread) == sorted(runs, key=runs.get)
+
+
+def test_replaced_and_removed_entries_are_skipped(db) -> None:
+    scheduler = _scheduler([])
+    scheduler.schedule("a", 100.0, Priority.LOW)
+    scheduler.schedule("a", 300.0, Priority.LOW)
+    scheduler.schedule("b", 200.0, Priority.LOW)
+    scheduler.unschedule("b")
+    assert scheduler.next_due() == 300.0
+    assert scheduler.pop_due(250.0, 10) == []
+    assert scheduler.pop_due(300.0, 10) == ["a"]
+    assert scheduler.next_due() is None
+
+
+def test_paused_sources_are_not_dispatched(db) -> None:
+    source = _add(db, "paused", next_run_at=NOW - timedelta(seconds=1))
+    scheduler = _scheduler([])
+    scheduler.sync(db, NOW)
+    source.status = Status.PAUSED
+    db.commit()
+    assert scheduler.tick(db, NOW) == []
+    assert len(scheduler) == 0
+
+
+def test_dispatch_failure_retries_later(db) -> None:
+    _add(db, "retry", next_run_at=NOW - timedelta(seconds=1))
+    dispatched: list = []
+    failing = _scheduler(dispatched, fail=True)
+    assert failing.tick(db, NOW) == []
+    # 下次刷新时间没有推进，重试时间只保存在内存中
+    assert _next_run(db, "retry") == NOW - timedelta(seconds=1)
+    retry_at = NOW + timedelta(seconds=settings.SCHEDULER_RETRY_SECONDS)
+    assert failing.next_due() == retry_at.timestamp()
+    failing.dispatch = lambda batch: dispatched.append(list(batch))
+    assert failing.tick(db, retry_at - timedelta(seconds=1)) == []
+    assert failing.tick(db, retry_at) == ["retry"]
+    assert dispatched == [["retry"]]
+
+
+def test_frequency_increase_applies_on_resync(db) -> None:
+    last_run = NOW - timedelta(hours=1)
+    source = _add(db, "weekly", frequency=UpdateFrequency.WEEKLY,
+                  next_run_at=last_run + timedelta(days=7), last_run_at=last_run)
+    scheduler = _scheduler([])
+    assert scheduler.tick(db, NOW) == []
+    source.update_frequency = UpdateFrequency.REALTIME
+    db.commit()
+    scheduler.sync(db, NOW)
+    latest = last_run + timedelta(seconds=FREQUENCY_INTERVALS[UpdateFrequency.REALTIME])
+    assert _next_run(db, "weekly") == latest
+    assert scheduler.tick(db, max(NOW, latest)) == ["weekly"]
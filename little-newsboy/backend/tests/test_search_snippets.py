@@ -0,0 +1,30 @@
+"""
+搜索高亮片段：正文先转义再插入<mark>标签
+"""
+from app.core.security import create_access_token
+from app.db.models.summary import Summary
+from app.db.models.user import User
+from app.db.search import format_snippet
+from app.db.session import SessionLocal
+
+
+def test_format_snippet_desegments_and_escapes() -> None:
+    assert format_snippet("中 \x02文\x03 \x02检\x03 索 <b>") == "中<mark>文</mark><mark>检</mark>索 &lt;b&gt;"
+    assert format_snippet(None) is None
+
+
+def test_search_snippets_escape_content(client) -> None:
+    with SessionLocal() as db:
+        user = User(username="snippets", email="snippets@example.com", hashed_password="-", is_active=True)
+        db.add(user)
+        db.commit()
+        db.add(Summary(title="xss", content='<img src=x onerror="alert(1)"> 高亮关键词 & more', user_id=user.id))
+        db.commit()
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+    response = client.get("/api/v1/summaries", params={"search": "关键词"}, headers=headers)
+    assert response.status_code == 200
+    snippet = response.json()["items"][0]["snippet"]
+    assert "<img" not in snippet
+    assert "&lt;img src=x onerror=&quot;alert(1)&quot;&gt;" in snippet
+    assert "高亮<mark>关键词</mark>" in snippet
+    assert "&amp; more" in snippet
@@ -0,0 +1,78 @@
+"""
+响应使用orjson编码；BaseRepository按模型列直接映射输入，不经过jsonable_encoder
+"""
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import fastapi.responses
+import orjson
+
+from app.core.security import create_access_token
+from app.db.models.summary import Summary
+from app.db.models.user import User
+from app.db.repositories.base import BaseRepository
+from app.db.session import SessionLocal
+from app.schemas.summary import SummaryImport, SummaryUpdate
+
+
+def test_responses_are_encoded_with_orjson(client, monkeypatch) -> None:
+    with SessionLocal() as db:
+        user = User(username="orjson", email="orjson@example.com", hashed_password="-", is_active=True)
+        db.add(user)
+        db.commit()
+        summary = Summary(title="中文标题", content="正文" * 100, key_points=["要点"], user_id=user.id)
+        db.add(summary)
+        db.commit()
+        summary_id = summary.id
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+
+    encoded = []
+
+    def dumps(content, option=None):
+        encoded.append(content)
+        return orjson.dumps(content, option=option)
+
+    monkeypatch.setattr(fastapi.responses, "orjson", SimpleNamespace(
+        dumps=dumps, OPT_NON_STR_KEYS=orjson.OPT_NON_STR_KEYS, OPT_SERIALIZE_NUMPY=orjson.OPT_SERIALIZE_NUMPY,
+    ))
+
+    detail = client.get(f"/api/v1/summaries/{summary_id}", headers=headers)
+    assert detail.status_code == 200
+    assert detail.headers["content-type"] == "application/json"
+    assert detail.content == orjson.dumps(detail.json())
+    # 中文不转义为\u序列
+    assert "中文标题".encode("utf-8") in detail.content
+
+    listing = client.get("/api/v1/summaries", headers=headers)
+    assert listing.status_code == 200
+    assert [item["id"] for item in listing.json()["items"]] == [summary_id]
+    assert len(encoded) == 2
+
+
+def test_create_maps_model_columns_only() -> None:
+    repository = BaseRepository(Summary)
+    created_at = datetime(2024, 3, 1, 8, 30, tzinfo=timezone.utc)
+    with SessionLocal() as db:
+        user = User(username="columns", email="columns@example.com", hashed_password="-", is_active=True)
+        db.add(user)
+        db.commit()
+        # source_ids不是模型列，created_at保持datetime而不是被编码为字符串
+        obj_in = SummaryImport(
+            title="标题", content="正文", key_points=["a", "b"], tags=["t"], source_ids=["missing"],
+            created_at=created_at, is_important=True,
+        )
+        summary = repository.create(db, obj_in=obj_in, user_id=user.id)
+
+        assert summary.user_id == user.id
+        assert (summary.title, summary.key_points, summary.tags) == ("标题", ["a", "b"], ["t"])
+        assert summary.is_important is True
+        assert summary.created_at.replace(tzinfo=timezone.utc) == created_at
+        assert summary.sources == []
+
+        updated = repository.update(db, db_obj=summary, obj_in=SummaryUpdate(title="新标题", source_ids=["x"]))
+        assert updated.title == "新标题"
+        assert updated.content == "正文"
+        updated = repository.update(db, db_obj=summary, obj_in={"is_archived": True, "unknown": 1})
+        assert updated.is_archived is True
+        assert not hasattr(updated, "unknown")
+        assert updated.sources == []
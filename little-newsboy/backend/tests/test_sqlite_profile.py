@@ -0,0 +1,86 @@
+"""
+SQLite生产配置：新连接启用WAL等PRAGMA，只读引擎的连接拒绝写入
+"""
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.config import settings
+from app.db import session
+
+
+def _pragma(connection, name: str):
+    return connection.execute(text(f"PRAGMA {name}")).scalar()
+
+
+@pytest.fixture
+def production(monkeypatch):
+    monkeypatch.setattr(session, "SQLITE_PRODUCTION", True)
+
+
+def test_pragmas_on_new_connections(production, tmp_path) -> None:
+    url = f"sqlite:///{tmp_path / 'profile.db'}"
+    write_engine = create_engine(url)
+    read_engine = create_engine(url)
+    session.apply_sqlite_profile(write_engine)
+    session.apply_sqlite_profile(read_engine, read_only=True)
+
+    with write_engine.begin() as connection:
+        assert _pragma(connection, "journal_mode") == "wal"
+        assert _pragma(connection, "synchronous") == 1  # NORMAL
+        assert _pragma(connection, "busy_timeout") == settings.SQLITE_BUSY_TIMEOUT_MS
+        assert _pragma(connection, "cache_size") == -settings.SQLITE_CACHE_SIZE_KB
+        assert _pragma(connection, "temp_store") == 2  # MEMORY
+        assert _pragma(connection, "query_only") == 0
+        connection.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY)"))
+        connection.execute(text("INSERT INTO items (id) VALUES (1)"))
+
+    with read_engine.connect() as connection:
+        assert _pragma(connection, "journal_mode") == "wal"
+        assert _pragma(connection, "query_only") == 1
+        assert connection.execute(text("SELECT count(*) FROM items")).scalar() == 1
+        with pytest.raises(OperationalError, match="readonly"):
+            connection.execute(text("INSERT INTO items (id) VALUES (2)"))
+
+    write_engine.dispose()
+    read_engine.dispose()
+
+
+def test_default_profile_leaves_connections_unchanged(tmp_path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'default.db'}")
+    session.apply_sqlite_profile(engine, read_only=True)
+    with engine.connect() as connection:
+        assert _pragma(connection, "journal_mode") == "delete"
+        assert _pragma(connection, "query_only") == 0
+    engine.dispose()
+
+
+def test_read_sessions_use_read_only_engine(tmp_path) -> None:
+    # 引擎在导入时按配置创建，在子进程中以生产配置导入
+    script = textwrap.dedent("""
+        from sqlalchemy import text
+        from app.db.session import ReadSessionLocal, SessionLocal, engine, read_engine
+
+        assert read_engine is not engine
+        with SessionLocal() as db:
+            assert db.execute(text("PRAGMA query_only")).scalar() == 0
+        with ReadSessionLocal() as db:
+            assert db.get_bind() is read_engine
+            assert db.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert db.execute(text("PRAGMA query_only")).scalar() == 1
+    """)
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{tmp_path / 'production.db'}",
+        "SQLITE_PROFILE": "production",
+    }
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=backend, env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,60 @@
+"""
+导入应用和worker模块时不访问数据库；API在lifespan中、worker在启动信号中准备数据库
+"""
+import os
+import subprocess
+import sys
+import textwrap
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(script: str, db_path) -> subprocess.CompletedProcess:
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{db_path}"}
+    return subprocess.run(
+        [sys.executable, "-c", textwrap.dedent(script)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=60,
+    )
+
+
+def test_import_has_no_database_side_effects(tmp_path) -> None:
+    db_path = tmp_path / "import.db"
+    result = _run("""
+        import app.main
+        import app.tasks.worker
+        import app.tasks.scheduler
+        import app.tasks.analytics
+        import app.tasks.related
+    """, db_path)
+    assert result.returncode == 0, result.stderr
+    assert not db_path.exists()
+
+
+def test_lifespan_prepares_database(tmp_path) -> None:
+    result = _run("""
+        from fastapi.testclient import TestClient
+        from sqlalchemy import inspect, text
+        from app.db.session import engine
+        from app.main import app
+
+        with TestClient(app):
+            tables = set(inspect(engine).get_table_names())
+            assert {"summaries", "summaries_fts", "alembic_version"} <= tables, tables
+            with engine.connect() as connection:
+                assert connection.execute(text("SELECT count(*) FROM summaries")).scalar() == 0
+    """, tmp_path / "lifespan.db")
+    assert result.returncode == 0, result.stderr
+
+
+def test_worker_init_prepares_database(tmp_path) -> None:
+    result = _run("""
+        from celery.signals import worker_init
+        from sqlalchemy import inspect
+        from app.db.session import engine
+        from app.tasks.worker import celery_app
+
+        assert "summaries" not in inspect(engine).get_table_names()
+        worker_init.send(sender=None)
+        assert {"summaries", "summary_jobs", "summaries_fts"} <= set(inspect(engine).get_table_names())
+    """, tmp_path / "worker.db")
+    assert result.returncode == 0, result.stderr
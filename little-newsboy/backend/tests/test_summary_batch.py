@@ -0,0 +1,40 @@
+"""
+批量生成摘要：生成失败的项单独计入failed，不计入rejected
+"""
+from app.api.routes import summary as summary_routes
+from app.core.security import create_access_token
+from app.db.models.source import Source, SourceType
+from app.db.models.user import User
+from app.db.session import SessionLocal
+from app.services.ai import SummaryRequest, SummaryResult
+
+
+def test_generation_failures_are_counted_separately(client, monkeypatch) -> None:
+    with SessionLocal() as db:
+        user = User(username="batch", email="batch@example.com", hashed_password="-", is_active=True)
+        db.add(user)
+        db.commit()
+        sources = [Source(name=f"batch {i}", type=SourceType.BLOG, url=f"https://example.com/batch/{i}", user_id=user.id)
+                   for i in range(2)]
+        db.add_all(sources)
+        db.commit()
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+        source_ids = [source.id for source in sources]
+
+    def build_summary_request(db, source_ids, template_id, parameters, user_id):
+        return SummaryRequest(content=source_ids[0]), parameters
+
+    async def generate_summary(request):
+        if request.content == source_ids[0]:
+            raise RuntimeError("模型不可用")
+        return SummaryResult(summary="摘要", key_points=[])
+
+    monkeypatch.setattr(summary_routes, "build_summary_request", build_summary_request)
+    monkeypatch.setattr(summary_routes.ai_service, "generate_summary", generate_summary)
+    response = client.post("/api/v1/summaries/generate/batch", headers=headers, json={"wait": True, "items": [
+        {"source_ids": [source_ids[0]]}, {"source_ids": [source_ids[1]]}, {"source_ids": ["missing"]},
+    ]})
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["status"] for item in body["items"]] == ["failed", "succeeded", "rejected"]
+    assert (body["accepted"], body["rejected"], body["failed"]) == (1, 1, 1)
@@ -0,0 +1,100 @@
+"""
+摘要列表：默认以纯文本摘录代替正文，fields参数只返回所选字段
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.core.security import create_access_token
+from app.db.models.user import User
+from app.db.repositories.summary import build_excerpt
+from app.db.session import SessionLocal
+
+CONTENT = "# 标题\n\n- 第一点 **加粗**\n- 查看[链接](https://example.com)\n\n" + "很长的正文" * 100
+
+
+@pytest.fixture(scope="module")
+def headers() -> dict:
+    with SessionLocal() as db:
+        user = User(username="fields", email="fields@example.com", hashed_password="-", is_active=True)
+        db.add(user)
+        db.commit()
+        return {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+
+
+@pytest.fixture(scope="module")
+def summary_id(client: TestClient, headers: dict) -> str:
+    response = client.post("/api/v1/summaries", json={
+        "title": "稀疏字段", "content": CONTENT, "key_points": ["要点"], "tags": ["t1", "t2"],
+    }, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def test_build_excerpt() -> None:
+    assert build_excerpt(None) is None
+    assert build_excerpt("  短\n\n正文  ") == "短 正文"
+    assert build_excerpt("> 引用 `代码` ![图](a.png)") == "引用 代码 图"
+    excerpt = build_excerpt(CONTENT)
+    assert excerpt.startswith("标题 第一点 加粗 查看链接 很长的正文")
+    assert excerpt.endswith("…")
+    assert len(excerpt) == settings.SUMMARY_EXCERPT_LENGTH + 1
+
+
+def test_default_list_returns_excerpt(client: TestClient, headers: dict, summary_id: str) -> None:
+    response = client.get("/api/v1/summaries", headers=headers)
+    assert response.status_code == 200
+    (item,) = response.json()["items"]
+    assert item["id"] == summary_id
+    assert item["excerpt"] == build_excerpt(CONTENT)
+    assert item["tags"] == ["t1", "t2"]
+    assert "content" not in item
+    assert "key_points" not in item
+
+
+@pytest.mark.parametrize("fields, expected", [
+    ("title,tags", {"id", "title", "tags"}),
+    (" excerpt , ,title,excerpt", {"id", "excerpt", "title"}),
+    ("id", {"id"}),
+    ("content,key_points", {"id", "content", "key_points"}),
+    ("source_ids,created_at", {"id", "source_ids", "created_at"}),
+])
+def test_sparse_fields(client: TestClient, headers: dict, summary_id: str, fields: str, expected: set) -> None:
+    response = client.get("/api/v1/summaries", params={"fields": fields}, headers=headers)
+    assert response.status_code == 200, response.text
+    (item,) = response.json()["items"]
+    assert set(item) == expected
+    if "content" in expected:
+        assert item["content"] == CONTENT
+        assert item["key_points"] == ["要点"]
+    if "source_ids" in expected:
+        assert item["source_ids"] == []
+
+
+def test_sparse_fields_with_search_and_cursor(client: TestClient, headers: dict, summary_id: str) -> None:
+    response = client.get(
+        "/api/v1/summaries", params={"fields": "title,snippet", "search": "稀疏字段"}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    (item,) = response.json()["items"]
+    assert set(item) == {"id", "title", "snippet"}
+
+    response = client.get(
+        "/api/v1/summaries", params={"fields": "excerpt", "page_size": 1, "include_total": "false"}, headers=headers
+    )
+    assert response.status_code == 200
+    assert set(response.json()["items"][0]) == {"id", "excerpt"}
+
+
+def test_unknown_field(client: TestClient, headers: dict) -> None:
+    response = client.get("/api/v1/summaries", params={"fields": "title,password,nope"}, headers=headers)
+    assert response.status_code == 400
+    assert "password" in response.json()["detail"]
+    assert "nope" in response.json()["detail"]
+
+
+def test_update_regenerates_excerpt(client: TestClient, headers: dict, summary_id: str) -> None:
+    response = client.put(f"/api/v1/summaries/{summary_id}", json={"content": "## 新的正文"}, headers=headers)
+    assert response.status_code == 200, response.text
+    response = client.get("/api/v1/summaries", params={"fields": "excerpt"}, headers=headers)
+    assert response.json()["items"] == [{"id": summary_id, "excerpt": "新的正文"}]
@@ -0,0 +1,154 @@
+"""
+摘要生成任务（Celery eager模式，模型调用使用替身）：
+状态依次为PENDING、RUNNING、SUCCEEDED/FAILED，失败后按指数退避重试；入队失败时返回503
+"""
+import threading
+import uuid
+from typing import List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.routes import summary as summary_routes
+from app.config import settings
+from app.core.security import create_access_token
+from app.db.models.job import JobStatus, SummaryJob
+from app.db.models.source import Source, SourceFetch, SourceType
+from app.db.models.summary import Summary
+from app.db.models.user import User
+from app.db.session import SessionLocal
+from app.services.ai import SummaryResult
+from app.tasks import worker
+from app.tasks.summary import generate_summary_job
+
+
+class StubAIService:
+    """按顺序返回预设结果的AI服务，调用时记录任务状态"""
+    outcomes: List[object] = []
+    statuses: List[JobStatus] = []
+    source_id = ""
+
+    async def generate_summary(self, request):
+        with SessionLocal() as db:
+            StubAIService.statuses.append(db.query(SummaryJob.status).filter(
+                SummaryJob.source_ids.contains(StubAIService.source_id)
+            ).scalar())
+        outcome = StubAIService.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def eager(monkeypatch):
+    monkeypatch.setattr(worker.celery_app.conf, "task_always_eager", True)
+    # 执行线程中已创建的AI服务替换为替身
+    monkeypatch.setattr(worker, "_local", threading.local())
+    monkeypatch.setattr(worker, "AIService", StubAIService)
+    StubAIService.outcomes, StubAIService.statuses = [], []
+
+    countdowns = []
+    retry = generate_summary_job.retry
+
+    def record_retry(*args, **kwargs):
+        countdowns.append(kwargs.get("countdown"))
+        return retry(*args, **kwargs)
+
+    monkeypatch.setattr(generate_summary_job, "retry", record_retry)
+    return countdowns
+
+
+@pytest.fixture
+def account() -> dict:
+    name = f"jobs_{uuid.uuid4().hex[:8]}"
+    with SessionLocal() as db:
+        user = User(username=name, email=f"{name}@example.com", hashed_password="-", is_active=True)
+        db.add(user)
+        db.commit()
+        source = Source(name=name, type=SourceType.BLOG, url=f"https://example.com/{name}", user_id=user.id)
+        db.add(source)
+        db.commit()
+        db.add(SourceFetch(source_id=source.id, url=source.url, content="已抓取的正文", items=[]))
+        db.commit()
+        return {
+            "source_id": source.id,
+            "headers": {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"},
+        }
+
+
+def _generate(client: TestClient, account: dict, monkeypatch) -> dict:
+    """提交生成请求，记录入队时的任务状态，返回任务详情"""
+    enqueued = []
+    enqueue = summary_routes.enqueue_summary_job
+
+    def record_enqueue(job_id: str) -> None:
+        with SessionLocal() as db:
+            enqueued.append(db.get(SummaryJob, job_id).status)
+        enqueue(job_id)
+
+    monkeypatch.setattr(summary_routes, "enqueue_summary_job", record_enqueue)
+    StubAIService.source_id = account["source_id"]
+    response = client.post(
+        "/api/v1/summaries/generate", json={"source_ids": [account["source_id"]]}, headers=account["headers"]
+    )
+    assert response.status_code == 202, response.text
+    assert enqueued == [JobStatus.PENDING]
+    job = client.get(f"/api/v1/summaries/jobs/{response.json()['job_id']}", headers=account["headers"])
+    assert job.status_code == 200
+    return job.json()
+
+
+def test_job_succeeds(client: TestClient, eager, account: dict, monkeypatch) -> None:
+    StubAIService.outcomes = [SummaryResult(summary="生成的摘要", key_points=["要点"])]
+    job = _generate(client, account, monkeypatch)
+
+    assert job["status"] == JobStatus.SUCCEEDED.value
+    assert job["attempts"] == 1
+    assert job["error"] is None
+    assert job["finished_at"] is not None
+    assert StubAIService.statuses == [JobStatus.RUNNING]
+    assert eager == []
+    with SessionLocal() as db:
+        summary = db.get(Summary, job["summary_id"])
+        assert summary.content == "生成的摘要"
+        assert [source.id for source in summary.sources] == [account["source_id"]]
+
+
+def test_job_retries_with_backoff(client: TestClient, eager, account: dict, monkeypatch) -> None:
+    StubAIService.outcomes = [RuntimeError("超时"), RuntimeError("超时"), SummaryResult(summary="摘要", key_points=[])]
+    job = _generate(client, account, monkeypatch)
+
+    assert job["status"] == JobStatus.SUCCEEDED.value
+    assert job["attempts"] == 3
+    assert StubAIService.statuses == [JobStatus.RUNNING] * 3
+    backoff = settings.SUMMARY_JOB_RETRY_BACKOFF
+    assert eager == [backoff, backoff * 2]
+
+
+def test_job_fails_after_max_retries(client: TestClient, eager, account: dict, monkeypatch) -> None:
+    retries = settings.SUMMARY_JOB_MAX_RETRIES
+    StubAIService.outcomes = [RuntimeError(f"第{i + 1}次失败") for i in range(retries + 1)]
+    job = _generate(client, account, monkeypatch)
+
+    assert job["status"] == JobStatus.FAILED.value
+    assert job["attempts"] == retries + 1
+    assert job["error"] == f"第{retries + 1}次失败"
+    assert job["finished_at"] is not None
+    assert job["summary_id"] is None
+    assert StubAIService.outcomes == []
+    assert eager == [settings.SUMMARY_JOB_RETRY_BACKOFF * 2 ** i for i in range(retries)]
+
+
+def test_enqueue_failure_returns_503(client: TestClient, account: dict, monkeypatch) -> None:
+    def unavailable(job_id: str) -> None:
+        raise ConnectionError("broker不可用")
+
+    monkeypatch.setattr(summary_routes, "enqueue_summary_job", unavailable)
+    response = client.post(
+        "/api/v1/summaries/generate", json={"source_ids": [account["source_id"]]}, headers=account["headers"]
+    )
+    assert response.status_code == 503
+    with SessionLocal() as db:
+        job = db.query(SummaryJob).filter(SummaryJob.source_ids.contains(account["source_id"])).one()
+        assert job.status == JobStatus.FAILED
+        assert job.error == "任务队列不可用"
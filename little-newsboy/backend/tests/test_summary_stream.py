@@ -0,0 +1,150 @@
+"""
+流式摘要：SSE依次推送delta和done（出错时为error）事件；模型输出结束即释放全局并发名额，不等客户端读完
+"""
+import asyncio
+import json
+import uuid
+from typing import List, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.routes import summary as summary_routes
+from app.config import settings
+from app.core.security import create_access_token
+from app.db.models.source import Source, SourceFetch, SourceType
+from app.db.models.summary import Summary
+from app.db.models.user import User
+from app.db.session import SessionLocal
+from app.services.ai import AIService, SummaryRequest
+
+STREAM_URL = "/api/v1/summaries/generate/stream"
+OUTPUT = ["## 摘要\n", "今日要闻", "\n## 关键要点\n- 要点一"]
+
+
+class _StreamService(AIService):
+    """流式输出预设文本，记录模型输出是否结束"""
+
+    def __init__(self):
+        super().__init__()
+        self.cache = None
+        self.provider = "openai"
+        self.finished = asyncio.Event()
+        self.cancelled = False
+
+    async def _stream_with_openai(self, request: SummaryRequest):
+        try:
+            for text in OUTPUT:
+                await asyncio.sleep(0)
+                yield text
+        except BaseException:
+            self.cancelled = True
+            raise
+        self.finished.set()
+
+
+def test_limiter_is_released_before_client_reads(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "AI_MAX_CONCURRENCY", 1)
+
+    async def run():
+        service = _StreamService()
+        stream = service.stream_summary(SummaryRequest(content="正文"))
+        first = await stream.__anext__()
+        # 客户端暂停读取时模型输出仍会读完并释放名额
+        await asyncio.wait_for(service.finished.wait(), timeout=1)
+        released = not service._get_limiter().locked()
+        rest = [text async for text in stream]
+        return first, rest, released
+
+    first, rest, released = asyncio.run(run())
+    assert [first] + rest == OUTPUT
+    assert released
+
+
+def test_closing_stream_cancels_upstream(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "AI_MAX_CONCURRENCY", 1)
+
+    async def run():
+        service = _StreamService()
+        stream = service.stream_summary(SummaryRequest(content="正文"))
+        await stream.__anext__()
+        await stream.aclose()
+        await asyncio.sleep(0)
+        return service
+
+    service = asyncio.run(run())
+    assert service.cancelled
+    assert not service.finished.is_set()
+    assert not service._get_limiter().locked()
+
+
+@pytest.fixture
+def account() -> dict:
+    name = f"stream_{uuid.uuid4().hex[:8]}"
+    with SessionLocal() as db:
+        user = User(username=name, email=f"{name}@example.com", hashed_password="-", is_active=True)
+        db.add(user)
+        db.commit()
+        source = Source(name=name, type=SourceType.BLOG, url=f"https://example.com/{name}", user_id=user.id)
+        db.add(source)
+        db.commit()
+        db.add(SourceFetch(source_id=source.id, url=source.url, content="已抓取的正文", items=[]))
+        db.commit()
+        return {
+            "source_id": source.id,
+            "headers": {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"},
+        }
+
+
+def _stream(client: TestClient, account: dict, monkeypatch, outputs: list) -> List[Tuple[str, dict]]:
+    """以替身模型输出调用流式接口，返回 (事件名, 数据) 列表"""
+    async def fake_stream(request: SummaryRequest):
+        for output in outputs:
+            if isinstance(output, Exception):
+                raise output
+            yield output
+
+    monkeypatch.setattr(summary_routes.ai_service, "_stream_with_openai", fake_stream)
+    monkeypatch.setattr(summary_routes.ai_service, "_stream_with_ollama", fake_stream)
+    response = client.post(STREAM_URL, json={"source_ids": [account["source_id"]]}, headers=account["headers"])
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["cache-control"] == "no-cache"
+
+    events = []
+    for message in response.text.split("\n\n"):
+        if not message:
+            continue
+        event, data = message.split("\n")
+        assert event.startswith("event: ") and data.startswith("data: ")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_stream_events(client: TestClient, account: dict, monkeypatch) -> None:
+    events = _stream(client, account, monkeypatch, OUTPUT)
+
+    assert [name for name, _ in events] == ["delta"] * len(OUTPUT) + ["done"]
+    assert [data["text"] for _, data in events[:-1]] == OUTPUT
+    done = events[-1][1]
+    assert done["content"] == "今日要闻"
+    assert done["key_points"] == ["要点一"]
+    with SessionLocal() as db:
+        summary = db.get(Summary, done["id"])
+        assert [source.id for source in summary.sources] == [account["source_id"]]
+
+
+def test_stream_error_event(client: TestClient, account: dict, monkeypatch) -> None:
+    events = _stream(client, account, monkeypatch, ["## 摘要\n", RuntimeError("连接中断")])
+
+    assert events == [("delta", {"text": "## 摘要\n"}), ("error", {"detail": "摘要生成失败"})]
+    with SessionLocal() as db:
+        assert db.query(Summary).filter(Summary.sources.any(Source.id == account["source_id"])).count() == 0
+
+
+def test_stream_requires_fetched_content(client: TestClient, account: dict) -> None:
+    with SessionLocal() as db:
+        db.query(SourceFetch).filter(SourceFetch.source_id == account["source_id"]).delete()
+        db.commit()
+    response = client.post(STREAM_URL, json={"source_ids": [account["source_id"]]}, headers=account["headers"])
+    assert response.status_code == 409
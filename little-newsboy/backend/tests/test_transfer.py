@@ -0,0 +1,60 @@
+"""
+NDJSON导入：按数据块逐行读取请求体，超过长度上限的行记为失败
+"""
+import asyncio
+import json
+import random
+
+from app.config import settings
+from app.core.security import create_access_token
+from app.db.models.user import User
+from app.db.session import SessionLocal
+from app.services.transfer import read_ndjson_lines
+
+
+class _Request:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def stream(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+def _read(chunks, max_line_bytes: int):
+    async def collect():
+        return [item async for item in read_ndjson_lines(_Request(chunks), max_line_bytes)]
+    return asyncio.run(collect())
+
+
+def test_lines_split_across_chunks() -> None:
+    body = b"".join(b"x" * random.Random(i).randrange(0, 30) + b"\n" for i in range(200)) + b"  \n\nlast"
+    expected = [(number, line) for number, line in enumerate(body.split(b"\n"), 1) if line.strip()]
+    rng = random.Random(0)
+    for _ in range(20):
+        cuts = sorted(rng.sample(range(1, len(body)), 40))
+        chunks = [body[start:end] for start, end in zip([0] + cuts, cuts + [len(body)])]
+        assert _read(chunks, 1000) == expected
+
+
+def test_oversized_lines() -> None:
+    chunks = [b'{"a": 1}\nxxxx', b"xxxx", b"xxxx\n", b'{"b": 2}\n', b"y" * 20 + b"\n", b"zzzz", b"zzzzzzzz"]
+    assert _read(chunks, 10) == [(1, b'{"a": 1}'), (2, None), (3, b'{"b": 2}'), (4, None), (5, None)]
+
+
+def test_import_reports_oversized_line(client) -> None:
+    with SessionLocal() as db:
+        user = User(username="importer", email="importer@example.com", hashed_password="-", is_active=True)
+        db.add(user)
+        db.commit()
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+    body = "\n".join([
+        json.dumps({"title": "ok", "content": "short"}),
+        json.dumps({"title": "too long", "content": "x" * settings.IMPORT_MAX_LINE_BYTES}),
+        json.dumps({"title": "ok again", "content": "short"}),
+    ])
+    response = client.post("/api/v1/summaries/import", content=body, headers=headers)
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["imported"], result["failed"]) == (2, 1)
+    assert result["errors"][0]["line"] == 2
@@ -84,7 +84,7 @@ const SummaryCard: React.FC<SummaryCardProps> = ({
         </Title>
         
         <Paragraph ellipsis={{ rows: 3 }} className="text-gray-600 mb-3">
-          {summary.content}
+          {summary.excerpt ?? summary.content}
         </Paragraph>
         
         <div className="mb-2">
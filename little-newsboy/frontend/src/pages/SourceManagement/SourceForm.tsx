@@ -47,7 +47,7 @@ interface Source {
   status: string;
   filters?: Record<string, any>;
   credentials?: Record<string, any>;
-  user_id: string;
+  user_id: number;
   created_at: string;
   updated_at: string;
 }
@@ -128,6 +128,11 @@ export const summaryAPI = {
     return apiClient.get(`/summaries/${id}`);
   },
   
+  // 获取相关摘要（按本地向量的相似度排序）
+  getRelatedSummaries: (id: string, limit?: number) => {
+    return apiClient.get(`/summaries/${id}/related`, { params: { limit } });
+  },
+  
   // 创建新摘要
   createSummary: (data: {
     title: string;
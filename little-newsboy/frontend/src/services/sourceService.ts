@@ -25,7 +25,7 @@ export interface SourceUpdate {
 
 export interface Source extends SourceCreate {
   id: string;
-  user_id: string;
+  user_id: number;
   created_at: string;
   updated_at: string;
 }
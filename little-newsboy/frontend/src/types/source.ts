@@ -33,7 +33,7 @@ export interface ISource {
   status: Status;
   filters?: string;
   credentials?: string;
-  user_id: string;
+  user_id: number;
   created_at: string;
   updated_at: string;
 }
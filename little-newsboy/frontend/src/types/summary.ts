@@ -5,12 +5,16 @@ export interface Summary {
   id: string;
   title: string;
   content: string;
+  // 列表接口返回的正文摘录（列表不返回content）
+  excerpt?: string;
+  // 相关摘要接口返回的余弦相似度
+  score?: number;
   key_points: string[];
   sources: ISource[];
   tags: string[];
   is_archived: boolean;
   is_important: boolean;
-  user_id: string;
+  user_id: number;
   created_at: string;
   updated_at: string;
 }
@@ -59,7 +63,7 @@ export interface SummaryTemplate {
   name: string;
   description: string;
   parameters: SummaryParameters;
-  user_id: string;
+  user_id: number;
   created_at: string;
   updated_at: string;
 }